@@ -6,8 +6,20 @@ Phase 8 added automatic embedding at chunk creation time,
 but existing chunks don't have embeddings yet. This script
 retroactively generates and stores embeddings for all chunks.
 
+Phase 11: chunks are embedded --batch-size at a time (one provider call
+per batch, through the embedding cache) and each batch is appended to the
+vector log in one write, then recorded in a checkpoint
+(context/.backfill_embeddings.json): an interrupted run resumes where it
+stopped (--restart discards the checkpoint). The log is folded into the
+.vec file at the end. Throughput is reported in chunks/s.
+
+--passages also embeds the line windows of chunks that have none yet
+(passage index, see passages.py; enable RLM_PASSAGE_INDEX=1 to use them
+in searches).
+
 Usage:
-    python3 scripts/backfill_embeddings.py [--dry-run]
+    python3 scripts/backfill_embeddings.py [--dry-run] [--passages]
+        [--batch-size N] [--restart]
 """
 
 import json
@@ -18,13 +30,18 @@ from pathlib import Path
 ROOT = Path(__file__).resolve().parent.parent
 sys.path.insert(0, str(ROOT / "src"))
 
+from mcp_server.tools.backfill import Checkpoint, Throughput, batched, int_option
+from mcp_server.tools.embedcache import cached_embed, get_embedding_cache, model_name
 from mcp_server.tools.embeddings import _get_cached_provider
+from mcp_server.tools.passages import PASSAGES_FILE, index_passages
 from mcp_server.tools.vecstore import VectorStore
 
 
 CONTEXT_DIR = ROOT / "context"
 INDEX_FILE = CONTEXT_DIR / "index.json"
 CHUNKS_DIR = CONTEXT_DIR / "chunks"
+CHECKPOINT_FILE = CONTEXT_DIR / ".backfill_embeddings.json"
+BATCH_SIZE = 64
 
 
 def extract_content(chunk_file: Path) -> str:
@@ -65,8 +82,31 @@ def extract_content(chunk_file: Path) -> str:
     return body
 
 
+def backfill_passages(chunks: list[dict], provider, dry_run: bool, batch_size: int) -> int:
+    """Embed the line windows of chunks without passages. Returns windows written."""
+    store = VectorStore(CONTEXT_DIR / PASSAGES_FILE)
+    store.load()
+    indexed = {pid.rpartition("#")[0] for pid in store.chunk_ids}
+    todo = [
+        c["id"] for c in chunks if c["id"] not in indexed and (CONTEXT_DIR / c["file"]).exists()
+    ]
+    print(f"\nPassages: {len(indexed)} chunks indexed, {len(todo)} to index")
+    if dry_run or not todo:
+        return 0
+
+    # Resumes without a checkpoint: chunks with passages are skipped above
+    written = 0
+    throughput = Throughput()
+    for batch in batched(todo, batch_size):
+        written += index_passages(batch, provider, CONTEXT_DIR, batch_size)
+        throughput.add(len(batch))
+        print(f"  Passages: {throughput.format(len(todo))}")
+    return written
+
+
 def main():
     dry_run = "--dry-run" in sys.argv
+    batch_size = int_option("--batch-size", BATCH_SIZE)
 
     # Check provider
     provider = _get_cached_provider()
@@ -94,57 +134,91 @@ def main():
     existing_ids = set(store.chunk_ids)
     print(f"Already embedded: {len(existing_ids)}")
 
-    embedded = 0
-    skipped = 0
-    errors = 0
+    # Phase 11: Resume an interrupted run
+    checkpoint = Checkpoint(None if dry_run else CHECKPOINT_FILE)
+    if "--restart" in sys.argv:
+        checkpoint.clear()
+    elif checkpoint.load():
+        print(f"Resuming: {len(checkpoint.done)} chunks done by the previous run")
 
+    skipped = 0
+    todo = []
     for chunk_info in chunks:
         chunk_id = chunk_info["id"]
-        chunk_file = CONTEXT_DIR / chunk_info["file"]
+        if chunk_id in checkpoint.done:
+            continue  # Counted by the interrupted run
 
         # Skip if already embedded
         if chunk_id in existing_ids:
             skipped += 1
-            continue
-
-        if not chunk_file.exists():
-            print(f"  SKIP {chunk_id}: file not found")
-            errors += 1
-            continue
-
-        content = extract_content(chunk_file)
-        if not content.strip():
-            print(f"  SKIP {chunk_id}: empty content")
-            skipped += 1
-            continue
-
-        if dry_run:
-            print(f"  WOULD EMBED {chunk_id} ({len(content)} chars)")
-            embedded += 1
-            continue
-
-        try:
-            vec = provider.embed([content])[0]
-            store.add(chunk_id, vec)
-            embedded += 1
-            if embedded % 10 == 0:
-                print(f"  Embedded {embedded} chunks...")
-        except Exception as e:
-            print(f"  ERROR {chunk_id}: {e}")
-            errors += 1
-
-    # Save
-    if not dry_run and embedded > 0:
-        store.save()
-        print(f"\nSaved to {store.path}")
+        else:
+            todo.append(chunk_info)
+
+    throughput = Throughput()
+    for batch in batched(todo, batch_size):
+        ids, texts = [], []
+        empty = errors = 0
+        for chunk_info in batch:
+            chunk_id = chunk_info["id"]
+            chunk_file = CONTEXT_DIR / chunk_info["file"]
+
+            if not chunk_file.exists():
+                print(f"  SKIP {chunk_id}: file not found")
+                errors += 1
+                continue
+
+            content = extract_content(chunk_file)
+            if not content.strip():
+                print(f"  SKIP {chunk_id}: empty content")
+                empty += 1
+                continue
+
+            if dry_run:
+                print(f"  WOULD EMBED {chunk_id} ({len(content)} chars)")
+            ids.append(chunk_id)
+            texts.append(content)
+
+        # One provider call and one log write per batch
+        if texts and not dry_run:
+            try:
+                vectors = cached_embed(provider, texts)
+                store.append_many(zip(ids, vectors, strict=True))
+            except Exception as e:
+                print(f"  ERROR {ids[0]} .. {ids[-1]}: {e}")
+                errors += len(ids)
+                ids = []
+
+        checkpoint.mark([c["id"] for c in batch], embedded=len(ids), skipped=empty, errors=errors)
+        throughput.add(len(batch))
+        print(f"  Embedded {throughput.format(len(todo))}")
+
+    # Fold the appended batches into the .vec file
+    if not dry_run and checkpoint.count("embedded") > 0:
+        store.wait_for_compact()
+        store.compact()
+        print(f"\nSaved to {store.data_file}")
+
+    # Phase 11: Passage index
+    passages = 0
+    if "--passages" in sys.argv:
+        passages = backfill_passages(chunks, provider, dry_run, batch_size)
 
     # Summary
+    final = VectorStore()
+    final.load()
     mode = "[DRY RUN] " if dry_run else ""
     print(f"\n{mode}Backfill complete:")
-    print(f"  Embedded: {embedded}")
-    print(f"  Skipped (already embedded or empty): {skipped}")
-    print(f"  Errors: {errors}")
-    print(f"  Total in store: {len(store.chunk_ids)}")
+    print(f"  Embedded: {checkpoint.count('embedded')}")
+    print(f"  Skipped (already embedded or empty): {skipped + checkpoint.count('skipped')}")
+    print(f"  Errors: {checkpoint.count('errors')}")
+    print(f"  Total in store: {len(final.chunk_ids)}")
+    print(f"  Throughput: {throughput.rate:.1f} chunks/s")
+    if "--passages" in sys.argv:
+        print(f"  Passages embedded: {passages}")
+    cache = get_embedding_cache(model_name(provider)).stats()
+    print(f"  Embedding cache: {cache['hits']} hits, {cache['misses']} misses")
+
+    checkpoint.clear()
 
 
 if __name__ == "__main__":
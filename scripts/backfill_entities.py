@@ -6,24 +6,42 @@ Phase 7.2 added automatic entity extraction at chunk creation time,
 but ~100 existing chunks don't have entities yet. This script
 retroactively extracts and stores entities for all chunks.
 
+Phase 11: chunks are parsed and their entities extracted in a process
+pool (--workers, default: CPU count), --batch-size chunks at a time. At
+the end of each batch the chunk files are rewritten and index.json is
+updated in one locked write, then the batch is recorded in a checkpoint
+(context/.backfill_entities.json): an interrupted run resumes where it
+stopped (--restart discards the checkpoint). Throughput is reported in
+chunks/s.
+
 Usage:
-    python3 scripts/backfill_entities.py [--dry-run]
+    python3 scripts/backfill_entities.py [--dry-run] [--batch-size N]
+        [--workers N] [--restart]
 """
 
 import json
+import os
 import sys
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
 # Add project root to path
 ROOT = Path(__file__).resolve().parent.parent
 sys.path.insert(0, str(ROOT / "src"))
 
+from mcp_server.tools.backfill import Checkpoint, Throughput, batched, int_option
+from mcp_server.tools.fileutil import atomic_write_text, bump_generation, locked_json_update
+from mcp_server.tools.lineindex import write_line_index
 from mcp_server.tools.navigation import _extract_entities
 
 
 CONTEXT_DIR = ROOT / "context"
 INDEX_FILE = CONTEXT_DIR / "index.json"
 CHUNKS_DIR = CONTEXT_DIR / "chunks"
+CHECKPOINT_FILE = CONTEXT_DIR / ".backfill_entities.json"
+BATCH_SIZE = 256
+
+EMPTY_ENTITIES = {"files": [], "versions": [], "modules": [], "tickets": [], "functions": []}
 
 
 def parse_chunk_file(filepath: Path) -> tuple[dict, str]:
@@ -88,84 +106,128 @@ def rebuild_frontmatter(original_fm: str, entities: dict) -> str:
     return "\n".join(result_lines)
 
 
+def extract_chunk(chunk_file: Path) -> tuple:
+    """Parse a chunk and extract its entities (runs in a pool worker).
+
+    Returns:
+        Tuple of (frontmatter, content, entities), or (None, error message, None)
+    """
+    try:
+        fm_raw, content = parse_chunk_file(chunk_file)
+    except Exception as e:
+        return None, str(e), None
+
+    if not content:
+        # Empty content, set empty entities
+        return fm_raw, content, {etype: [] for etype in EMPTY_ENTITIES}
+    return fm_raw, content, _extract_entities(content)
+
+
 def main():
     dry_run = "--dry-run" in sys.argv
+    batch_size = int_option("--batch-size", BATCH_SIZE)
+    workers = int_option("--workers", os.cpu_count() or 1)
 
     # Load index
     with open(INDEX_FILE, encoding="utf-8") as f:
         index = json.load(f)
 
     chunks = index["chunks"]
-    updated = 0
-    skipped = 0
-    errors = 0
-    total_entities = 0
 
+    # Phase 11: Resume an interrupted run
+    checkpoint = Checkpoint(None if dry_run else CHECKPOINT_FILE)
+    if "--restart" in sys.argv:
+        checkpoint.clear()
+    elif checkpoint.load():
+        print(f"Resuming: {len(checkpoint.done)} chunks done by the previous run")
+
+    skipped = 0
+    todo = []
     for chunk_info in chunks:
         chunk_id = chunk_info["id"]
-        chunk_file = CONTEXT_DIR / chunk_info["file"]
+        if chunk_id in checkpoint.done:
+            continue  # Counted by the interrupted run
 
         # Skip if already has entities
         if "entities" in chunk_info and chunk_info["entities"]:
             skipped += 1
             continue
 
-        if not chunk_file.exists():
+        if not (CONTEXT_DIR / chunk_info["file"]).exists():
             print(f"  SKIP {chunk_id}: file not found")
-            errors += 1
+            checkpoint.mark([chunk_id], errors=1)
             continue
 
-        # Parse chunk file
-        try:
-            fm_raw, content = parse_chunk_file(chunk_file)
-        except Exception as e:
-            print(f"  ERROR {chunk_id}: {e}")
-            errors += 1
-            continue
-
-        if not content:
-            # Empty content, set empty entities
-            entities = {"files": [], "versions": [], "modules": [], "tickets": [], "functions": []}
-        else:
-            entities = _extract_entities(content)
-
-        # Count entities
-        n_entities = sum(len(v) for v in entities.values())
-        total_entities += n_entities
-
-        if dry_run:
-            if n_entities > 0:
-                print(f"  {chunk_id}: {n_entities} entities → {entities}")
-            else:
-                print(f"  {chunk_id}: (no entities)")
-            updated += 1
-            continue
-
-        # Update index.json entry
-        chunk_info["entities"] = entities
-
-        # Update .md file frontmatter
-        if isinstance(fm_raw, str) and fm_raw:
-            new_fm = rebuild_frontmatter(fm_raw, entities)
-            # Reconstruct file
-            new_text = f"---\n{new_fm}\n---\n\n{content}\n"
-            chunk_file.write_text(new_text, encoding="utf-8")
-
-        updated += 1
-
-    # Save index.json
-    if not dry_run and updated > 0:
-        with open(INDEX_FILE, "w", encoding="utf-8") as f:
-            json.dump(index, f, indent=2, ensure_ascii=False)
-            f.write("\n")
+        todo.append(chunk_info)
+
+    print(f"Chunks to process: {len(todo)} ({workers} workers)")
+
+    throughput = Throughput()
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for batch in batched(todo, batch_size):
+            files = [CONTEXT_DIR / c["file"] for c in batch]
+            chunksize = max(1, len(batch) // workers)
+            extracted = list(pool.map(extract_chunk, files, chunksize=chunksize))
+
+            found = {}
+            errors = n_entities = 0
+            for chunk_info, chunk_file, (fm_raw, content, entities) in zip(
+                batch, files, extracted, strict=True
+            ):
+                chunk_id = chunk_info["id"]
+                if entities is None:
+                    print(f"  ERROR {chunk_id}: {content}")
+                    errors += 1
+                    continue
+
+                # Count entities
+                count = sum(len(v) for v in entities.values())
+                n_entities += count
+
+                if dry_run:
+                    if count > 0:
+                        print(f"  {chunk_id}: {count} entities → {entities}")
+                    else:
+                        print(f"  {chunk_id}: (no entities)")
+                    continue
+
+                found[chunk_id] = {"entities": entities}
+
+                # Update .md file frontmatter
+                if isinstance(fm_raw, str) and fm_raw:
+                    new_fm = rebuild_frontmatter(fm_raw, entities)
+                    # Reconstruct file
+                    header = f"---\n{new_fm}\n---\n"
+                    atomic_write_text(chunk_file, f"{header}\n{content}\n")
+                    # Phase 11: The header changed length
+                    found[chunk_id]["body_offset"] = len(header.encode("utf-8"))
+                    write_line_index(chunk_file)
+
+            # Bulk index.json update for the batch
+            if found:
+                with locked_json_update(INDEX_FILE) as current:
+                    for chunk_info in current.get("chunks", []):
+                        if chunk_info["id"] in found:
+                            chunk_info.update(found[chunk_info["id"]])
+                bump_generation(INDEX_FILE.parent, "index")
+
+            updated = len(batch) - errors
+            checkpoint.mark(
+                [c["id"] for c in batch], updated=updated, errors=errors, entities=n_entities
+            )
+            throughput.add(len(batch))
+            print(f"  Processed {throughput.format(len(todo))}")
 
     # Summary
     mode = "[DRY RUN] " if dry_run else ""
     print(f"\n{mode}Backfill complete:")
-    print(f"  Updated: {updated}")
+    print(f"  Updated: {checkpoint.count('updated')}")
     print(f"  Skipped (already had entities): {skipped}")
-    print(f"  Errors: {errors}")
-    print(f"  Total entities extracted: {total_entities}")
+    print(f"  Errors: {checkpoint.count('errors')}")
+    print(f"  Total entities extracted: {checkpoint.count('entities')}")
+    print(f"  Throughput: {throughput.rate:.1f} chunks/s")
+
+    checkpoint.clear()
 
 
 if __name__ == "__main__":
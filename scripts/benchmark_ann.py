@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+Benchmark the IVF vector index and quantized scans against brute force.
+
+Measures, per store size:
+- index build time (k-means + list assignment)
+- for each n_probe: recall@k against brute force and query latency (p50/p95)
+- int8 / binary codes (RLM_VECTOR_QUANT): encode time, code size vs the
+  float32 matrix, recall@k after exact rescoring and latency
+- brute-force latency for comparison
+
+Vectors are drawn around random cluster centers (real embeddings are
+clustered; uniform random vectors are the worst case for IVF).
+
+Usage:
+    python3 scripts/benchmark_ann.py
+    python3 scripts/benchmark_ann.py --sizes 100000 --nprobe 4 8 16 --top-k 10
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add project root to path
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "src"))
+
+import numpy as np
+
+from mcp_server.tools.vecstore import VectorStore
+
+DEFAULT_SIZES = [10_000, 100_000]
+DEFAULT_DIM = 256  # Model2Vec potion-multilingual-128M
+DEFAULT_QUERIES = 50
+DEFAULT_NPROBE = [1, 4, 8, 16, 32]
+DEFAULT_CLUSTERS = 200
+TOP_K = 15  # search() limit 5 x FUSION_DEPTH
+
+
+def percentiles(timings: list[float]) -> tuple[float, float]:
+    """p50 and p95 in milliseconds."""
+    timings = sorted(timings)
+    p50 = timings[len(timings) // 2]
+    p95 = timings[min(len(timings) - 1, int(len(timings) * 0.95))]
+    return p50 * 1000, p95 * 1000
+
+
+def run_queries(store: VectorStore, queries, top_k: int):
+    """Ids returned per query and per-query latencies."""
+    ids, timings = [], []
+    for q in queries:
+        t0 = time.perf_counter()
+        results = store.search(q, top_k=top_k)
+        timings.append(time.perf_counter() - t0)
+        ids.append({cid for cid, _ in results})
+    return ids, timings
+
+
+def recall(found: list[set], exact: list[set]) -> float:
+    """Mean fraction of the exact top-k ids returned."""
+    return float(np.mean([len(f & e) / max(1, len(e)) for f, e in zip(found, exact, strict=True)]))
+
+
+def benchmark_size(args, size: int, workdir: Path) -> None:
+    """Build one store, then compare brute force, quantized scans and IVF."""
+    rng = np.random.default_rng(size)
+    centers = rng.standard_normal((args.clusters, args.dim), dtype=np.float32)
+    labels = rng.integers(0, args.clusters, size)
+    vectors = centers[labels] + 0.5 * rng.standard_normal((size, args.dim), dtype=np.float32)
+    queries = centers[rng.integers(0, args.clusters, args.queries)]
+    queries = queries + 0.5 * rng.standard_normal(queries.shape, dtype=np.float32)
+
+    path = workdir / f"bench_{size}.npz"
+    np.savez(path, chunk_ids=np.array([f"chunk_{i:07d}" for i in range(size)]), vectors=vectors)
+    del vectors
+    VectorStore(path=path).load()  # Legacy .npz -> .vec
+
+    store = VectorStore(path=path)
+    store.load()
+    os.environ["RLM_VECTOR_INDEX"] = "flat"
+    os.environ["RLM_VECTOR_QUANT"] = "none"
+    exact, timings = run_queries(store, queries, args.top_k)
+    p50, p95 = percentiles(timings)
+    print(f"  {size:>10,} {'flat':>8} {'':>10} {1.0:>10.3f} {p50:>10.2f} {p95:>10.2f}")
+
+    for kind in ("int8", "binary"):
+        os.environ["RLM_VECTOR_QUANT"] = kind
+        t0 = time.perf_counter()
+        codes = store.quantized()
+        t_build = time.perf_counter() - t0
+        if codes is None:
+            break
+        found, timings = run_queries(store, queries, args.top_k)
+        p50, p95 = percentiles(timings)
+        print(
+            f"  {size:>10,} {kind:>8} {t_build * 1000:>10.0f} {recall(found, exact):>10.3f} "
+            f"{p50:>10.2f} {p95:>10.2f}  ({size * args.dim * 4 / codes.nbytes:.0f}x smaller)"
+        )
+    os.environ["RLM_VECTOR_QUANT"] = "none"
+
+    os.environ["RLM_VECTOR_INDEX"] = "ivf"
+    t0 = time.perf_counter()
+    index = store.ann_index()
+    t_build = time.perf_counter() - t0
+    if index is None:
+        print(f"  {size:>10,} {'ivf':>8}  (below ANN_MIN_ROWS, brute force used)")
+        return
+
+    for n_probe in args.nprobe:
+        os.environ["RLM_IVF_NPROBE"] = str(n_probe)
+        found, timings = run_queries(store, queries, args.top_k)
+        p50, p95 = percentiles(timings)
+        print(
+            f"  {size:>10,} {n_probe:>8} {t_build * 1000:>10.0f} {recall(found, exact):>10.3f} "
+            f"{p50:>10.2f} {p95:>10.2f}"
+        )
+    print(f"  {'':>10} ({index.n_lists} lists)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="IVF / quantization recall@k vs brute force")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument("--dim", type=int, default=DEFAULT_DIM)
+    parser.add_argument("--queries", type=int, default=DEFAULT_QUERIES)
+    parser.add_argument("--nprobe", type=int, nargs="+", default=DEFAULT_NPROBE)
+    parser.add_argument("--clusters", type=int, default=DEFAULT_CLUSTERS)
+    parser.add_argument("--top-k", type=int, default=TOP_K)
+    args = parser.parse_args()
+
+    print("RLM ANN Benchmark")
+    print(f"dim={args.dim} | queries={args.queries} | recall@{args.top_k}\n")
+    print(
+        f"  {'Vectors':>10} {'mode':>8} {'build ms':>10} {'recall':>10} "
+        f"{'p50 ms':>10} {'p95 ms':>10}"
+    )
+    print(f"  {'-' * 10} {'-' * 8} {'-' * 10} {'-' * 10} {'-' * 10} {'-' * 10}")
+
+    with tempfile.TemporaryDirectory(prefix="rlm-annbench-") as tmp:
+        for size in args.sizes:
+            benchmark_size(args, size, Path(tmp))
+
+    print("\n  Done.")
+
+
+if __name__ == "__main__":
+    main()
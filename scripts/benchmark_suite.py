@@ -0,0 +1,449 @@
+#!/usr/bin/env python3
+"""
+End-to-end performance benchmark suite for RLM tools.
+
+Generates synthetic FR/EN corpora in the real chunk format (YAML header,
+entities, index.json, session_memory.json insights), then measures
+latency percentiles (p50/p95/p99) and throughput of:
+chunk, peek, grep, grep_fuzzy, search, recall, retention_run.
+
+Each corpus size runs in its own subprocess with RLM_CONTEXT_DIR pointing
+at a temporary context directory, so the real context/ is never touched.
+Results are written to a JSON report; pass --compare to diff against a
+previous report (e.g. from the last release).
+
+Usage:
+    python3 scripts/benchmark_suite.py
+    python3 scripts/benchmark_suite.py --sizes 1000 10000 100000 --output bench.json
+    python3 scripts/benchmark_suite.py --compare bench-0.10.0.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+# Add project root to path
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "src"))
+
+DEFAULT_SIZES = [1000, 10000]
+DEFAULT_ITERATIONS = 30
+DEFAULT_SEED = 42
+
+PROJECTS = ["RLM", "JoyJuice", "WebApp", "Infra"]
+DOMAINS = ["bp", "seo", "r&d", "infra", ""]
+CHUNK_TYPES = ["session", "snapshot", "debug"]
+
+# Vocabulary for synthetic content — FR and EN, with accents
+WORDS_FR = (
+    "serveur configuration déploiement stratégie réunion décision problème performance "
+    "architecture module fonction requête index recherche mémoire fichier projet client "
+    "budget équipe planning livraison sécurité base données cache latence migration "
+    "analyse rapport réseau authentification sauvegarde prototype évaluation marché "
+    "tarification fournisseur qualité test intégration version correctif régression"
+).split()
+WORDS_EN = (
+    "server configuration deployment strategy meeting decision issue performance "
+    "architecture module function query index search memory file project customer "
+    "budget team schedule delivery security database cache latency migration "
+    "analysis report network authentication backup prototype evaluation market "
+    "pricing supplier quality test integration release hotfix regression"
+).split()
+FILES = ["server.py", "search.py", "navigation.py", "vecstore.py", "index.json", "README.md"]
+MODULES = ["bm25s", "numpy", "fastmcp", "thefuzz", "model2vec", "pytest"]
+FUNCTIONS = ["search()", "chunk()", "peek()", "grep()", "recall()", "retention_run()"]
+
+
+# =============================================================================
+# SYNTHETIC CORPUS
+# =============================================================================
+
+
+def synthetic_text(rng: random.Random, sentences: int) -> str:
+    """Generate mixed FR/EN paragraphs with entity mentions."""
+    lines = []
+    for _ in range(sentences):
+        words = WORDS_FR if rng.random() < 0.5 else WORDS_EN
+        sentence = " ".join(rng.choice(words) for _ in range(rng.randint(6, 16)))
+        roll = rng.random()
+        if roll < 0.15:
+            sentence += f" dans {rng.choice(FILES)}"
+        elif roll < 0.25:
+            sentence += f" avec {rng.choice(MODULES)} v{rng.randint(0, 3)}.{rng.randint(0, 20)}"
+        elif roll < 0.30:
+            sentence += f" via {rng.choice(FUNCTIONS)}"
+        elif roll < 0.35:
+            sentence += f" (JJ-{rng.randint(1, 500)})"
+        lines.append(sentence.capitalize() + ".")
+    return "\n".join(lines)
+
+
+def generate_corpus(context_dir: Path, size: int, seed: int) -> None:
+    """
+    Write a synthetic context directory in the real on-disk format.
+
+    Args:
+        context_dir: Target directory (created)
+        size: Number of chunks
+        seed: Random seed (same seed = same corpus)
+    """
+    from mcp_server.tools.navigation import _content_hash, _estimate_tokens, _extract_entities
+
+    rng = random.Random(seed)
+    chunks_dir = context_dir / "chunks"
+    chunks_dir.mkdir(parents=True, exist_ok=True)
+
+    now = datetime.now()
+    sequences: dict[tuple, int] = {}
+    entries = []
+
+    for _ in range(size):
+        created = now - timedelta(days=rng.randint(1, 400), seconds=rng.randint(0, 86399))
+        date = created.strftime("%Y-%m-%d")
+        project = rng.choice(PROJECTS)
+        domain = rng.choice(DOMAINS)
+        chunk_type = rng.choice(CHUNK_TYPES)
+        seq = sequences[(date, project)] = sequences.get((date, project), 0) + 1
+
+        chunk_id = f"{date}_{project}_{seq:03d}" + (f"_{domain}" if domain else "")
+        content = synthetic_text(rng, rng.randint(5, 40))
+        summary = content.split("\n")[0][:80]
+        tags = rng.sample(["bp", "infra", "perf", "bug", "seo", "decision"], rng.randint(0, 2))
+        entities = _extract_entities(content)
+        tokens = _estimate_tokens(content)
+        content_hash = _content_hash(content)
+
+        entities_yaml = "\n".join(
+            f"  {etype}: {', '.join(evals)}" for etype, evals in entities.items() if evals
+        )
+        header = f"""---
+id: {chunk_id}
+summary: {summary}
+tags: {", ".join(tags)}
+chunk_type: {chunk_type}
+entities:
+{entities_yaml or "  (none)"}
+project: {project}
+ticket:
+domain: {domain}
+created_at: {created.isoformat()}
+tokens_estimate: {tokens}
+content_hash: {content_hash}
+format_version: "2.0"
+---
+
+"""
+        (chunks_dir / f"{chunk_id}.md").write_text(header + content, encoding="utf-8")
+
+        entries.append(
+            {
+                "id": chunk_id,
+                "file": f"chunks/{chunk_id}.md",
+                "summary": summary,
+                "tags": tags,
+                "tokens_estimate": tokens,
+                "content_hash": content_hash,
+                # Mostly accessed, so retention archives a realistic fraction
+                "access_count": 0 if rng.random() < 0.1 else rng.randint(1, 5),
+                "last_accessed": None,
+                "created_at": created.isoformat(),
+                "chunk_type": chunk_type,
+                "project": project,
+                "ticket": None,
+                "domain": domain or None,
+                "format_version": "2.0",
+                "entities": entities,
+            }
+        )
+
+    index = {
+        "version": "2.1.0",
+        "created_at": now.isoformat(),
+        "chunks": entries,
+        "total_tokens_estimate": sum(c["tokens_estimate"] for c in entries),
+    }
+    (context_dir / "index.json").write_text(json.dumps(index), encoding="utf-8")
+
+    insights = []
+    for i in range(max(1, size // 10)):
+        insights.append(
+            {
+                "id": f"{i:08x}",
+                "content": synthetic_text(rng, 1),
+                "category": rng.choice(["decision", "fact", "preference", "finding", "todo"]),
+                "importance": rng.choice(["low", "medium", "high", "critical"]),
+                "tags": rng.sample(["bp", "infra", "perf", "bug"], rng.randint(0, 2)),
+                "created_at": (now - timedelta(days=rng.randint(0, 400))).isoformat(),
+            }
+        )
+    memory = {
+        "version": "1.0.0",
+        "insights": insights,
+        "metadata": {
+            "created_at": now.isoformat(),
+            "last_updated": now.isoformat(),
+            "total_insights": len(insights),
+        },
+    }
+    (context_dir / "session_memory.json").write_text(json.dumps(memory), encoding="utf-8")
+
+
+# =============================================================================
+# MEASUREMENT
+# =============================================================================
+
+
+def percentile(sorted_values: list[float], pct: float) -> float:
+    """Nearest-rank percentile of an ascending list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, round(pct / 100 * len(sorted_values)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def measure(fn, args_list: list) -> dict:
+    """
+    Time fn(*args) for each args tuple.
+
+    Returns:
+        Latency percentiles (ms) and throughput (ops/s)
+    """
+    timings = []
+    for args in args_list:
+        t0 = time.perf_counter()
+        fn(*args)
+        timings.append(time.perf_counter() - t0)
+
+    timings.sort()
+    total = sum(timings)
+    return {
+        "iterations": len(timings),
+        "p50_ms": percentile(timings, 50) * 1000,
+        "p95_ms": percentile(timings, 95) * 1000,
+        "p99_ms": percentile(timings, 99) * 1000,
+        "mean_ms": total / len(timings) * 1000 if timings else 0.0,
+        "ops_per_s": len(timings) / total if total else 0.0,
+    }
+
+
+def timed(fn, *args) -> float:
+    """Run fn once, return elapsed milliseconds."""
+    t0 = time.perf_counter()
+    fn(*args)
+    return (time.perf_counter() - t0) * 1000
+
+
+def run_size(context_dir: Path, size: int, iterations: int, seed: int) -> dict:
+    """
+    Benchmark every operation on one corpus. Must run with RLM_CONTEXT_DIR
+    set to context_dir before mcp_server is imported (see worker mode).
+    """
+    t0 = time.perf_counter()
+    generate_corpus(context_dir, size, seed)
+    generate_s = time.perf_counter() - t0
+
+    from mcp_server.tools.memory import recall
+    from mcp_server.tools.navigation import chunk, grep, grep_fuzzy, peek
+    from mcp_server.tools.retention import retention_run
+    from mcp_server.tools.search import search
+
+    rng = random.Random(seed + 1)
+    index = json.loads((context_dir / "index.json").read_text(encoding="utf-8"))
+    chunk_ids = [c["id"] for c in index["chunks"]]
+    vocab = WORDS_FR + WORDS_EN
+
+    def queries(n_words: int) -> list[tuple]:
+        return [(" ".join(rng.sample(vocab, n_words)),) for _ in range(iterations)]
+
+    results = {}
+    notes = {}
+
+    # Search first: the cold call includes building the persistent BM25 index
+    notes["search_cold_ms"] = timed(search, "serveur performance")
+    results["search"] = measure(search, queries(3))
+
+    results["peek"] = measure(peek, [(rng.choice(chunk_ids),) for _ in range(iterations)])
+    results["grep"] = measure(grep, [(rng.choice(vocab),) for _ in range(iterations)])
+
+    try:
+        import thefuzz  # noqa: F401
+
+        results["grep_fuzzy"] = measure(
+            grep_fuzzy, [(rng.choice(vocab)[:-1] + "x",) for _ in range(iterations)]
+        )
+    except ImportError:
+        notes["grep_fuzzy"] = "skipped (thefuzz not installed)"
+
+    results["recall"] = measure(recall, queries(1))
+
+    content = [(synthetic_text(rng, 20), "", None, "BENCH") for _ in range(iterations)]
+    results["chunk"] = measure(chunk, content)
+
+    # First run archives the eligible chunks; later runs measure the steady-state scan
+    first = {}
+    notes["retention_run_first_ms"] = timed(lambda: first.update(retention_run()))
+    notes["retention_archived"] = first.get("archived_count", 0)
+    results["retention_run"] = measure(retention_run, [() for _ in range(max(1, iterations // 5))])
+
+    return {
+        "size": size,
+        "generate_s": generate_s,
+        "operations": results,
+        "notes": notes,
+    }
+
+
+# =============================================================================
+# REPORT
+# =============================================================================
+
+
+def print_result(result: dict) -> None:
+    """Print one corpus size as a table."""
+    print(f"\n{'=' * 72}")
+    print(f"  {result['size']} chunks (generated in {result['generate_s']:.1f}s)")
+    print(f"{'=' * 72}")
+    print(f"  {'Operation':<16} {'p50 ms':>10} {'p95 ms':>10} {'p99 ms':>10} {'ops/s':>10}")
+    print(f"  {'-' * 16} {'-' * 10} {'-' * 10} {'-' * 10} {'-' * 10}")
+    for name, stats in result["operations"].items():
+        print(
+            f"  {name:<16} {stats['p50_ms']:>10.2f} {stats['p95_ms']:>10.2f} "
+            f"{stats['p99_ms']:>10.2f} {stats['ops_per_s']:>10.1f}"
+        )
+    for key, value in result["notes"].items():
+        print(f"  {key}: {value:.1f}" if isinstance(value, float) else f"  {key}: {value}")
+
+
+def compare_reports(old: dict, new: dict, threshold: float) -> int:
+    """
+    Print p50/p95 ratios new/old per size and operation.
+
+    Returns:
+        Number of regressions (p95 ratio above 1 + threshold)
+    """
+    old_by_size = {r["size"]: r for r in old.get("results", [])}
+    regressions = 0
+
+    print(f"\n{'=' * 72}")
+    print(f"  COMPARISON vs {old.get('version', '?')} ({old.get('timestamp', '?')})")
+    print(f"{'=' * 72}")
+    for result in new["results"]:
+        previous = old_by_size.get(result["size"])
+        if previous is None:
+            continue
+        print(f"\n  {result['size']} chunks")
+        for name, stats in result["operations"].items():
+            before = previous["operations"].get(name)
+            if not before or not before["p50_ms"] or not before["p95_ms"]:
+                continue
+            p50 = stats["p50_ms"] / before["p50_ms"]
+            p95 = stats["p95_ms"] / before["p95_ms"]
+            flag = ""
+            if p95 > 1 + threshold:
+                flag = "  REGRESSION"
+                regressions += 1
+            print(f"    {name:<16} p50 x{p50:.2f}  p95 x{p95:.2f}{flag}")
+
+    return regressions
+
+
+def run_worker(args) -> None:
+    """Worker mode: benchmark one size, print the result as JSON."""
+    result = run_size(Path(args.context_dir), args.worker, args.iterations, args.seed)
+    print(json.dumps(result))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="RLM end-to-end benchmark suite")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument("--iterations", type=int, default=DEFAULT_ITERATIONS)
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED)
+    parser.add_argument("--output", default="benchmark_report.json")
+    parser.add_argument("--compare", help="Previous JSON report to compare against")
+    parser.add_argument(
+        "--threshold", type=float, default=0.2, help="p95 slowdown flagged as regression"
+    )
+    parser.add_argument("--keep", action="store_true", help="Keep generated corpora")
+    parser.add_argument("--worker", type=int, help=argparse.SUPPRESS)
+    parser.add_argument("--context-dir", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        run_worker(args)
+        return
+
+    from mcp_server import __version__
+
+    print("RLM Benchmark Suite")
+    print(f"Sizes: {args.sizes} | iterations: {args.iterations} | seed: {args.seed}")
+
+    workdir = Path(tempfile.mkdtemp(prefix="rlm-bench-"))
+    results = []
+    try:
+        for size in args.sizes:
+            context_dir = workdir / f"context-{size}"
+            env = {**os.environ, "RLM_CONTEXT_DIR": str(context_dir)}
+            print(f"\nRunning {size} chunks...")
+            proc = subprocess.run(
+                [
+                    sys.executable,
+                    __file__,
+                    "--worker",
+                    str(size),
+                    "--context-dir",
+                    str(context_dir),
+                    "--iterations",
+                    str(args.iterations),
+                    "--seed",
+                    str(args.seed),
+                ],
+                env=env,
+                capture_output=True,
+                text=True,
+            )
+            if proc.returncode != 0:
+                print(f"  ERROR: worker failed\n{proc.stderr}")
+                sys.exit(1)
+            result = json.loads(proc.stdout.strip().splitlines()[-1])
+            print_result(result)
+            results.append(result)
+    finally:
+        if args.keep:
+            print(f"\nCorpora kept in {workdir}")
+        else:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    report = {
+        "version": __version__,
+        "timestamp": datetime.now().isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "seed": args.seed,
+        "iterations": args.iterations,
+        "results": results,
+    }
+    Path(args.output).write_text(json.dumps(report, indent=2), encoding="utf-8")
+    print(f"\nReport written to {args.output}")
+
+    if args.compare:
+        old = json.loads(Path(args.compare).read_text(encoding="utf-8"))
+        regressions = compare_reports(old, report, args.threshold)
+        print(f"\n  {regressions} regression(s) above +{args.threshold:.0%} p95")
+        if regressions:
+            sys.exit(2)
+
+    print(f"\n{'=' * 72}")
+    print("  Done.")
+
+
+if __name__ == "__main__":
+    main()
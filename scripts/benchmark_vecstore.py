@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Benchmark VectorStore query latency on random vectors.
+
+Measures, per store size:
+- migration of a legacy .npz to the .vec format, then load time (memmap)
+- search latency (p50/p95) of VectorStore.search
+- the same query scored the pre-Phase 11 way (full-matrix norm + full
+  argsort) for comparison
+
+Usage:
+    python3 scripts/benchmark_vecstore.py
+    python3 scripts/benchmark_vecstore.py --sizes 10000 100000 --dim 384 --queries 100
+"""
+
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add project root to path
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "src"))
+
+import numpy as np
+
+from mcp_server.tools.vecstore import VectorStore
+
+DEFAULT_SIZES = [10_000, 100_000, 1_000_000]
+DEFAULT_DIM = 256  # Model2Vec potion-multilingual-128M
+DEFAULT_QUERIES = 50
+TOP_K = 15  # search() limit 5 x FUSION_DEPTH
+
+
+def legacy_search(vectors, chunk_ids, query_vec, top_k):
+    """Pre-Phase 11 scoring: norms recomputed and full argsort per query."""
+    q_norm = np.linalg.norm(query_vec)
+    v_norms = np.linalg.norm(vectors, axis=1)
+    v_norms = np.where(v_norms == 0, 1e-10, v_norms)
+    similarities = np.clip((vectors @ query_vec) / (v_norms * q_norm), 0, 1)
+    top_indices = np.argsort(similarities)[::-1][:top_k]
+    return [(chunk_ids[i], float(similarities[i])) for i in top_indices if similarities[i] > 0]
+
+
+def percentiles(timings: list[float]) -> tuple[float, float]:
+    """p50 and p95 in milliseconds."""
+    timings = sorted(timings)
+    p50 = timings[len(timings) // 2]
+    p95 = timings[min(len(timings) - 1, int(len(timings) * 0.95))]
+    return p50 * 1000, p95 * 1000
+
+
+def benchmark_size(size: int, dim: int, n_queries: int, workdir: Path) -> None:
+    """Build, load and query one store size."""
+    rng = np.random.default_rng(size)
+    vectors = rng.standard_normal((size, dim), dtype=np.float32)
+    chunk_ids = [f"chunk_{i:07d}" for i in range(size)]
+    queries = rng.standard_normal((n_queries, dim), dtype=np.float32)
+
+    path = workdir / f"bench_{size}.npz"
+    np.savez(path, chunk_ids=np.array(chunk_ids, dtype=object), vectors=vectors)
+    del vectors
+
+    t0 = time.perf_counter()
+    VectorStore(path=path).load()  # Legacy .npz -> .vec
+    t_migrate = time.perf_counter() - t0
+
+    store = VectorStore(path=path)
+    t0 = time.perf_counter()
+    store.load()
+    t_load = time.perf_counter() - t0
+
+    timings = []
+    for q in queries:
+        t0 = time.perf_counter()
+        store.search(q, top_k=TOP_K)
+        timings.append(time.perf_counter() - t0)
+    p50, p95 = percentiles(timings)
+
+    legacy = []
+    for q in queries:
+        t0 = time.perf_counter()
+        legacy_search(store.vectors, store.chunk_ids, q, TOP_K)
+        legacy.append(time.perf_counter() - t0)
+    legacy_p50, legacy_p95 = percentiles(legacy)
+
+    print(
+        f"  {size:>10,} {t_migrate * 1000:>10.1f} {t_load * 1000:>10.2f} {p50:>10.2f} {p95:>10.2f} "
+        f"{legacy_p50:>10.2f} {legacy_p95:>10.2f} {legacy_p50 / p50:>8.1f}x"
+    )
+    path.unlink()
+    store.data_file.unlink()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="VectorStore query latency benchmark")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument("--dim", type=int, default=DEFAULT_DIM)
+    parser.add_argument("--queries", type=int, default=DEFAULT_QUERIES)
+    args = parser.parse_args()
+
+    print("RLM VectorStore Benchmark")
+    print(f"dim={args.dim} | queries={args.queries} | top_k={TOP_K}\n")
+    print(
+        f"  {'Vectors':>10} {'migrate ms':>10} {'load ms':>10} {'p50 ms':>10} {'p95 ms':>10} "
+        f"{'legacy p50':>10} {'legacy p95':>10} {'speedup':>9}"
+    )
+    print(
+        f"  {'-' * 10} {'-' * 10} {'-' * 10} {'-' * 10} {'-' * 10} {'-' * 10} {'-' * 10} {'-' * 9}"
+    )
+
+    with tempfile.TemporaryDirectory(prefix="rlm-vecbench-") as tmp:
+        for size in args.sizes:
+            benchmark_size(size, args.dim, args.queries, Path(tmp))
+
+    print("\n  Done.")
+
+
+if __name__ == "__main__":
+    main()
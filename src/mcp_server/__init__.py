@@ -1,3 +1,8 @@
 """RLM — Infinite Memory for Claude Code."""
 
+import time
+
 __version__ = "0.10.0"
+
+# Phase 11: start of the package import, for the startup breakdown in rlm_status
+IMPORT_STARTED = time.perf_counter()
@@ -14,18 +14,45 @@ Usage:
     python server.py --http       # Run with HTTP (for testing)
 """
 
+import time
+
 from mcp.server.fastmcp import FastMCP
+from mcp.types import InitializedNotification
 
+from mcp_server import IMPORT_STARTED
+from mcp_server.tools.embedcache import query_cache_stats
+from mcp_server.tools.embedqueue import get_embed_queue
+from mcp_server.tools.fileutil import CONTEXT_DIR
 from mcp_server.tools.memory import forget, memory_status, recall, remember
 from mcp_server.tools.navigation import chunk, grep, list_chunks, peek
 from mcp_server.tools.retention import restore, retention_preview, retention_run
+from mcp_server.tools.search import cache_stats as search_cache_stats
 from mcp_server.tools.search import search as bm25_search
+from mcp_server.tools.search import search_batch as bm25_search_batch
 from mcp_server.tools.sessions import list_domains, list_sessions
+from mcp_server.tools.warmup import record_timing, start_warmup, startup_report
+
+record_timing("import", time.perf_counter() - IMPORT_STARTED)
 
 # Initialize the MCP server
 mcp = FastMCP("RLM Server")
 
 
+async def _on_initialized(_notification: InitializedNotification) -> None:
+    """
+    Start the background work once the client completed the handshake.
+
+    Phase 11: Load the model and search state in the background, then embed
+    chunks left in the queue by a previous run. Both are started once per
+    process (later HTTP sessions find them running or done).
+    """
+    start_warmup(CONTEXT_DIR)
+    get_embed_queue().start_worker()
+
+
+mcp._mcp_server.notification_handlers[InitializedNotification] = _on_initialized
+
+
 # =============================================================================
 # MEMORY TOOLS
 # =============================================================================
@@ -163,12 +190,46 @@ def rlm_status() -> str:
         if provider is not None:
             store = VectorStore()
             store.load()
-            semantic_line = f"Semantic: {type(provider).__name__} ({len(store.chunk_ids)}/{chunks_result['total_chunks']} embedded)\n"
+            pending = len(get_embed_queue().pending_ids())
+            pending_note = f", {pending} queued" if pending else ""
+            semantic_line = f"Semantic: {type(provider).__name__} ({len(store)}/{chunks_result['total_chunks']} embedded{pending_note})\n"
         else:
             semantic_line = "Semantic: not installed (pip install mcp-rlm-server[semantic])\n"
     except Exception:
         semantic_line = "Semantic: not available\n"
 
+    # Phase 11: Startup breakdown (background warm-up)
+    startup = startup_report()
+    startup_line = f"Startup: warm-up {startup['status']}"
+    if startup["timings_ms"]:
+        startup_line += (
+            " ("
+            + " | ".join(
+                f"{phase.replace('_', ' ')} {ms:.0f}ms"
+                for phase, ms in startup["timings_ms"].items()
+            )
+            + ")"
+        )
+    startup_line += "\n"
+
+    # Phase 11: Search result cache
+    cache_line = ""
+    try:
+        stats = search_cache_stats()
+        cache_line = (
+            f"Search cache: {stats['hits']} hits / {stats['misses']} misses "
+            f"({stats['size']}/{stats['maxsize']} entries)\n"
+        )
+    except Exception:
+        pass
+
+    # Phase 11: Query embedding cache
+    stats = query_cache_stats()
+    query_cache_line = (
+        f"Query embedding cache: {stats['hits']} hits / {stats['misses']} misses "
+        f"({stats['hit_rate']:.0%} hit rate, {stats['size']}/{stats['maxsize']} entries)\n"
+    )
+
     return (
         f"RLM Memory Status (v{mem_result['version']})\n"
         f"━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━\n"
@@ -178,6 +239,9 @@ def rlm_status() -> str:
         f"Chunks: {chunks_result['total_chunks']} (~{chunks_result['total_tokens_estimate']} tokens)\n"
         f"  Total accesses: {total_accesses}{access_stats}"
         f"{semantic_line}"
+        f"{cache_line}"
+        f"{query_cache_line}"
+        f"{startup_line}"
         f"━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━\n"
         f"Created: {mem_result['created_at'][:16] if mem_result['created_at'] else 'N/A'}\n"
         f"Last updated: {mem_result['last_updated'][:16] if mem_result['last_updated'] else 'never'}"
@@ -255,6 +319,7 @@ def rlm_chunk(
             f"⚠ Duplicate content detected!\n"
             f"  Existing chunk: {result['existing_chunk_id']}\n"
             f"  Summary: {result['existing_summary']}"
+            + ("\n  Archived: rlm_peek restores it" if result.get("archived") else "")
         )
 
     # Phase 9: Handle validation error
@@ -374,6 +439,14 @@ def rlm_grep(
     return "\n\n".join(output)
 
 
+def _passage_hint(result: dict) -> str:
+    """Peek hint for a result tagged with its best line window (Phase 11)."""
+    passage = result.get("passage")
+    if not passage:
+        return ""
+    return f"\n   best lines: {passage['start']}-{passage['end']} (rlm_peek start/end)"
+
+
 @mcp.tool()
 def rlm_search(
     query: str,
@@ -396,6 +469,8 @@ def rlm_search(
     Phase 5.5c: Supports filtering by project and domain.
     Phase 7.1: Supports temporal filtering by date range.
     Phase 7.2: Supports filtering by entity.
+    Phase 11: With RLM_PASSAGE_INDEX=1, results show their best-matching
+    line range: pass it to rlm_peek instead of reading the whole chunk.
 
     Args:
         query: Natural language search query (e.g., "business plan discussion")
@@ -434,11 +509,80 @@ def rlm_search(
         output.append(
             f"{i}. [{r['chunk_id']}]{type_tag} score: {r['score']:.2f}\n"
             f"   {r['summary'][:80]}{'...' if len(r['summary']) > 80 else ''}"
+            f"{_passage_hint(r)}"
         )
 
     return "\n\n".join(output)
 
 
+@mcp.tool()
+def rlm_search_batch(
+    queries: list[str],
+    limit: int = 5,
+    project: str = "",
+    domain: str = "",
+    date_from: str = "",
+    date_to: str = "",
+    entity: str = "",
+    include_insights: bool = True,
+) -> str:
+    """
+    Run several searches in one call (Phase 11).
+
+    Same ranking and filters as rlm_search, applied to every query.
+    Cheaper than calling rlm_search repeatedly: queries share one
+    BM25 pass and one embedding batch.
+
+    Args:
+        queries: Natural language search queries
+        limit: Maximum results per query (default: 5)
+        project: Filter by project name (e.g., "RLM", "MyApp")
+        domain: Filter by domain (e.g., "bp", "seo", "r&d")
+        date_from: Start date inclusive, YYYY-MM-DD (e.g., "2026-01-25")
+        date_to: End date inclusive, YYYY-MM-DD (e.g., "2026-01-30")
+        entity: Filter by entity name (file, module, version, etc.)
+        include_insights: Include insights in search results (default: True)
+
+    Returns:
+        Ranked matching chunks for each query
+    """
+    if not queries:
+        return "No queries given."
+
+    batch = bm25_search_batch(
+        queries,
+        limit,
+        project=project if project else None,
+        domain=domain if domain else None,
+        date_from=date_from if date_from else None,
+        date_to=date_to if date_to else None,
+        entity=entity if entity else None,
+        include_insights=include_insights,
+    )
+
+    if batch["status"] == "error":
+        return f"Error: {batch['message']}"
+
+    sections = []
+    for result in batch["results"]:
+        query = result["query"]
+        if result["result_count"] == 0:
+            sections.append(f"No matching chunks found for: {query}")
+            continue
+
+        output = [f"Top {result['result_count']} results for '{query}':"]
+        for i, r in enumerate(result["results"], 1):
+            type_tag = f" ({r['type']})" if r.get("type") else ""
+            output.append(
+                f"{i}. [{r['chunk_id']}]{type_tag} score: {r['score']:.2f}\n"
+                f"   {r['summary'][:80]}{'...' if len(r['summary']) > 80 else ''}"
+                f"{_passage_hint(r)}"
+            )
+        sections.append("\n\n".join(output))
+
+    return "\n\n━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━\n\n".join(sections)
+
+
 @mcp.tool()
 def rlm_list_chunks(limit: int = 20) -> str:
     """
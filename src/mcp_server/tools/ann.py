@@ -0,0 +1,175 @@
+"""
+RLM ANN Index - Inverted-file (IVF) index over VectorStore vectors.
+
+Phase 11 implementation.
+
+Brute-force cosine search scores every stored vector. IVF clusters the
+(unit-normalized) base vectors with spherical k-means; a query scores the
+centroids, then only the vectors of the n_probe closest lists.
+
+Enabled with RLM_VECTOR_INDEX=ivf (default "flat" = brute force), only
+once the base file holds at least ANN_MIN_ROWS vectors. Persisted next to
+the vectors (embeddings.ivf) and rebuilt when the base file changes.
+Pure NumPy, no extra dependency. See scripts/benchmark_ann.py for the
+recall@k / latency trade-off of n_probe.
+"""
+
+import os
+from pathlib import Path
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+IVF_SUFFIX = ".ivf"
+ANN_MIN_ROWS = 10_000  # Below this, brute force is already fast
+IVF_NPROBE = 8
+IVF_ITERATIONS = 10
+IVF_TRAIN_SAMPLE = 64  # Training points per list (k-means runs on a sample)
+_ASSIGN_BATCH = 8192
+
+
+def ann_mode() -> str:
+    """Vector index type from RLM_VECTOR_INDEX ("flat" or "ivf")."""
+    mode = os.environ.get("RLM_VECTOR_INDEX", "flat").lower()
+    return mode if mode in ("flat", "ivf") else "flat"
+
+
+def ivf_nprobe() -> int:
+    """Lists probed per query, from RLM_IVF_NPROBE (default IVF_NPROBE)."""
+    try:
+        return max(1, int(os.environ.get("RLM_IVF_NPROBE", IVF_NPROBE)))
+    except ValueError:
+        return IVF_NPROBE
+
+
+def _assign(units, centroids):
+    """Closest centroid (max dot product) of each unit vector, in batches."""
+    labels = np.empty(len(units), dtype=np.int64)
+    for start in range(0, len(units), _ASSIGN_BATCH):
+        block = np.asarray(units[start : start + _ASSIGN_BATCH], dtype=np.float32)
+        labels[start : start + len(block)] = np.argmax(block @ centroids.T, axis=1)
+    return labels
+
+
+class IVFIndex:
+    """
+    Inverted lists of base rows, grouped by nearest k-means centroid.
+
+    Build with IVFIndex.build(); rows are VectorStore base row numbers.
+    """
+
+    def __init__(self, centroids, order, offsets, fingerprint: tuple):
+        """
+        Args:
+            centroids: (n_lists, dim) float32 unit vectors
+            order: Row numbers sorted by list
+            offsets: n_lists + 1 offsets into order
+            fingerprint: (row count, size, mtime_ns) of the base file indexed
+        """
+        self.centroids = centroids
+        self.order = order
+        self.offsets = offsets
+        self.fingerprint = tuple(int(x) for x in fingerprint)
+
+    @property
+    def n_lists(self) -> int:
+        return len(self.centroids)
+
+    @classmethod
+    def build(
+        cls,
+        vectors,
+        inv_norms,
+        fingerprint: tuple,
+        n_lists: int | None = None,
+        iterations: int = IVF_ITERATIONS,
+        seed: int = 0,
+    ) -> "IVFIndex":
+        """
+        Train centroids with spherical k-means and fill the inverted lists.
+
+        Args:
+            vectors: (N, dim) base vectors (memmap is fine, read in batches)
+            inv_norms: (N,) cached inverse norms of vectors
+            fingerprint: Identifies the base file the index belongs to
+            n_lists: Number of lists (default: sqrt(N))
+            iterations: k-means iterations
+            seed: Random seed for the training sample and initial centroids
+
+        Returns:
+            The built index
+        """
+        n = len(vectors)
+        n_lists = max(1, min(n, n_lists or int(np.sqrt(n))))
+        rng = np.random.default_rng(seed)
+
+        # Train on a sample of unit vectors
+        sample_rows = np.sort(rng.choice(n, min(n, n_lists * IVF_TRAIN_SAMPLE), replace=False))
+        sample = np.asarray(vectors[sample_rows], dtype=np.float32) * inv_norms[sample_rows, None]
+        centroids = sample[rng.choice(len(sample), n_lists, replace=False)]
+        for _ in range(iterations):
+            labels = _assign(sample, centroids)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, labels, sample)
+            norms = np.linalg.norm(sums, axis=1)
+            empty = norms == 0
+            # Empty lists keep their previous centroid
+            centroids = np.where(
+                empty[:, None], centroids, sums / np.where(empty, 1, norms)[:, None]
+            )
+
+        # Assign every row (batched, the base may be memory-mapped)
+        labels = np.empty(n, dtype=np.int64)
+        for start in range(0, n, _ASSIGN_BATCH):
+            block = np.asarray(vectors[start : start + _ASSIGN_BATCH], dtype=np.float32)
+            block = block * inv_norms[start : start + len(block), None]
+            labels[start : start + len(block)] = np.argmax(block @ centroids.T, axis=1)
+
+        order = np.argsort(labels, kind="stable")
+        offsets = np.zeros(n_lists + 1, dtype=np.int64)
+        np.cumsum(np.bincount(labels, minlength=n_lists), out=offsets[1:])
+        return cls(centroids.astype(np.float32), order, offsets, fingerprint)
+
+    def candidates(self, query_unit, n_probe: int):
+        """Base rows in the n_probe lists closest to a unit query vector (sorted)."""
+        n_probe = min(n_probe, self.n_lists)
+        scores = self.centroids @ query_unit
+        lists = np.argpartition(scores, self.n_lists - n_probe)[self.n_lists - n_probe :]
+        return np.sort(
+            np.concatenate([self.order[self.offsets[i] : self.offsets[i + 1]] for i in lists])
+        )
+
+    # -------------------------------------------------------------------------
+    # Persistence
+    # -------------------------------------------------------------------------
+
+    def save(self, path: Path) -> None:
+        """Write the index atomically (numeric arrays only, no pickle)."""
+        tmp_path = path.parent / (path.stem + "_tmp" + path.suffix)
+        try:
+            with open(tmp_path, "wb") as f:
+                np.savez(
+                    f,
+                    centroids=self.centroids,
+                    order=self.order,
+                    offsets=self.offsets,
+                    fingerprint=np.array(self.fingerprint, dtype=np.int64),
+                )
+            os.replace(tmp_path, path)
+        except Exception:
+            if tmp_path.exists():
+                tmp_path.unlink()
+            raise
+
+    @classmethod
+    def load(cls, path: Path) -> "IVFIndex | None":
+        """Read an index, or None if missing/unreadable."""
+        try:
+            with np.load(path, allow_pickle=False) as data:
+                return cls(
+                    data["centroids"], data["order"], data["offsets"], tuple(data["fingerprint"])
+                )
+        except Exception:
+            return None
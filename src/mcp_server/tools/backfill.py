@@ -0,0 +1,103 @@
+"""
+RLM Backfill - Checkpoints and batching for the backfill scripts.
+
+Phase 11 implementation.
+
+scripts/backfill_embeddings.py and scripts/backfill_entities.py work
+through the chunks in batches. After each batch's bulk write they record
+the processed chunk ids in a checkpoint file, so an interrupted run skips
+them when restarted. The checkpoint is removed once a run completes.
+"""
+
+import json
+import sys
+import time
+from collections.abc import Iterator
+from pathlib import Path
+
+from .fileutil import atomic_write_json
+
+
+def int_option(name: str, default: int) -> int:
+    """Value of a "--name N" command-line option."""
+    if name in sys.argv:
+        i = sys.argv.index(name)
+        if i + 1 < len(sys.argv):
+            return int(sys.argv[i + 1])
+    return default
+
+
+def batched(items: list, size: int) -> Iterator[list]:
+    """Consecutive slices of at most size items."""
+    for start in range(0, len(items), max(1, size)):
+        yield items[start : start + size]
+
+
+class Checkpoint:
+    """Processed chunk ids and counters of a backfill run, persisted per batch."""
+
+    def __init__(self, path: Path | None):
+        """
+        Args:
+            path: Checkpoint file (JSON), None to only count (dry runs)
+        """
+        self.path = path
+        self.done: set[str] = set()
+        self.counters: dict[str, int] = {}
+
+    def load(self) -> bool:
+        """
+        Resume from the checkpoint file, if any.
+
+        Returns:
+            True if a previous run's progress was loaded
+        """
+        if self.path is None:
+            return False
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return False
+        self.done = set(data.get("done", []))
+        self.counters = dict(data.get("counters", {}))
+        return True
+
+    def mark(self, chunk_ids, **counts: int) -> None:
+        """Record a finished batch (ids + counter increments) and save."""
+        self.done.update(chunk_ids)
+        for name, value in counts.items():
+            self.counters[name] = self.counters.get(name, 0) + value
+        if self.path is not None:
+            atomic_write_json(self.path, {"done": sorted(self.done), "counters": self.counters})
+
+    def count(self, name: str) -> int:
+        return self.counters.get(name, 0)
+
+    def clear(self) -> None:
+        """Forget the progress (run completed, or restart requested)."""
+        if self.path is not None:
+            self.path.unlink(missing_ok=True)
+        self.done = set()
+        self.counters = {}
+
+
+class Throughput:
+    """Chunks per second since creation."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.count = 0
+
+    def add(self, n: int) -> None:
+        self.count += n
+
+    @property
+    def rate(self) -> float:
+        elapsed = time.perf_counter() - self.started
+        return self.count / elapsed if elapsed > 0 else 0.0
+
+    def format(self, total: int | None = None) -> str:
+        """e.g. "120/500 chunks (85.3 chunks/s)"."""
+        done = f"{self.count}/{total}" if total is not None else str(self.count)
+        return f"{done} chunks ({self.rate:.1f} chunks/s)"
@@ -0,0 +1,954 @@
+"""
+RLM BM25 Store - Persistent, segment-based BM25 index for chunks and insights.
+
+Phase 11 implementation.
+
+The BM25 index is saved under CONTEXT_DIR/bm25_index/ next to a manifest
+listing every indexed document with a fingerprint:
+- chunks: content_hash from index.json (file size/mtime for legacy chunks)
+- insights: hash of content + tags
+
+Segments (Lucene-style):
+- main segment: bm25s matrices + token ids, memory-mapped on load
+- delta segment: small list of recently added documents, kept in the manifest
+  and scored in Python with the main segment's collection statistics
+- tombstones: ids of main-segment documents that were deleted or replaced
+
+Writers (chunk, archive/restore, remember/forget) only touch the manifest.
+When the delta or the tombstones grow past a threshold, a background merge
+rewrites the main segment from stored token ids, without re-reading chunks.
+
+On load, the manifest is reconciled with the current chunks and insights:
+small differences go to the delta segment, large ones trigger a full rebuild.
+"""
+
+import hashlib
+import json
+import math
+import re
+import shutil
+import threading
+import uuid
+from collections import Counter
+from pathlib import Path
+
+# BM25S import with fallback
+try:
+    import bm25s
+    import numpy as np
+    from bm25s.tokenization import Tokenized
+
+    BM25_AVAILABLE = True
+except ImportError:
+    bm25s = None
+    np = None
+    BM25_AVAILABLE = False
+
+from .fileutil import atomic_write_json, locked_json_update
+from .tokenizer_fr import tokenize_fr
+
+INDEX_DIRNAME = "bm25_index"
+MANIFEST_NAME = "manifest.json"
+MANIFEST_VERSION = "2.0.0"
+SEGMENT_PREFIX = "main-"
+TOKENS_NAME = "tokens.npy"
+OFFSETS_NAME = "offsets.npy"
+VOCAB_NAME = "tokens.vocab.json"
+
+# Merge policy
+MERGE_MIN_DOCS = 64  # Never merge for fewer delta docs / tombstones than this
+MERGE_DELTA_RATIO = 0.10  # Merge once the delta exceeds 10% of the main segment
+MERGE_TOMBSTONE_RATIO = 0.20  # ... or tombstones exceed 20% of the main segment
+REBUILD_CHANGE_RATIO = 0.5  # Reconcile falls back to a full rebuild above this
+
+# BM25 defaults (bm25s "lucene" method)
+DEFAULT_K1 = 1.5
+DEFAULT_B = 0.75
+
+# One merge at a time per process
+_merge_lock = threading.Lock()
+
+INSIGHT_PREFIX = "insight:"
+
+
+def _read_chunk_text(chunk_file: Path) -> str:
+    """Read a chunk file as UTF-8 text."""
+    with open(chunk_file, encoding="utf-8") as f:
+        return f.read()
+
+
+def extract_search_text(text: str) -> str:
+    """
+    Build the BM25 text of a chunk, skipping its YAML header.
+
+    Phase 8.1: Prepends summary, tags, project, and domain from the
+    YAML header so BM25 can match on metadata keywords too.
+
+    Args:
+        text: Raw chunk file content
+
+    Returns:
+        Content string with metadata keywords prepended
+    """
+    # Skip YAML header (between --- markers)
+    lines = text.split("\n")
+    content_start = 0
+    in_header = False
+
+    for i, line in enumerate(lines):
+        if line.strip() == "---":
+            if not in_header:
+                in_header = True
+            else:
+                content_start = i + 1
+                break
+
+    body = "\n".join(lines[content_start:])
+
+    # Phase 8.1: Prepend metadata to boost keyword matching
+    meta_parts = []
+    for line in lines[:content_start]:
+        if line.startswith("summary:"):
+            val = line.split(":", 1)[1].strip()
+            if val:
+                meta_parts.append(val)
+        elif line.startswith("tags:"):
+            val = line.split(":", 1)[1].strip().replace(",", " ")
+            if val:
+                meta_parts.append(val)
+        elif line.startswith("project:"):
+            val = line.split(":", 1)[1].strip()
+            if val:
+                meta_parts.append(val)
+        elif line.startswith("domain:"):
+            val = line.split(":", 1)[1].strip()
+            if val:
+                meta_parts.append(val)
+
+    if meta_parts:
+        body = " ".join(meta_parts) + "\n" + body
+
+    return body
+
+
+def extract_summary(text: str) -> str:
+    """
+    Extract summary from chunk YAML header.
+
+    Args:
+        text: Raw chunk file content
+
+    Returns:
+        Summary string or empty string
+    """
+    match = re.search(r"^summary:\s*(.+)$", text, re.MULTILINE)
+    if match:
+        return match.group(1).strip()
+    return ""
+
+
+def insight_text(insight: dict) -> str:
+    """Build the BM25 text of an insight (content + tags)."""
+    content = insight["content"]
+    if insight.get("tags"):
+        content += " " + " ".join(insight["tags"])
+    return content
+
+
+def insight_fingerprint(insight: dict) -> str:
+    """Fingerprint an insight by its indexed text."""
+    return hashlib.sha256(insight_text(insight).encode()).hexdigest()[:16]
+
+
+def _stat_fingerprint(chunk_file: Path) -> str:
+    """Fingerprint a chunk without content_hash by size and mtime."""
+    st = chunk_file.stat()
+    return f"stat:{st.st_size}:{st.st_mtime_ns}"
+
+
+def _apply_changes(manifest: dict, added: list[dict], removed: list[str]) -> None:
+    """
+    Apply document additions and removals to a manifest in place.
+
+    Removed or replaced main-segment documents become tombstones; delta
+    documents are dropped directly. New documents go to the delta segment.
+
+    Args:
+        manifest: Manifest dict (modified in place)
+        added: Documents as dicts with id, fingerprint, summary, tokens
+        removed: Document ids to delete
+    """
+    main_docs = set(manifest["main_docs"])
+    tombstones = set(manifest["tombstones"])
+    delta = {d["id"]: d for d in manifest["delta"]}
+    fingerprints = manifest["fingerprints"]
+    summaries = manifest["summaries"]
+
+    for doc_id in list(removed) + [d["id"] for d in added]:
+        if doc_id in main_docs:
+            tombstones.add(doc_id)
+        delta.pop(doc_id, None)
+        fingerprints.pop(doc_id, None)
+        summaries.pop(doc_id, None)
+
+    for doc in added:
+        fingerprints[doc["id"]] = doc["fingerprint"]
+        if doc["tokens"]:  # Only index non-empty documents
+            summaries[doc["id"]] = doc["summary"]
+            delta[doc["id"]] = {"id": doc["id"], "tokens": doc["tokens"]}
+
+    manifest["tombstones"] = sorted(tombstones)
+    manifest["delta"] = list(delta.values())
+
+
+class BM25Store:
+    """
+    Persistent, segment-based BM25 index over chunk files and insights.
+
+    Layout of index_dir:
+    - manifest.json: version, main segment name and documents, tombstones,
+      delta documents (tokens), fingerprints and summaries
+    - main-<id>/: bm25s matrices + token ids (.npy, memory-mapped on load)
+
+    Document ids are chunk ids, or "insight:<id>" for insights.
+    Positions are main-segment documents followed by delta documents.
+    """
+
+    def __init__(
+        self,
+        chunks_dir: Path,
+        index_dir: Path | None = None,
+        index_file: Path | None = None,
+        memory_file: Path | None = None,
+    ):
+        """
+        Initialize the store.
+
+        Args:
+            chunks_dir: Directory holding chunk .md files
+            index_dir: Where to persist the index (default: chunks_dir/../bm25_index)
+            index_file: index.json used for content hashes (default: chunks_dir/../index.json)
+            memory_file: session_memory.json for insights (default: memory.MEMORY_FILE)
+        """
+        self.chunks_dir = chunks_dir
+        self.index_dir = index_dir or chunks_dir.parent / INDEX_DIRNAME
+        self.index_file = index_file or chunks_dir.parent / "index.json"
+        self._memory_file = memory_file
+
+        self.manifest: dict | None = None
+        self.retriever = None  # main segment
+        self.doc_ids: list[str] = []  # by position: main docs, then delta docs
+        self.summaries: dict[str, str] = {}
+        self.fingerprints: dict[str, str] = {}
+        self._alive = None  # np.ndarray[bool], False for tombstoned positions
+        self._insight_mask = None  # np.ndarray[bool], True for insight docs
+        self._n_main = 0
+        self._main_total_len = 0
+        self._delta_postings: dict[str, list[tuple[int, int]]] = {}
+        self._delta_lengths = None
+        self._merge_thread: threading.Thread | None = None
+
+    @property
+    def memory_file(self) -> Path:
+        if self._memory_file is not None:
+            return self._memory_file
+        from . import memory
+
+        return memory.MEMORY_FILE
+
+    @property
+    def manifest_file(self) -> Path:
+        return self.index_dir / MANIFEST_NAME
+
+    @property
+    def live_ids(self) -> list[str]:
+        """Ids of searchable documents (tombstones excluded)."""
+        if self._alive is None:
+            return []
+        return [d for d, alive in zip(self.doc_ids, self._alive, strict=True) if alive]
+
+    # -------------------------------------------------------------------------
+    # Source state
+    # -------------------------------------------------------------------------
+
+    def _load_insights(self) -> list[dict]:
+        """Load insights from session memory (empty list if absent)."""
+        if not self.memory_file.exists():
+            return []
+        try:
+            with open(self.memory_file, encoding="utf-8") as f:
+                return json.load(f).get("insights", [])
+        except (json.JSONDecodeError, OSError):
+            return []
+
+    def _content_hashes(self) -> dict[str, str]:
+        """Map chunk id -> content_hash from index.json."""
+        if not self.index_file.exists():
+            return {}
+        try:
+            with open(self.index_file, encoding="utf-8") as f:
+                index = json.load(f)
+        except (json.JSONDecodeError, OSError):
+            return {}
+        return {
+            c["id"]: c["content_hash"] for c in index.get("chunks", []) if c.get("content_hash")
+        }
+
+    def current_fingerprints(self) -> dict[str, str]:
+        """
+        Fingerprint every document that should be in the index.
+
+        Chunks use their content_hash from index.json when available,
+        falling back to file size + mtime for legacy chunks.
+
+        Returns:
+            Dict of document id -> fingerprint, in indexing order
+        """
+        hashes = self._content_hashes()
+        fingerprints = {}
+
+        for chunk_file in sorted(self.chunks_dir.glob("*.md")):
+            chunk_id = chunk_file.stem
+            if chunk_id in hashes:
+                fingerprints[chunk_id] = hashes[chunk_id]
+            else:
+                fingerprints[chunk_id] = _stat_fingerprint(chunk_file)
+
+        for insight in self._load_insights():
+            fingerprints[f"{INSIGHT_PREFIX}{insight['id']}"] = insight_fingerprint(insight)
+
+        return fingerprints
+
+    def _chunk_document(self, chunk_id: str, fingerprint: str) -> dict:
+        """Read and tokenize one chunk file."""
+        text = _read_chunk_text(self.chunks_dir / f"{chunk_id}.md")
+        return {
+            "id": chunk_id,
+            "fingerprint": fingerprint,
+            "summary": extract_summary(text),
+            "tokens": tokenize_fr(extract_search_text(text)),
+        }
+
+    @staticmethod
+    def _insight_document(insight: dict) -> dict:
+        """Tokenize one insight."""
+        return {
+            "id": f"{INSIGHT_PREFIX}{insight['id']}",
+            "fingerprint": insight_fingerprint(insight),
+            "summary": insight["content"][:80],
+            "tokens": tokenize_fr(insight_text(insight)),
+        }
+
+    # -------------------------------------------------------------------------
+    # Manifest and segments
+    # -------------------------------------------------------------------------
+
+    def _read_manifest(self) -> dict | None:
+        """Load the manifest, or None if missing/corrupt/outdated."""
+        if not self.manifest_file.exists():
+            return None
+        try:
+            with open(self.manifest_file, encoding="utf-8") as f:
+                manifest = json.load(f)
+        except (json.JSONDecodeError, OSError):
+            return None
+        if manifest.get("version") != MANIFEST_VERSION:
+            return None
+        return manifest
+
+    def _write_segment(self, name: str, docs: list, vocab: list[str]) -> int:
+        """
+        Index documents into a new main segment directory.
+
+        Args:
+            name: Segment directory name
+            docs: Token id arrays, one per document
+            vocab: Token strings indexed by token id
+
+        Returns:
+            Total number of tokens in the segment
+        """
+        lengths = np.array([len(d) for d in docs], dtype=np.int64)
+        flat = np.concatenate(docs).astype(np.int64) if docs else np.zeros(0, dtype=np.int64)
+
+        # Compact the vocabulary to tokens still in use
+        used, flat = np.unique(flat, return_inverse=True)
+        seg_vocab = [vocab[i] for i in used]
+        offsets = np.concatenate([[0], np.cumsum(lengths)]).astype(np.int64)
+
+        seg_dir = self.index_dir / name
+        tmp_dir = self.index_dir / f"{name}.tmp"
+        if tmp_dir.exists():
+            shutil.rmtree(tmp_dir)
+
+        retriever = bm25s.BM25()
+        retriever.index(
+            Tokenized(
+                ids=[flat[offsets[i] : offsets[i + 1]].tolist() for i in range(len(docs))],
+                vocab={tok: i for i, tok in enumerate(seg_vocab)},
+            ),
+            show_progress=False,
+        )
+        retriever.save(tmp_dir, show_progress=False)
+        np.save(tmp_dir / TOKENS_NAME, flat.astype(np.int32))
+        np.save(tmp_dir / OFFSETS_NAME, offsets)
+        with open(tmp_dir / VOCAB_NAME, "w", encoding="utf-8") as f:
+            json.dump(seg_vocab, f, ensure_ascii=False)
+        tmp_dir.rename(seg_dir)
+
+        return int(lengths.sum())
+
+    def _remove_segments(self, keep: str | None) -> None:
+        """Delete every segment directory except `keep` (stale merges included)."""
+        if not self.index_dir.exists():
+            return
+        for path in self.index_dir.iterdir():
+            if path.is_dir() and path.name.startswith(SEGMENT_PREFIX) and path.name != keep:
+                shutil.rmtree(path, ignore_errors=True)
+
+    def _activate(self, manifest: dict) -> None:
+        """Load a manifest's segments into memory."""
+        main_docs = manifest["main_docs"]
+        delta = manifest["delta"]
+        tombstones = set(manifest["tombstones"])
+
+        retriever = None
+        if manifest["main"] and main_docs:
+            retriever = bm25s.BM25.load(
+                self.index_dir / manifest["main"], mmap=True, show_progress=False
+            )
+
+        self.manifest = manifest
+        self.retriever = retriever
+        self.doc_ids = main_docs + [d["id"] for d in delta]
+        self.summaries = manifest["summaries"]
+        self.fingerprints = manifest["fingerprints"]
+        self._n_main = len(main_docs)
+        self._main_total_len = manifest["main_total_len"]
+        self._alive = np.array(
+            [d not in tombstones for d in main_docs] + [True] * len(delta), dtype=bool
+        )
+        self._insight_mask = np.array(
+            [d.startswith(INSIGHT_PREFIX) for d in self.doc_ids], dtype=bool
+        )
+
+        postings: dict[str, list[tuple[int, int]]] = {}
+        for j, doc in enumerate(delta):
+            for tok, tf in Counter(doc["tokens"]).items():
+                postings.setdefault(tok, []).append((self._n_main + j, tf))
+        self._delta_postings = postings
+        self._delta_lengths = np.array([len(d["tokens"]) for d in delta], dtype=np.float64)
+
+    # -------------------------------------------------------------------------
+    # Build / load
+    # -------------------------------------------------------------------------
+
+    def build(self) -> int:
+        """
+        Rebuild the index from scratch and persist it.
+
+        Reads all chunk files and insights, tokenizes them with tokenize_fr,
+        indexes them with BM25S into a single main segment, and saves
+        matrices + manifest.
+
+        Returns:
+            Number of documents indexed
+        """
+        if not BM25_AVAILABLE:
+            raise ImportError("bm25s is required for search. Install with: pip install bm25s")
+
+        fingerprints = self.current_fingerprints()
+        insights = {f"{INSIGHT_PREFIX}{i['id']}": i for i in self._load_insights()}
+
+        vocab: dict[str, int] = {}
+        docs = []
+        doc_ids = []
+        summaries = {}
+
+        for doc_id, fingerprint in fingerprints.items():
+            if doc_id.startswith(INSIGHT_PREFIX):
+                doc = self._insight_document(insights[doc_id])
+            else:
+                doc = self._chunk_document(doc_id, fingerprint)
+
+            if doc["tokens"]:  # Only index non-empty documents
+                docs.append(np.array([vocab.setdefault(t, len(vocab)) for t in doc["tokens"]]))
+                doc_ids.append(doc_id)
+                summaries[doc_id] = doc["summary"]
+
+        name = None
+        total_len = 0
+        self.index_dir.mkdir(parents=True, exist_ok=True)
+        if docs:
+            name = f"{SEGMENT_PREFIX}{uuid.uuid4().hex[:12]}"
+            total_len = self._write_segment(name, docs, list(vocab))
+
+        manifest = {
+            "version": MANIFEST_VERSION,
+            "main": name,
+            "main_docs": doc_ids,
+            "main_total_len": total_len,
+            "tombstones": [],
+            "delta": [],
+            # Fingerprints cover empty documents too, so they don't trigger rebuilds
+            "fingerprints": fingerprints,
+            "summaries": summaries,
+        }
+        atomic_write_json(self.manifest_file, manifest)
+        self._remove_segments(keep=name)
+        self._activate(manifest)
+
+        return len(doc_ids)
+
+    def load(self) -> int:
+        """
+        Load the persisted index and bring it up to date.
+
+        Matrices are memory-mapped. The manifest is then reconciled with
+        the current chunks and insights (see reconcile()).
+
+        Returns:
+            Number of documents available for search
+        """
+        if not BM25_AVAILABLE:
+            raise ImportError("bm25s is required for search. Install with: pip install bm25s")
+
+        manifest = self._read_manifest()
+        if manifest is None:
+            return self.build()
+
+        try:
+            self._activate(manifest)
+        except Exception:
+            return self.build()
+
+        self.reconcile()
+        return len(self.live_ids)
+
+    def reconcile(self) -> int:
+        """
+        Bring the index in line with the current chunks and insights.
+
+        New or changed documents are tokenized into the delta segment and
+        deleted ones are tombstoned. If most of the corpus changed, the
+        index is rebuilt instead.
+
+        Returns:
+            Number of changed documents
+        """
+        current = self.current_fingerprints()
+        known = self.fingerprints
+
+        removed = [d for d in known if current.get(d) != known[d]]
+        added = [d for d in current if known.get(d) != current[d]]
+        changes = len(added) + len(removed)
+        if changes == 0:
+            return 0
+
+        if changes > MERGE_MIN_DOCS and changes > REBUILD_CHANGE_RATIO * len(current):
+            self.build()
+            return changes
+
+        insights = {f"{INSIGHT_PREFIX}{i['id']}": i for i in self._load_insights()}
+        docs = [
+            self._insight_document(insights[d])
+            if d.startswith(INSIGHT_PREFIX)
+            else self._chunk_document(d, current[d])
+            for d in added
+        ]
+        self._commit(docs, removed)
+        return changes
+
+    # -------------------------------------------------------------------------
+    # Incremental updates
+    # -------------------------------------------------------------------------
+
+    def _commit(self, added: list[dict], removed: list[str]) -> bool:
+        """
+        Apply changes to the persisted manifest under lock.
+
+        Does nothing if the index was never built: the next load builds it.
+
+        Returns:
+            True if the manifest was updated
+        """
+        if self._read_manifest() is None:
+            return False
+
+        committed = None
+        with locked_json_update(self.manifest_file) as manifest:
+            if manifest.get("version") == MANIFEST_VERSION:
+                _apply_changes(manifest, added, removed)
+                committed = manifest
+
+        if committed is None:
+            return False
+
+        if self.manifest is not None:
+            self._activate(committed)
+        self.maybe_merge()
+        return True
+
+    def add_chunk(self, chunk_id: str, content_hash: str | None = None) -> bool:
+        """
+        Add or replace a chunk in the delta segment.
+
+        Args:
+            chunk_id: Chunk id (its .md file must exist in chunks_dir)
+            content_hash: content_hash stored in index.json, if any
+
+        Returns:
+            True if the index was updated
+        """
+        chunk_file = self.chunks_dir / f"{chunk_id}.md"
+        if not BM25_AVAILABLE or not chunk_file.exists():
+            return False
+        fingerprint = content_hash or _stat_fingerprint(chunk_file)
+        return self._commit([self._chunk_document(chunk_id, fingerprint)], [])
+
+    def add_insight(self, insight: dict) -> bool:
+        """Add or replace an insight in the delta segment."""
+        if not BM25_AVAILABLE:
+            return False
+        return self._commit([self._insight_document(insight)], [])
+
+    def remove(self, doc_id: str) -> bool:
+        """Delete a document (chunk id or "insight:<id>") from the index."""
+        if not BM25_AVAILABLE:
+            return False
+        return self._commit([], [doc_id])
+
+    # -------------------------------------------------------------------------
+    # Merge policy
+    # -------------------------------------------------------------------------
+
+    @staticmethod
+    def needs_merge(manifest: dict) -> bool:
+        """Check whether the delta or tombstones outgrew the main segment."""
+        n_main = len(manifest["main_docs"])
+        n_delta = len(manifest["delta"])
+        n_tombstones = len(manifest["tombstones"])
+        return (n_delta >= MERGE_MIN_DOCS and n_delta > MERGE_DELTA_RATIO * n_main) or (
+            n_tombstones >= MERGE_MIN_DOCS and n_tombstones > MERGE_TOMBSTONE_RATIO * n_main
+        )
+
+    def maybe_merge(self, background: bool = True) -> bool:
+        """
+        Start a merge if the merge policy asks for one.
+
+        Args:
+            background: Run the merge in a daemon thread (default: True)
+
+        Returns:
+            True if a merge was started (or completed, when synchronous)
+        """
+        manifest = self._read_manifest()
+        if manifest is None or not self.needs_merge(manifest):
+            return False
+
+        if not background:
+            return self.merge()
+
+        if self._merge_thread is not None and self._merge_thread.is_alive():
+            return False
+        self._merge_thread = threading.Thread(target=self._merge_quietly, daemon=True)
+        self._merge_thread.start()
+        return True
+
+    def wait_for_merge(self, timeout: float | None = None) -> None:
+        """Block until a background merge started by this store finishes."""
+        if self._merge_thread is not None:
+            self._merge_thread.join(timeout)
+
+    def _merge_quietly(self) -> None:
+        try:
+            self.merge()
+        except Exception:
+            pass  # Merging is an optimization, never fail the caller
+
+    def merge(self) -> bool:
+        """
+        Merge the delta segment into a new main segment, dropping tombstones.
+
+        Builds the new segment from stored token ids (no chunk re-read) while
+        writers keep appending to the manifest; changes made during the merge
+        are carried over when the new segment is committed.
+
+        Returns:
+            True if a new main segment was committed
+        """
+        if not BM25_AVAILABLE:
+            return False
+
+        with _merge_lock:
+            snapshot = self._read_manifest()
+            if snapshot is None:
+                return False
+
+            # Live main documents, as token ids of the old segment vocabulary
+            tombstones = set(snapshot["tombstones"])
+            vocab: list[str] = []
+            docs = []
+            doc_ids = []
+            if snapshot["main"] and snapshot["main_docs"]:
+                seg_dir = self.index_dir / snapshot["main"]
+                tokens = np.load(seg_dir / TOKENS_NAME, mmap_mode="r")
+                offsets = np.load(seg_dir / OFFSETS_NAME)
+                with open(seg_dir / VOCAB_NAME, encoding="utf-8") as f:
+                    vocab = json.load(f)
+                for i, doc_id in enumerate(snapshot["main_docs"]):
+                    if doc_id not in tombstones:
+                        docs.append(np.asarray(tokens[offsets[i] : offsets[i + 1]]))
+                        doc_ids.append(doc_id)
+
+            # Delta documents, mapped into the same vocabulary
+            token_ids = {tok: i for i, tok in enumerate(vocab)}
+            for doc in snapshot["delta"]:
+                ids = []
+                for tok in doc["tokens"]:
+                    if tok not in token_ids:
+                        token_ids[tok] = len(vocab)
+                        vocab.append(tok)
+                    ids.append(token_ids[tok])
+                docs.append(np.array(ids, dtype=np.int64))
+                doc_ids.append(doc["id"])
+
+            name = f"{SEGMENT_PREFIX}{uuid.uuid4().hex[:12]}"
+            total_len = self._write_segment(name, docs, vocab) if docs else 0
+
+            committed = None
+            with locked_json_update(self.manifest_file) as current:
+                if (
+                    current.get("version") == MANIFEST_VERSION
+                    and current["main"] == snapshot["main"]
+                ):
+                    merged_fp = {
+                        d["id"]: snapshot["fingerprints"].get(d["id"]) for d in snapshot["delta"]
+                    }
+                    fingerprints = current["fingerprints"]
+                    current_delta = {d["id"] for d in current["delta"]}
+
+                    # Deletions/replacements that happened during the merge
+                    new_tombstones = set(current["tombstones"]) - tombstones
+                    for doc_id, fp in merged_fp.items():
+                        if doc_id not in current_delta or fingerprints.get(doc_id) != fp:
+                            new_tombstones.add(doc_id)
+
+                    current["delta"] = [
+                        d
+                        for d in current["delta"]
+                        if d["id"] not in merged_fp
+                        or fingerprints.get(d["id"]) != merged_fp[d["id"]]
+                    ]
+                    current["main"] = name if docs else None
+                    current["main_docs"] = doc_ids
+                    current["main_total_len"] = total_len
+                    current["tombstones"] = sorted(new_tombstones & set(doc_ids))
+                    committed = current
+
+            if committed is None:
+                # Another process rebuilt or merged first
+                shutil.rmtree(self.index_dir / name, ignore_errors=True)
+                return False
+
+            self._remove_segments(keep=committed["main"])
+
+        if self.manifest is not None:
+            self._activate(committed)
+        return True
+
+    # -------------------------------------------------------------------------
+    # Search
+    # -------------------------------------------------------------------------
+
+    def _idf(self, n_docs: int, df: int) -> float:
+        return math.log(1 + (n_docs - df + 0.5) / (df + 0.5))
+
+    def _main_df(self, token: str) -> int:
+        """Document frequency of a token in the main segment."""
+        if self.retriever is None or token not in self.retriever.vocab_dict:
+            return 0
+        tid = self.retriever.vocab_dict[token]
+        indptr = self.retriever.scores["indptr"]
+        return int(indptr[tid + 1] - indptr[tid])
+
+    def _token_scores(self, token: str):
+        """
+        BM25 contribution of one query token to every position.
+
+        The main segment's saved matrices embed idf from build time. While a
+        delta segment exists, the main contribution is rescaled to the idf
+        of main + delta, and delta documents are scored with the same
+        collection statistics, so both segments rank on the same scale.
+
+        Returns:
+            np.ndarray (one score per position in doc_ids), or None if the
+            token matches no document
+        """
+        df_main = self._main_df(token)
+        postings = self._delta_postings.get(token, ())
+        if df_main == 0 and not postings:
+            return None
+
+        n_delta = len(self._delta_lengths)
+        n_docs = self._n_main + n_delta
+        idf = self._idf(n_docs, df_main + len(postings))
+        scores = np.zeros(len(self.doc_ids), dtype=np.float64)
+
+        if df_main:
+            main = self.retriever.get_scores([token])
+            if n_delta:
+                main = main * (idf / self._idf(self._n_main, df_main))
+            scores[: self._n_main] = main
+
+        if postings:
+            k1 = getattr(self.retriever, "k1", DEFAULT_K1)
+            b = getattr(self.retriever, "b", DEFAULT_B)
+            avgdl = (self._main_total_len + self._delta_lengths.sum()) / n_docs
+            for pos, tf in postings:
+                dl = self._delta_lengths[pos - self._n_main]
+                scores[pos] = idf * tf / (tf + k1 * (1 - b + b * dl / avgdl))
+
+        return scores
+
+    def score_batch(self, token_lists: list[list[str]]):
+        """
+        Compute BM25 scores of several queries at once.
+
+        Each distinct token is scored once for the whole batch; a query's
+        scores are the sum of its tokens' contributions.
+
+        Tombstoned positions are not masked here; see search_batch().
+
+        Args:
+            token_lists: One tokenize_fr() output per query
+
+        Returns:
+            np.ndarray of shape (n_queries, len(doc_ids))
+        """
+        scores = np.zeros((len(token_lists), len(self.doc_ids)), dtype=np.float64)
+        by_token: dict[str, object] = {}
+        for q, tokens in enumerate(token_lists):
+            for tok, count in Counter(tokens).items():
+                if tok not in by_token:
+                    by_token[tok] = self._token_scores(tok)
+                if by_token[tok] is not None:
+                    scores[q] += count * by_token[tok]
+        return scores
+
+    def score(self, query_tokens: list[str]):
+        """
+        Compute BM25 scores of every position (main then delta).
+
+        Returns:
+            np.ndarray of scores, one per position in doc_ids
+        """
+        return self.score_batch([query_tokens])[0]
+
+    def search_batch(
+        self,
+        token_lists: list[list[str]],
+        top_k: int = 5,
+        include_insights: bool = True,
+        mask=None,
+    ) -> list[list[tuple[str, float]]]:
+        """
+        Score documents against several tokenized queries.
+
+        Args:
+            token_lists: One tokenize_fr() output per query
+            top_k: Maximum number of results per query
+            include_insights: Whether insights may appear in results
+            mask: Optional bool array aligned with doc_ids; only True
+                positions are eligible (filters applied before top-k)
+
+        Returns:
+            One list of (doc_id, score) per query, positive scores only,
+            sorted descending
+        """
+        if not self.doc_ids:
+            return [[] for _ in token_lists]
+
+        eligible = self._alive if include_insights else self._alive & ~self._insight_mask
+        if mask is not None:
+            eligible = eligible & mask
+        if not eligible.any():
+            return [[] for _ in token_lists]
+
+        scores = np.where(eligible, self.score_batch(token_lists), 0.0)
+        k = min(top_k, len(self.doc_ids))
+
+        output = []
+        for row in scores:
+            if k <= 0:
+                output.append([])
+                continue
+            top = np.argpartition(-row, k - 1)[:k]
+            top = top[np.argsort(-row[top], kind="stable")]
+            output.append([(self.doc_ids[i], float(row[i])) for i in top if row[i] > 0])
+        return output
+
+    def search(
+        self,
+        query_tokens: list[str],
+        top_k: int = 5,
+        include_insights: bool = True,
+        mask=None,
+    ) -> list[tuple[str, float]]:
+        """
+        Score documents against a tokenized query.
+
+        Args:
+            query_tokens: Output of tokenize_fr(query)
+            top_k: Maximum number of results
+            include_insights: Whether insights may appear in results
+            mask: Optional bool array aligned with doc_ids; only True
+                positions are eligible (filters applied before top-k)
+
+        Returns:
+            List of (doc_id, score) with positive scores, sorted descending
+        """
+        if not query_tokens:
+            return []
+        return self.search_batch([query_tokens], top_k, include_insights, mask)[0]
+
+
+# =============================================================================
+# Writer hooks
+# =============================================================================
+
+
+def index_chunk(chunks_dir: Path, chunk_id: str, content_hash: str | None = None) -> None:
+    """
+    Add a newly written (or restored) chunk to the persisted BM25 index.
+
+    Never raises: indexing is an optimization, the next search reconciles.
+    """
+    try:
+        BM25Store(chunks_dir).add_chunk(chunk_id, content_hash)
+    except Exception:
+        pass
+
+
+def unindex_chunk(chunks_dir: Path, chunk_id: str) -> None:
+    """Tombstone an archived or deleted chunk in the persisted BM25 index."""
+    try:
+        BM25Store(chunks_dir).remove(chunk_id)
+    except Exception:
+        pass
+
+
+def index_insight(chunks_dir: Path, memory_file: Path, insight: dict) -> None:
+    """Add a newly remembered insight to the persisted BM25 index."""
+    try:
+        BM25Store(chunks_dir, memory_file=memory_file).add_insight(insight)
+    except Exception:
+        pass
+
+
+def unindex_insight(chunks_dir: Path, memory_file: Path, insight_id: str) -> None:
+    """Tombstone a forgotten insight in the persisted BM25 index."""
+    try:
+        BM25Store(chunks_dir, memory_file=memory_file).remove(f"{INSIGHT_PREFIX}{insight_id}")
+    except Exception:
+        pass
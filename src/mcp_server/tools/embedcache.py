@@ -0,0 +1,282 @@
+"""
+RLM Embedding Cache - Persistent content-hash-keyed embedding cache.
+
+Phase 11 implementation.
+
+Embeddings are keyed by (provider model name, sha256 of the enriched embed
+text), so re-chunked, restored or re-indexed content is never embedded
+twice. One append-only file per model under context/embed_cache/:
+
+    header   magic "RLME", format version, dim
+    records  32-byte sha256 digest + dim float32, fixed size
+
+Files are memory-mapped; records appended by other processes are picked
+up when the file grows. A truncated last record (crash mid-append) is
+ignored. RLM_EMBED_CACHE=0 disables the cache.
+
+Query embeddings are not persisted: embed_queries() keeps them in an
+in-process LRU keyed by (model name, normalized query text), sized by
+RLM_QUERY_CACHE_SIZE (default 256, 0 disables).
+"""
+
+import fcntl
+import hashlib
+import os
+import re
+import struct
+import threading
+from pathlib import Path
+
+try:
+    import numpy as np
+
+    NUMPY_AVAILABLE = True
+except ImportError:
+    np = None
+    NUMPY_AVAILABLE = False
+
+from .cache import LRUCache, env_cache_size
+from .fileutil import CONTEXT_DIR
+
+EMBED_CACHE_DIR = "embed_cache"
+EMBED_CACHE_SUFFIX = ".emb"
+EMBED_CACHE_VERSION = 1
+_EMB_MAGIC = b"RLME"
+_EMB_HEADER = struct.Struct("<4sII")  # magic, version, dim
+
+QUERY_CACHE_SIZE = 256  # Default entries in the query embedding cache
+
+_caches: dict[tuple[str, str], "EmbeddingCache"] = {}
+_caches_lock = threading.Lock()
+_query_cache = LRUCache(env_cache_size("RLM_QUERY_CACHE_SIZE", QUERY_CACHE_SIZE))
+
+
+def text_digest(text: str) -> bytes:
+    """sha256 of the embed text (the cache key within a model)."""
+    return hashlib.sha256(text.encode("utf-8")).digest()
+
+
+def model_name(provider) -> str:
+    """Cache namespace of a provider: its model name."""
+    name = getattr(provider, "MODEL_NAME", None)
+    return name if isinstance(name, str) else type(provider).__name__
+
+
+class EmbeddingCache:
+    """Digest -> vector store for one embedding model."""
+
+    def __init__(self, model: str, directory: Path | None = None):
+        """
+        Args:
+            model: Provider model name (one file per model)
+            directory: Cache directory (default: CONTEXT_DIR/embed_cache)
+        """
+        self.model = model
+        directory = directory or CONTEXT_DIR / EMBED_CACHE_DIR
+        self.file = directory / (re.sub(r"[^\w.-]+", "_", model) + EMBED_CACHE_SUFFIX)
+        self.dim: int | None = None
+        self.hits = 0
+        self.misses = 0
+        self._records = None
+        self._keys: dict[bytes, int] = {}
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        self._refresh()
+        return len(self._keys)
+
+    def _dtype(self, dim: int):
+        # Raw key bytes (an "S32" field would strip trailing NULs)
+        return np.dtype([("key", "u1", (32,)), ("vec", "<f4", (dim,))])
+
+    def _refresh(self) -> None:
+        """Map records appended since the last look (by any process)."""
+        try:
+            size = self.file.stat().st_size
+        except OSError:
+            return
+        if size == self._size or size < _EMB_HEADER.size:
+            return
+        if self.dim is None:
+            with open(self.file, "rb") as f:
+                magic, version, dim = _EMB_HEADER.unpack(f.read(_EMB_HEADER.size))
+            if magic != _EMB_MAGIC or version != EMBED_CACHE_VERSION:
+                return
+            self.dim = dim
+        dtype = self._dtype(self.dim)
+        count = (size - _EMB_HEADER.size) // dtype.itemsize
+        known = 0 if self._records is None else len(self._records)
+        if count > known:
+            self._records = np.memmap(
+                self.file, dtype=dtype, mode="r", offset=_EMB_HEADER.size, shape=count
+            )
+            blob = np.ascontiguousarray(self._records["key"][known:]).tobytes()
+            for row in range(known, count):
+                start = (row - known) * 32
+                self._keys.setdefault(blob[start : start + 32], row)
+        self._size = size
+
+    def get_many(self, digests: list[bytes]) -> list:
+        """Cached vector (float32 copy) per digest, None for misses."""
+        with self._lock:
+            if any(d not in self._keys for d in digests):
+                self._refresh()
+            found = []
+            for digest in digests:
+                row = self._keys.get(digest)
+                found.append(None if row is None else np.array(self._records[row]["vec"]))
+            hits = sum(v is not None for v in found)
+            self.hits += hits
+            self.misses += len(digests) - hits
+            return found
+
+    def put_many(self, digests: list[bytes], vectors) -> int:
+        """
+        Append new digest/vector pairs (existing keys are skipped).
+
+        Returns:
+            Number of records written
+        """
+        vectors = np.asarray(vectors, dtype=np.float32)
+        if vectors.ndim != 2 or len(vectors) != len(digests):
+            return 0
+        self.file.parent.mkdir(parents=True, exist_ok=True)
+        with self._lock, open(self.file, "ab") as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                self._refresh()
+                if self.dim is None:
+                    if f.tell() == 0:
+                        f.write(_EMB_HEADER.pack(_EMB_MAGIC, EMBED_CACHE_VERSION, vectors.shape[1]))
+                        self.dim = vectors.shape[1]
+                    else:
+                        return 0  # Unreadable file, leave it alone
+                if vectors.shape[1] != self.dim:
+                    return 0
+
+                new, seen = [], set()
+                for i, digest in enumerate(digests):
+                    if digest not in self._keys and digest not in seen:
+                        seen.add(digest)
+                        new.append(i)
+                if not new:
+                    return 0
+                # Drop a torn record from an interrupted append first
+                dtype = self._dtype(self.dim)
+                tail = (f.tell() - _EMB_HEADER.size) % dtype.itemsize
+                if tail:
+                    f.truncate(f.tell() - tail)
+                records = np.empty(len(new), dtype=dtype)
+                records["key"] = np.frombuffer(
+                    b"".join(digests[i] for i in new), dtype=np.uint8
+                ).reshape(-1, 32)
+                records["vec"] = vectors[new]
+                f.write(records.tobytes())
+                f.flush()
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+            self._refresh()
+        return len(new)
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "model": self.model,
+            "entries": len(self),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+        }
+
+
+def get_embedding_cache(model: str, directory: Path | None = None) -> EmbeddingCache:
+    """Shared cache instance for a model (one per process)."""
+    directory = directory or CONTEXT_DIR / EMBED_CACHE_DIR
+    key = (str(directory), model)
+    with _caches_lock:
+        if key not in _caches:
+            _caches[key] = EmbeddingCache(model, directory)
+        return _caches[key]
+
+
+def cached_embed(provider, texts: list[str], directory: Path | None = None):
+    """
+    provider.embed() through the cache: only unseen texts are embedded.
+
+    Args:
+        provider: EmbeddingProvider
+        texts: Enriched texts to embed
+        directory: Cache directory (default: CONTEXT_DIR/embed_cache)
+
+    Returns:
+        numpy ndarray of shape (len(texts), dim), as provider.embed()
+    """
+    if os.environ.get("RLM_EMBED_CACHE", "1") == "0" or not texts:
+        return provider.embed(texts)
+
+    cache = get_embedding_cache(model_name(provider), directory)
+    digests = [text_digest(t) for t in texts]
+    try:
+        found = cache.get_many(digests)
+    except Exception:
+        return provider.embed(texts)  # The cache is an optimization, never fail the caller
+
+    missing = [i for i, vec in enumerate(found) if vec is None]
+    if missing:
+        vectors = np.asarray(provider.embed([texts[i] for i in missing]), dtype=np.float32)
+        try:
+            cache.put_many([digests[i] for i in missing], vectors)
+        except Exception:
+            pass
+        for i, vec in zip(missing, vectors, strict=True):
+            found[i] = vec
+    return np.stack(found)
+
+
+# =============================================================================
+# Query embeddings (in-memory LRU)
+# =============================================================================
+
+
+def normalize_query(query: str) -> str:
+    """Case- and whitespace-insensitive form of a query (its cache key)."""
+    return " ".join(query.lower().split())
+
+
+def embed_queries(provider, queries: list[str]):
+    """
+    Embed search queries, reusing vectors of recently seen queries.
+
+    Queries are cached under their normalized form, but the provider embeds
+    the query as typed (the first spelling seen fills the entry).
+
+    Args:
+        provider: EmbeddingProvider
+        queries: Raw query strings
+
+    Returns:
+        numpy ndarray of shape (len(queries), dim)
+    """
+    model = model_name(provider)
+    keys = [normalize_query(q) for q in queries]
+    found = [_query_cache.get((model, key)) for key in keys]
+
+    # First spelling of each missing key
+    missing: dict[str, str] = {}
+    for query, key, vec in zip(queries, keys, found, strict=True):
+        if vec is None:
+            missing.setdefault(key, query)
+    if missing:
+        vectors = np.asarray(provider.embed(list(missing.values())), dtype=np.float32)
+        embedded = dict(zip(missing, vectors, strict=True))
+        for key, vec in embedded.items():
+            vec.setflags(write=False)  # Shared by every caller hitting this entry
+            _query_cache.put((model, key), vec)
+        found = [embedded[k] if vec is None else vec for k, vec in zip(keys, found, strict=True)]
+    return np.stack(found)
+
+
+def query_cache_stats() -> dict:
+    """Size and hit/miss counters of the query embedding cache."""
+    return _query_cache.stats()
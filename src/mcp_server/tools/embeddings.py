@@ -12,6 +12,7 @@ All dependencies are optional — returns None if unavailable.
 """
 
 import os
+import threading
 from abc import ABC, abstractmethod
 
 try:
@@ -89,6 +90,7 @@ class FastEmbedProvider(EmbeddingProvider):
 # Singleton cache
 _cached_provider: EmbeddingProvider | None = None
 _provider_loaded: bool = False
+_provider_lock = threading.Lock()
 
 
 def _get_cached_provider() -> EmbeddingProvider | None:
@@ -96,22 +98,28 @@ def _get_cached_provider() -> EmbeddingProvider | None:
 
     Reads RLM_EMBEDDING_PROVIDER env var (default: "model2vec").
     Returns None if the required library is not installed.
+
+    Phase 11: thread-safe — a call made while the warm-up thread loads the
+    model waits for it instead of seeing no provider.
     """
     global _cached_provider, _provider_loaded
 
     if _provider_loaded:
         return _cached_provider
 
-    _provider_loaded = True
-    provider_name = os.getenv("RLM_EMBEDDING_PROVIDER", "model2vec").lower()
-
-    try:
-        if provider_name == "fastembed":
-            _cached_provider = FastEmbedProvider()
-        else:
-            _cached_provider = Model2VecProvider()
-    except (ImportError, Exception):
-        _cached_provider = None
+    with _provider_lock:
+        if _provider_loaded:
+            return _cached_provider
+
+        provider_name = os.getenv("RLM_EMBEDDING_PROVIDER", "model2vec").lower()
+        try:
+            if provider_name == "fastembed":
+                _cached_provider = FastEmbedProvider()
+            else:
+                _cached_provider = Model2VecProvider()
+        except (ImportError, Exception):
+            _cached_provider = None
+        _provider_loaded = True
 
     return _cached_provider
 
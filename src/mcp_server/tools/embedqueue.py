@@ -0,0 +1,248 @@
+"""
+RLM Embed Queue - Write-behind embedding of new chunks.
+
+Phase 11 implementation.
+
+chunk() used to embed its content and write the vector before returning,
+putting model inference on the critical path of every rlm_chunk call. It
+now appends (chunk_id, embed text) to a durable on-disk queue and returns;
+a background worker drains the queue in micro-batches (one provider.embed()
+call per batch, through the embedding cache) into the vector log.
+
+Files under the context directory:
+
+    embed_queue.jsonl       pending entries, appended under flock
+    embed_queue.processing  entries claimed by a worker (kept until written)
+    embed_queue.lock        held by the active worker (one per context dir)
+
+A worker that dies leaves its .processing file behind; the next worker
+processes it first. Writing a vector twice is harmless (it replaces), and
+the embedding cache makes re-embedding free. With RLM_PASSAGE_INDEX=1 the
+worker also embeds each chunk's line windows (passages.py). Until their
+vector lands, pending chunks are ranked on BM25 alone by search().
+"""
+
+import fcntl
+import json
+import threading
+from pathlib import Path
+
+from .fileutil import CONTEXT_DIR, atomic_write_text
+
+EMBED_QUEUE_FILE = "embed_queue.jsonl"
+EMBED_PROCESSING_FILE = "embed_queue.processing"
+EMBED_LOCK_FILE = "embed_queue.lock"
+EMBED_BATCH_SIZE = 32
+
+_queues: dict[str, "EmbedQueue"] = {}
+_queues_lock = threading.Lock()
+
+
+def chunk_embed_text(content: str, summary: str = "", tags: list[str] | None = None) -> str:
+    """Text embedded for a chunk: tags and summary lines, then the content (Phase 8.1)."""
+    text = content
+    if summary:
+        text = f"{summary}\n{text}"
+    if tags:
+        text = f"{', '.join(tags)}\n{text}"
+    return text
+
+
+def _parse(raw: str) -> list[dict]:
+    """Queue entries from JSON lines (a torn last line is skipped)."""
+    entries = []
+    for line in raw.splitlines():
+        try:
+            entry = json.loads(line)
+        except json.JSONDecodeError:
+            continue
+        if isinstance(entry, dict) and "chunk_id" in entry and "text" in entry:
+            entries.append(entry)
+    return entries
+
+
+class EmbedQueue:
+    """Durable queue of chunks waiting for their embedding."""
+
+    def __init__(self, context_dir: Path | None = None):
+        self.context_dir = context_dir or CONTEXT_DIR
+        self.queue_file = self.context_dir / EMBED_QUEUE_FILE
+        self.processing_file = self.context_dir / EMBED_PROCESSING_FILE
+        self.lock_file = self.context_dir / EMBED_LOCK_FILE
+        self._worker: threading.Thread | None = None
+        self._worker_lock = threading.Lock()
+        self._wake = False  # Entries queued since the worker's last pass
+        self._pending_key: tuple | None = None
+        self._pending: frozenset[str] = frozenset()
+
+    # -------------------------------------------------------------------------
+    # Producer side
+    # -------------------------------------------------------------------------
+
+    def enqueue(self, chunk_id: str, text: str, background: bool = True) -> None:
+        """
+        Queue a chunk for embedding and wake the worker.
+
+        Args:
+            chunk_id: Chunk id
+            text: Enriched embed text (summary/tags + content)
+            background: Drain in a daemon thread (default: True)
+        """
+        line = json.dumps({"chunk_id": chunk_id, "text": text}, ensure_ascii=False) + "\n"
+        self.context_dir.mkdir(parents=True, exist_ok=True)
+        with open(self.queue_file, "a", encoding="utf-8") as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                f.write(line)
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+        self.start_worker(background)
+
+    def pending_ids(self) -> frozenset[str]:
+        """Chunk ids queued or being embedded (cached until the files change)."""
+        key = tuple(_stat_key(path) for path in (self.queue_file, self.processing_file))
+        if key != self._pending_key:
+            ids = set()
+            for path in (self.queue_file, self.processing_file):
+                try:
+                    ids.update(e["chunk_id"] for e in _parse(path.read_text(encoding="utf-8")))
+                except OSError:
+                    continue
+            self._pending, self._pending_key = frozenset(ids), key
+        return self._pending
+
+    # -------------------------------------------------------------------------
+    # Worker
+    # -------------------------------------------------------------------------
+
+    def start_worker(self, background: bool = True) -> bool:
+        """
+        Drain the queue, in a daemon thread unless background is False.
+
+        Returns:
+            True if a worker was started (or the queue drained, when synchronous)
+        """
+        if not background:
+            return self.drain() > 0
+        with self._worker_lock:
+            self._wake = True
+            if self._worker is not None and self._worker.is_alive():
+                return False
+            self._worker = threading.Thread(target=self._drain_quietly, daemon=True)
+            self._worker.start()
+            return True
+
+    def wait_for_worker(self, timeout: float | None = None) -> None:
+        """Block until a worker started by this queue finishes."""
+        if self._worker is not None:
+            self._worker.join(timeout)
+
+    def _drain_quietly(self) -> None:
+        while True:
+            with self._worker_lock:
+                self._wake = False
+            try:
+                self.drain()
+            except Exception:
+                pass  # Semantic is optional, entries stay queued for the next worker
+            with self._worker_lock:
+                if not self._wake:
+                    return
+
+    def drain(self, batch_size: int = EMBED_BATCH_SIZE) -> int:
+        """
+        Embed every queued entry into the vector log.
+
+        Returns immediately (0) if another worker holds the context's
+        worker lock.
+
+        Returns:
+            Number of vectors written
+        """
+        self.context_dir.mkdir(parents=True, exist_ok=True)
+        with open(self.lock_file, "a") as lock:
+            try:
+                fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                return 0
+            try:
+                written = 0
+                while self._claim():
+                    written += self._process(batch_size)
+                return written
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+    def _claim(self) -> bool:
+        """Move queued entries to the processing file. False if nothing to do."""
+        if self.processing_file.exists():
+            return True  # Left over by a worker that died
+        if not self.queue_file.exists():
+            return False
+        with open(self.queue_file, "r+", encoding="utf-8") as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                raw = f.read()
+                if not raw:
+                    return False
+                # Durable copy first: a crash in between only duplicates entries
+                atomic_write_text(self.processing_file, raw)
+                f.truncate(0)
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+        return True
+
+    def _process(self, batch_size: int) -> int:
+        """Embed the claimed entries batch by batch, then drop the processing file."""
+        from .embedcache import cached_embed
+        from .embeddings import _get_cached_provider
+        from .passages import index_passages, passages_enabled
+        from .vecstore import VectorStore
+
+        entries = _parse(self.processing_file.read_text(encoding="utf-8"))
+        # Last entry per chunk wins; skip chunks deleted while queued
+        latest = {e["chunk_id"]: e["text"] for e in entries}
+        chunks_dir = self.context_dir / "chunks"
+        items = [(cid, text) for cid, text in latest.items() if (chunks_dir / f"{cid}.md").exists()]
+
+        # Without a provider, semantic search is off: the entries are dropped
+        provider = _get_cached_provider()
+        written = 0
+        if provider is not None and items:
+            store = VectorStore(self.context_dir / "embeddings.npz")
+            for start in range(0, len(items), batch_size):
+                batch = items[start : start + batch_size]
+                vectors = cached_embed(
+                    provider,
+                    [text for _, text in batch],
+                    self.context_dir / "embed_cache",
+                )
+                store.append_many(
+                    (chunk_id, vec) for (chunk_id, _), vec in zip(batch, vectors, strict=True)
+                )
+                written += len(batch)
+
+            # Phase 11: Line windows for targeted peeks (passages.py)
+            if passages_enabled():
+                index_passages([cid for cid, _ in items], provider, self.context_dir)
+
+        self.processing_file.unlink(missing_ok=True)
+        return written
+
+
+def _stat_key(path: Path) -> tuple:
+    try:
+        st = path.stat()
+        return (st.st_size, st.st_mtime_ns)
+    except OSError:
+        return (0, 0)
+
+
+def get_embed_queue(context_dir: Path | None = None) -> EmbedQueue:
+    """Shared queue for a context directory (one worker per process)."""
+    context_dir = context_dir or CONTEXT_DIR
+    with _queues_lock:
+        key = str(context_dir)
+        if key not in _queues:
+            _queues[key] = EmbedQueue(context_dir)
+        return _queues[key]
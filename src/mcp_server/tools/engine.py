@@ -0,0 +1,212 @@
+"""
+RLM Search Engine - Long-lived, process-wide search state.
+
+Phase 11 implementation.
+
+The MCP server process lives for the whole session, so the BM25 index
+(chunks + insights), the vector store and the chunk metadata (index.json,
+as a columnar MetaStore) are kept in memory between tool calls instead of being reloaded on every call.
+
+Writers (_save_index, _save_memory, VectorStore.save) bump a counter in the
+CONTEXT_DIR/.generation header (see fileutil.bump_generation). Before each
+query the engine reads that header once and reloads only the parts whose
+counter changed, so several server processes sharing one context directory
+stay consistent. Without a header (legacy data, manual edits), the engine
+falls back to the data files' size/mtime.
+"""
+
+import json
+import threading
+from pathlib import Path
+
+from .cache import LRUCache, env_cache_size
+from .fileutil import read_generation
+from .metastore import MetaStore
+from .passages import PASSAGES_FILE, PassageIndex
+from .search import RLMSearch
+
+SEARCH_CACHE_SIZE = 128  # Default entries in the search result cache
+
+# Slots whose change invalidates cached search results
+_RESULT_SLOTS = ("index", "memory", "vectors")
+
+# Parts of the engine and the generation slot invalidating each of them
+_PART_SLOTS = {
+    "bm25": ("index", "memory"),
+    "metastore": ("index", "access"),
+    "vectors": ("vectors",),
+    "passages": ("vectors",),
+}
+
+
+class SearchEngine:
+    """
+    In-memory search state for one context directory.
+
+    Parts are loaded lazily on first use and reloaded when refresh()
+    detects that their generation changed.
+    """
+
+    def __init__(self, context_dir: Path, chunks_dir: Path | None = None):
+        """
+        Initialize the engine (nothing is loaded yet).
+
+        Args:
+            context_dir: Context directory (index.json, session_memory.json, ...)
+            chunks_dir: Chunks directory (default: context_dir/chunks)
+        """
+        self.context_dir = context_dir
+        self.chunks_dir = chunks_dir or context_dir / "chunks"
+        self.index_file = context_dir / "index.json"
+        self.memory_file = context_dir / "session_memory.json"
+        self.vectors_file = context_dir / "embeddings.npz"
+        self.passages_file = context_dir / PASSAGES_FILE
+
+        self.searcher = RLMSearch(chunks_dir=self.chunks_dir)
+        self.searcher.store._memory_file = self.memory_file
+
+        self._lock = threading.RLock()
+        self._stamps: dict[str, tuple | None] = {}  # slot -> stamp seen at last refresh
+        self._loaded: set[str] = set()
+        self._metastore = None
+        self._vectors = None
+        self._passages = None
+        self.reloads = dict.fromkeys(_PART_SLOTS, 0)
+
+        # search.search() results (size from RLM_SEARCH_CACHE_SIZE, 0 disables)
+        self.results = LRUCache(env_cache_size("RLM_SEARCH_CACHE_SIZE", SEARCH_CACHE_SIZE))
+
+    def _slot_files(self) -> dict[str, Path]:
+        return {
+            "index": self.index_file,
+            "access": self.index_file,
+            "memory": self.memory_file,
+            "vectors": self.vectors_file.with_suffix(".vec"),
+        }
+
+    def _current_stamps(self) -> dict[str, tuple | None]:
+        """One read of the generation header, or one stat per file without it."""
+        generations = read_generation(self.context_dir)
+        if generations is not None:
+            return {slot: ("gen", generations[slot]) for slot in self._slot_files()}
+
+        stamps = {}
+        for slot, path in self._slot_files().items():
+            try:
+                st = path.stat()
+                stamps[slot] = ("stat", st.st_size, st.st_mtime_ns)
+            except OSError:
+                stamps[slot] = None
+        return stamps
+
+    def refresh(self) -> set[str]:
+        """
+        Drop the parts whose generation changed since the last refresh.
+
+        Returns:
+            Names of the invalidated parts
+        """
+        with self._lock:
+            stamps = self._current_stamps()
+            changed = {slot for slot in stamps if stamps[slot] != self._stamps.get(slot)}
+            self._stamps = stamps
+
+            stale = {
+                part for part, slots in _PART_SLOTS.items() if changed.intersection(slots)
+            } & self._loaded
+            self._loaded -= stale
+            if changed.intersection(_RESULT_SLOTS):
+                self.results.clear()
+            return stale
+
+    def generation(self) -> tuple:
+        """Stamps of the slots search results depend on (as of last refresh)."""
+        return tuple(self._stamps.get(slot) for slot in _RESULT_SLOTS)
+
+    def stamp(self, slot: str) -> tuple | None:
+        """Stamp of one generation slot as of last refresh (None if unknown)."""
+        return self._stamps.get(slot)
+
+    def invalidate(self) -> None:
+        """Force every part to reload on next use."""
+        with self._lock:
+            self._loaded.clear()
+
+    # -------------------------------------------------------------------------
+    # Parts
+    # -------------------------------------------------------------------------
+
+    def bm25(self) -> RLMSearch:
+        """BM25 searcher backed by the persisted index."""
+        with self._lock:
+            if "bm25" not in self._loaded:
+                self.searcher.load_index()
+                self._loaded.add("bm25")
+                self.reloads["bm25"] += 1
+            return self.searcher
+
+    def metastore(self) -> MetaStore:
+        """Columnar view of index.json (see metastore.py)."""
+        with self._lock:
+            if "metastore" not in self._loaded:
+                index = {}
+                if self.index_file.exists():
+                    with open(self.index_file, encoding="utf-8") as f:
+                        index = json.load(f)
+                self._metastore = MetaStore(index)
+                self._loaded.add("metastore")
+                self.reloads["metastore"] += 1
+            return self._metastore
+
+    def vectors(self):
+        """Loaded VectorStore, or None if no embeddings (or numpy) are available."""
+        with self._lock:
+            if "vectors" not in self._loaded:
+                from .vecstore import VectorStore
+
+                store = VectorStore(self.vectors_file)
+                self._vectors = store if store.load() else None
+                self._loaded.add("vectors")
+                self.reloads["vectors"] += 1
+            return self._vectors
+
+    def passages(self) -> PassageIndex | None:
+        """Loaded passage index (passages.py), or None if no passages exist."""
+        with self._lock:
+            if "passages" not in self._loaded:
+                from .vecstore import VectorStore
+
+                store = VectorStore(self.passages_file)
+                self._passages = PassageIndex(store) if store.load() else None
+                self._loaded.add("passages")
+                self.reloads["passages"] += 1
+            return self._passages
+
+
+# =============================================================================
+# Registry
+# =============================================================================
+
+_engines: dict[tuple[Path, Path], SearchEngine] = {}
+_engines_lock = threading.Lock()
+
+
+def get_engine(context_dir: Path, chunks_dir: Path | None = None) -> SearchEngine:
+    """
+    Get the process-wide engine for a context directory, refreshed.
+
+    Args:
+        context_dir: Context directory
+        chunks_dir: Chunks directory (default: context_dir/chunks)
+
+    Returns:
+        SearchEngine with stale parts invalidated
+    """
+    chunks_dir = chunks_dir or context_dir / "chunks"
+    key = (context_dir, chunks_dir)
+    with _engines_lock:
+        engine = _engines.get(key)
+        if engine is None:
+            engine = _engines[key] = SearchEngine(context_dir, chunks_dir)
+    engine.refresh()
+    return engine
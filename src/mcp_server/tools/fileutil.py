@@ -6,12 +6,14 @@ Provides:
 - File locking for concurrent access
 - Chunk ID validation against path traversal
 - JSON loading with structure validation
+- Generation counters for cross-process cache invalidation (Phase 11)
 """
 
 import fcntl
 import json
 import os
 import re
+import struct
 import tempfile
 from contextlib import contextmanager
 from pathlib import Path
@@ -246,3 +248,75 @@ def load_json_safe(
             raise ValueError(f"Missing keys in {filepath.name}: {missing}")
 
     return data
+
+
+# =============================================================================
+# PHASE 11: Generation counters
+# =============================================================================
+
+# Tiny binary header next to the data files. Each writer bumps its slot, so
+# readers in any process detect changes with one small read instead of
+# re-parsing JSON.
+GENERATION_FILE = ".generation"
+GENERATION_SLOTS = ("index", "memory", "vectors", "access")
+_GENERATION_MAGIC = b"RLMG"
+_GENERATION_STRUCT = struct.Struct(f"<4s{len(GENERATION_SLOTS)}Q")
+
+
+def _unpack_generation(raw: bytes) -> list[int] | None:
+    if len(raw) != _GENERATION_STRUCT.size:
+        return None
+    magic, *counters = _GENERATION_STRUCT.unpack(raw)
+    if magic != _GENERATION_MAGIC:
+        return None
+    return counters
+
+
+def read_generation(directory: Path) -> dict[str, int] | None:
+    """
+    Read the generation counters of a context directory.
+
+    Args:
+        directory: Directory holding the .generation header
+
+    Returns:
+        Dict of slot -> counter, or None if the header is missing or invalid
+    """
+    try:
+        with open(directory / GENERATION_FILE, "rb") as f:
+            counters = _unpack_generation(f.read(_GENERATION_STRUCT.size))
+    except OSError:
+        return None
+    if counters is None:
+        return None
+    return dict(zip(GENERATION_SLOTS, counters, strict=True))
+
+
+def bump_generation(directory: Path, slot: str) -> int:
+    """
+    Increment one generation counter (creating the header if needed).
+
+    Called by every writer after its data file was replaced.
+
+    Args:
+        directory: Directory holding the .generation header
+        slot: One of GENERATION_SLOTS
+
+    Returns:
+        The new counter value
+    """
+    i = GENERATION_SLOTS.index(slot)
+    directory.mkdir(parents=True, exist_ok=True)
+
+    fd = os.open(directory / GENERATION_FILE, os.O_RDWR | os.O_CREAT, 0o644)
+    try:
+        fcntl.flock(fd, fcntl.LOCK_EX)
+        counters = _unpack_generation(os.pread(fd, _GENERATION_STRUCT.size, 0))
+        if counters is None:
+            counters = [0] * len(GENERATION_SLOTS)
+        counters[i] += 1
+        os.pwrite(fd, _GENERATION_STRUCT.pack(_GENERATION_MAGIC, *counters), 0)
+        return counters[i]
+    finally:
+        fcntl.flock(fd, fcntl.LOCK_UN)
+        os.close(fd)
@@ -0,0 +1,362 @@
+"""
+RLM Fuzzy Index - q-gram count filtering for fuzzy grep.
+
+Phase 11 implementation.
+
+grep_fuzzy() scored every non-empty line of every chunk with
+fuzz.partial_ratio and kept every line above the threshold before sorting.
+Each chunk's lines now get a positional q-gram index (QGRAM characters),
+and the indexes of the searched chunks are merged into one sorted array,
+cached by the (path, size, mtime) of every file: a repeated search costs
+one stat per chunk. When a file or the chunk set changes, the unchanged
+chunks' indexes are taken from the latest merged index. A query
+looks up the positions holding one of the pattern's q-grams, counts them
+per line within a needle-sized window, and discards the lines that cannot
+reach the threshold (count filtering). Only the survivors are scored
+exactly, into a bounded top-k heap.
+
+The filter is lossless. partial_ratio aligns the shorter string (the
+needle, length a) with windows of the longer one (length w <= a) and
+scores 100 * 2 * LCS / (a + w). Reaching a score therefore requires a
+minimum LCS, and an alignment with that LCS leaves at least
+
+    (a - q + 1) - q * (a - LCS) - (q - 1) * (w - LCS)
+
+of the needle's q-grams intact, at distinct positions of one window of
+the other string (a deleted character breaks at most q of them, an
+inserted one at most q - 1). Lines whose bound is not positive (short
+lines, low thresholds) are always scored.
+
+The bound is much tighter near 100, so the filter first runs at high
+levels and lowers them (TIGHTEN_STEP) down to the threshold: once the
+heap holds `limit` lines scoring at least the current level, no line
+left out can displace them.
+
+Without numpy every line is scored, as before, into the same heap.
+"""
+
+import heapq
+import math
+import os
+from collections.abc import Callable
+from functools import lru_cache
+from pathlib import Path
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from .cache import LRUCache
+from .lineindex import read_body_lines
+
+QGRAM = 2
+TIGHTEN_STEP = 5  # Score levels between filter passes
+CORPUS_CACHE_SIZE = 4  # Merged indexes (chunk sets) kept in memory
+
+_CHAR_BITS = 21  # Unicode code points fit in 21 bits
+_CHUNK_SHIFT = QGRAM * _CHAR_BITS
+
+_corpus_cache = LRUCache(CORPUS_CACHE_SIZE)
+_latest_chunks: dict[tuple, "ChunkLines"] = {}  # Stat key -> index, latest corpus built
+
+
+def _gram_codes(text: str):
+    """Integer code of the q-gram starting at each position of text."""
+    points = np.frombuffer(text.encode("utf-32-le"), dtype=np.uint32).astype(np.int64)
+    codes = np.zeros(max(0, len(points) - QGRAM + 1), dtype=np.int64)
+    for k in range(QGRAM):
+        codes <<= _CHAR_BITS
+        codes |= points[k : k + len(codes)]
+    return codes
+
+
+@lru_cache(maxsize=4096)
+def intact_bound(a: int, threshold: int) -> int:
+    """
+    Fewest needle q-grams left intact by any window scoring >= threshold.
+
+    Args:
+        a: Needle length (the shorter of pattern and line)
+        threshold: Minimum partial_ratio score (0-100, rounded)
+
+    Returns:
+        Lower bound on intact q-gram occurrences (may be <= 0: no filter)
+    """
+    t = (threshold - 0.5) / 100  # Scores are rounded
+    total = a - QGRAM + 1
+    bound = total
+    for w in range(1, a + 1):
+        lcs = max(0, math.ceil(t * (a + w) / 2 - 1e-9))
+        if lcs <= w:
+            bound = min(bound, total - QGRAM * (a - lcs) - (QGRAM - 1) * (w - lcs))
+    return bound
+
+
+# =============================================================================
+# Per-chunk and merged indexes
+# =============================================================================
+
+
+class ChunkLines:
+    """Non-blank body lines of a chunk with their positional q-grams."""
+
+    def __init__(self, lines: list[str], key=None):
+        """
+        Args:
+            lines: Body lines as rlm_peek numbers them
+            key: Cache key of the chunk file (identifies it in merged indexes)
+        """
+        self.key = key
+        self.numbers: list[int] = []  # 1-based line numbers, as grep reports them
+        self.texts: list[str] = []  # Stripped lines
+        self.folded: list[str] = []  # Stripped, lowercased lines
+        for number, line in enumerate(lines, 1):
+            text = line.strip()
+            if text:
+                self.numbers.append(number)
+                self.texts.append(text)
+                self.folded.append(text.lower())
+
+        if np is None:
+            return
+        # Positions of every line's q-grams, sorted by q-gram code
+        self.lengths = np.array([len(text) for text in self.folded], dtype=np.int32)
+        codes = _gram_codes("\n".join(self.folded))
+        line_starts = np.zeros(len(self.folded), dtype=np.int64)
+        np.cumsum(self.lengths[:-1] + 1, out=line_starts[1:])
+        rows = np.repeat(np.arange(len(self.folded), dtype=np.int32), self.lengths + 1)
+        rows = rows[: len(codes)]
+        cols = np.arange(len(codes), dtype=np.int64) - line_starts[rows]
+        inside = cols <= self.lengths[rows] - QGRAM  # Not across a line break
+        codes, rows, cols = codes[inside], rows[inside], cols[inside]
+        order = np.argsort(codes, kind="stable")
+        self.grams = codes[order]
+        self.rows = rows[order]
+        self.cols = cols[order].astype(np.int32)
+
+
+class LineCorpus:
+    """q-gram indexes of several chunks merged into one sorted array."""
+
+    def __init__(self, chunks: list[ChunkLines]):
+        """
+        Args:
+            chunks: Chunk line indexes, in search order (rows are numbered
+                across them in that order)
+        """
+        self.chunks = chunks
+        if np is None:
+            return
+        self.row_offsets = np.zeros(len(chunks) + 1, dtype=np.int64)
+        np.cumsum([len(c.folded) for c in chunks], out=self.row_offsets[1:])
+        self.lengths = np.concatenate([c.lengths for c in chunks] or [np.zeros(0, np.int32)])
+        # Chunk number in the high bits keeps the concatenation sorted
+        self.keys = np.concatenate(
+            [c.grams | (i << _CHUNK_SHIFT) for i, c in enumerate(chunks)] or [np.zeros(0, np.int64)]
+        )
+        self.rows = np.concatenate(
+            [c.rows + self.row_offsets[i] for i, c in enumerate(chunks)] or [np.zeros(0, np.int64)]
+        )
+        self.cols = np.concatenate([c.cols for c in chunks] or [np.zeros(0, np.int32)])
+
+    def hits(self, grams) -> tuple:
+        """
+        Positions holding one of the given q-gram codes.
+
+        Returns:
+            (rows, cols), unordered
+        """
+        n_chunks = len(self.row_offsets) - 1
+        queries = (np.arange(n_chunks, dtype=np.int64)[:, None] << _CHUNK_SHIFT) | grams
+        queries = queries.ravel()
+        lo = np.searchsorted(self.keys, queries, side="left")
+        counts = np.searchsorted(self.keys, queries, side="right") - lo
+        # Concatenated ranges lo[i]:lo[i] + counts[i]
+        ends = np.cumsum(counts)
+        positions = np.repeat(lo - ends + counts, counts) + np.arange(int(counts.sum()))
+        return self.rows[positions], self.cols[positions]
+
+
+def chunk_lines(chunk_file: Path, offset: int | None = None) -> ChunkLines | None:
+    """
+    Line index of a chunk file.
+
+    Args:
+        chunk_file: Chunk .md file
+        offset: Recorded body offset (index.json "body_offset")
+
+    Returns:
+        ChunkLines, or None if the file does not exist
+    """
+    key = _stat_key(chunk_file)
+    if key is None:
+        return None
+    return ChunkLines(read_body_lines(chunk_file, offset), key)
+
+
+def line_corpus(chunk_files: list[tuple[Path, int | None]]) -> tuple[list[int], LineCorpus]:
+    """
+    Merged line index of chunk files, cached until one of them changes.
+
+    Args:
+        chunk_files: (chunk file, recorded body offset) pairs, in search order
+
+    Returns:
+        (positions in chunk_files of the files that exist, their LineCorpus)
+    """
+    global _latest_chunks
+    present, keys = [], []
+    for i, (chunk_file, _) in enumerate(chunk_files):
+        key = _stat_key(chunk_file)
+        if key is not None:
+            present.append(i)
+            keys.append(key)
+
+    corpus = _corpus_cache.get(tuple(keys))
+    if corpus is None:
+        chunks = []
+        for i, key in zip(present, keys, strict=True):
+            lines = _latest_chunks.get(key)
+            if lines is None:
+                chunk_file, offset = chunk_files[i]
+                lines = ChunkLines(read_body_lines(chunk_file, offset), key)
+            chunks.append(lines)
+        corpus = LineCorpus(chunks)
+        _corpus_cache.put(tuple(keys), corpus)
+        _latest_chunks = {lines.key: lines for lines in chunks}
+    return present, corpus
+
+
+def _stat_key(chunk_file: Path) -> tuple | None:
+    try:
+        st = os.stat(chunk_file)
+    except OSError:
+        return None
+    return (str(chunk_file), st.st_size, st.st_mtime_ns)
+
+
+# =============================================================================
+# Search
+# =============================================================================
+
+
+class FuzzyMatcher:
+    """Top-k fuzzy line matches of one pattern across chunks."""
+
+    def __init__(self, pattern: str, threshold: int, limit: int, scorer: Callable):
+        """
+        Args:
+            pattern: Text to search for
+            threshold: Minimum similarity score 0-100
+            limit: Number of matches to keep
+            scorer: Similarity function (e.g. fuzz.partial_ratio)
+        """
+        self.pattern = pattern.lower()
+        self.threshold = threshold
+        self.limit = limit
+        self.scorer = scorer
+        self.scored = 0  # Lines scored exactly (for benchmarks)
+        self._heap: list[tuple] = []
+
+    def search(self, chunks: list[tuple]) -> list[tuple]:
+        """
+        Best matching lines of the given chunks.
+
+        Args:
+            chunks: (tag, ChunkLines) pairs, in result tie-break order
+
+        Returns:
+            (tag, line number, score, text) by descending score, ties in
+            chunk and line order
+        """
+        tags = [tag for tag, _ in chunks]
+        return self.search_corpus(tags, LineCorpus([lines for _, lines in chunks]))
+
+    def search_corpus(self, tags: list, corpus: LineCorpus) -> list[tuple]:
+        """
+        Best matching lines of an already merged index (see line_corpus()).
+
+        Args:
+            tags: One tag per chunk of the corpus, in result tie-break order
+            corpus: Merged index of the chunks
+
+        Returns:
+            (tag, line number, score, text) by descending score, ties in
+            chunk and line order
+        """
+        indexes = corpus.chunks
+        if self.limit <= 0 or not indexes:
+            return []
+        if np is None:
+            row = 0
+            for c, lines in enumerate(indexes):
+                for r in range(len(lines.folded)):
+                    self._score(row + r, c, lines, r)
+                row += len(lines.folded)
+        else:
+            self._filtered(corpus)
+        ranked = sorted(self._heap, reverse=True)
+        return [
+            (tags[c], indexes[c].numbers[r], score, indexes[c].texts[r])
+            for score, _, c, r in ranked
+        ]
+
+    def _filtered(self, corpus: LineCorpus) -> None:
+        """Score the lines passing the count filter, tightest level first."""
+        indexes = corpus.chunks
+        m = len(self.pattern)
+        grams = np.unique(_gram_codes(self.pattern))
+        hit_rows, hit_cols = corpus.hits(grams)
+        row_needles = np.minimum(corpus.lengths, m)
+        scored = np.zeros(len(corpus.lengths), dtype=bool)
+
+        # Rows with fewer hits than the threshold needs cannot pass at any
+        # level; order the hits of the others by row, then column
+        need = np.maximum(self._bounds(self.threshold)[row_needles], 1)
+        counts = np.bincount(hit_rows, minlength=len(scored))
+        keep = counts[hit_rows] >= need[hit_rows]
+        order = np.sort((hit_rows[keep].astype(np.int64) << 32) | hit_cols[keep])
+        hit_rows, hit_cols = order >> 32, order & 0xFFFFFFFF
+        hit_needles = row_needles[hit_rows]
+
+        levels = list(range(100, self.threshold, -TIGHTEN_STEP)) + [self.threshold]
+        for level in levels:
+            bounds = self._bounds(level)
+            # need intact positions within one needle-sized window
+            need = np.maximum(bounds[hit_needles], 1)
+            first = np.arange(len(hit_rows)) - need + 1
+            ok = first >= 0
+            first = np.where(ok, first, 0)
+            ok &= hit_rows[first] == hit_rows
+            ok &= hit_cols - hit_cols[first] <= hit_needles - QGRAM
+            candidates = np.zeros(len(scored), dtype=bool)
+            candidates[hit_rows[ok]] = True
+            candidates |= bounds[row_needles] <= 0
+            candidates &= ~scored
+            scored |= candidates
+
+            rows = np.flatnonzero(candidates)
+            chunk_of = np.searchsorted(corpus.row_offsets, rows, side="right") - 1
+            local = rows - corpus.row_offsets[chunk_of]
+            for row, c, r in zip(rows.tolist(), chunk_of.tolist(), local.tolist(), strict=True):
+                self._score(row, c, indexes[c], r)
+            # Every line left out scores below level
+            if len(self._heap) == self.limit and self._heap[0][0] >= level:
+                return
+
+    def _bounds(self, level: int):
+        """intact_bound of every needle length up to the pattern's."""
+        return np.array([intact_bound(a, level) for a in range(len(self.pattern) + 1)])
+
+    def _score(self, row: int, c: int, lines: ChunkLines, r: int) -> None:
+        """Score one line into the heap (ties keep the earliest row)."""
+        score = self.scorer(self.pattern, lines.folded[r])
+        self.scored += 1
+        if score < self.threshold:
+            return
+        item = (score, -row, c, r)
+        if len(self._heap) < self.limit:
+            heapq.heappush(self._heap, item)
+        elif item > self._heap[0]:
+            heapq.heapreplace(self._heap, item)
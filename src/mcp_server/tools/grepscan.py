@@ -0,0 +1,280 @@
+"""
+RLM Grep Scanner - Parallel, memory-mapped scan behind rlm_grep.
+
+Phase 11 implementation.
+
+grep() used to read every chunk with readlines() and run the regex on each
+line, in index order, even when `limit` was about to be reached. Chunks are
+now memory-mapped and scanned by a thread pool, GREP_PREFETCH chunks per
+worker ahead of the chunk being collected; results are still collected in
+index order, and nothing more is scheduled once `limit` matches are in.
+
+Within a chunk, the regex runs once over the whole body (re.MULTILINE)
+instead of once per line: each body match only points at a candidate line,
+which is then checked with the per-line regex, so the matches are exactly
+those of the per-line scan. Line numbers and context are computed for hit
+lines only. Patterns whose whole-body match could miss a per-line match
+(lookarounds, $, \\A, \\Z, \\B, atomic groups, possessive repeats) fall
+back to testing every line.
+
+Plain-ASCII chunks are searched as bytes straight from the mapping, with a
+bytes version of the pattern (identical semantics on ASCII text); other
+chunks are decoded once.
+"""
+
+import mmap
+import os
+import re
+import threading
+from collections import deque
+from collections.abc import Iterable
+from pathlib import Path
+
+try:
+    from re import _parser as sre_parse  # Python 3.11+
+except ImportError:
+    import sre_parse
+
+from .lineindex import body_offset, valid_body_offset
+
+GREP_WORKERS = min(8, os.cpu_count() or 1)
+GREP_PREFETCH = 2  # Chunks scheduled per worker ahead of collection
+
+# Bytes outside plain ASCII text (CR: universal newlines; \x1c-\x1f: str \s)
+_NOT_PLAIN = re.compile(rb"[\r\x80-\xff]")
+_NOT_PLAIN_SPACE = re.compile(rb"[\r\x1c-\x1f\x80-\xff]")
+
+# Zero-width checks that can pass on a lone line but fail inside the body
+_LINE_ONLY_AT = {
+    sre_parse.AT_BEGINNING_STRING,
+    sre_parse.AT_END,
+    sre_parse.AT_END_STRING,
+    sre_parse.AT_NON_BOUNDARY,
+}
+_LINE_ONLY_OPS = {
+    sre_parse.ASSERT,
+    sre_parse.ASSERT_NOT,
+    getattr(sre_parse, "ATOMIC_GROUP", None),
+    getattr(sre_parse, "POSSESSIVE_REPEAT", None),
+} - {None}
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def _body_safe(items) -> bool:
+    """Whether a per-line match implies a whole-body match at the same offset."""
+    for op, av in items:
+        if op in _LINE_ONLY_OPS:
+            return False
+        if op is sre_parse.AT and av in _LINE_ONLY_AT:
+            return False
+        if op is sre_parse.SUBPATTERN:
+            children = [av[-1]]
+        elif op is sre_parse.BRANCH:
+            children = av[1]
+        elif op in (sre_parse.MAX_REPEAT, sre_parse.MIN_REPEAT):
+            children = [av[2]]
+        elif op is sre_parse.GROUPREF_EXISTS:
+            children = [p for p in av[1:] if p is not None]
+        else:
+            continue
+        if not all(_body_safe(child) for child in children):
+            return False
+    return True
+
+
+class LineMatcher:
+    """A grep pattern compiled for per-line checks and whole-body scans."""
+
+    def __init__(self, pattern: str):
+        """
+        Args:
+            pattern: Regular expression (valid), matched case-insensitively
+        """
+        self.line = re.compile(pattern, re.IGNORECASE)
+        self.body = None
+        self.line_bytes = self.body_bytes = None
+        if not _body_safe(sre_parse.parse(pattern, sre_parse.SRE_FLAG_IGNORECASE)):
+            return
+        self.body = re.compile(pattern, re.IGNORECASE | re.MULTILINE)
+        if pattern.isascii():
+            try:
+                raw = pattern.encode("ascii")
+                self.line_bytes = re.compile(raw, re.IGNORECASE)
+                self.body_bytes = re.compile(raw, re.IGNORECASE | re.MULTILINE)
+            except re.error:
+                pass  # str-only escapes (\u, \N{...})
+        # \s also matches \x1c-\x1f in str patterns, not in bytes patterns
+        self._not_plain = _NOT_PLAIN_SPACE if "\\s" in pattern.lower() else _NOT_PLAIN
+
+
+def _scan(data, start: int, line_re, body_re, limit: int, context_lines: int) -> list:
+    """(line number, context slice) of the first limit matching body lines."""
+    nl = "\n" if isinstance(data, str) else b"\n"
+    end = len(data)
+    hits = []
+    line_no, counted = 1, start  # Line number at offset `counted`
+    pos = start
+    while pos < end and len(hits) < limit:
+        line_start = pos
+        if body_re is not None:
+            m = body_re.search(data, pos)
+            if m is None:
+                break
+            i = data.rfind(nl, pos, m.start())
+            line_start = pos if i < 0 else i + 1
+            if line_start >= end:
+                break
+        i = data.find(nl, line_start)
+        line_end = end if i < 0 else i + 1
+        pos = line_end
+        if not line_re.search(data[line_start:line_end]):
+            continue
+
+        line_no += data[counted:line_start].count(nl)  # (mmap has no count())
+        counted = line_start
+        ctx_start = line_start
+        for _ in range(context_lines):
+            if ctx_start <= start:
+                break
+            i = data.rfind(nl, start, ctx_start - 1)
+            ctx_start = start if i < 0 else i + 1
+        ctx_end = line_end
+        for _ in range(context_lines):
+            if ctx_end >= end:
+                break
+            i = data.find(nl, ctx_end)
+            ctx_end = end if i < 0 else i + 1
+        hits.append((line_no, data[ctx_start:ctx_end]))
+    return hits
+
+
+def scan_file(
+    path: Path, matcher: LineMatcher, limit: int, context_lines: int, offset: int | None = None
+) -> list:
+    """
+    Matching body lines of one chunk file.
+
+    Args:
+        path: Chunk file (missing files have no matches)
+        matcher: Compiled pattern
+        limit: Stop after this many matching lines
+        context_lines: Lines of context before/after each match
+        offset: Recorded body offset (checked before use), None to locate it
+
+    Returns:
+        List of (line number in the body, 1-based; context text) tuples
+    """
+    try:
+        with open(path, "rb") as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                return []
+            data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except FileNotFoundError:
+        return []
+
+    try:
+        # Phase 11: Body offset recorded by chunk() (lineindex.py)
+        start = offset if valid_body_offset(data, offset) else None
+        if matcher.body_bytes is not None and not matcher._not_plain.search(data):
+            if start is None:
+                start = body_offset(data)
+            hits = _scan(data, start, matcher.line_bytes, matcher.body_bytes, limit, context_lines)
+            return [(n, context.decode("ascii")) for n, context in hits]
+        raw = data[start or 0 :]
+    finally:
+        data.close()
+
+    if b"\r" in raw:  # Universal newlines, as text-mode reads
+        raw = raw.replace(b"\r\n", b"\n").replace(b"\r", b"\n")
+        start = None
+    text = raw.decode("utf-8")
+    text_start = 0 if start is not None else body_offset(text)
+    return _scan(text, text_start, matcher.line, matcher.body, limit, context_lines)
+
+
+def _get_pool():
+    """Shared scan thread pool (created on first parallel grep)."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            from concurrent.futures import ThreadPoolExecutor
+
+            _pool = ThreadPoolExecutor(max_workers=GREP_WORKERS, thread_name_prefix="rlm-grep")
+        return _pool
+
+
+def grep_files(
+    chunks: Iterable[dict],
+    root: Path,
+    matcher: LineMatcher,
+    limit: int,
+    context_lines: int = 1,
+) -> list[tuple[dict, int, str]]:
+    """
+    First limit matching lines across chunk files, in the order of chunks.
+
+    Files are scanned in parallel, at most GREP_WORKERS * GREP_PREFETCH ahead
+    of the file being collected. chunks is consumed and each path resolved
+    only as files are scheduled, and nothing is scheduled once limit is
+    reached.
+
+    Args:
+        chunks: Index entries ("file" relative to root, optional
+            "body_offset"), in result order; may be a lazy iterable
+        root: Directory the "file" paths are relative to
+        matcher: Compiled pattern
+        limit: Maximum number of matches
+        context_lines: Lines of context before/after each match
+
+    Returns:
+        List of (chunk entry, line number, context) tuples
+    """
+    limit = max(1, limit)
+    chunks = iter(chunks)
+    results: list[tuple[dict, int, str]] = []
+
+    if GREP_WORKERS <= 1:
+        for chunk in chunks:
+            hits = scan_file(
+                root / chunk["file"],
+                matcher,
+                limit - len(results),
+                context_lines,
+                chunk.get("body_offset"),
+            )
+            results.extend((chunk, n, context) for n, context in hits)
+            if len(results) >= limit:
+                break
+        return results
+
+    pool = _get_pool()
+    pending = deque()
+
+    def schedule() -> None:
+        for chunk in chunks:
+            remaining = limit - len(results)
+            future = pool.submit(
+                scan_file,
+                root / chunk["file"],
+                matcher,
+                remaining,
+                context_lines,
+                chunk.get("body_offset"),
+            )
+            pending.append((chunk, future))
+            return
+
+    try:
+        for _ in range(GREP_WORKERS * GREP_PREFETCH):
+            schedule()
+        while pending and len(results) < limit:
+            chunk, future = pending.popleft()
+            results.extend((chunk, n, context) for n, context in future.result())
+            if len(results) < limit:
+                schedule()
+    finally:
+        for _, future in pending:
+            future.cancel()
+    return results[:limit]
@@ -0,0 +1,277 @@
+"""
+RLM Hash Index - content_hash -> chunk map for duplicate detection.
+
+Phase 11 implementation.
+
+_check_duplicate() loaded index.json and compared the content_hash of every
+chunk, and content already moved to the archive was never detected. This
+module keeps a persistent map from content hash to chunk, covering active
+and archived chunks:
+
+    content_hashes.jsonl   append-only log: a header line, then one JSON
+                           record per change ({"op": "add" | "remove",
+                           "hash", "id", "summary"})
+
+Each process reads the log once, then only the records appended since
+(by byte position), so a lookup is a dict access plus one stat of the
+chunk file. chunk() adds its hash and purge removes it through the writer
+hooks at the bottom; archive and restore keep the entry, the chunk file
+decides whether the hit is active or archived. A missing log is rebuilt
+from index.json and archive_index.json, and a hit whose chunk file no
+longer exists anywhere is ignored, so chunks deleted by other means never
+block new ones. compact() rewrites the log with the live entries once
+removed or superseded records dominate.
+"""
+
+import fcntl
+import json
+import os
+import threading
+from pathlib import Path
+
+from .fileutil import CONTEXT_DIR, atomic_write_text, safe_path
+
+HASH_LOG_FILE = "content_hashes.jsonl"
+HASH_LOG_VERSION = 1
+HASH_LOG_COMPACT_MIN = 1000  # Never compact a log with fewer records
+
+_indexes: dict[str, "HashIndex"] = {}
+_indexes_lock = threading.Lock()
+_compact_lock = threading.Lock()
+
+
+def _record(op: str, content_hash: str, chunk_id: str, summary: str = "") -> dict:
+    record = {"op": op, "hash": content_hash, "id": chunk_id}
+    if op == "add":
+        record["summary"] = summary
+    return record
+
+
+def _encode(record: dict) -> str:
+    return json.dumps(record, ensure_ascii=False) + "\n"
+
+
+class HashIndex:
+    """content_hash -> (chunk id, summary) map of one context directory."""
+
+    def __init__(self, context_dir: Path | None = None):
+        """
+        Args:
+            context_dir: Context directory (default: CONTEXT_DIR)
+        """
+        self.context_dir = context_dir or CONTEXT_DIR
+        self.log_file = self.context_dir / HASH_LOG_FILE
+        self._lock = threading.RLock()
+        self._reset()
+
+    def _reset(self) -> None:
+        self._entries: dict[str, tuple[str, str]] = {}
+        self._log_key: tuple | None = None  # (inode, header line) of the log read
+        self._log_pos = 0
+        self._records = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    # -------------------------------------------------------------------------
+    # Loading
+    # -------------------------------------------------------------------------
+
+    def refresh(self) -> None:
+        """Read the records appended since the last call (all, if replaced)."""
+        with self._lock:
+            if not self.log_file.exists():
+                self.rebuild()
+            try:
+                log = open(self.log_file, "rb")
+            except OSError:
+                self._reset()
+                return
+            with log:
+                fcntl.flock(log, fcntl.LOCK_SH)
+                try:
+                    # Compaction replaces the file: a new inode and log id
+                    log_key = (os.fstat(log.fileno()).st_ino, log.readline())
+                    if log_key != self._log_key:
+                        self._reset()
+                        self._log_key = log_key
+                        self._log_pos = log.tell()
+                    log.seek(self._log_pos)
+                    records = log.read()
+                finally:
+                    fcntl.flock(log, fcntl.LOCK_UN)
+            self._log_pos += self._replay(records)
+
+    def _replay(self, records: bytes) -> int:
+        """Apply log records. Returns the bytes consumed (a torn tail is left)."""
+        end = records.rfind(b"\n") + 1
+        for line in records[:end].splitlines():
+            try:
+                record = json.loads(line)
+                op, content_hash, chunk_id = record["op"], record["hash"], record["id"]
+            except (ValueError, KeyError, TypeError):
+                continue  # Header or damaged line
+            if op == "add":
+                self._entries[content_hash] = (chunk_id, record.get("summary", ""))
+            elif op == "remove" and self._entries.get(content_hash, ("",))[0] == chunk_id:
+                del self._entries[content_hash]
+            self._records += 1
+        return end
+
+    def rebuild(self) -> int:
+        """
+        Rewrite the log from index.json and archive_index.json.
+
+        Returns:
+            Number of hashes recorded
+        """
+        records = []
+        # Archives first: an active chunk with the same hash wins
+        for name, key in (("archive_index.json", "archives"), ("index.json", "chunks")):
+            try:
+                with open(self.context_dir / name, encoding="utf-8") as f:
+                    chunks = json.load(f).get(key, [])
+            except (OSError, ValueError, AttributeError):
+                continue
+            for chunk in chunks:
+                if chunk.get("content_hash") and chunk.get("id"):
+                    records.append(
+                        _record("add", chunk["content_hash"], chunk["id"], chunk.get("summary", ""))
+                    )
+        self._write_log(records)
+        return len({r["hash"] for r in records})
+
+    def _write_log(self, records: list[dict]) -> None:
+        header = {"version": HASH_LOG_VERSION, "log_id": os.urandom(8).hex()}
+        self.context_dir.mkdir(parents=True, exist_ok=True)
+        atomic_write_text(self.log_file, "".join(_encode(r) for r in [header, *records]))
+
+    # -------------------------------------------------------------------------
+    # Lookups and writes
+    # -------------------------------------------------------------------------
+
+    def lookup(self, content_hash: str) -> dict | None:
+        """
+        Chunk holding content with this hash.
+
+        Args:
+            content_hash: content_hash of the normalized content
+
+        Returns:
+            {"id", "summary", "archived"}, or None if no existing chunk
+            (active or archived) has this hash
+        """
+        with self._lock:
+            self.refresh()
+            entry = self._entries.get(content_hash)
+        if entry is None:
+            return None
+        chunk_id, summary = entry
+        chunk_file = safe_path(self.context_dir / "chunks", chunk_id, ".md")
+        archive_file = safe_path(self.context_dir / "archive", chunk_id, ".md.gz")
+        if chunk_file is not None and chunk_file.exists():
+            archived = False
+        elif archive_file is not None and archive_file.exists():
+            archived = True
+        else:
+            return None  # Deleted by other means
+        return {"id": chunk_id, "summary": summary, "archived": archived}
+
+    def add(self, content_hash: str, chunk_id: str, summary: str = "") -> None:
+        """Record the hash of a new chunk."""
+        self._append(_record("add", content_hash, chunk_id, summary))
+
+    def remove(self, content_hash: str, chunk_id: str) -> None:
+        """Forget the hash of a purged chunk (if it still maps to it)."""
+        self._append(_record("remove", content_hash, chunk_id))
+
+    def _append(self, record: dict) -> None:
+        self.refresh()  # Rebuilds a missing log before the first record
+        line = _encode(record).encode("utf-8")
+        while True:
+            with open(self.log_file, "ab") as log:
+                fcntl.flock(log, fcntl.LOCK_EX)
+                try:
+                    if os.fstat(log.fileno()).st_ino != os.stat(self.log_file).st_ino:
+                        continue  # Replaced by a compaction meanwhile
+                    log.write(line)
+                    break
+                finally:
+                    fcntl.flock(log, fcntl.LOCK_UN)
+        self.maybe_compact()
+
+    def needs_compact(self) -> bool:
+        """Check whether removed or superseded records outnumber live ones."""
+        return self._records >= HASH_LOG_COMPACT_MIN and self._records > 2 * len(self._entries)
+
+    def maybe_compact(self) -> bool:
+        """Compact the log if needed. Returns True if it was compacted."""
+        with self._lock:
+            self.refresh()
+            if not self.needs_compact():
+                return False
+            return self.compact()
+
+    def compact(self) -> bool:
+        """
+        Rewrite the log with one record per live hash.
+
+        Holds the log's exclusive lock throughout, so appends wait (and then
+        retry on the new file).
+
+        Returns:
+            True if the log was compacted
+        """
+        if not self.log_file.exists():
+            return False
+        with _compact_lock, open(self.log_file, "rb") as log:
+            fcntl.flock(log, fcntl.LOCK_EX)
+            try:
+                merged = HashIndex(self.context_dir)
+                merged._replay(log.read())
+                self._write_log(
+                    [
+                        _record("add", content_hash, chunk_id, summary)
+                        for content_hash, (chunk_id, summary) in merged._entries.items()
+                    ]
+                )
+            finally:
+                fcntl.flock(log, fcntl.LOCK_UN)
+        return True
+
+
+def get_hash_index(context_dir: Path | None = None) -> HashIndex:
+    """Shared index for a context directory (one per process)."""
+    context_dir = context_dir or CONTEXT_DIR
+    with _indexes_lock:
+        key = str(context_dir)
+        if key not in _indexes:
+            _indexes[key] = HashIndex(context_dir)
+        return _indexes[key]
+
+
+# =============================================================================
+# Writer hooks
+# =============================================================================
+
+
+def record_chunk_hash(context_dir: Path, content_hash: str, chunk_id: str, summary: str) -> None:
+    """
+    Add the hash of a newly written chunk.
+
+    Never raises: a missing record only means a duplicate goes undetected.
+    """
+    try:
+        get_hash_index(context_dir).add(content_hash, chunk_id, summary)
+    except Exception:
+        pass
+
+
+def forget_chunk_hash(context_dir: Path, content_hash: str | None, chunk_id: str) -> None:
+    """Remove the hash of a purged chunk."""
+    if not content_hash:
+        return
+    try:
+        get_hash_index(context_dir).remove(content_hash, chunk_id)
+    except Exception:
+        pass
@@ -0,0 +1,205 @@
+"""
+RLM Line Index - Body offsets and line-offset sidecars of chunk files.
+
+Phase 11 implementation.
+
+peek(), grep() and grep_fuzzy() re-scanned the YAML header of every chunk
+line by line to find the second "---", and a ranged peek read the whole
+file (up to MAX_CHUNK_CONTENT_SIZE) to return a few lines. chunk() now
+records the byte offset of the body in index.json ("body_offset") and
+writes a sidecar next to the chunk:
+
+    chunks/<chunk_id>.lines   header (magic, version, stride, line count,
+                              body offset, chunk size + mtime) followed by
+                              the uint32 file offsets of body lines
+                              0, LINE_INDEX_STRIDE, 2 * LINE_INDEX_STRIDE...
+
+A ranged peek is then one seek to the sampled line at or before `start`
+and one read bounded by the sampled line at or after `end`. The sidecar is
+only trusted while the chunk's size and mtime match; a chunk rewritten by
+other means (restore, entity backfill) falls back to a full read, which
+rewrites the sidecar. Line numbers are rlm_peek's: body lines as
+readlines() returns them after the header (line 0 is the blank line that
+follows it).
+"""
+
+import array
+import os
+import struct
+import sys
+from pathlib import Path
+
+LINE_INDEX_SUFFIX = ".lines"
+LINE_INDEX_STRIDE = 32  # Body lines per sampled offset
+LINE_INDEX_VERSION = 1
+_LINE_INDEX_MAGIC = b"RLML"
+# magic, version, stride, lines, body offset, chunk size, chunk mtime_ns
+_LINE_INDEX_HEADER = struct.Struct("<4sHHIQQQ")
+
+
+def body_offset(data) -> int:
+    """Offset of the body: after the second "---" line (0 without header)."""
+    nl, dashes = ("\n", "---") if isinstance(data, str) else (b"\n", b"---")
+    pos, in_header = 0, False
+    while pos < len(data):
+        i = data.find(nl, pos)
+        end = len(data) if i < 0 else i + 1
+        if data[pos:end].strip() == dashes:
+            if in_header:
+                return end
+            in_header = True
+        pos = end
+    return 0
+
+
+def valid_body_offset(data: bytes, offset: int | None) -> bool:
+    """Check a recorded body offset against the bytes just before it."""
+    return offset is not None and 4 <= offset <= len(data) and data[offset - 4 : offset] == b"---\n"
+
+
+def line_index_path(chunk_file: Path) -> Path:
+    return chunk_file.with_suffix(LINE_INDEX_SUFFIX)
+
+
+def _split_lines(text: str) -> list[str]:
+    """Lines with their "\\n" kept, as readlines() splits translated text."""
+    parts = text.split("\n")
+    lines = [part + "\n" for part in parts[:-1]]
+    if parts[-1]:
+        lines.append(parts[-1])
+    return lines
+
+
+# =============================================================================
+# Full reads
+# =============================================================================
+
+
+def read_body_lines(chunk_file: Path, offset: int | None = None) -> list[str]:
+    """
+    Body lines of a chunk file, numbered as rlm_peek numbers them.
+
+    Args:
+        chunk_file: Chunk .md file
+        offset: Recorded body offset (index.json "body_offset"), checked
+            before use; None to locate the header end
+
+    Returns:
+        List of lines (with their line endings)
+    """
+    data = chunk_file.read_bytes()
+    if b"\r" in data:  # Universal newlines, as text-mode reads
+        data = data.replace(b"\r\n", b"\n").replace(b"\r", b"\n")
+    if not valid_body_offset(data, offset):
+        offset = body_offset(data)
+    return _split_lines(data[offset:].decode("utf-8"))
+
+
+# =============================================================================
+# Sidecar
+# =============================================================================
+
+
+def write_line_index(chunk_file: Path) -> bool:
+    """
+    Write the line-offset sidecar of a chunk file.
+
+    Never raises: a missing sidecar only means full reads.
+
+    Returns:
+        True if the sidecar was written
+    """
+    try:
+        with open(chunk_file, "rb") as f:
+            data = f.read()
+            st = os.fstat(f.fileno())
+        if b"\r" in data:
+            return False  # Line ends are translated on read, offsets would drift
+        start = body_offset(data)
+        starts = [start]
+        pos = data.find(b"\n", start)
+        while pos >= 0 and pos + 1 < len(data):
+            starts.append(pos + 1)
+            pos = data.find(b"\n", pos + 1)
+        n_lines = len(starts) if start < len(data) else 0
+
+        offsets = array.array("I", starts[:n_lines:LINE_INDEX_STRIDE])
+        if sys.byteorder != "little":
+            offsets.byteswap()
+        header = _LINE_INDEX_HEADER.pack(
+            _LINE_INDEX_MAGIC,
+            LINE_INDEX_VERSION,
+            LINE_INDEX_STRIDE,
+            n_lines,
+            start,
+            st.st_size,
+            st.st_mtime_ns,
+        )
+        path = line_index_path(chunk_file)
+        tmp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+        try:
+            tmp_path.write_bytes(header + offsets.tobytes())
+            os.replace(tmp_path, path)
+        except Exception:
+            tmp_path.unlink(missing_ok=True)
+            raise
+        return True
+    except Exception:
+        return False
+
+
+def remove_line_index(chunk_file: Path) -> None:
+    """Delete the sidecar of an archived or deleted chunk."""
+    try:
+        line_index_path(chunk_file).unlink(missing_ok=True)
+    except OSError:
+        pass
+
+
+def read_line_range(chunk_file: Path, start: int, end: int | None) -> tuple[list[str], int] | None:
+    """
+    Body lines [start:end] of a chunk through its sidecar.
+
+    Args:
+        chunk_file: Chunk .md file
+        start: First line (list slice semantics, negative counts from the end)
+        end: End line, exclusive (None: to the end)
+
+    Returns:
+        (selected lines, total body lines), or None if the sidecar is
+        missing or stale (caller reads the whole file)
+    """
+    try:
+        sidecar = line_index_path(chunk_file).read_bytes()
+        magic, version, stride, n_lines, _, size, mtime_ns = _LINE_INDEX_HEADER.unpack_from(sidecar)
+        offsets = array.array("I")
+        offsets.frombytes(sidecar[_LINE_INDEX_HEADER.size :])
+    except (OSError, ValueError, struct.error):
+        return None
+    if magic != _LINE_INDEX_MAGIC or version != LINE_INDEX_VERSION or stride == 0:
+        return None
+    if sys.byteorder != "little":
+        offsets.byteswap()
+    if len(offsets) != -(-n_lines // stride):
+        return None
+
+    first, last, _ = slice(start, end).indices(n_lines)
+    try:
+        with open(chunk_file, "rb") as f:
+            st = os.fstat(f.fileno())
+            if (st.st_size, st.st_mtime_ns) != (size, mtime_ns):
+                return None
+            if last <= first:
+                return [], n_lines
+            block = first // stride
+            after = -(-last // stride)
+            read_from = offsets[block]
+            read_to = offsets[after] if after < len(offsets) else size
+            f.seek(read_from)
+            raw = f.read(read_to - read_from)
+    except OSError:
+        return None
+
+    skip = first - block * stride
+    lines = _split_lines(raw.decode("utf-8"))
+    return lines[skip : skip + last - first], n_lines
@@ -10,10 +10,12 @@ import hashlib
 import json
 from datetime import datetime
 
-from .fileutil import CONTEXT_DIR, atomic_write_json
+from .bm25store import index_insight, unindex_insight
+from .fileutil import CONTEXT_DIR, atomic_write_json, bump_generation
 from .tokenizer_fr import tokenize_fr
 
 MEMORY_FILE = CONTEXT_DIR / "session_memory.json"
+CHUNKS_DIR = CONTEXT_DIR / "chunks"
 
 
 def _load_memory() -> dict:
@@ -38,6 +40,7 @@ def _save_memory(memory: dict) -> None:
     memory["metadata"]["last_updated"] = datetime.now().isoformat()
     memory["metadata"]["total_insights"] = len(memory["insights"])
     atomic_write_json(MEMORY_FILE, memory)
+    bump_generation(MEMORY_FILE.parent, "memory")
 
 
 def _generate_id(content: str) -> str:
@@ -84,6 +87,9 @@ def remember(
     memory["insights"].append(insight)
     _save_memory(memory)
 
+    # Phase 11: Add to the BM25 delta segment
+    index_insight(CHUNKS_DIR, MEMORY_FILE, insight)
+
     return {
         "status": "saved",
         "id": insight["id"],
@@ -189,6 +195,9 @@ def forget(insight_id: str) -> dict:
 
     _save_memory(memory)
 
+    # Phase 11: Tombstone in the BM25 index
+    unindex_insight(CHUNKS_DIR, MEMORY_FILE, insight_id)
+
     return {
         "status": "deleted",
         "message": f"Insight {insight_id} removed from memory",
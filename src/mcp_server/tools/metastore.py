@@ -0,0 +1,199 @@
+"""
+RLM Metadata Store - Columnar view of index.json with bitmap indexes.
+
+Phase 11 implementation.
+
+grep, grep_fuzzy, search and list_chunks filter chunks by project, domain,
+date and entity. Instead of walking index["chunks"] and re-parsing dates /
+scanning entities for every chunk, MetaStore keeps:
+- one column per field, in index.json order (row i = chunk i)
+- one bitmap per distinct project / domain / chunk_type value
+- dates sorted once, so a date range is two bisects
+- an inverted map entity -> rows, so the substring filter scans
+  distinct entities only
+
+Bitmaps are Python ints (bit i = row i): a filtered query is a few
+bitwise ops, with no optional dependency.
+"""
+
+from array import array
+from bisect import bisect_left, bisect_right
+
+from .navigation import _parse_date_from_chunk
+
+CATEGORICAL_FIELDS = ("project", "domain", "chunk_type")
+
+
+def to_bitmap(rows, size: int) -> int:
+    """Build a bitmap from row numbers."""
+    buf = bytearray((size + 7) // 8)
+    for i in rows:
+        buf[i >> 3] |= 1 << (i & 7)
+    return int.from_bytes(buf, "little")
+
+
+def bitmap_rows(bitmap: int) -> list[int]:
+    """Row numbers set in a bitmap, ascending."""
+    bits = bin(bitmap)[:1:-1]  # LSB first, "0b" prefix dropped
+    rows = []
+    i = bits.find("1")
+    while i != -1:
+        rows.append(i)
+        i = bits.find("1", i + 1)
+    return rows
+
+
+class MetaStore:
+    """
+    Columnar, read-only view of index.json chunks.
+
+    Build one per index generation (see engine.SearchEngine.metastore).
+    """
+
+    def __init__(self, index: dict):
+        """
+        Build columns and bitmaps.
+
+        Args:
+            index: Parsed index.json
+        """
+        self.chunks: list[dict] = index.get("chunks", [])
+        self.info = {k: v for k, v in index.items() if k != "chunks"}
+        if self.info.get("version", "1.0.0") == "1.0.0":
+            self.info["total_chunks"] = len(self.chunks)  # Same as _load_index migration
+
+        n = self.size = len(self.chunks)
+        self.all = (1 << n) - 1
+        self.ids = [c["id"] for c in self.chunks]
+        self.row_of = {cid: i for i, cid in enumerate(self.ids)}
+
+        # Categorical columns: codes + one bitmap per value
+        self.columns: dict[str, array] = {}
+        self.categories: dict[str, list] = {}
+        self._bitmaps: dict[str, dict] = {}
+        for field in CATEGORICAL_FIELDS:
+            codes_of: dict = {}
+            rows_of: dict = {}
+            codes = array("i")
+            for i, c in enumerate(self.chunks):
+                value = c.get(field)
+                codes.append(codes_of.setdefault(value, len(codes_of)))
+                rows_of.setdefault(value, []).append(i)
+            self.columns[field] = codes
+            self.categories[field] = list(codes_of)
+            self._bitmaps[field] = {v: to_bitmap(r, n) for v, r in rows_of.items()}
+
+        # Dates (YYYY-MM-DD, lexicographic = chronologic)
+        self.dates = [_parse_date_from_chunk(c) for c in self.chunks]
+        dated = sorted((d, i) for i, d in enumerate(self.dates) if d is not None)
+        self._sorted_dates = [d for d, _ in dated]
+        self._date_rows = [i for _, i in dated]
+
+        self.created_at = [c.get("created_at", "") for c in self.chunks]
+        self.access_count = array("q", (c.get("access_count", 0) for c in self.chunks))
+
+        # Entities: lowercased value -> rows
+        self._entities: dict[str, list[int]] = {}
+        for i, c in enumerate(self.chunks):
+            entities = c.get("entities", {})
+            if not entities or not isinstance(entities, dict):
+                continue
+            for vals in entities.values():
+                if isinstance(vals, list):
+                    for e in vals:
+                        rows = self._entities.setdefault(str(e).lower(), [])
+                        if not rows or rows[-1] != i:
+                            rows.append(i)
+
+        self._positions: dict[int, tuple[list, array]] = {}
+
+    # -------------------------------------------------------------------------
+    # Bitmaps
+    # -------------------------------------------------------------------------
+
+    def value_bitmap(self, field: str, value) -> int:
+        """Rows whose field equals value (0 if none)."""
+        return self._bitmaps[field].get(value, 0)
+
+    def date_bitmap(self, date_from: str | None, date_to: str | None) -> int:
+        """Rows dated within [date_from, date_to] (same rules as _chunk_in_date_range)."""
+        if date_from is None and date_to is None:
+            return self.all
+        lo = bisect_left(self._sorted_dates, date_from) if date_from else 0
+        hi = bisect_right(self._sorted_dates, date_to) if date_to else len(self._sorted_dates)
+        return to_bitmap(self._date_rows[lo:hi], self.size)
+
+    def entity_bitmap(self, entity: str) -> int:
+        """Rows with an entity containing `entity` (case-insensitive)."""
+        needle = entity.lower()
+        rows = set()
+        for value, value_rows in self._entities.items():
+            if needle in value:
+                rows.update(value_rows)
+        return to_bitmap(rows, self.size)
+
+    def mask(
+        self,
+        project: str = None,
+        domain: str = None,
+        date_from: str = None,
+        date_to: str = None,
+        entity: str = None,
+        chunk_type: str = None,
+    ) -> int:
+        """
+        Combine filters into one bitmap of eligible rows.
+
+        Args:
+            project: Exact project name
+            domain: Exact domain
+            date_from: Start date inclusive, YYYY-MM-DD
+            date_to: End date inclusive, YYYY-MM-DD
+            entity: Case-insensitive entity substring
+            chunk_type: Exact chunk type
+
+        Returns:
+            Bitmap (bit i set = chunk i passes every filter)
+        """
+        bitmap = self.date_bitmap(date_from, date_to)
+        if project:
+            bitmap &= self.value_bitmap("project", project)
+        if domain:
+            bitmap &= self.value_bitmap("domain", domain)
+        if chunk_type:
+            bitmap &= self.value_bitmap("chunk_type", chunk_type)
+        if entity and bitmap:
+            bitmap &= self.entity_bitmap(entity)
+        return bitmap
+
+    def select(self, bitmap: int) -> list[dict]:
+        """Chunk entries of a bitmap, in index.json order."""
+        if bitmap == self.all:
+            return self.chunks
+        return [self.chunks[i] for i in bitmap_rows(bitmap)]
+
+    # -------------------------------------------------------------------------
+    # Orderings / lookups
+    # -------------------------------------------------------------------------
+
+    def newest_first(self, limit: int | None = None) -> list[dict]:
+        """Chunks sorted by created_at descending (stable, like sorted(reverse=True))."""
+        n = self.size
+        order = sorted(range(n), key=lambda i: self.created_at[n - 1 - i])
+        return [self.chunks[n - 1 - i] for i in reversed(order)][:limit]
+
+    def positions(self, doc_ids: list[str]) -> array:
+        """
+        Row of each document id (-1 if not in index.json, e.g. insights).
+
+        Cached per doc_ids list object, so a retriever's id list is mapped
+        once per metadata generation.
+        """
+        cached = self._positions.get(id(doc_ids))
+        if cached is not None and cached[0] is doc_ids and len(cached[1]) == len(doc_ids):
+            return cached[1]
+        rows = array("l", (self.row_of.get(d, -1) for d in doc_ids))
+        if len(self._positions) > 8:
+            self._positions.clear()
+        self._positions[id(doc_ids)] = (doc_ids, rows)
+        return rows
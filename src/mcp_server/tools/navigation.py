@@ -24,15 +24,22 @@ import subprocess
 from datetime import datetime
 from pathlib import Path
 
+from .bm25store import index_chunk
 from .fileutil import (
     CONTEXT_DIR,
     MAX_CHUNK_CONTENT_SIZE,
     atomic_write_json,
     atomic_write_text,
+    bump_generation,
     locked_json_update,
     safe_path,
 )
+from .fuzzyindex import FuzzyMatcher, line_corpus
+from .grepscan import LineMatcher, grep_files
+from .hashindex import get_hash_index, record_chunk_hash
+from .lineindex import body_offset, read_body_lines, read_line_range, write_line_index
 from .sessions import add_chunk_to_session, register_session
+from .trigram import get_trigram_index, index_chunk_trigrams
 
 # Phase 5.2: Fuzzy matching (optional dependency)
 try:
@@ -161,11 +168,23 @@ def _load_index() -> dict:
     return data
 
 
+def _metastore():
+    """
+    Columnar view of index.json, cached by the long-lived engine (Phase 11).
+
+    Rebuilt only when index.json changed (see engine.SearchEngine).
+    """
+    from .engine import get_engine
+
+    return get_engine(CONTEXT_DIR, CHUNKS_DIR).metastore()
+
+
 def _save_index(index: dict) -> None:
     """Save chunks index atomically."""
     index["last_chunking"] = datetime.now().isoformat()
     index["total_chunks"] = len(index.get("chunks", []))
     atomic_write_json(INDEX_FILE, index)
+    bump_generation(INDEX_FILE.parent, "index")
 
 
 def _estimate_tokens(text: str) -> int:
@@ -433,6 +452,12 @@ def _check_duplicate(content_hash: str) -> dict | None:
     Returns:
         Existing chunk info if duplicate found, None otherwise
     """
+    # Phase 11: Persistent hash map (hashindex.py), also covers archived chunks
+    try:
+        return get_hash_index(CHUNKS_DIR.parent).lookup(content_hash)
+    except Exception:
+        pass  # Unreadable map: fall back to scanning the index
+
     index = _load_index()
 
     for chunk_info in index.get("chunks", []):
@@ -469,8 +494,13 @@ def _increment_access(chunk_id: str) -> None:
         index["last_chunking"] = datetime.now().isoformat()
         index["total_chunks"] = len(index.get("chunks", []))
 
+    # Phase 11: Access counts change often, keep them out of the "index" slot
+    bump_generation(INDEX_FILE.parent, "access")
+
 
-def _generate_chunk_id(project: str = None, ticket: str = None, domain: str = None) -> str:
+def _generate_chunk_id(
+    project: str = None, ticket: str = None, domain: str = None, index: dict | None = None
+) -> str:
     """
     Generate a unique chunk ID (Phase 5.5 enhanced).
 
@@ -480,12 +510,14 @@ def _generate_chunk_id(project: str = None, ticket: str = None, domain: str = No
         project: Project name (auto-detected if None)
         ticket: Optional ticket reference (e.g., "JJ-123")
         domain: Optional domain (e.g., "bp", "seo")
+        index: Already loaded index (loaded from disk if None)
 
     Returns:
         Unique chunk ID string
     """
     today = datetime.now().strftime("%Y-%m-%d")
-    index = _load_index()
+    if index is None:
+        index = _load_index()
 
     # Auto-detect project if not provided
     if project is None:
@@ -588,12 +620,19 @@ def chunk(
     existing = _check_duplicate(content_hash)
 
     if existing:
-        return {
+        duplicate = {
             "status": "duplicate",
             "existing_chunk_id": existing["id"],
             "existing_summary": existing.get("summary", ""),
             "message": f"Content already exists in chunk {existing['id']}",
         }
+        # Phase 11: Archived content is detected too (hashindex.py)
+        if existing.get("archived"):
+            duplicate["archived"] = True
+            duplicate["message"] = (
+                f"Content already exists in archived chunk {existing['id']} (rlm_peek restores it)"
+            )
+        return duplicate
 
     # Phase 4.1: Auto-generate summary if not provided
     if not summary:
@@ -603,7 +642,9 @@ def chunk(
     entities = _extract_entities(content)
 
     # Phase 5.5: Generate ID with project/ticket/domain
-    chunk_id = _generate_chunk_id(project=project, ticket=ticket, domain=domain)
+    # Phase 11: index.json loaded once, for the ID sequence and the append
+    index = _load_index()
+    chunk_id = _generate_chunk_id(project=project, ticket=ticket, domain=domain, index=index)
     chunk_file = CHUNKS_DIR / f"{chunk_id}.md"
     tokens = _estimate_tokens(content)
 
@@ -637,9 +678,10 @@ format_version: "2.0"
 """
 
     atomic_write_text(chunk_file, header + content)
+    # Phase 11: Line-offset sidecar for ranged peeks (lineindex.py)
+    write_line_index(chunk_file)
 
     # Update index
-    index = _load_index()
     index["chunks"].append(
         {
             "id": chunk_id,
@@ -660,29 +702,29 @@ format_version: "2.0"
             "format_version": "2.0",
             # Phase 7.2 fields
             "entities": entities,
+            # Phase 11 fields
+            "body_offset": body_offset(header.encode("utf-8")),
         }
     )
     index["total_tokens_estimate"] = sum(c["tokens_estimate"] for c in index["chunks"])
     _save_index(index)
 
+    # Phase 11: Add to the BM25 delta segment (no full rebuild on next search)
+    index_chunk(CHUNKS_DIR, chunk_id, content_hash)
+    index_chunk_trigrams(CHUNKS_DIR.parent, chunk_id, chunk_file)
+    record_chunk_hash(CHUNKS_DIR.parent, content_hash, chunk_id, summary)
+
     # Phase 8: Generate embedding if semantic search available
     # Phase 8.1: Enrich text with metadata for better semantic matching
+    # Phase 11: Write-behind — queued for the background embed worker
+    # (embedqueue.py), which embeds through the cache into the vector log
     try:
-        from .embeddings import _get_cached_provider
-        from .vecstore import VectorStore
-
-        provider = _get_cached_provider()
-        if provider is not None:
-            embed_text = content
-            if summary:
-                embed_text = f"{summary}\n{embed_text}"
-            if tags:
-                embed_text = f"{', '.join(tags)}\n{embed_text}"
-            vec = provider.embed([embed_text])[0]
-            store = VectorStore()
-            store.load()
-            store.add(chunk_id, vec)
-            store.save()
+        from .embedqueue import chunk_embed_text, get_embed_queue
+        from .vecstore import NUMPY_AVAILABLE
+
+        if NUMPY_AVAILABLE:
+            embed_text = chunk_embed_text(content, summary, tags)
+            get_embed_queue(CONTEXT_DIR).enqueue(chunk_id, embed_text)
     except Exception:
         pass  # Semantic is optional, never block chunk creation
 
@@ -759,27 +801,19 @@ def peek(chunk_id: str, start: int = 0, end: int | None = None) -> dict:
         else:
             return {"status": "not_found", "message": f"Chunk {chunk_id} not found"}
 
-    with open(chunk_file, encoding="utf-8") as f:
-        lines = f.readlines()
-
-    # Skip YAML header (find end of ---)
-    content_start = 0
-    in_header = False
-    for i, line in enumerate(lines):
-        if line.strip() == "---":
-            if not in_header:
-                in_header = True
-            else:
-                content_start = i + 1
-                break
-
-    content_lines = lines[content_start:]
+    # Phase 11: One seek + one bounded read through the line-offset sidecar
+    ranged = read_line_range(chunk_file, start, end)
+    if ranged is not None:
+        selected_lines, total_lines = ranged
+    else:
+        content_lines = read_body_lines(chunk_file)
+        selected_lines = content_lines[start:end]
+        total_lines = len(content_lines)
+        write_line_index(chunk_file)  # Missing or stale: next peek is ranged
 
     # Apply start/end
     if end is None:
-        end = len(content_lines)
-
-    selected_lines = content_lines[start:end]
+        end = total_lines
 
     # Phase 4.3: Track access
     _increment_access(chunk_id)
@@ -787,12 +821,44 @@ def peek(chunk_id: str, start: int = 0, end: int | None = None) -> dict:
     return {
         "status": "success",
         "chunk_id": chunk_id,
-        "total_lines": len(content_lines),
-        "showing_lines": f"{start}-{min(end, len(content_lines))}",
+        "total_lines": total_lines,
+        "showing_lines": f"{start}-{min(end, total_lines)}",
         "content": "".join(selected_lines),
     }
 
 
+# Phase 11: (context dir, "index" generation) -> (chunk id, file) of every chunk
+_trigram_chunks: dict[tuple, list[tuple[str, Path]]] = {}
+
+
+def _trigram_candidates(pattern: str) -> set[str] | None:
+    """
+    Phase 11: Ids of the chunks that may match pattern.
+
+    The index is synced against the chunk files only when the "index"
+    generation changed; the (id, file) list is built once per generation.
+
+    Returns:
+        Set of chunk ids, or None to scan every eligible chunk (the regex
+        has no usable trigram, or the index is unavailable)
+    """
+    from .engine import get_engine
+
+    try:
+        engine = get_engine(CONTEXT_DIR, CHUNKS_DIR)
+        generation = engine.stamp("index")
+        key = (str(CONTEXT_DIR), generation)
+        chunks = _trigram_chunks.get(key)
+        if chunks is None:
+            chunks = [(c["id"], CONTEXT_DIR / c["file"]) for c in engine.metastore().chunks]
+            _trigram_chunks.clear()
+            if generation is not None:
+                _trigram_chunks[key] = chunks
+        return get_trigram_index(CONTEXT_DIR).candidates(pattern, chunks, generation)
+    except Exception:
+        return None
+
+
 def grep(
     pattern: str,
     limit: int = 10,
@@ -837,7 +903,6 @@ def grep(
             pattern, fuzzy_threshold, limit, project, domain, date_from, date_to, entity
         )
 
-    index = _load_index()
     matches = []
 
     try:
@@ -846,60 +911,29 @@ def grep(
         # If invalid regex, treat as literal string
         regex = re.compile(re.escape(pattern), re.IGNORECASE)
 
-    for chunk_info in index.get("chunks", []):
-        # Phase 7.1: Apply temporal filter
-        if not _chunk_in_date_range(chunk_info, date_from, date_to):
-            continue
-        # Phase 5.5c: Apply project/domain filters
-        if project and chunk_info.get("project") != project:
-            continue
-        if domain and chunk_info.get("domain") != domain:
-            continue
-        # Phase 7.2: Apply entity filter
-        if entity and not _entity_matches(chunk_info, entity):
-            continue
-        chunk_file = CONTEXT_DIR / chunk_info["file"]
-
-        if not chunk_file.exists():
-            continue
+    # Phase 5.5c + 7.1 + 7.2: project/domain/date/entity filters
+    # Phase 11: Evaluated as bitmaps on the columnar metadata store
+    meta = _metastore()
+    eligible = meta.select(meta.mask(project, domain, date_from, date_to, entity))
 
-        with open(chunk_file, encoding="utf-8") as f:
-            lines = f.readlines()
-
-        # Skip YAML header
-        content_start = 0
-        in_header = False
-        for i, line in enumerate(lines):
-            if line.strip() == "---":
-                if not in_header:
-                    in_header = True
-                else:
-                    content_start = i + 1
-                    break
-
-        content_lines = lines[content_start:]
-
-        for i, line in enumerate(content_lines):
-            if regex.search(line):
-                # Get context
-                start_ctx = max(0, i - context_lines)
-                end_ctx = min(len(content_lines), i + context_lines + 1)
-                context = "".join(content_lines[start_ctx:end_ctx])
-
-                matches.append(
-                    {
-                        "chunk_id": chunk_info["id"],
-                        "chunk_summary": chunk_info.get("summary", ""),
-                        "line_number": i + 1,
-                        "context": context.strip(),
-                    }
-                )
+    # Phase 11: Only open chunks whose trigrams can match (trigram.py)
+    candidates = _trigram_candidates(regex.pattern)
 
-                if len(matches) >= limit:
-                    break
+    if candidates is not None:
+        eligible = (c for c in eligible if c["id"] in candidates)
 
-        if len(matches) >= limit:
-            break
+    # Phase 11: Parallel memory-mapped scan, stops at limit (grepscan.py);
+    # chunks are filtered and their paths resolved only as files are scheduled
+    hits = grep_files(eligible, CONTEXT_DIR, LineMatcher(regex.pattern), limit, context_lines)
+    for chunk_info, line_number, context in hits:
+        matches.append(
+            {
+                "chunk_id": chunk_info["id"],
+                "chunk_summary": chunk_info.get("summary", ""),
+                "line_number": line_number,
+                "context": context.strip(),
+            }
+        )
 
     return {
         "status": "success",
@@ -952,65 +986,32 @@ def grep_fuzzy(
             "message": "Fuzzy search requires thefuzz: pip install mcp-rlm-server[fuzzy]",
         }
 
-    index = _load_index()
     matches = []
 
-    for chunk_info in index.get("chunks", []):
-        # Phase 7.1: Apply temporal filter
-        if not _chunk_in_date_range(chunk_info, date_from, date_to):
-            continue
-        # Phase 5.5c: Apply project/domain filters
-        if project and chunk_info.get("project") != project:
-            continue
-        if domain and chunk_info.get("domain") != domain:
-            continue
-        # Phase 7.2: Apply entity filter
-        if entity and not _entity_matches(chunk_info, entity):
-            continue
-
-        chunk_file = CONTEXT_DIR / chunk_info["file"]
+    # Phase 5.5c + 7.1 + 7.2: project/domain/date/entity filters
+    # Phase 11: Evaluated as bitmaps on the columnar metadata store
+    meta = _metastore()
+    eligible = meta.select(meta.mask(project, domain, date_from, date_to, entity))
 
-        if not chunk_file.exists():
-            continue
-
-        with open(chunk_file, encoding="utf-8") as f:
-            lines = f.readlines()
-
-        # Skip YAML header
-        content_start = 0
-        in_header = False
-        for i, line in enumerate(lines):
-            if line.strip() == "---":
-                if not in_header:
-                    in_header = True
-                else:
-                    content_start = i + 1
-                    break
-
-        content_lines = lines[content_start:]
-
-        # Search line by line with fuzzy matching
-        for i, line in enumerate(content_lines):
-            line_text = line.strip()
-            if not line_text:
-                continue
-
-            # partial_ratio finds best partial match (handles substrings)
-            score = fuzz.partial_ratio(pattern.lower(), line_text.lower())
-
-            if score >= threshold:
-                matches.append(
-                    {
-                        "chunk_id": chunk_info["id"],
-                        "chunk_summary": chunk_info.get("summary", ""),
-                        "line_number": i + 1,
-                        "score": score,
-                        "context": line_text[:150],  # Truncate for readability
-                    }
-                )
+    # Phase 11: q-gram count filter, exact score on survivors only,
+    # bounded top-k heap (fuzzyindex.py)
+    present, corpus = line_corpus(
+        [(CONTEXT_DIR / c["file"], c.get("body_offset")) for c in eligible]
+    )
+    matcher = FuzzyMatcher(pattern, threshold, limit, fuzz.partial_ratio)
 
-    # Sort by score (highest first)
-    matches.sort(key=lambda x: x["score"], reverse=True)
+    for chunk_info, line_number, score, line_text in matcher.search_corpus(
+        [eligible[i] for i in present], corpus
+    ):
+        matches.append(
+            {
+                "chunk_id": chunk_info["id"],
+                "chunk_summary": chunk_info.get("summary", ""),
+                "line_number": line_number,
+                "score": score,
+                "context": line_text[:150],  # Truncate for readability
+            }
+        )
 
     return {
         "status": "success",
@@ -1035,16 +1036,15 @@ def list_chunks(limit: int = 20) -> dict:
     Returns:
         Dictionary with list of chunks and their summaries
     """
-    index = _load_index()
-    chunks = index.get("chunks", [])
+    meta = _metastore()
 
     # Sort by creation date (newest first)
-    chunks_sorted = sorted(chunks, key=lambda x: x.get("created_at", ""), reverse=True)[:limit]
+    chunks_sorted = meta.newest_first(limit)
 
     return {
         "status": "success",
-        "total_chunks": index.get("total_chunks", 0),
-        "total_tokens_estimate": index.get("total_tokens_estimate", 0),
+        "total_chunks": meta.info.get("total_chunks", 0),
+        "total_tokens_estimate": meta.info.get("total_tokens_estimate", 0),
         "chunks": [
             {
                 "id": c["id"],
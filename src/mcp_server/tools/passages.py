@@ -0,0 +1,222 @@
+"""
+RLM Passages - Line-window vectors for targeted peeks.
+
+Phase 11 implementation.
+
+A chunk can hold up to MAX_CHUNK_CONTENT_SIZE but has a single embedding,
+so a semantic hit still meant peeking the whole chunk. With
+RLM_PASSAGE_INDEX=1, the body of each chunk is also cut into windows of
+PASSAGE_LINES lines (consecutive windows overlap by PASSAGE_OVERLAP) and
+every window is embedded. Passage vectors live in their own VectorStore
+(passages.vec / passages.vlog), one row per window, with ids:
+
+    <chunk_id>#<start>-<end>
+
+start/end are body line numbers in rlm_peek's convention (0-indexed, end
+exclusive). The embed queue worker writes them next to the chunk vector;
+search() then tags each semantic result with its best window, so the agent
+can rlm_peek(chunk_id, start, end) instead of reading the whole chunk.
+Re-indexing a chunk drops its windows that no longer exist, and archive
+and purge drop all of them (writer hook at the bottom).
+"""
+
+import os
+from pathlib import Path
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from .fileutil import CONTEXT_DIR
+from .lineindex import read_body_lines
+
+PASSAGES_FILE = "passages.npz"  # VectorStore path: data in passages.vec/.vlog
+PASSAGE_LINES = 40
+PASSAGE_OVERLAP = 10
+PASSAGE_BATCH_SIZE = 64
+
+
+def passages_enabled() -> bool:
+    """Passage index switch (RLM_PASSAGE_INDEX=1, off by default)."""
+    return os.environ.get("RLM_PASSAGE_INDEX", "0").lower() in ("1", "true", "yes")
+
+
+def passage_id(chunk_id: str, start: int, end: int) -> str:
+    """Vector store id of a window."""
+    return f"{chunk_id}#{start}-{end}"
+
+
+def parse_passage_id(pid: str) -> tuple[str, int, int]:
+    """(chunk_id, start, end) from a passage id."""
+    chunk_id, _, span = pid.rpartition("#")
+    start, _, end = span.partition("-")
+    return chunk_id, int(start), int(end)
+
+
+def passage_windows(
+    n_lines: int, size: int = PASSAGE_LINES, overlap: int = PASSAGE_OVERLAP
+) -> list[tuple[int, int]]:
+    """
+    Line windows covering a body.
+
+    Args:
+        n_lines: Number of body lines
+        size: Lines per window
+        overlap: Lines shared by consecutive windows
+
+    Returns:
+        (start, end) pairs, end exclusive; the last window ends at n_lines
+    """
+    stride = max(1, size - overlap)
+    windows = []
+    start = 0
+    while start < n_lines:
+        end = min(start + size, n_lines)
+        windows.append((start, end))
+        if end == n_lines:
+            break
+        start += stride
+    return windows
+
+
+def chunk_passages(chunk_id: str, lines: list[str]) -> list[tuple[str, str]]:
+    """(passage id, text) of every non-blank window of a chunk body."""
+    passages = []
+    for start, end in passage_windows(len(lines)):
+        text = "".join(lines[start:end])
+        if text.strip():
+            passages.append((passage_id(chunk_id, start, end), text))
+    return passages
+
+
+def index_passages(
+    chunk_ids: list[str],
+    provider,
+    context_dir: Path | None = None,
+    batch_size: int = PASSAGE_BATCH_SIZE,
+) -> int:
+    """
+    Embed the windows of chunks into the passage store.
+
+    Windows are embedded batch_size at a time through the embedding cache
+    and appended to the passage log in one write per batch. Re-indexing a
+    chunk replaces its passages: same ids are overwritten, windows of the
+    previous version (or of a deleted chunk file) are removed.
+
+    Args:
+        chunk_ids: Chunks to index (missing chunk files are skipped)
+        provider: EmbeddingProvider
+        context_dir: Context directory (default: CONTEXT_DIR)
+        batch_size: Windows per provider.embed() call
+
+    Returns:
+        Number of passage vectors written
+    """
+    from .embedcache import cached_embed
+    from .vecstore import VectorStore
+
+    context_dir = context_dir or CONTEXT_DIR
+    passages = []
+    for chunk_id in chunk_ids:
+        chunk_file = context_dir / "chunks" / f"{chunk_id}.md"
+        if chunk_file.exists():
+            passages.extend(chunk_passages(chunk_id, read_body_lines(chunk_file)))
+    remove_passages(chunk_ids, context_dir, keep={pid for pid, _ in passages})
+
+    store = VectorStore(context_dir / PASSAGES_FILE)
+    for start in range(0, len(passages), batch_size):
+        batch = passages[start : start + batch_size]
+        vectors = cached_embed(provider, [text for _, text in batch], context_dir / "embed_cache")
+        store.append_many((pid, vec) for (pid, _), vec in zip(batch, vectors, strict=True))
+    return len(passages)
+
+
+def remove_passages(
+    chunk_ids: list[str], context_dir: Path | None = None, keep: set[str] | None = None
+) -> int:
+    """
+    Remove the passages of chunks from the passage store.
+
+    Args:
+        chunk_ids: Chunks whose passages to remove
+        context_dir: Context directory (default: CONTEXT_DIR)
+        keep: Passage ids to leave in place
+
+    Returns:
+        Number of passages removed
+    """
+    from .vecstore import VectorStore
+
+    store = VectorStore((context_dir or CONTEXT_DIR) / PASSAGES_FILE)
+    if not store.load():
+        return 0
+    wanted, keep = set(chunk_ids), keep or set()
+    stale = [pid for pid in store.chunk_ids if pid.rpartition("#")[0] in wanted and pid not in keep]
+    store.append_remove_many(stale)
+    return len(stale)
+
+
+class PassageIndex:
+    """Loaded passage store with a chunk id -> rows lookup."""
+
+    def __init__(self, store):
+        """
+        Args:
+            store: Loaded VectorStore of passage vectors
+        """
+        self.store = store
+        self._rows: dict[str, list[int]] | None = None
+
+    def rows_of(self, chunk_id: str) -> list[int]:
+        """Store rows holding the passages of a chunk."""
+        if self._rows is None:
+            rows: dict[str, list[int]] = {}
+            for row, pid in enumerate(self.store.row_ids):
+                if pid is not None:
+                    rows.setdefault(pid.rpartition("#")[0], []).append(row)
+            self._rows = rows
+        return self._rows.get(chunk_id, [])
+
+    def best(self, query_vec, chunk_ids: list[str]) -> dict[str, dict]:
+        """
+        Best-matching window of each chunk for one query.
+
+        Args:
+            query_vec: Query embedding
+            chunk_ids: Chunks to look into (typically the search results)
+
+        Returns:
+            Dict of chunk_id -> {"start", "end", "score"} (chunks without
+            passages are absent)
+        """
+        rows = [row for cid in chunk_ids for row in self.rows_of(cid)]
+        if not rows:
+            return {}
+        mask = np.zeros(len(self.store.row_ids), dtype=bool)
+        mask[rows] = True
+
+        best: dict[str, dict] = {}
+        for pid, score in self.store.search(query_vec, top_k=len(rows), mask=mask):
+            chunk_id, start, end = parse_passage_id(pid)
+            if chunk_id not in best:  # Hits are sorted, first one wins
+                best[chunk_id] = {"start": start, "end": end, "score": score}
+        return best
+
+
+# =============================================================================
+# Writer hooks
+# =============================================================================
+
+
+def unindex_chunk_passages(context_dir: Path, chunk_id: str) -> None:
+    """
+    Remove the passages of an archived or purged chunk.
+
+    Never raises: a leftover passage is only dead weight in the store
+    (search looks up passages of result chunks only).
+    """
+    try:
+        remove_passages([chunk_id], context_dir)
+    except Exception:
+        pass
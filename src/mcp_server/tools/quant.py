@@ -0,0 +1,229 @@
+"""
+RLM Vector Quantization - int8 / binary codes for VectorStore scans.
+
+Phase 11 implementation.
+
+A full scan reads every float32 vector (1.5 KB per 384-dim chunk). With
+RLM_VECTOR_QUANT=int8 (4x smaller) or binary (32x smaller), the scan runs
+over compact codes of the unit-normalized base vectors to shortlist
+candidates, which are then rescored exactly against the full-precision
+memmap — only their pages are read.
+
+- int8: per-dimension scale, code = round(127 * u / scale); approximate
+  dot products in float32 blocks
+- binary: sign bits packed 8 per byte; Hamming distance via popcount
+
+Codes are stored next to the vectors (embeddings.vq, memory-mapped) and
+rebuilt when the base file changes, like the IVF index (ann.py).
+"""
+
+import os
+import struct
+from pathlib import Path
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+VQ_SUFFIX = ".vq"
+VQ_FORMAT_VERSION = 1
+_VQ_MAGIC = b"RLMQ"
+# magic, version, kind, dim, then the base file fingerprint (count, size, mtime_ns)
+_VQ_HEADER = struct.Struct("<4sIII3q")
+_VQ_ALIGN = 64
+_VQ_KINDS = ("none", "int8", "binary")  # index = kind code
+# Candidates rescored exactly per result (binary codes are coarser)
+RESCORE_FACTOR = {"int8": 4, "binary": 32}
+RESCORE_MIN = 64
+_SCAN_BATCH = 1024  # Rows per block: the float32 copy of an int8 block stays in cache
+
+
+def quant_mode() -> str:
+    """Code type from RLM_VECTOR_QUANT ("none", "int8" or "binary")."""
+    mode = os.environ.get("RLM_VECTOR_QUANT", "none").lower()
+    return mode if mode in _VQ_KINDS else "none"
+
+
+def _popcount(x):
+    """Set bits per byte (np.bitwise_count on NumPy >= 2, else a lookup table)."""
+    if hasattr(np, "bitwise_count"):
+        return np.bitwise_count(x)
+    return _POPCOUNT_TABLE[x]
+
+
+_POPCOUNT_TABLE = (
+    np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8) if np is not None else None
+)
+
+
+class QuantizedCodes:
+    """
+    Compact codes of the base rows, used to shortlist scan candidates.
+
+    Build with QuantizedCodes.build(); rows are VectorStore base row numbers.
+    """
+
+    def __init__(self, kind: str, codes, scales, fingerprint: tuple):
+        """
+        Args:
+            kind: "int8" or "binary"
+            codes: (N, dim) int8 or (N, ceil(dim / 8)) uint8 packed bits
+            scales: (dim,) float32 per-dimension scales (int8 only, else None)
+            fingerprint: (row count, size, mtime_ns) of the base file encoded
+        """
+        self.kind = kind
+        self.codes = codes
+        self.scales = scales
+        self.fingerprint = tuple(int(x) for x in fingerprint)
+
+    @property
+    def nbytes(self) -> int:
+        return int(self.codes.nbytes)
+
+    @classmethod
+    def build(cls, kind: str, vectors, inv_norms, fingerprint: tuple) -> "QuantizedCodes":
+        """
+        Encode the unit-normalized vectors.
+
+        Args:
+            kind: "int8" or "binary"
+            vectors: (N, dim) base vectors (memmap is fine, read in batches)
+            inv_norms: (N,) cached inverse norms of vectors
+            fingerprint: Identifies the base file the codes belong to
+
+        Returns:
+            The codes
+        """
+        n, dim = vectors.shape
+
+        def unit_blocks():
+            for start in range(0, n, _SCAN_BATCH):
+                block = np.asarray(vectors[start : start + _SCAN_BATCH], dtype=np.float32)
+                yield start, block * inv_norms[start : start + len(block), None]
+
+        if kind == "binary":
+            codes = np.empty((n, (dim + 7) // 8), dtype=np.uint8)
+            for start, units in unit_blocks():
+                codes[start : start + len(units)] = np.packbits(units > 0, axis=1)
+            return cls(kind, codes, None, fingerprint)
+
+        scales = np.zeros(dim, dtype=np.float32)
+        for _, units in unit_blocks():
+            np.maximum(scales, np.abs(units).max(axis=0), out=scales)
+        scales[scales == 0] = 1.0
+        codes = np.empty((n, dim), dtype=np.int8)
+        for start, units in unit_blocks():
+            codes[start : start + len(units)] = np.rint(units / scales * 127)
+        return cls(kind, codes, scales, fingerprint)
+
+    def shortlist(self, query_units, rows, size: int) -> list:
+        """
+        Best `size` rows per query by approximate score.
+
+        Args:
+            query_units: (Q, dim) unit query vectors
+            rows: Sorted base rows to scan, or None for all
+            size: Candidates to keep per query
+
+        Returns:
+            One sorted row array per query
+        """
+        n = len(self.codes) if rows is None else len(rows)
+        size = min(size, n)
+        if size == 0:
+            return [np.empty(0, dtype=np.int64) for _ in range(len(query_units))]
+        if self.kind == "binary":
+            # Higher is better: number of agreeing sign bits
+            q_bits = np.packbits(query_units > 0, axis=1)
+            words = _as_words(q_bits)
+            scores = np.empty((len(query_units), n), dtype=np.int32)
+            for start in range(0, n, _SCAN_BATCH * 16):
+                block = _as_words(self._block(rows, start, _SCAN_BATCH * 16))
+                for q, bits in enumerate(words):
+                    scores[q, start : start + len(block)] = -_popcount(block ^ bits).sum(
+                        axis=1, dtype=np.int32
+                    )
+        else:
+            q_scaled = (query_units * (self.scales / 127)).astype(np.float32)
+            scores = np.empty((len(query_units), n), dtype=np.float32)
+            for start in range(0, n, _SCAN_BATCH):
+                block = self._block(rows, start).astype(np.float32)
+                scores[:, start : start + len(block)] = q_scaled @ block.T
+
+        shortlists = []
+        for row in scores:
+            top = np.sort(np.argpartition(row, n - size)[n - size :])
+            shortlists.append(top if rows is None else rows[top])
+        return shortlists
+
+    def _block(self, rows, start: int, size: int = _SCAN_BATCH):
+        if rows is None:
+            return self.codes[start : start + size]
+        return self.codes[rows[start : start + size]]
+
+    # -------------------------------------------------------------------------
+    # Persistence
+    # -------------------------------------------------------------------------
+
+    def save(self, path: Path) -> None:
+        """Write the codes atomically (temp file + rename)."""
+        dim = len(self.scales) if self.scales is not None else self.codes.shape[1] * 8
+        tmp_path = path.parent / (path.stem + "_tmp" + path.suffix)
+        try:
+            with open(tmp_path, "wb") as f:
+                f.write(
+                    _VQ_HEADER.pack(
+                        _VQ_MAGIC,
+                        VQ_FORMAT_VERSION,
+                        _VQ_KINDS.index(self.kind),
+                        dim,
+                        *self.fingerprint,
+                    )
+                )
+                if self.scales is not None:
+                    self.scales.astype(np.float32).tofile(f)
+                f.seek(_aligned(f.tell()))
+                np.ascontiguousarray(self.codes).tofile(f)
+            os.replace(tmp_path, path)
+        except Exception:
+            if tmp_path.exists():
+                tmp_path.unlink()
+            raise
+
+    @classmethod
+    def load(cls, path: Path) -> "QuantizedCodes | None":
+        """Memory-map codes from disk, or None if missing/unreadable."""
+        try:
+            with open(path, "rb") as f:
+                magic, version, kind_code, dim, *fingerprint = _VQ_HEADER.unpack(
+                    f.read(_VQ_HEADER.size)
+                )
+            if magic != _VQ_MAGIC or version != VQ_FORMAT_VERSION or kind_code == 0:
+                return None
+            kind, count = _VQ_KINDS[kind_code], fingerprint[0]
+            offset, scales = _VQ_HEADER.size, None
+            if kind == "int8":
+                scales = np.fromfile(path, dtype=np.float32, count=dim, offset=offset)
+                offset += dim * 4
+                shape, dtype = (count, dim), np.int8
+            else:
+                shape, dtype = (count, (dim + 7) // 8), np.uint8
+            codes = np.memmap(path, dtype=dtype, mode="r", offset=_aligned(offset), shape=shape)
+            return cls(kind, codes, scales, tuple(fingerprint))
+        except Exception:
+            return None
+
+
+def _as_words(bits):
+    """Packed bits viewed as uint64 words when the width allows (8x fewer popcounts).
+
+    Bytes are kept for the lookup-table fallback, which indexes by byte value.
+    """
+    if bits.shape[1] % 8 or not hasattr(np, "bitwise_count"):
+        return bits
+    return np.ascontiguousarray(bits).view(np.uint64)
+
+
+def _aligned(offset: int) -> int:
+    return -(-offset // _VQ_ALIGN) * _VQ_ALIGN
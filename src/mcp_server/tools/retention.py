@@ -17,14 +17,22 @@ Retention Rules:
 import gzip
 import json
 from datetime import datetime, timedelta
+from pathlib import Path
 
+from .bm25store import index_chunk, unindex_chunk
 from .fileutil import (
     CONTEXT_DIR,
     MAX_DECOMPRESSED_SIZE,
     atomic_write_json,
+    bump_generation,
     safe_path,
     validate_chunk_id,
 )
+from .hashindex import forget_chunk_hash
+from .lineindex import read_body_lines, remove_line_index, write_line_index
+from .passages import unindex_chunk_passages
+from .trigram import index_chunk_trigrams, unindex_chunk_trigrams
+from .vecstore import unindex_chunk_vector
 
 CHUNKS_DIR = CONTEXT_DIR / "chunks"
 ARCHIVE_DIR = CONTEXT_DIR / "archive"
@@ -66,6 +74,7 @@ def _load_index() -> dict:
 def _save_index(index: dict) -> None:
     """Save chunks index atomically."""
     atomic_write_json(INDEX_FILE, index)
+    bump_generation(INDEX_FILE.parent, "index")
 
 
 def _load_archive_index() -> dict:
@@ -333,6 +342,13 @@ def archive_chunk(chunk_id: str) -> dict:
         # Delete original file
         src_file.unlink()
 
+        # Phase 11: Tombstone in the BM25 index
+        unindex_chunk(CHUNKS_DIR, chunk_id)
+        unindex_chunk_trigrams(CHUNKS_DIR.parent, chunk_id)
+        remove_line_index(src_file)
+        unindex_chunk_vector(CHUNKS_DIR.parent, chunk_id)
+        unindex_chunk_passages(CHUNKS_DIR.parent, chunk_id)
+
         compression_ratio = (1 - compressed_size / original_size) * 100 if original_size > 0 else 0
 
         return {
@@ -429,6 +445,13 @@ def restore_chunk(chunk_id: str) -> dict:
         # Delete archive file
         archive_file.unlink()
 
+        # Phase 11: Back into the BM25 delta segment
+        index_chunk(CHUNKS_DIR, chunk_id, (archive_meta or {}).get("content_hash"))
+        index_chunk_trigrams(CHUNKS_DIR.parent, chunk_id, dst_file)
+        write_line_index(dst_file)
+        # Phase 11: Vector dropped at archive time, re-embedded by the worker
+        _enqueue_embedding(chunk_id, dst_file, archive_meta or {})
+
         return {
             "status": "restored",
             "chunk_id": chunk_id,
@@ -442,6 +465,21 @@ def restore_chunk(chunk_id: str) -> dict:
         return {"status": "error", "message": f"Failed to restore {chunk_id}: {str(e)}"}
 
 
+def _enqueue_embedding(chunk_id: str, chunk_file: Path, meta: dict) -> None:
+    """Queue a restored chunk for the background embed worker (never raises)."""
+    try:
+        from .embedqueue import chunk_embed_text, get_embed_queue
+        from .vecstore import NUMPY_AVAILABLE
+
+        if NUMPY_AVAILABLE:
+            # Body starts with the blank line chunk() writes after the header
+            content = "".join(read_body_lines(chunk_file)).removeprefix("\n")
+            text = chunk_embed_text(content, meta.get("summary", ""), meta.get("tags"))
+            get_embed_queue(CHUNKS_DIR.parent).enqueue(chunk_id, text)
+    except Exception:
+        pass  # Semantic is optional
+
+
 def purge_chunk(chunk_id: str) -> dict:
     """
     Permanently delete an archived chunk.
@@ -499,6 +537,12 @@ def purge_chunk(chunk_id: str) -> dict:
         # Delete archive file
         archive_file.unlink()
 
+        # Phase 11: Content may be chunked again once purged
+        forget_chunk_hash(CHUNKS_DIR.parent, (archive_meta or {}).get("content_hash"), chunk_id)
+        # Vectors of chunks archived before Phase 11
+        unindex_chunk_vector(CHUNKS_DIR.parent, chunk_id)
+        unindex_chunk_passages(CHUNKS_DIR.parent, chunk_id)
+
         return {
             "status": "purged",
             "chunk_id": chunk_id,
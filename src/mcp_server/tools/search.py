@@ -9,21 +9,29 @@ Uses BM25S library (500x faster than rank_bm25) for efficient scoring.
 Phase 5.1 implementation.
 Phase 5.5c: Added project/domain filtering.
 Phase 8: Hybrid search (BM25 + cosine similarity) when semantic deps available.
+Phase 11: Persistent BM25 index (see bm25store.py), filters pushed down into scoring.
 """
 
-import json
-import re
+import copy
 from pathlib import Path
 
-# BM25S import with fallback
 try:
-    import bm25s
-
-    BM25_AVAILABLE = True
+    import numpy as np
 except ImportError:
-    BM25_AVAILABLE = False
-
+    np = None
+
+from .bm25store import (
+    BM25_AVAILABLE,
+    INSIGHT_PREFIX,
+    BM25Store,
+    extract_search_text,
+    extract_summary,
+)
+from .embedcache import normalize_query
+from .embedqueue import get_embed_queue
 from .fileutil import CONTEXT_DIR
+from .metastore import bitmap_rows
+from .passages import passages_enabled
 from .tokenizer_fr import tokenize_fr
 
 CHUNKS_DIR = CONTEXT_DIR / "chunks"
@@ -36,6 +44,7 @@ class RLMSearch:
     Features:
     - French/English tokenization
     - Fast BM25S scoring
+    - Persistent index, reloaded only when chunks or insights change (Phase 11)
     - Returns ranked results with scores
     """
 
@@ -47,6 +56,7 @@ class RLMSearch:
             chunks_dir: Path to chunks directory (default: RLM/context/chunks)
         """
         self.chunks_dir = chunks_dir or CHUNKS_DIR
+        self.store = BM25Store(self.chunks_dir)
         self.retriever = None
         self.chunk_ids = []
         self.chunk_summaries = {}
@@ -65,47 +75,7 @@ class RLMSearch:
             Content string with metadata keywords prepended
         """
         with open(chunk_file, encoding="utf-8") as f:
-            content = f.read()
-
-        # Skip YAML header (between --- markers)
-        lines = content.split("\n")
-        content_start = 0
-        in_header = False
-
-        for i, line in enumerate(lines):
-            if line.strip() == "---":
-                if not in_header:
-                    in_header = True
-                else:
-                    content_start = i + 1
-                    break
-
-        body = "\n".join(lines[content_start:])
-
-        # Phase 8.1: Prepend metadata to boost keyword matching
-        meta_parts = []
-        for line in lines[:content_start]:
-            if line.startswith("summary:"):
-                val = line.split(":", 1)[1].strip()
-                if val:
-                    meta_parts.append(val)
-            elif line.startswith("tags:"):
-                val = line.split(":", 1)[1].strip().replace(",", " ")
-                if val:
-                    meta_parts.append(val)
-            elif line.startswith("project:"):
-                val = line.split(":", 1)[1].strip()
-                if val:
-                    meta_parts.append(val)
-            elif line.startswith("domain:"):
-                val = line.split(":", 1)[1].strip()
-                if val:
-                    meta_parts.append(val)
-
-        if meta_parts:
-            body = " ".join(meta_parts) + "\n" + body
-
-        return body
+            return extract_search_text(f.read())
 
     def _extract_summary(self, chunk_file: Path) -> str:
         """
@@ -118,24 +88,26 @@ class RLMSearch:
             Summary string or empty string
         """
         with open(chunk_file, encoding="utf-8") as f:
-            content = f.read()
+            return extract_summary(f.read())
 
-        # Find summary in YAML header
-        match = re.search(r"^summary:\s*(.+)$", content, re.MULTILINE)
-        if match:
-            return match.group(1).strip()
-        return ""
+    def _sync_from_store(self) -> int:
+        """Expose the store's documents through the legacy attributes."""
+        self.retriever = self.store.retriever
+        self.chunk_ids = self.store.live_ids
+        self.chunk_summaries = self.store.summaries
+        return len(self.chunk_ids)
 
     def build_index(self, include_insights: bool = True) -> int:
         """
-        Build BM25 index from all chunks and optionally insights.
+        Build BM25 index from all chunks and insights.
 
         Reads all .md files in chunks directory, tokenizes content,
-        and builds the BM25 index. When include_insights is True,
-        also indexes insights from session_memory.
+        builds the BM25 index and persists it under CONTEXT_DIR/bm25_index.
+        Insights from session_memory are always indexed; include_insights
+        only controls whether they count in the returned total.
 
         Args:
-            include_insights: Whether to index insights too (default: True)
+            include_insights: Whether to count insights (default: True)
 
         Returns:
             Number of documents indexed
@@ -143,50 +115,32 @@ class RLMSearch:
         if not BM25_AVAILABLE:
             raise ImportError("bm25s is required for search. Install with: pip install bm25s")
 
-        documents = []
-        self.chunk_ids = []
-        self.chunk_summaries = {}
+        self.store.build()
+        self._sync_from_store()
+        if include_insights:
+            return len(self.chunk_ids)
+        return sum(1 for cid in self.chunk_ids if not cid.startswith(INSIGHT_PREFIX))
 
-        # Collect all chunks
-        chunk_files = sorted(self.chunks_dir.glob("*.md"))
+    def load_index(self) -> int:
+        """
+        Load the persisted BM25 index, rebuilding it only if stale (Phase 11).
 
-        for chunk_file in chunk_files:
-            content = self._extract_content(chunk_file)
-            tokens = tokenize_fr(content)
+        Returns:
+            Number of documents indexed
+        """
+        if not BM25_AVAILABLE:
+            raise ImportError("bm25s is required for search. Install with: pip install bm25s")
 
-            if tokens:  # Only index non-empty chunks
-                documents.append(tokens)
-                chunk_id = chunk_file.stem
-                self.chunk_ids.append(chunk_id)
-                self.chunk_summaries[chunk_id] = self._extract_summary(chunk_file)
+        self.store.load()
+        return self._sync_from_store()
 
-        # Index insights from session_memory
-        if include_insights:
-            from .memory import MEMORY_FILE, _load_memory
-
-            if MEMORY_FILE.exists():
-                memory = _load_memory()
-                for insight in memory.get("insights", []):
-                    content = insight["content"]
-                    if insight.get("tags"):
-                        content += " " + " ".join(insight["tags"])
-                    tokens = tokenize_fr(content)
-                    if tokens:
-                        documents.append(tokens)
-                        iid = f"insight:{insight['id']}"
-                        self.chunk_ids.append(iid)
-                        self.chunk_summaries[iid] = insight["content"][:80]
-
-        if not documents:
-            return 0
-
-        # Build BM25 index
-        self.retriever = bm25s.BM25()
-        self.retriever.index(documents)
-
-        return len(documents)
-
-    def search(self, query: str, top_k: int = 5, include_insights: bool = True) -> list[dict]:
+    def search(
+        self,
+        query: str,
+        top_k: int = 5,
+        include_insights: bool = True,
+        doc_filter: "DocFilter | None" = None,
+    ) -> list[dict]:
         """
         Search chunks (and optionally insights) using BM25 ranking.
 
@@ -194,52 +148,111 @@ class RLMSearch:
             query: Natural language search query
             top_k: Maximum number of results to return
             include_insights: Whether to include insights in search (default: True)
+            doc_filter: Filters applied before top-k selection (Phase 11)
 
         Returns:
             List of dicts with chunk_id, type, score, and summary
         """
+        return self.search_batch([query], top_k, include_insights, doc_filter)[0]
+
+    def search_batch(
+        self,
+        queries: list[str],
+        top_k: int = 5,
+        include_insights: bool = True,
+        doc_filter: "DocFilter | None" = None,
+        query_tokens: list[list[str]] | None = None,
+    ) -> list[list[dict]]:
+        """
+        Search several queries in one BM25 pass (Phase 11).
+
+        Args:
+            queries: Natural language search queries
+            top_k: Maximum number of results per query
+            include_insights: Whether to include insights in search (default: True)
+            doc_filter: Filters applied before top-k selection
+            query_tokens: tokenize_fr() output per query, if already computed
+
+        Returns:
+            One list of result dicts (as in search()) per query
+        """
         if not BM25_AVAILABLE:
             raise ImportError("bm25s is required for search. Install with: pip install bm25s")
 
-        # Build index if not already done
-        if self.retriever is None:
-            indexed = self.build_index(include_insights=include_insights)
+        # Load persisted index if not already done
+        if self.store.manifest is None:
+            indexed = self.load_index()
             if indexed == 0:
-                return []
-
-        # Tokenize query
-        query_tokens = tokenize_fr(query)
+                return [[] for _ in queries]
 
-        if not query_tokens:
-            return []
+        # Tokenize queries
+        if query_tokens is None:
+            query_tokens = [tokenize_fr(q) for q in queries]
 
-        # BM25S retrieve
-        # Note: bm25s.retrieve expects 2D array for queries
-        results, scores = self.retriever.retrieve([query_tokens], k=min(top_k, len(self.chunk_ids)))
+        mask = doc_filter.mask(self.store.doc_ids) if doc_filter is not None else None
+        hits = self.store.search_batch(query_tokens, top_k, include_insights, mask)
 
         # Format results
         output = []
-        for _i, (idx, score) in enumerate(zip(results[0], scores[0], strict=False)):
-            if score > 0:  # Only include positive scores
-                chunk_id = self.chunk_ids[idx]
-                type_ = "insight" if chunk_id.startswith("insight:") else "chunk"
-                output.append(
+        for tokens, query_hits in zip(query_tokens, hits, strict=True):
+            results = []
+            for chunk_id, score in query_hits if tokens else []:
+                type_ = "insight" if chunk_id.startswith(INSIGHT_PREFIX) else "chunk"
+                results.append(
                     {
                         "chunk_id": chunk_id,
                         "type": type_,
-                        "score": float(score),
-                        "summary": self.chunk_summaries.get(chunk_id, ""),
+                        "score": score,
+                        "summary": self.store.summaries.get(chunk_id, ""),
                     }
                 )
+            output.append(results)
 
         return output
 
 
+# =============================================================================
+# PHASE 11: Filter pushdown
+# =============================================================================
+
+
+class DocFilter:
+    """
+    Project/domain/date/entity filters compiled once per query.
+
+    Evaluated as a bitmap over the engine's MetaStore, then turned into
+    bool masks aligned with a retriever's documents, so filters apply
+    before top-k selection (exact results, no over-fetch). Documents
+    absent from index.json (insights) never pass an active filter.
+    """
+
+    def __init__(
+        self,
+        meta,
+        project: str = None,
+        domain: str = None,
+        date_from: str = None,
+        date_to: str = None,
+        entity: str = None,
+    ):
+        self.meta = meta
+        self.bitmap = meta.mask(project, domain, date_from, date_to, entity)
+        # Row mask with one extra False slot for documents not in index.json (-1)
+        self._rows = np.zeros(meta.size + 1, dtype=bool)
+        self._rows[bitmap_rows(self.bitmap)] = True
+
+    def mask(self, doc_ids: list[str]):
+        """Bool array, True where the document passes the filters."""
+        positions = self.meta.positions(doc_ids)
+        return self._rows[np.frombuffer(positions, dtype=positions.typecode)]
+
+
 # =============================================================================
 # PHASE 8: Hybrid Search (BM25 + Cosine Similarity)
 # =============================================================================
 
 HYBRID_ALPHA = 0.6  # Weight for semantic score (0.6 semantic, 0.4 BM25)
+FUSION_DEPTH = 3  # Candidates fetched per retriever, as a multiple of the limit
 
 
 def _normalize_bm25_scores(results: list[dict]) -> list[dict]:
@@ -270,7 +283,9 @@ def _normalize_bm25_scores(results: list[dict]) -> list[dict]:
     return results
 
 
-def _hybrid_search(query: str, top_k: int) -> list[tuple[str, float]] | None:
+def _hybrid_search(
+    query: str, top_k: int, engine=None, doc_filter: DocFilter | None = None
+) -> list[tuple[str, float]] | None:
     """Perform semantic vector search if available.
 
     Returns None if semantic search is not available (deps missing),
@@ -279,11 +294,30 @@ def _hybrid_search(query: str, top_k: int) -> list[tuple[str, float]] | None:
     Args:
         query: Natural language search query
         top_k: Maximum number of results
+        engine: SearchEngine holding the loaded vectors (Phase 11, optional)
+        doc_filter: Filters applied before top-k selection (Phase 11, optional)
 
     Returns:
         List of (chunk_id, score) tuples with scores in [0,1], or None
     """
+    hits = _hybrid_search_batch([query], top_k, engine, doc_filter)
+    return None if hits is None else hits[0]
+
+
+def _hybrid_search_batch(
+    queries: list[str], top_k: int, engine=None, doc_filter: DocFilter | None = None
+) -> list[list[tuple[str, float]]] | None:
+    """Semantic search for several queries (Phase 11).
+
+    Embeds all queries in one provider.embed() call and scores them
+    with one matrix multiply (VectorStore.search_batch).
+
+    Returns:
+        One list of (chunk_id, score) tuples per query, or None if semantic
+        search is not available
+    """
     try:
+        from .embedcache import embed_queries
         from .embeddings import _get_cached_provider
         from .vecstore import VectorStore
 
@@ -291,16 +325,104 @@ def _hybrid_search(query: str, top_k: int) -> list[tuple[str, float]] | None:
         if provider is None:
             return None
 
-        store = VectorStore()
-        if not store.load():
-            return None
-
-        query_vec = provider.embed([query])[0]
-        return store.search(query_vec, top_k=top_k)
+        if engine is not None:
+            store = engine.vectors()
+            if store is None:
+                return None
+        else:
+            store = VectorStore()
+            if not store.load():
+                return None
+
+        # Phase 11: Repeated queries reuse their cached vector
+        query_vecs = embed_queries(provider, list(queries))
+        mask = doc_filter.mask(store.row_ids) if doc_filter is not None else None
+        return store.search_batch(query_vecs, top_k=top_k, mask=mask)
     except Exception:
         return None
 
 
+def _attach_passages(queries: list[str], results: list[list[dict]], engine) -> None:
+    """Tag results with their best-matching line window (Phase 11, passages.py).
+
+    Adds a "passage" dict (start, end, score) to each result that has
+    passage vectors; start/end can be passed to rlm_peek as is. Does
+    nothing if no passages or no provider are available.
+
+    Args:
+        queries: Search queries
+        results: Final result dicts of each query, updated in place
+        engine: SearchEngine holding the loaded passages
+    """
+    try:
+        from .embedcache import embed_queries
+        from .embeddings import _get_cached_provider
+
+        passages = engine.passages()
+        provider = _get_cached_provider()
+        if passages is None or provider is None:
+            return
+
+        # Cache hits: the same queries were just embedded for the chunk search
+        query_vecs = embed_queries(provider, list(queries))
+        for query_vec, query_results in zip(query_vecs, results, strict=True):
+            best = passages.best(query_vec, [r["chunk_id"] for r in query_results])
+            for r in query_results:
+                if r["chunk_id"] in best:
+                    r["passage"] = best[r["chunk_id"]]
+    except Exception:
+        pass  # Passages are optional, results stay chunk-level
+
+
+def _fuse(
+    results: list[dict],
+    semantic_hits: list[tuple[str, float]] | None,
+    summaries: dict,
+    pending: frozenset[str] = frozenset(),
+) -> list[dict]:
+    """Fuse BM25 results with semantic hits (Phase 8).
+
+    Args:
+        results: BM25 result dicts
+        semantic_hits: (chunk_id, score) tuples, or None without semantic search
+        summaries: Summary lookup for semantic-only hits
+        pending: Chunks still in the embed queue, scored on BM25 alone (Phase 11)
+
+    Returns:
+        Result dicts sorted by fused score
+    """
+    if semantic_hits is None:
+        return results
+
+    if not results:
+        # BM25 returned nothing but semantic has results
+        return [
+            {"chunk_id": cid, "score": s, "summary": summaries.get(cid, "")}
+            for cid, s in semantic_hits
+        ]
+
+    results = _normalize_bm25_scores(results)
+    bm25_map = {r["chunk_id"]: r.get("score_norm", 0) for r in results}
+    sem_map = dict(semantic_hits)
+    all_ids = set(bm25_map) | set(sem_map)
+    fused = []
+    for cid in all_ids:
+        if cid in pending:
+            # No vector yet: not penalized for a missing semantic score
+            score = bm25_map.get(cid, 0)
+        else:
+            score = (1 - HYBRID_ALPHA) * bm25_map.get(cid, 0) + HYBRID_ALPHA * sem_map.get(cid, 0)
+        fused.append(
+            {
+                "chunk_id": cid,
+                "score": score,
+                "summary": summaries.get(cid, ""),
+            }
+        )
+    fused.sort(key=lambda x: x["score"], reverse=True)
+    return fused
+
+
 def search(
     query: str,
     limit: int = 5,
@@ -317,6 +439,9 @@ def search(
     Phase 5.5c: Supports filtering by project and domain.
     Phase 7.1: Supports temporal filtering by date range.
     Phase 7.2: Supports filtering by entity.
+    Phase 11: Results cached per normalized query text (lower-cased,
+    whitespace collapsed), filters and index generation; queries without
+    tokens (only stopwords) are not cached.
 
     Args:
         query: Natural language search query
@@ -330,93 +455,157 @@ def search(
     Returns:
         Dictionary with search results
     """
-    from .navigation import _chunk_in_date_range, _entity_matches
+    batch = search_batch(
+        [query], limit, project, domain, date_from, date_to, entity, include_insights
+    )
+    if batch["status"] == "error":
+        return batch
+    return batch["results"][0]
 
-    searcher = RLMSearch()
 
-    try:
-        # Get more results than needed for filtering
-        results = searcher.search(query, top_k=limit * 3, include_insights=include_insights)
-    except ImportError as e:
-        return {"status": "error", "message": str(e), "results": []}
-
-    # Phase 8: Hybrid fusion if semantic available
-    semantic_hits = _hybrid_search(query, limit * 3)
-    if semantic_hits is not None and results:
-        results = _normalize_bm25_scores(results)
-        bm25_map = {r["chunk_id"]: r.get("score_norm", 0) for r in results}
-        sem_map = dict(semantic_hits)
-        all_ids = set(bm25_map) | set(sem_map)
-        fused = []
-        for cid in all_ids:
-            score = (1 - HYBRID_ALPHA) * bm25_map.get(cid, 0) + HYBRID_ALPHA * sem_map.get(cid, 0)
-            fused.append(
-                {
-                    "chunk_id": cid,
-                    "score": score,
-                    "summary": searcher.chunk_summaries.get(cid, ""),
-                }
+def search_batch(
+    queries: list[str],
+    limit: int = 5,
+    project: str = None,
+    domain: str = None,
+    date_from: str = None,
+    date_to: str = None,
+    entity: str = None,
+    include_insights: bool = True,
+) -> dict:
+    """
+    Search several queries in one pass (Phase 11).
+
+    Shares one engine refresh and one filter mask, tokenizes all queries
+    together, scores BM25 computing each distinct token once, embeds all
+    queries in one provider.embed() call and scores them against the
+    vectors with one matrix multiply. Each query still uses the result cache.
+
+    Args:
+        queries: Natural language search queries
+        limit: Maximum results per query (default: 5)
+        project: Filter by project name
+        domain: Filter by domain
+        date_from: Start date inclusive, YYYY-MM-DD
+        date_to: End date inclusive, YYYY-MM-DD
+        entity: Filter by entity name, case-insensitive substring
+        include_insights: Include insights in results (default: True)
+
+    Returns:
+        Dictionary with one search() result dict per query, in order
+    """
+    from .engine import get_engine
+
+    # Phase 11: Long-lived engine, reloaded only when a writer bumped a generation
+    engine = get_engine(CONTEXT_DIR, CHUNKS_DIR)
+
+    # Phase 11: Result cache, invalidated by any index/memory/vectors change.
+    # Keyed on the normalized text (the semantic side embeds the query, not
+    # its tokens); queries without tokens are not cached.
+    query_tokens = [tokenize_fr(q) for q in queries]
+    cache_keys = [
+        (
+            normalize_query(query),
+            project,
+            domain,
+            date_from,
+            date_to,
+            entity,
+            limit,
+            include_insights,
+            engine.generation(),
+        )
+        if tokens
+        else None
+        for query, tokens in zip(queries, query_tokens, strict=True)
+    ]
+
+    outputs: list[dict | None] = []
+    misses = []
+    for i, key in enumerate(cache_keys):
+        cached = engine.results.get(key) if key is not None else None
+        if cached is not None:
+            outputs.append({**copy.deepcopy(cached), "query": queries[i]})
+        else:
+            outputs.append(None)
+            misses.append(i)
+
+    if misses:
+        # Phase 5.5c + 7.1 + 7.2: Filter by project/domain/date/entity if specified
+        # Phase 11: Compiled into masks applied inside BM25 and vector top-k
+        doc_filter = None
+        has_filters = project or domain or date_from or date_to or entity
+        if has_filters and engine.index_file.exists():
+            doc_filter = DocFilter(engine.metastore(), project, domain, date_from, date_to, entity)
+
+        # Candidates per retriever: fusion may reorder beyond the final limit
+        candidates = limit * FUSION_DEPTH
+        miss_queries = [queries[i] for i in misses]
+
+        try:
+            searcher = engine.bm25()
+            bm25_results = searcher.search_batch(
+                miss_queries,
+                top_k=candidates,
+                include_insights=include_insights,
+                doc_filter=doc_filter,
+                query_tokens=[query_tokens[i] for i in misses],
             )
-        fused.sort(key=lambda x: x["score"], reverse=True)
-        results = fused
-    elif semantic_hits is not None:
-        # BM25 returned nothing but semantic has results
-        results = [
-            {"chunk_id": cid, "score": s, "summary": searcher.chunk_summaries.get(cid, "")}
-            for cid, s in semantic_hits
-        ]
+        except ImportError as e:
+            return {"status": "error", "message": str(e), "results": []}
+
+        # Phase 8: Hybrid fusion if semantic available
+        semantic_hits = _hybrid_search_batch(miss_queries, candidates, engine, doc_filter)
+
+        # Build filters summary
+        active_filters = {}
+        if project:
+            active_filters["project"] = project
+        if domain:
+            active_filters["domain"] = domain
+        if date_from:
+            active_filters["date_from"] = date_from
+        if date_to:
+            active_filters["date_to"] = date_to
+        if entity:
+            active_filters["entity"] = entity
+
+        # Phase 11: Chunks waiting for the embed worker are BM25-only
+        pending = get_embed_queue(CONTEXT_DIR).pending_ids() if semantic_hits else frozenset()
+
+        fused = []
+        for j in range(len(misses)):
+            hits = semantic_hits[j] if semantic_hits is not None else None
+            results = _fuse(bm25_results[j], hits, searcher.store.summaries, pending)
+
+            # Apply final limit
+            fused.append(results[:limit])
+
+        # Phase 11: Best line range per result, for targeted peeks
+        if semantic_hits is not None and passages_enabled():
+            _attach_passages(miss_queries, fused, engine)
+
+        for j, i in enumerate(misses):
+            results = fused[j]
+            output = {
+                "status": "success",
+                "query": queries[i],
+                "result_count": len(results),
+                "filters": active_filters if active_filters else None,
+                "results": results,
+            }
+            if cache_keys[i] is not None:
+                engine.results.put(cache_keys[i], copy.deepcopy(output))
+            outputs[i] = output
+
+    return {"status": "success", "query_count": len(queries), "results": outputs}
+
+
+def cache_stats() -> dict:
+    """Hit/miss counters of the search result cache (Phase 11)."""
+    from .engine import get_engine
 
-    # Phase 5.5c + 7.1 + 7.2: Filter by project/domain/date/entity if specified
-    has_filters = project or domain or date_from or date_to or entity
-    if has_filters:
-        # Load index to get chunk metadata
-        index_file = CONTEXT_DIR / "index.json"
-        if index_file.exists():
-            with open(index_file, encoding="utf-8") as f:
-                index = json.load(f)
-
-            # Build lookup for metadata
-            chunk_meta = {c["id"]: c for c in index.get("chunks", [])}
-
-            filtered = []
-            for r in results:
-                meta = chunk_meta.get(r["chunk_id"], {})
-                # Phase 7.1: Temporal filter
-                if not _chunk_in_date_range(meta, date_from, date_to):
-                    continue
-                if project and meta.get("project") != project:
-                    continue
-                if domain and meta.get("domain") != domain:
-                    continue
-                # Phase 7.2: Entity filter
-                if entity and not _entity_matches(meta, entity):
-                    continue
-                filtered.append(r)
-            results = filtered
-
-    # Apply final limit
-    results = results[:limit]
-
-    # Build filters summary
-    active_filters = {}
-    if project:
-        active_filters["project"] = project
-    if domain:
-        active_filters["domain"] = domain
-    if date_from:
-        active_filters["date_from"] = date_from
-    if date_to:
-        active_filters["date_to"] = date_to
-    if entity:
-        active_filters["entity"] = entity
-
-    return {
-        "status": "success",
-        "query": query,
-        "result_count": len(results),
-        "filters": active_filters if active_filters else None,
-        "results": results,
-    }
+    return get_engine(CONTEXT_DIR, CHUNKS_DIR).results.stats()
 
 
 # Quick test when run directly
@@ -427,7 +616,7 @@ if __name__ == "__main__":
         print("  ERROR: bm25s not installed. Run: pip install bm25s")
     else:
         searcher = RLMSearch()
-        indexed = searcher.build_index()
+        indexed = searcher.load_index()
         print(f"  Indexed {indexed} chunks")
 
         if indexed > 0:
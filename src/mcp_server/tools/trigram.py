@@ -0,0 +1,690 @@
+"""
+RLM Trigram Index - Prunes the chunks rlm_grep has to open.
+
+Phase 11 implementation.
+
+grep() used to open and scan every chunk, so a rare term cost as much as a
+common one. Like Google Code Search / zoekt, this module keeps an inverted
+index from trigrams to chunks, and compiles each grep regex (parsed with
+the stdlib regex parser) into a boolean trigram query: only the chunks
+satisfying it can contain a match, and only those files are opened.
+
+Trigrams are taken from chunk bodies (the lines grep searches), case-folded
+the way re.IGNORECASE matches; only all-ASCII trigrams are indexed and
+queried, so non-ASCII text never causes a missed match, only less pruning.
+
+Files under the context directory (same scheme as the vector store):
+
+    trigrams.tri    base: header, JSON doc table, then uint32 arrays
+                    (sorted trigram keys, posting offsets, doc numbers),
+                    memory-mapped on load
+    trigrams.tlog   append-only log of add/remove records, replayed over
+                    the base and folded into it by compact()
+
+chunk(), archive and restore update the index through the writer hooks at
+the bottom. When the chunk set changed (a new "index" generation), the
+next query syncs the index against every chunk by file size/mtime, so
+chunks written by any other means are indexed on the fly instead of being
+missed; queries in between use the index as is.
+"""
+
+import array
+import fcntl
+import json
+import mmap
+import os
+import struct
+import sys
+import threading
+from pathlib import Path
+
+try:
+    from re import _parser as sre_parse  # Python 3.11+
+except ImportError:
+    import sre_parse
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from .fileutil import CONTEXT_DIR
+
+TRIGRAM_BASE_FILE = "trigrams.tri"
+TRIGRAM_LOG_FILE = "trigrams.tlog"
+TRI_FORMAT_VERSION = 1
+_TRI_MAGIC = b"RLMT"
+_TRI_HEADER = struct.Struct("<4sIIIIQ")  # magic, version, docs, keys, postings, doc table size
+_TLOG_RECORD = struct.Struct("<BHHI")  # op, id length, fingerprint length, trigram count
+_TLOG_ADD = 1
+_TLOG_REMOVE = 2
+
+TLOG_COMPACT_MIN_BYTES = 1 << 20  # Never compact a log smaller than this
+TLOG_COMPACT_RATIO = 0.10  # Compact once the log exceeds 10% of the base file
+
+MAX_EXACT = 16  # Alternative strings tracked per regex node before giving up
+
+# Non-ASCII characters matching an ASCII letter under re.IGNORECASE
+_FOLD = str.maketrans({"İ": "i", "ı": "i", "ſ": "s", "K": "k"})
+
+_indexes: dict[str, "TrigramIndex"] = {}
+_indexes_lock = threading.Lock()
+_compact_lock = threading.Lock()
+
+# Regex opcodes (the last two exist since Python 3.11)
+_LITERAL = sre_parse.LITERAL
+_IN = sre_parse.IN
+_BRANCH = sre_parse.BRANCH
+_SUBPATTERN = sre_parse.SUBPATTERN
+_AT = sre_parse.AT
+_REPEATS = {
+    sre_parse.MAX_REPEAT,
+    sre_parse.MIN_REPEAT,
+    getattr(sre_parse, "POSSESSIVE_REPEAT", None),
+}
+_ATOMIC_GROUP = getattr(sre_parse, "ATOMIC_GROUP", None)
+
+
+# =============================================================================
+# Trigram extraction
+# =============================================================================
+
+
+def fold(text: str) -> str:
+    """Case-fold text so that re.IGNORECASE matches imply equal ASCII trigrams."""
+    return text.translate(_FOLD).lower()
+
+
+def _key(gram: bytes) -> int:
+    return (gram[0] << 16) | (gram[1] << 8) | gram[2]
+
+
+def trigram_keys(text: str) -> list[int]:
+    """Sorted distinct keys of the all-ASCII trigrams of text (folded)."""
+    data = fold(text).encode("utf-8")
+    if len(data) < 3:
+        return []
+    if np is not None:
+        b = np.frombuffer(data, dtype=np.uint8).astype(np.uint32)
+        keys = (b[:-2] << 16) | (b[1:-1] << 8) | b[2:]
+        ascii_only = (b[:-2] < 128) & (b[1:-1] < 128) & (b[2:] < 128)
+        return np.unique(keys[ascii_only]).tolist()
+    grams = {data[i : i + 3] for i in range(len(data) - 2)}
+    return sorted(_key(g) for g in grams if max(g) < 128)
+
+
+def body_text(text: str) -> str:
+    """Chunk body: the lines after the YAML header, as grep() reads them."""
+    lines = text.splitlines(keepends=True)
+    in_header = False
+    for i, line in enumerate(lines):
+        if line.strip() == "---":
+            if not in_header:
+                in_header = True
+            else:
+                return "".join(lines[i + 1 :])
+    return text
+
+
+def _fingerprint(path: Path) -> str | None:
+    try:
+        st = path.stat()
+    except OSError:
+        return None
+    return f"{st.st_size}:{st.st_mtime_ns}"
+
+
+# =============================================================================
+# Regex -> trigram query
+# =============================================================================
+
+# A query is None (matches every chunk), a trigram key (int),
+# or ("and" | "or", left, right).
+
+
+def _and(a, b):
+    if a is None:
+        return b
+    if b is None:
+        return a
+    return ("and", a, b)
+
+
+def _or(a, b):
+    if a is None or b is None:
+        return None
+    return ("or", a, b)
+
+
+def _exact_query(strings: set[str] | None):
+    """Query matching any of the strings (None if one is shorter than 3)."""
+    if not strings or any(len(s) < 3 for s in strings):
+        return None
+    query = None
+    for i, s in enumerate(sorted(strings)):
+        grams = None
+        for key in trigram_keys(s):
+            grams = _and(grams, key)
+        query = grams if i == 0 else _or(query, grams)
+    return query
+
+
+def _char_set(op, av) -> set[str] | None:
+    """Folded ASCII characters matched by one LITERAL / IN node, or None."""
+    chars: set[str] = set()
+    items = [(op, av)] if op is _LITERAL else av
+    for item_op, item_av in items:
+        if item_op is _LITERAL:
+            codes = [item_av]
+        elif item_op is sre_parse.RANGE and item_av[1] - item_av[0] < MAX_EXACT:
+            codes = range(item_av[0], item_av[1] + 1)
+        else:
+            return None  # NEGATE, CATEGORY, wide ranges
+        for code in codes:
+            c = fold(chr(code))
+            if len(c) != 1 or not c.isascii():
+                return None
+            chars.add(c)
+    return chars if len(chars) <= MAX_EXACT else None
+
+
+def _analyze(op, av) -> tuple[set[str] | None, object]:
+    """(exact strings matched, or None if unknown/too many; query) of one node."""
+    if op is _LITERAL or op is _IN:
+        return _char_set(op, av), None
+    if op is _AT:
+        return {""}, None
+    if op is _SUBPATTERN:
+        return _analyze_seq(av[-1])
+    if op is _ATOMIC_GROUP:
+        return _analyze_seq(av)
+    if op is _BRANCH:
+        branches = [_analyze_seq(p) for p in av[1]]
+        if all(exact is not None for exact, _ in branches):
+            union = set().union(*(exact for exact, _ in branches))
+            if len(union) <= MAX_EXACT:
+                query = branches[0][1]
+                for _, match in branches[1:]:
+                    query = _or(query, match)
+                return union, query
+        query = None
+        for i, (exact, match) in enumerate(branches):
+            branch_query = _and(match, _exact_query(exact))
+            query = branch_query if i == 0 else _or(query, branch_query)
+        return None, query
+    if op in _REPEATS:
+        low, high, item = av
+        exact, match = _analyze_seq(item)
+        if low == 0:
+            if high == 1 and exact is not None:
+                return exact | {""}, None
+            return None, None
+        if low == high == 1:
+            return exact, match
+        return None, _and(match, _exact_query(exact))  # At least one occurrence
+    return None, None  # ANY, NOT_LITERAL, CATEGORY, GROUPREF, ASSERT, ...
+
+
+def _analyze_seq(items) -> tuple[set[str] | None, object]:
+    """Concatenation: cross product of exact sets while small, else flushed."""
+    exact: set[str] | None = {""}
+    complete = True
+    query = None
+    for op, av in items:
+        item_exact, item_query = _analyze(op, av)
+        query = _and(query, item_query)
+        if exact is not None and item_exact is not None:
+            product = {x + y for x in exact for y in item_exact}
+            if len(product) <= MAX_EXACT:
+                exact = product
+                continue
+        # Unknown or too many alternatives: what is known so far must match
+        if exact is not None:
+            query = _and(query, _exact_query(exact))
+        complete = False
+        exact = item_exact
+    if complete:
+        return exact, query
+    return None, _and(query, _exact_query(exact))
+
+
+def regex_query(pattern: str):
+    """
+    Compile a regex (as grep() uses it: re.IGNORECASE) into a trigram query.
+
+    Args:
+        pattern: Regular expression
+
+    Returns:
+        Query tree, or None if any chunk could match
+    """
+    parsed = sre_parse.parse(pattern, sre_parse.SRE_FLAG_IGNORECASE)
+    exact, query = _analyze_seq(parsed)
+    return _and(query, _exact_query(exact))
+
+
+# =============================================================================
+# Index
+# =============================================================================
+
+
+class TrigramIndex:
+    """Trigram -> chunk inverted index of one context directory."""
+
+    def __init__(self, context_dir: Path | None = None):
+        """
+        Args:
+            context_dir: Context directory (default: CONTEXT_DIR)
+        """
+        self.context_dir = context_dir or CONTEXT_DIR
+        self.base_file = self.context_dir / TRIGRAM_BASE_FILE
+        self.log_file = self.context_dir / TRIGRAM_LOG_FILE
+        self._lock = threading.RLock()
+        self._compact_thread: threading.Thread | None = None
+        self._synced: tuple | None = None  # Chunk set generation of the last sync
+        self._reset()
+
+    def _reset(self) -> None:
+        # Base (memory-mapped): doc numbers -> ids, sorted keys, postings
+        self._base_key: tuple | None = None
+        self._base_docs: list[str] = []
+        self._keys = self._offsets = self._postings = None
+        self._dead: set[int] = set()  # Base docs removed or replaced since
+        self._base_num: dict[str, int] = {}
+        # Documents added by the log, with their own small inverted index
+        self._delta: dict[str, list[int]] = {}
+        self._delta_postings: dict[int, set[str]] = {}
+        self._fps: dict[str, str] = {}  # id -> fingerprint of every live doc
+        self._log_pos = 0
+
+    def __len__(self) -> int:
+        return len(self._fps)
+
+    # -------------------------------------------------------------------------
+    # Loading
+    # -------------------------------------------------------------------------
+
+    def refresh(self) -> None:
+        """Reload the base if it changed, then replay new log records."""
+        with self._lock:
+            try:
+                log = open(self.log_file, "rb")
+            except OSError:
+                log = None  # No log yet, so no compaction either
+            try:
+                # Shared lock: compact() cannot replace the base and truncate
+                # the log between the checks below and the read
+                if log is not None:
+                    fcntl.flock(log, fcntl.LOCK_SH)
+                base_key = _stat_key(self.base_file)
+                log_size = os.fstat(log.fileno()).st_size if log is not None else 0
+                # Base replaced, or log folded into a base we already read
+                if base_key != self._base_key or log_size < self._log_pos:
+                    self._reset()
+                    self._map_base()
+                    self._base_key = base_key
+                records = b""
+                if log_size > self._log_pos:
+                    log.seek(self._log_pos)
+                    records = log.read(log_size - self._log_pos)
+            finally:
+                if log is not None:
+                    fcntl.flock(log, fcntl.LOCK_UN)
+                    log.close()
+            self._log_pos += self._replay(records)
+
+    def _map_base(self) -> None:
+        try:
+            with open(self.base_file, "rb") as f:
+                data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            return  # No base yet
+        try:
+            magic, version, n_docs, n_keys, n_postings, docs_size = _TRI_HEADER.unpack_from(data)
+        except struct.error:
+            return
+        if magic != _TRI_MAGIC or version != TRI_FORMAT_VERSION:
+            return
+        pos = _TRI_HEADER.size
+        docs = json.loads(bytes(data[pos : pos + docs_size]))
+        pos = _aligned(pos + docs_size)
+        view = memoryview(data)
+        self._keys = view[pos : pos + 4 * n_keys].cast("I")
+        pos += 4 * n_keys
+        self._offsets = view[pos : pos + 4 * (n_keys + 1)].cast("I")
+        pos += 4 * (n_keys + 1)
+        self._postings = view[pos : pos + 4 * n_postings].cast("I")
+        self._base_docs = [doc_id for doc_id, _ in docs]
+        self._base_num = {doc_id: num for num, (doc_id, _) in enumerate(docs)}
+        self._fps = dict(docs)
+
+    def _replay(self, records: bytes) -> int:
+        """Apply log records. Returns the bytes consumed (a torn tail is left)."""
+        pos = 0
+        while pos + _TLOG_RECORD.size <= len(records):
+            op, id_len, fp_len, n_keys = _TLOG_RECORD.unpack_from(records, pos)
+            start = pos + _TLOG_RECORD.size
+            end = start + id_len + fp_len + 4 * n_keys
+            if end > len(records):
+                break
+            doc_id = records[start : start + id_len].decode("utf-8")
+            if op == _TLOG_ADD:
+                fp = records[start + id_len : start + id_len + fp_len].decode("utf-8")
+                keys = array.array("I")
+                keys.frombytes(records[start + id_len + fp_len : end])
+                if sys.byteorder != "little":
+                    keys.byteswap()
+                self._add(doc_id, fp, keys.tolist())
+            elif op == _TLOG_REMOVE:
+                self._remove(doc_id)
+            pos = end
+        return pos
+
+    def _add(self, doc_id: str, fp: str, keys: list[int]) -> None:
+        self._remove(doc_id)
+        self._delta[doc_id] = keys
+        for key in keys:
+            self._delta_postings.setdefault(key, set()).add(doc_id)
+        self._fps[doc_id] = fp
+
+    def _remove(self, doc_id: str) -> None:
+        num = self._base_num.get(doc_id)
+        if num is not None:
+            self._dead.add(num)
+            del self._base_num[doc_id]
+        for key in self._delta.pop(doc_id, ()):
+            self._delta_postings[key].discard(doc_id)
+        self._fps.pop(doc_id, None)
+
+    # -------------------------------------------------------------------------
+    # Writes
+    # -------------------------------------------------------------------------
+
+    def add_files(self, files: list[tuple[str, Path]]) -> int:
+        """
+        Index chunk files (replacing their previous entry) in one log write.
+
+        Args:
+            files: (chunk_id, chunk file) pairs; unreadable files are skipped
+
+        Returns:
+            Number of chunks indexed
+        """
+        parts = []
+        for doc_id, path in files:
+            fp = _fingerprint(path)
+            try:
+                text = path.read_text(encoding="utf-8")
+            except (OSError, UnicodeDecodeError):
+                continue
+            keys = array.array("I", trigram_keys(body_text(text)))
+            if sys.byteorder != "little":
+                keys.byteswap()
+            encoded_id, encoded_fp = doc_id.encode("utf-8"), (fp or "").encode("utf-8")
+            parts.append(
+                _TLOG_RECORD.pack(_TLOG_ADD, len(encoded_id), len(encoded_fp), len(keys))
+                + encoded_id
+                + encoded_fp
+                + keys.tobytes()
+            )
+        if parts:
+            self._append(b"".join(parts))
+        return len(parts)
+
+    def remove(self, doc_id: str) -> None:
+        """Record the removal of a chunk (archived or deleted)."""
+        encoded_id = doc_id.encode("utf-8")
+        self._append(_TLOG_RECORD.pack(_TLOG_REMOVE, len(encoded_id), 0, 0) + encoded_id)
+
+    def _append(self, record: bytes) -> None:
+        self.context_dir.mkdir(parents=True, exist_ok=True)
+        with open(self.log_file, "ab") as log:
+            fcntl.flock(log, fcntl.LOCK_EX)
+            try:
+                log.write(record)
+            finally:
+                fcntl.flock(log, fcntl.LOCK_UN)
+        self.maybe_compact()
+
+    def needs_compact(self) -> bool:
+        """Check whether the log outgrew TLOG_COMPACT_RATIO of the base file."""
+        log_size = _stat_key(self.log_file)[0]
+        base_size = _stat_key(self.base_file)[0]
+        return log_size >= TLOG_COMPACT_MIN_BYTES and log_size > TLOG_COMPACT_RATIO * base_size
+
+    def maybe_compact(self, background: bool = True) -> bool:
+        """
+        Start a compaction if the log is large enough.
+
+        Args:
+            background: Run the compaction in a daemon thread (default: True)
+
+        Returns:
+            True if a compaction was started (or completed, when synchronous)
+        """
+        if not self.needs_compact():
+            return False
+        if not background:
+            return self.compact()
+        if self._compact_thread is not None and self._compact_thread.is_alive():
+            return False
+        self._compact_thread = threading.Thread(target=self._compact_quietly, daemon=True)
+        self._compact_thread.start()
+        return True
+
+    def wait_for_compact(self, timeout: float | None = None) -> None:
+        """Block until a background compaction started by this index finishes."""
+        if self._compact_thread is not None:
+            self._compact_thread.join(timeout)
+
+    def _compact_quietly(self) -> None:
+        try:
+            self.compact()
+        except Exception:
+            pass  # Compaction is an optimization, never fail the caller
+
+    def compact(self) -> bool:
+        """
+        Fold the log into a new base file and clear the log.
+
+        Holds the log's exclusive lock throughout, so appends wait.
+
+        Returns:
+            True if the log was compacted
+        """
+        if not self.log_file.exists():
+            return False
+        with _compact_lock, open(self.log_file, "r+b") as log:
+            fcntl.flock(log, fcntl.LOCK_EX)
+            try:
+                merged = TrigramIndex(self.context_dir)
+                merged._map_base()
+                merged._replay(log.read())
+                merged._write_base()
+                log.truncate(0)
+            finally:
+                fcntl.flock(log, fcntl.LOCK_UN)
+        return True
+
+    def _write_base(self) -> None:
+        """Write base + delta documents as a new base file (atomic replace)."""
+        docs = [(doc_id, self._fps[doc_id]) for doc_id in self._base_num]
+        docs += [(doc_id, self._fps[doc_id]) for doc_id in self._delta]
+        new_num = {doc_id: num for num, (doc_id, _) in enumerate(docs)}
+
+        postings: dict[int, list[int]] = {}
+        if self._keys is not None:
+            alive = {num: new_num[doc_id] for doc_id, num in self._base_num.items()}
+            for i, key in enumerate(self._keys):
+                nums = self._postings[self._offsets[i] : self._offsets[i + 1]]
+                kept = [alive[num] for num in nums if num in alive]
+                if kept:
+                    postings[key] = kept
+        for key, doc_ids in self._delta_postings.items():
+            if doc_ids:
+                postings.setdefault(key, []).extend(sorted(new_num[d] for d in doc_ids))
+
+        keys = array.array("I", sorted(postings))
+        offsets = array.array("I", [0])
+        flat = array.array("I")
+        for key in keys:
+            flat.extend(postings[key])
+            offsets.append(len(flat))
+        if sys.byteorder != "little":
+            for arr in (keys, offsets, flat):
+                arr.byteswap()
+
+        docs_blob = json.dumps(docs, ensure_ascii=False).encode("utf-8")
+        header = _TRI_HEADER.pack(
+            _TRI_MAGIC, TRI_FORMAT_VERSION, len(docs), len(keys), len(flat), len(docs_blob)
+        )
+        padding = b"\0" * (_aligned(len(header) + len(docs_blob)) - len(header) - len(docs_blob))
+
+        tmp_path = self.base_file.with_name(f".{self.base_file.name}.{os.getpid()}.tmp")
+        try:
+            with open(tmp_path, "wb") as f:
+                f.write(header + docs_blob + padding)
+                f.write(keys.tobytes())
+                f.write(offsets.tobytes())
+                f.write(flat.tobytes())
+            os.replace(tmp_path, self.base_file)
+        except Exception:
+            tmp_path.unlink(missing_ok=True)
+            raise
+
+    # -------------------------------------------------------------------------
+    # Queries
+    # -------------------------------------------------------------------------
+
+    def sync(self, chunks: list[tuple[str, Path]], generation: tuple | None = None) -> int:
+        """
+        Index the chunks that are missing or changed (by file size/mtime).
+
+        Args:
+            chunks: (chunk_id, chunk file) pairs about to be searched
+            generation: Stamp of the chunk set (e.g. the "index" generation).
+                If equal to the one of the last sync, nothing is checked:
+                the writer hooks kept the index current meanwhile.
+
+        Returns:
+            Number of chunks (re)indexed
+        """
+        with self._lock:
+            self.refresh()
+            if generation is not None and generation == self._synced:
+                return 0
+            stale = [
+                (doc_id, path)
+                for doc_id, path in chunks
+                if self._fps.get(doc_id) != _fingerprint(path) and path.exists()
+            ]
+            written = self.add_files(stale) if stale else 0
+            if written:
+                self.refresh()
+            self._synced = generation
+            return written
+
+    def _lookup(self, key: int) -> set[str]:
+        ids = set(self._delta_postings.get(key, ()))
+        if self._keys is not None:
+            i = _bisect(self._keys, key)
+            if i < len(self._keys) and self._keys[i] == key:
+                nums = self._postings[self._offsets[i] : self._offsets[i + 1]]
+                docs, dead = self._base_docs, self._dead
+                ids.update(docs[num] for num in nums if num not in dead)
+        return ids
+
+    def _evaluate(self, query) -> set[str] | None:
+        if query is None:
+            return None
+        if isinstance(query, int):
+            return self._lookup(query)
+        op, left, right = query
+        a, b = self._evaluate(left), self._evaluate(right)
+        if op == "and":
+            if a is None or b is None:
+                return b if a is None else a
+            return a & b
+        if a is None or b is None:
+            return None
+        return a | b
+
+    def candidates(
+        self, pattern: str, chunks: list[tuple[str, Path]], generation: tuple | None = None
+    ) -> set[str] | None:
+        """
+        Chunks that may contain a match of pattern (grep() semantics).
+
+        Args:
+            pattern: Regular expression, matched case-insensitively per line
+            chunks: (chunk_id, chunk file) pairs to sync the index against
+            generation: Stamp of the chunk set (see sync())
+
+        Returns:
+            Set of chunk ids to scan, or None if the regex gives no trigram
+            to filter on (scan every chunk)
+        """
+        query = regex_query(pattern)
+        if query is None:
+            return None
+        with self._lock:
+            self.sync(chunks, generation)
+            return self._evaluate(query)
+
+
+def _aligned(offset: int) -> int:
+    return -(-offset // 4) * 4
+
+
+def _bisect(keys, key: int) -> int:
+    lo, hi = 0, len(keys)
+    while lo < hi:
+        mid = (lo + hi) // 2
+        if keys[mid] < key:
+            lo = mid + 1
+        else:
+            hi = mid
+    return lo
+
+
+def _stat_key(path: Path) -> tuple:
+    try:
+        st = path.stat()
+        return (st.st_size, st.st_mtime_ns, st.st_ino)
+    except OSError:
+        return (0, 0, 0)
+
+
+def get_trigram_index(context_dir: Path | None = None) -> TrigramIndex:
+    """Shared index for a context directory (one per process)."""
+    context_dir = context_dir or CONTEXT_DIR
+    with _indexes_lock:
+        key = str(context_dir)
+        if key not in _indexes:
+            _indexes[key] = TrigramIndex(context_dir)
+        return _indexes[key]
+
+
+# =============================================================================
+# Writer hooks
+# =============================================================================
+
+
+def index_chunk_trigrams(context_dir: Path, chunk_id: str, chunk_file: Path) -> None:
+    """
+    Add a newly written (or restored) chunk to the trigram index.
+
+    Never raises: the next grep indexes whatever is missing.
+    """
+    try:
+        get_trigram_index(context_dir).add_files([(chunk_id, chunk_file)])
+    except Exception:
+        pass
+
+
+def unindex_chunk_trigrams(context_dir: Path, chunk_id: str) -> None:
+    """Remove an archived or deleted chunk from the trigram index."""
+    try:
+        get_trigram_index(context_dir).remove(chunk_id)
+    except Exception:
+        pass
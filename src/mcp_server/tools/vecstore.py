@@ -3,10 +3,38 @@ RLM Vector Store - Numpy-based vector storage for semantic search.
 
 Phase 8 implementation.
 
-Stores chunk embeddings in a .npz file for fast cosine similarity search.
+Stores chunk embeddings for fast cosine similarity search.
 All numpy operations are guarded — module degrades gracefully if numpy is absent.
+
+Phase 11: on-disk format is a single .vec file opened with np.memmap
+(zero-copy load, no pickle):
+
+    header   magic "RLMV", format version, dtype code, dim, count
+    vectors  count x dim float32 (or float16, RLM_VECTOR_DTYPE=float16)
+    norms    count float32 inverse row norms
+    offsets  count + 1 uint64 byte offsets into the id blob
+    ids      UTF-8 chunk ids, concatenated
+
+Sections start on 64-byte boundaries. A legacy embeddings.npz is migrated
+to embeddings.vec on first load (the .npz is left in place, unused).
+
+Writes from chunk() go to an append-only log (embeddings.vlog) of add and
+remove records instead of rewriting the .vec file; load() replays the log
+over the base file, and compact() folds it in once it outgrows
+VLOG_COMPACT_RATIO of the base.
+
+With RLM_VECTOR_INDEX=ivf, large base files are searched through an IVF
+index (see ann.py) persisted as embeddings.ivf; log rows are always
+scanned exactly. With RLM_VECTOR_QUANT=int8|binary, full scans shortlist
+candidates over compact codes (quant.py, embeddings.vq) and rescore them
+against the full-precision vectors.
 """
 
+import fcntl
+import os
+import struct
+import threading
+from contextlib import contextmanager
 from pathlib import Path
 
 try:
@@ -17,81 +45,326 @@ except ImportError:
     np = None
     NUMPY_AVAILABLE = False
 
-from .fileutil import CONTEXT_DIR
+from .ann import ANN_MIN_ROWS, IVF_SUFFIX, IVFIndex, ann_mode, ivf_nprobe
+from .fileutil import CONTEXT_DIR, bump_generation
+from .quant import RESCORE_FACTOR, RESCORE_MIN, VQ_SUFFIX, QuantizedCodes, quant_mode
 
 DEFAULT_EMBEDDINGS_PATH = CONTEXT_DIR / "embeddings.npz"
 
+VEC_SUFFIX = ".vec"
+VEC_FORMAT_VERSION = 1
+_VEC_MAGIC = b"RLMV"
+_VEC_HEADER = struct.Struct("<4sIIIQ")  # magic, version, dtype code, dim, count
+_VEC_ALIGN = 64
+_VEC_DTYPES = ("float32", "float16")  # index = dtype code
+
+VLOG_SUFFIX = ".vlog"
+VLOG_COMPACT_MIN_BYTES = 1 << 20  # Never compact a log smaller than this
+VLOG_COMPACT_RATIO = 0.10  # Compact once the log exceeds 10% of the base file
+_VLOG_RECORD = struct.Struct("<BHI")  # op, id length, dim (0 for removes)
+_VLOG_ADD = 1
+_VLOG_REMOVE = 2
+
+_compact_lock = threading.Lock()
+
+
+def _aligned(offset: int) -> int:
+    return -(-offset // _VEC_ALIGN) * _VEC_ALIGN
+
+
+def _vector_dtype() -> str:
+    """Storage dtype from RLM_VECTOR_DTYPE (float32 default, float16 halves size)."""
+    dtype = os.environ.get("RLM_VECTOR_DTYPE", "float32").lower()
+    return dtype if dtype in _VEC_DTYPES else "float32"
+
 
 class VectorStore:
     """Numpy-based vector store for chunk embeddings.
 
-    Stores vectors in a .npz file with two arrays:
-    - chunk_ids: 1D array of chunk ID strings
-    - vectors: 2D array of float32 vectors
-
-    Search uses brute-force cosine similarity (fast enough for <10k chunks).
+    Stores vectors in a memory-mapped .vec file (see module docstring).
+
+    Phase 11 in-memory layout: rows [0, n_base) are the base file (read-only
+    memmap, never copied), later rows live in a growable in-RAM block.
+    A dict maps chunk id -> row and a validity mask marks removed rows, so
+    add, replace and remove are O(1): removed extra rows are reused, removed
+    base rows stay masked until the next save()/compact().
+
+    Search uses brute-force cosine similarity by default. Phase 11: row
+    norms are computed once at load/add time and cached, so a query is one
+    matrix multiply plus an argpartition top-k. With RLM_VECTOR_INDEX=ivf
+    and at least ANN_MIN_ROWS base rows, the base rows are searched through
+    the IVF index instead (ann_index(), ann.py); rows outside the base file
+    (log records, add()) are always scanned exactly and merged into the
+    same top-k.
     """
 
     def __init__(self, path: Path | None = None):
         """Initialize the vector store.
 
         Args:
-            path: Path to the .npz file (default: CONTEXT_DIR/embeddings.npz)
+            path: Path to the embeddings file (default: CONTEXT_DIR/embeddings.npz).
+                Data is stored next to it with a .vec suffix; a legacy .npz
+                at this path is migrated on load.
         """
         self.path = path or DEFAULT_EMBEDDINGS_PATH
-        self.chunk_ids: list[str] = []
-        self.vectors = None  # np.ndarray or None
+        self.data_file = self.path.with_suffix(VEC_SUFFIX)
+        self.log_file = self.path.with_suffix(VLOG_SUFFIX)
+        self.ann_file = self.path.with_suffix(IVF_SUFFIX)
+        self.quant_file = self.path.with_suffix(VQ_SUFFIX)
+        self._compact_thread: threading.Thread | None = None
+        self._reset()
+
+    def _reset(self) -> None:
+        # Base rows (memmap or array), 1 / ||row|| (0 for zero rows)
+        self._base = None
+        self._base_inv = None
+        self._n_base = 0
+        self._base_stat: tuple | None = None  # (count, size, mtime_ns) of the mapped file
+        self._ann = None
+        self._quant = None
+        # Extra rows, capacity grows by doubling
+        self._extra = None
+        self._extra_inv = None
+        self._n_rows = 0  # Base + used extra rows (dead ones included)
+        self._valid = None  # bool per row (base + extra capacity)
+        self._free: list[int] = []  # Dead extra rows, reused first
+        self._live = 0
+        # Row -> chunk id (None = dead), decoded from the id table on first use
+        self._ids: list[str | None] | None = []
+        self._id_offsets = None
+        self._id_blob = None
+        self._row_of: dict[str, int] | None = {}
+        # Ids added, replaced or removed through add()/remove() since load,
+        # in first-change order (True: current vector, False: removed)
+        self._changed: dict[str, bool] = {}
+
+    # -------------------------------------------------------------------------
+    # Views
+    # -------------------------------------------------------------------------
+
+    def __len__(self) -> int:
+        return self._live
+
+    @property
+    def row_ids(self) -> list[str | None]:
+        """Chunk id of each row, None for removed rows (aligned with search masks)."""
+        if self._ids is None:
+            blob = bytes(self._id_blob)
+            offsets = self._id_offsets.tolist()
+            self._ids = [
+                blob[start:end].decode("utf-8")
+                for start, end in zip(offsets[:-1], offsets[1:], strict=True)
+            ]
+            self._id_offsets = self._id_blob = None
+        return self._ids
+
+    @property
+    def chunk_ids(self) -> list[str]:
+        """Ids of the stored chunks, in row order."""
+        return [cid for cid in self.row_ids if cid is not None]
+
+    @property
+    def vectors(self):
+        """Live vectors as one matrix, in chunk_ids order (None if empty).
+
+        The base memmap itself when nothing was added or removed since load.
+        """
+        if self._live == 0:
+            return None
+        if self._n_rows == self._n_base and self._live == self._n_base:
+            return self._base
+        rows = self._live_rows()
+        parts = [self._base[rows[rows < self._n_base]]] if self._n_base else []
+        parts.append(self._extra[rows[rows >= self._n_base] - self._n_base])
+        return np.concatenate(parts).astype(np.float32, copy=False)
+
+    def _live_rows(self):
+        return np.flatnonzero(self._valid[: self._n_rows])
+
+    def _id_at(self, row: int) -> str:
+        """Chunk id of one row, without decoding the whole id table."""
+        if self._ids is not None:
+            return self._ids[row]
+        start, end = int(self._id_offsets[row]), int(self._id_offsets[row + 1])
+        return bytes(self._id_blob[start:end]).decode("utf-8")
+
+    def _index(self) -> dict[str, int]:
+        """Chunk id -> row, built on first use."""
+        if self._row_of is None:
+            self._row_of = {cid: row for row, cid in enumerate(self.row_ids) if cid is not None}
+        return self._row_of
+
+    # -------------------------------------------------------------------------
+    # Persistence
+    # -------------------------------------------------------------------------
 
     def load(self) -> bool:
-        """Load vectors from .npz file.
+        """Memory-map vectors from the .vec file (migrating a legacy .npz),
+        then replay the append-only log.
 
         Returns:
-            True if loaded successfully, False if file doesn't exist or numpy unavailable
+            True if loaded successfully, False if no vectors exist or numpy unavailable
         """
         if not NUMPY_AVAILABLE:
             return False
 
-        if not self.path.exists():
-            return False
-
         try:
-            data = np.load(self.path, allow_pickle=True)
-            self.chunk_ids = list(data["chunk_ids"])
-            self.vectors = data["vectors"].astype(np.float32)
-            return True
+            # Shared lock: compact() cannot swap the base and truncate the log in between
+            with self._locked_log(fcntl.LOCK_SH) as log:
+                loaded = self._load_base()
+                records = log.read() if log is not None else b""
+            return self._replay(records) > 0 or loaded
         except Exception:
-            self.chunk_ids = []
-            self.vectors = None
+            self._reset()
             return False
 
-    def save(self) -> None:
-        """Persist vectors atomically to .npz file."""
-        if not NUMPY_AVAILABLE or self.vectors is None or len(self.chunk_ids) == 0:
-            return
+    def _load_base(self) -> bool:
+        self._reset()
+        if not self.data_file.exists():
+            return self._migrate_npz()
+        return self._map(self.data_file)
+
+    def _set_base(self, vectors, inv_norms, ids: list[str] | None) -> None:
+        count = len(vectors)
+        self._base = vectors
+        self._base_inv = inv_norms
+        self._n_base = self._n_rows = self._live = count
+        self._valid = np.ones(count, dtype=bool)
+        self._ids = ids
+        self._row_of = None
+
+    def _map(self, path: Path) -> bool:
+        """Open the sections of a .vec file as read-only memmaps (no copy)."""
+        with open(path, "rb") as f:
+            magic, version, dtype_code, dim, count = _VEC_HEADER.unpack(f.read(_VEC_HEADER.size))
+            stat = os.fstat(f.fileno())
+        if magic != _VEC_MAGIC or version != VEC_FORMAT_VERSION or count == 0:
+            raise ValueError(f"Not a vector file: {path}")
+
+        dtype = np.dtype(_VEC_DTYPES[dtype_code])
+        offset = _aligned(_VEC_HEADER.size)
+        vectors = np.memmap(path, dtype=dtype, mode="r", offset=offset, shape=(count, dim))
+        offset = _aligned(offset + count * dim * dtype.itemsize)
+        inv_norms = np.memmap(path, dtype=np.float32, mode="r", offset=offset, shape=count)
+        offset = _aligned(offset + count * 4)
+        self._set_base(vectors, inv_norms, None)
+        self._base_stat = (count, stat.st_size, stat.st_mtime_ns)
+        self._id_offsets = np.memmap(
+            path, dtype=np.uint64, mode="r", offset=offset, shape=count + 1
+        )
+        offset += (count + 1) * 8
+        self._id_blob = np.memmap(
+            path, dtype=np.uint8, mode="r", offset=offset, shape=int(self._id_offsets[-1])
+        )
+        return True
 
-        # Ensure parent directory exists
-        self.path.parent.mkdir(parents=True, exist_ok=True)
+    def _migrate_npz(self) -> bool:
+        """Convert a legacy .npz (pickled id array) to the .vec format."""
+        if self.path.suffix != ".npz" or not self.path.exists():
+            return False
+        data = np.load(self.path, allow_pickle=True)
+        vectors = data["vectors"].astype(np.float32)
+        self._set_base(vectors, _inverse_norms(vectors), [str(cid) for cid in data["chunk_ids"]])
+        if self._live:
+            self._write()
+        return True
 
-        # Atomic write: save to temp then rename
-        # np.savez auto-appends .npz if file doesn't end with .npz
-        # So we use a .npz temp file to avoid double extension
-        tmp_path = self.path.parent / (self.path.stem + "_tmp.npz")
+    def _write(self) -> None:
+        """Write the live rows to the .vec file atomically (temp file + rename)."""
+        self.data_file.parent.mkdir(parents=True, exist_ok=True)
+        dtype = np.dtype(_vector_dtype())
+        vectors = np.ascontiguousarray(self.vectors, dtype=dtype)
+        count, dim = vectors.shape
+
+        rows = self._live_rows()
+        inv_norms = np.concatenate(
+            [
+                self._base_inv[rows[rows < self._n_base]] if self._n_base else [],
+                self._extra_inv[rows[rows >= self._n_base] - self._n_base]
+                if self._extra is not None
+                else [],
+            ]
+        ).astype(np.float32)
+
+        encoded = [cid.encode("utf-8") for cid in self.chunk_ids]
+        offsets = np.zeros(count + 1, dtype=np.uint64)
+        np.cumsum([len(e) for e in encoded], out=offsets[1:])
+
+        tmp_path = self.data_file.parent / (self.data_file.stem + "_tmp" + VEC_SUFFIX)
         try:
-            np.savez(
-                tmp_path,
-                chunk_ids=np.array(self.chunk_ids, dtype=object),
-                vectors=self.vectors.astype(np.float32),
-            )
-            tmp_path.rename(self.path)
+            with open(tmp_path, "wb") as f:
+                f.write(
+                    _VEC_HEADER.pack(
+                        _VEC_MAGIC, VEC_FORMAT_VERSION, _VEC_DTYPES.index(dtype.name), dim, count
+                    )
+                )
+                f.seek(_aligned(f.tell()))
+                vectors.tofile(f)
+                f.seek(_aligned(f.tell()))
+                inv_norms.tofile(f)
+                f.seek(_aligned(f.tell()))
+                offsets.tofile(f)
+                f.write(b"".join(encoded))
+            os.replace(tmp_path, self.data_file)
         except Exception:
             if tmp_path.exists():
                 tmp_path.unlink()
             raise
 
-    def add(self, chunk_id: str, vector) -> None:
-        """Add a vector for a chunk.
+    def save(self) -> None:
+        """Persist vectors atomically to the .vec file.
 
-        If chunk_id already exists, replaces the vector.
+        Under the log's exclusive lock, the current base file and the whole
+        log (including records other writers appended since load()) are
+        merged, this store's own add()/remove() calls are applied on top,
+        and the result replaces the base while the log is cleared. The
+        store is then reloaded from it.
+        """
+        if not NUMPY_AVAILABLE or (len(self) == 0 and not self._changed):
+            return
+
+        self.data_file.parent.mkdir(parents=True, exist_ok=True)
+        self.log_file.touch()  # Held locked while the base is replaced
+        with _compact_lock, self._locked_log(fcntl.LOCK_EX) as log:
+            merged = VectorStore(self.path)
+            merged._load_base()
+            merged._replay(log.read())
+            row_of = self._index()
+            for chunk_id, present in self._changed.items():
+                if present:
+                    merged._add(chunk_id, self._row_vector(row_of[chunk_id]))
+                else:
+                    merged._remove(chunk_id)
+            if len(merged) > 0:
+                merged._write()
+            else:
+                self.data_file.unlink(missing_ok=True)
+            log.truncate(0)
+        bump_generation(self.data_file.parent, "vectors")
+        self.load()
+        self._prebuild_indexes()
+
+    # -------------------------------------------------------------------------
+    # Append-only log (Phase 11)
+    # -------------------------------------------------------------------------
+
+    @contextmanager
+    def _locked_log(self, mode: int):
+        """Yield the log file opened for read/write under flock(mode), or None."""
+        if not self.log_file.exists():
+            yield None
+            return
+        with open(self.log_file, "r+b") as log:
+            fcntl.flock(log, mode)
+            try:
+                yield log
+            finally:
+                fcntl.flock(log, fcntl.LOCK_UN)
+
+    def append(self, chunk_id: str, vector) -> None:
+        """Record an add (or replace) in the log, without loading the store.
+
+        O(1) in the store size: one record appended under an exclusive lock.
 
         Args:
             chunk_id: The chunk identifier
@@ -99,21 +372,287 @@ class VectorStore:
         """
         if not NUMPY_AVAILABLE:
             return
+        self._append_records([(_VLOG_ADD, chunk_id, np.asarray(vector, dtype=np.float32).ravel())])
 
-        vector = np.asarray(vector, dtype=np.float32).reshape(1, -1)
+    def append_many(self, items) -> None:
+        """Record several adds with one locked write and one generation bump.
 
-        # Replace if exists
-        if chunk_id in self.chunk_ids:
-            idx = self.chunk_ids.index(chunk_id)
-            self.vectors[idx] = vector[0]
+        Args:
+            items: (chunk_id, vector) pairs
+        """
+        if not NUMPY_AVAILABLE:
             return
+        records = [
+            (_VLOG_ADD, chunk_id, np.asarray(vector, dtype=np.float32).ravel())
+            for chunk_id, vector in items
+        ]
+        if records:
+            self._append_records(records)
 
-        # Append
-        self.chunk_ids.append(chunk_id)
-        if self.vectors is None:
-            self.vectors = vector
-        else:
-            self.vectors = np.vstack([self.vectors, vector])
+    def append_remove(self, chunk_id: str) -> None:
+        """Record a removal in the log, without loading the store.
+
+        Args:
+            chunk_id: The chunk identifier to remove
+        """
+        self.append_remove_many([chunk_id])
+
+    def append_remove_many(self, chunk_ids) -> None:
+        """Record several removals with one locked write.
+
+        Args:
+            chunk_ids: Identifiers to remove
+        """
+        if not NUMPY_AVAILABLE:
+            return
+        records = [(_VLOG_REMOVE, chunk_id, None) for chunk_id in chunk_ids]
+        if records:
+            self._append_records(records)
+
+    def _append_records(self, records: list[tuple]) -> None:
+        parts = []
+        for op, chunk_id, vector in records:
+            encoded = chunk_id.encode("utf-8")
+            dim = 0 if vector is None else len(vector)
+            parts.append(_VLOG_RECORD.pack(op, len(encoded), dim) + encoded)
+            if vector is not None:
+                parts.append(vector.tobytes())
+        record = b"".join(parts)
+
+        self.log_file.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.log_file, "ab") as log:
+            fcntl.flock(log, fcntl.LOCK_EX)
+            try:
+                log.write(record)
+            finally:
+                fcntl.flock(log, fcntl.LOCK_UN)
+        bump_generation(self.log_file.parent, "vectors")
+        self.maybe_compact()
+
+    def _replay(self, records: bytes) -> int:
+        """Apply log records to the in-memory store. Returns records applied.
+
+        A truncated record at the end (interrupted append) is ignored.
+        """
+        applied = 0
+        pos = 0
+        while pos + _VLOG_RECORD.size <= len(records):
+            op, id_len, dim = _VLOG_RECORD.unpack_from(records, pos)
+            start = pos + _VLOG_RECORD.size
+            end = start + id_len + dim * 4
+            if end > len(records):
+                break
+            chunk_id = records[start : start + id_len].decode("utf-8")
+            if op == _VLOG_ADD:
+                self._add(chunk_id, np.frombuffer(records, np.float32, dim, start + id_len))
+            elif op == _VLOG_REMOVE:
+                self._remove(chunk_id)
+            applied += 1
+            pos = end
+        return applied
+
+    def needs_compact(self) -> bool:
+        """Check whether the log outgrew VLOG_COMPACT_RATIO of the base file."""
+        try:
+            log_size = self.log_file.stat().st_size
+        except OSError:
+            return False
+        try:
+            base_size = self.data_file.stat().st_size
+        except OSError:
+            base_size = 0
+        return log_size >= VLOG_COMPACT_MIN_BYTES and log_size > VLOG_COMPACT_RATIO * base_size
+
+    def maybe_compact(self, background: bool = True) -> bool:
+        """
+        Start a compaction if the log is large enough.
+
+        Args:
+            background: Run the compaction in a daemon thread (default: True)
+
+        Returns:
+            True if a compaction was started (or completed, when synchronous)
+        """
+        if not self.needs_compact():
+            return False
+
+        if not background:
+            return self.compact()
+
+        if self._compact_thread is not None and self._compact_thread.is_alive():
+            return False
+        self._compact_thread = threading.Thread(target=self._compact_quietly, daemon=True)
+        self._compact_thread.start()
+        return True
+
+    def wait_for_compact(self, timeout: float | None = None) -> None:
+        """Block until a background compaction started by this store finishes."""
+        if self._compact_thread is not None:
+            self._compact_thread.join(timeout)
+
+    def _compact_quietly(self) -> None:
+        try:
+            self.compact()
+        except Exception:
+            pass  # Compaction is an optimization, never fail the caller
+
+    def compact(self) -> bool:
+        """
+        Fold the log into a new .vec base file and clear the log.
+
+        Holds the log's exclusive lock throughout, so appends wait and
+        loads never see the new base together with the old log.
+
+        Returns:
+            True if the log was compacted
+        """
+        if not NUMPY_AVAILABLE:
+            return False
+
+        with _compact_lock, self._locked_log(fcntl.LOCK_EX) as log:
+            if log is None:
+                return False
+            merged = VectorStore(self.path)
+            merged._load_base()
+            merged._replay(log.read())
+            if len(merged) > 0:
+                merged._write()
+            else:
+                self.data_file.unlink(missing_ok=True)
+            log.truncate(0)
+        bump_generation(self.data_file.parent, "vectors")
+        self._prebuild_indexes()
+        return True
+
+    # -------------------------------------------------------------------------
+    # ANN index / quantized codes (Phase 11)
+    # -------------------------------------------------------------------------
+
+    def ann_index(self) -> IVFIndex | None:
+        """
+        IVF index over the base rows, or None when brute force is used.
+
+        Only with RLM_VECTOR_INDEX=ivf and at least ANN_MIN_ROWS base rows.
+        Read from the .ivf file if it matches the mapped base file, else
+        built (k-means) and persisted.
+        """
+        if ann_mode() != "ivf" or self._base_stat is None or self._n_base < ANN_MIN_ROWS:
+            return None
+        if self._ann is None or self._ann.fingerprint != self._base_stat:
+            index = IVFIndex.load(self.ann_file)
+            if index is None or index.fingerprint != self._base_stat:
+                index = IVFIndex.build(self._base, self._base_inv, self._base_stat)
+                try:
+                    index.save(self.ann_file)
+                except OSError:
+                    pass  # Still usable in memory
+            self._ann = index
+        return self._ann
+
+    def quantized(self) -> QuantizedCodes | None:
+        """
+        Quantized codes of the base rows, or None when scans use the vectors.
+
+        Only with RLM_VECTOR_QUANT=int8|binary and at least ANN_MIN_ROWS
+        base rows. Memory-mapped from the .vq file if it matches the mapped
+        base file, else encoded and persisted.
+        """
+        kind = quant_mode()
+        if kind == "none" or self._base_stat is None or self._n_base < ANN_MIN_ROWS:
+            return None
+        current = self._quant
+        if current is None or current.kind != kind or current.fingerprint != self._base_stat:
+            codes = QuantizedCodes.load(self.quant_file)
+            if codes is None or codes.kind != kind or codes.fingerprint != self._base_stat:
+                codes = QuantizedCodes.build(kind, self._base, self._base_inv, self._base_stat)
+                try:
+                    codes.save(self.quant_file)
+                except OSError:
+                    pass  # Still usable in memory
+            self._quant = codes
+        return self._quant
+
+    def _prebuild_indexes(self) -> None:
+        """Build the index/codes for a freshly written base file, off the query path."""
+        if ann_mode() == "flat" and quant_mode() == "none":
+            return
+        try:
+            fresh = VectorStore(self.path)
+            if fresh.data_file.exists() and fresh._map(fresh.data_file):
+                fresh.ann_index()
+                fresh.quantized()
+        except Exception:
+            pass  # Rebuilt lazily by the next search instead
+
+    # -------------------------------------------------------------------------
+    # Updates / search
+    # -------------------------------------------------------------------------
+
+    def add(self, chunk_id: str, vector) -> None:
+        """Add a vector for a chunk.
+
+        If chunk_id already exists, replaces the vector.
+
+        Args:
+            chunk_id: The chunk identifier
+            vector: 1D numpy array (embedding vector)
+        """
+        if not NUMPY_AVAILABLE:
+            return
+        self._add(chunk_id, vector)
+        self._changed[chunk_id] = True
+
+    def _add(self, chunk_id: str, vector) -> None:
+        vector = np.asarray(vector, dtype=np.float32).ravel()
+        row_of = self._index()
+
+        # Replace: in place for an extra row, base rows are read-only
+        row = row_of.get(chunk_id)
+        if row is not None and row >= self._n_base:
+            self._extra[row - self._n_base] = vector
+            self._extra_inv[row - self._n_base] = _inverse_norms(vector[None])[0]
+            return
+        if row is not None:
+            self._kill(row)
+
+        row = self._allocate(len(vector))
+        self._extra[row - self._n_base] = vector
+        self._extra_inv[row - self._n_base] = _inverse_norms(vector[None])[0]
+        self._valid[row] = True
+        self._ids[row] = chunk_id
+        row_of[chunk_id] = row
+        self._live += 1
+
+    def _allocate(self, dim: int) -> int:
+        """Row for a new vector: a freed extra row, else the next one (grown x2)."""
+        if self._free:
+            return self._free.pop()
+
+        used = self._n_rows - self._n_base
+        capacity = 0 if self._extra is None else len(self._extra)
+        if used == capacity:
+            capacity = max(16, 2 * capacity)
+            extra = np.zeros((capacity, dim), dtype=np.float32)
+            extra_inv = np.zeros(capacity, dtype=np.float32)
+            valid = np.zeros(self._n_base + capacity, dtype=bool)
+            if self._extra is not None:
+                extra[:used] = self._extra
+                extra_inv[:used] = self._extra_inv
+            if self._valid is not None:
+                valid[: self._n_rows] = self._valid[: self._n_rows]
+            self._extra, self._extra_inv, self._valid = extra, extra_inv, valid
+
+        self._ids.append(None)
+        self._n_rows += 1
+        return self._n_rows - 1
+
+    def _kill(self, row: int) -> None:
+        del self._row_of[self._ids[row]]
+        self._ids[row] = None
+        self._valid[row] = False
+        self._live -= 1
+        if row >= self._n_base:
+            self._free.append(row)
 
     def remove(self, chunk_id: str) -> bool:
         """Remove a chunk's vector.
@@ -124,56 +663,176 @@ class VectorStore:
         Returns:
             True if found and removed, False if not found
         """
-        if not NUMPY_AVAILABLE or chunk_id not in self.chunk_ids:
+        if not NUMPY_AVAILABLE:
             return False
+        if not self._remove(chunk_id):
+            return False
+        self._changed[chunk_id] = False
+        return True
 
-        idx = self.chunk_ids.index(chunk_id)
-        self.chunk_ids.pop(idx)
-
-        if self.vectors is not None:
-            self.vectors = np.delete(self.vectors, idx, axis=0)
-            if len(self.chunk_ids) == 0:
-                self.vectors = None
-
+    def _remove(self, chunk_id: str) -> bool:
+        row = self._index().get(chunk_id)
+        if row is None:
+            return False
+        self._kill(row)
         return True
 
-    def search(self, query_vec, top_k: int = 5) -> list[tuple[str, float]]:
+    def _row_vector(self, row: int):
+        """Vector stored at one row (base or extra)."""
+        if row < self._n_base:
+            return np.asarray(self._base[row], dtype=np.float32)
+        return self._extra[row - self._n_base]
+
+    def search(self, query_vec, top_k: int = 5, mask=None) -> list[tuple[str, float]]:
         """Search for nearest vectors using cosine similarity.
 
         Args:
             query_vec: 1D numpy array (query embedding)
             top_k: Maximum number of results
+            mask: Optional bool array aligned with row_ids; only True rows
+                are scored (Phase 11 filter pushdown)
 
         Returns:
             List of (chunk_id, score) tuples, scores in [0, 1], sorted descending
         """
-        if not NUMPY_AVAILABLE or self.vectors is None or len(self.chunk_ids) == 0:
+        if not NUMPY_AVAILABLE:
             return []
+        return self.search_batch(np.asarray(query_vec).reshape(1, -1), top_k, mask)[0]
 
-        query_vec = np.asarray(query_vec, dtype=np.float32).reshape(1, -1)
-
-        # Cosine similarity: dot(q, v) / (||q|| * ||v||)
-        q_norm = np.linalg.norm(query_vec)
-        if q_norm == 0:
-            return []
+    def search_batch(self, query_vecs, top_k: int = 5, mask=None) -> list[list[tuple[str, float]]]:
+        """Search several queries with one matrix multiply (Phase 11).
 
-        v_norms = np.linalg.norm(self.vectors, axis=1)
-        # Avoid division by zero
-        v_norms = np.where(v_norms == 0, 1e-10, v_norms)
+        Args:
+            query_vecs: 2D numpy array, one query embedding per row
+            top_k: Maximum number of results per query
+            mask: Optional bool array aligned with row_ids; only True rows
+                are scored
 
-        similarities = (self.vectors @ query_vec.T).flatten() / (v_norms * q_norm)
+        Returns:
+            One list of (chunk_id, score) tuples per query, as in search()
+        """
+        if not NUMPY_AVAILABLE:
+            return []
 
+        query_vecs = np.asarray(query_vecs, dtype=np.float32)
+        query_vecs = query_vecs.reshape(len(query_vecs), -1)
+        empty = [[] for _ in range(len(query_vecs))]
+        if len(self) == 0:
+            return empty
+
+        # Cosine similarity: dot(q / ||q||, v) * (1 / ||v||), row norms cached
+        q_norms = np.linalg.norm(query_vecs, axis=1)
+        safe_q_norms = np.where(q_norms == 0, 1.0, q_norms)
+        query_units = query_vecs / safe_q_norms[:, None]
+
+        # Phase 11: Only score eligible rows (live, and passing the filter mask)
+        if mask is None and self._live == self._n_rows:
+            eligible = None  # Every row: no gather, score the base memmap in place
+            rows = np.arange(self._n_rows)
+        else:
+            eligible = self._valid[: self._n_rows]
+            if mask is not None:
+                eligible = eligible & np.asarray(mask, dtype=bool)[: self._n_rows]
+            rows = np.flatnonzero(eligible)
+            if len(rows) == 0:
+                return empty
+
+        # IVF: probed lists of base rows plus every extra row, per query.
+        # Selective filters leave few rows, scored exactly below instead.
+        index = self.ann_index() if len(rows) >= ANN_MIN_ROWS else None
+        if index is not None:
+            n_probe = ivf_nprobe()
+            extra_rows = np.arange(self._n_base, self._n_rows)
+            results = []
+            for q, unit in enumerate(query_units):
+                candidates = np.concatenate([index.candidates(unit, n_probe), extra_rows])
+                if eligible is not None:
+                    candidates = candidates[eligible[candidates]]
+                if q_norms[q] == 0 or len(candidates) == 0:
+                    results.append([])
+                    continue
+                similarities = self._similarities(unit[None], candidates)[0]
+                results.append(self._top_k(similarities, candidates, top_k))
+            return results
+
+        # Quantized scan: shortlist base rows on codes, rescore exactly (+ extra rows)
+        codes = self.quantized() if len(rows) >= ANN_MIN_ROWS else None
+        if codes is not None:
+            base_rows = None if eligible is None else rows[rows < self._n_base]
+            extra_rows = rows[rows >= self._n_base]
+            size = max(RESCORE_MIN, top_k * RESCORE_FACTOR[codes.kind])
+            shortlists = codes.shortlist(query_units, base_rows, size)
+            results = []
+            for q, unit in enumerate(query_units):
+                if q_norms[q] == 0:
+                    results.append([])
+                    continue
+                candidates = np.concatenate([shortlists[q], extra_rows])
+                similarities = self._similarities(unit[None], candidates)[0]
+                results.append(self._top_k(similarities, candidates, top_k))
+            return results
+
+        similarities = self._similarities(query_units, None if eligible is None else rows)
+        return [
+            self._top_k(row, rows, top_k) if q_norms[q] != 0 else []
+            for q, row in enumerate(similarities)
+        ]
+
+    def _top_k(self, similarities, rows, top_k: int) -> list[tuple[str, float]]:
+        """Best rows of one query: argpartition (O(n)), then sort only the k selected."""
+        k = min(top_k, len(rows))
+        if k <= 0:
+            return []
+        top_indices = np.argpartition(similarities, len(similarities) - k)[len(similarities) - k :]
+        top_indices = top_indices[np.argsort(similarities[top_indices])[::-1]]
         # Clamp to [0, 1] (negative similarities treated as 0)
-        similarities = np.clip(similarities, 0, 1)
-
-        # Top-k
-        k = min(top_k, len(self.chunk_ids))
-        top_indices = np.argsort(similarities)[::-1][:k]
-
-        results = []
-        for idx in top_indices:
-            score = float(similarities[idx])
-            if score > 0:
-                results.append((self.chunk_ids[idx], score))
+        return [
+            (self._id_at(rows[idx]), min(float(similarities[idx]), 1.0))
+            for idx in top_indices
+            if similarities[idx] > 0
+        ]
+
+    def _similarities(self, query_units, rows):
+        """query_units @ rows.T scaled by cached inverse norms, base then extra rows."""
+        parts = []
+        n_extra = self._n_rows - self._n_base
+        for matrix, inv_norms, start, count in (
+            (self._base, self._base_inv, 0, self._n_base),
+            (self._extra, self._extra_inv, self._n_base, n_extra),
+        ):
+            if count == 0:
+                continue
+            if rows is None:
+                matrix, inv_norms = matrix[:count], inv_norms[:count]
+            else:
+                selected = rows[(rows >= start) & (rows < start + count)] - start
+                if len(selected) == 0:
+                    continue
+                matrix, inv_norms = matrix[selected], inv_norms[selected]
+            parts.append((query_units @ matrix.T) * inv_norms)
+        return parts[0] if len(parts) == 1 else np.concatenate(parts, axis=1)
+
+
+def _inverse_norms(vectors):
+    """1 / L2 norm of each row (0 for zero rows, which then never match)."""
+    norms = np.linalg.norm(vectors, axis=1)
+    return np.divide(1.0, norms, out=np.zeros_like(norms), where=norms > 0)
+
+
+# =============================================================================
+# Writer hooks
+# =============================================================================
+
+
+def unindex_chunk_vector(context_dir: Path, chunk_id: str) -> None:
+    """
+    Remove the vector of an archived or purged chunk (one log record).
 
-        return results
+    Never raises: a leftover vector only costs a semantic-only hit.
+    """
+    try:
+        store = VectorStore(context_dir / DEFAULT_EMBEDDINGS_PATH.name)
+        if store.data_file.exists() or store.log_file.exists():
+            store.append_remove(chunk_id)
+    except Exception:
+        pass
@@ -0,0 +1,101 @@
+"""
+RLM Warm-up - Background loading of the model and search state at startup.
+
+Phase 11 implementation.
+
+The embedding model and the search engine parts are loaded lazily, so the
+first rlm_search or rlm_chunk used to pay for them. Once the client has
+completed the MCP handshake, the server starts a daemon thread that loads
+them; a tool call arriving meanwhile simply waits on the same locks.
+
+Each step is timed and reported by rlm_status:
+
+    import        server module imports (recorded by server.py)
+    model_load    embedding provider (Model2Vec / FastEmbed)
+    index_load    BM25 index + chunk metadata
+    vector_load   vector store (+ IVF index / quantized codes if enabled)
+"""
+
+import threading
+import time
+from pathlib import Path
+
+STARTUP_PHASES = ("import", "model_load", "index_load", "vector_load")
+
+_timings: dict[str, float] = {}  # phase -> milliseconds
+_status = "not started"
+_thread: threading.Thread | None = None
+_lock = threading.Lock()
+
+
+def record_timing(phase: str, seconds: float) -> None:
+    """Store the duration of a startup phase."""
+    _timings[phase] = seconds * 1000
+
+
+def start_warmup(context_dir: Path, chunks_dir: Path | None = None) -> bool:
+    """
+    Load the provider and the search engine in a daemon thread.
+
+    Args:
+        context_dir: Context directory to warm the engine for
+        chunks_dir: Chunks directory (default: context_dir/chunks)
+
+    Returns:
+        True if the thread was started (False if already running/done)
+    """
+    global _thread, _status
+    with _lock:
+        if _thread is not None:
+            return False
+        _status = "running"
+        _thread = threading.Thread(target=_warm, args=(context_dir, chunks_dir), daemon=True)
+        _thread.start()
+        return True
+
+
+def wait_for_warmup(timeout: float | None = None) -> None:
+    """Block until the warm-up thread finishes."""
+    if _thread is not None:
+        _thread.join(timeout)
+
+
+def startup_report() -> dict:
+    """
+    Warm-up status and timings.
+
+    Returns:
+        Dict with status ("not started", "running", "done", "failed")
+        and timings_ms (phase -> ms, only for completed phases)
+    """
+    return {
+        "status": _status,
+        "timings_ms": {phase: _timings[phase] for phase in STARTUP_PHASES if phase in _timings},
+    }
+
+
+def _warm(context_dir: Path, chunks_dir: Path | None) -> None:
+    global _status
+    try:
+        from .embeddings import _get_cached_provider
+        from .engine import get_engine
+
+        t0 = time.perf_counter()
+        _get_cached_provider()
+        record_timing("model_load", time.perf_counter() - t0)
+
+        engine = get_engine(context_dir, chunks_dir)
+        t0 = time.perf_counter()
+        engine.bm25()
+        engine.metastore()
+        record_timing("index_load", time.perf_counter() - t0)
+
+        t0 = time.perf_counter()
+        store = engine.vectors()
+        if store is not None:
+            store.ann_index()
+            store.quantized()
+        record_timing("vector_load", time.perf_counter() - t0)
+        _status = "done"
+    except Exception:
+        _status = "failed"  # Parts load lazily on first use instead
@@ -0,0 +1,68 @@
+"""
+Tests for the backfill checkpoint helpers (Phase 11).
+
+Tests cover:
+- Batching
+- Checkpoint persistence, resume and clear
+- Dry-run checkpoints (no file)
+- Throughput formatting
+"""
+
+from mcp_server.tools.backfill import Checkpoint, Throughput, batched, int_option
+
+
+class TestBatched:
+    def test_slices(self):
+        assert list(batched(list(range(5)), 2)) == [[0, 1], [2, 3], [4]]
+        assert list(batched([], 3)) == []
+
+
+class TestCheckpoint:
+    def test_resume_after_interruption(self, tmp_path):
+        path = tmp_path / ".backfill.json"
+        first = Checkpoint(path)
+        assert not first.load()
+        first.mark(["a", "b"], embedded=2)
+        first.mark(["c"], embedded=0, errors=1)
+
+        resumed = Checkpoint(path)
+        assert resumed.load()
+        assert resumed.done == {"a", "b", "c"}
+        assert resumed.count("embedded") == 2
+        assert resumed.count("errors") == 1
+        assert resumed.count("skipped") == 0
+
+    def test_clear(self, tmp_path):
+        path = tmp_path / ".backfill.json"
+        checkpoint = Checkpoint(path)
+        checkpoint.mark(["a"], embedded=1)
+        checkpoint.clear()
+
+        assert not path.exists()
+        assert checkpoint.done == set() and not Checkpoint(path).load()
+
+    def test_corrupt_file_starts_over(self, tmp_path):
+        path = tmp_path / ".backfill.json"
+        path.write_text('{"done": ["a"')
+        assert not Checkpoint(path).load()
+
+    def test_without_file(self, tmp_path):
+        checkpoint = Checkpoint(None)
+        checkpoint.mark(["a"], embedded=1)
+        checkpoint.clear()
+        assert not checkpoint.load()
+        assert list(tmp_path.iterdir()) == []
+
+
+class TestOptions:
+    def test_int_option(self, monkeypatch):
+        monkeypatch.setattr("sys.argv", ["script", "--batch-size", "16", "--workers"])
+        assert int_option("--batch-size", 64) == 16
+        assert int_option("--workers", 4) == 4
+        assert int_option("--other", 1) == 1
+
+    def test_throughput_format(self):
+        throughput = Throughput()
+        throughput.add(10)
+        assert throughput.format(40).startswith("10/40 chunks (")
+        assert throughput.format().endswith("chunks/s)")
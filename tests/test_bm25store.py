@@ -0,0 +1,300 @@
+"""
+Tests for the persistent BM25 index (Phase 11).
+
+Tests cover:
+- Index + manifest persisted under the context directory
+- Reload without re-tokenizing when nothing changed
+- Reconcile changed chunks/insights into the delta segment
+- Incremental add/remove (delta segment + tombstones) and merges
+- Insight exclusion at query time
+- Filter masks applied before top-k (search() filter pushdown)
+- Batched multi-query scoring matches single queries
+"""
+
+import json
+from unittest.mock import patch
+
+import pytest
+
+pytest.importorskip("bm25s")
+
+
+def _write_chunk(chunks_dir, chunk_id, body, summary="", tags=""):
+    (chunks_dir / f"{chunk_id}.md").write_text(
+        f"---\nsummary: {summary}\ntags: {tags}\n---\n\n{body}\n", encoding="utf-8"
+    )
+
+
+@pytest.fixture
+def store_env(temp_context_dir):
+    """Context dir with two chunks and one insight."""
+    chunks_dir = temp_context_dir / "chunks"
+    _write_chunk(chunks_dir, "2026-01-18_001", "Discussion du business plan", "BP 2026", "bp")
+    _write_chunk(chunks_dir, "2026-01-18_002", "Configuration serveur nginx", "Infra", "vps")
+
+    memory_file = temp_context_dir / "session_memory.json"
+    memory = json.loads(memory_file.read_text())
+    memory["insights"] = [
+        {"id": "abc12345", "content": "Le serveur nginx tourne sur le VPS", "tags": ["infra"]}
+    ]
+    memory_file.write_text(json.dumps(memory))
+
+    return temp_context_dir
+
+
+def _make_store(context_dir):
+    from mcp_server.tools.bm25store import BM25Store
+
+    return BM25Store(context_dir / "chunks", memory_file=context_dir / "session_memory.json")
+
+
+class TestPersistence:
+    def test_build_persists_manifest_and_matrices(self, store_env):
+        store = _make_store(store_env)
+        assert store.build() == 3
+
+        manifest = json.loads((store_env / "bm25_index" / "manifest.json").read_text())
+        assert manifest["main_docs"] == ["2026-01-18_001", "2026-01-18_002", "insight:abc12345"]
+        assert set(manifest["fingerprints"]) == set(manifest["main_docs"])
+        assert manifest["delta"] == [] and manifest["tombstones"] == []
+        assert (store_env / "bm25_index" / manifest["main"] / "params.index.json").exists()
+
+    def test_load_reuses_index_without_tokenizing(self, store_env):
+        _make_store(store_env).build()
+
+        store = _make_store(store_env)
+        with patch("mcp_server.tools.bm25store.tokenize_fr") as tokenize:
+            assert store.load() == 3
+            tokenize.assert_not_called()
+
+        results = store.search(["nginx"], top_k=5)
+        assert {doc_id for doc_id, _ in results} == {"2026-01-18_002", "insight:abc12345"}
+
+    def test_new_chunk_goes_to_delta(self, store_env):
+        _make_store(store_env).build()
+        _write_chunk(store_env / "chunks", "2026-01-19_001", "Nouvelle strategie marketing")
+
+        store = _make_store(store_env)
+        with patch.object(store, "build", wraps=store.build) as build:
+            assert store.load() == 4
+            build.assert_not_called()
+        assert [d["id"] for d in store.manifest["delta"]] == ["2026-01-19_001"]
+        assert store.search(["marketing"], top_k=5)[0][0] == "2026-01-19_001"
+
+    def test_changed_content_hash_is_replaced(self, store_env):
+        index_file = store_env / "index.json"
+        index = json.loads(index_file.read_text())
+        index["chunks"] = [{"id": "2026-01-18_001", "content_hash": "aaa"}]
+        index_file.write_text(json.dumps(index))
+        _make_store(store_env).build()
+
+        index["chunks"][0]["content_hash"] = "bbb"
+        index_file.write_text(json.dumps(index))
+
+        store = _make_store(store_env)
+        assert store.load() == 3
+        assert store.manifest["tombstones"] == ["2026-01-18_001"]
+        assert store.manifest["fingerprints"]["2026-01-18_001"] == "bbb"
+        assert [doc_id for doc_id, _ in store.search(["business"])] == ["2026-01-18_001"]
+
+    def test_new_insight_is_reconciled(self, store_env):
+        _make_store(store_env).build()
+
+        memory_file = store_env / "session_memory.json"
+        memory = json.loads(memory_file.read_text())
+        memory["insights"].append({"id": "def67890", "content": "Decision marketing", "tags": []})
+        memory_file.write_text(json.dumps(memory))
+
+        store = _make_store(store_env)
+        assert store.load() == 4
+
+
+class TestSearch:
+    def test_exclude_insights(self, store_env):
+        store = _make_store(store_env)
+        store.build()
+
+        results = store.search(["nginx"], top_k=5, include_insights=False)
+        assert [doc_id for doc_id, _ in results] == ["2026-01-18_002"]
+
+    def test_mask_applies_before_top_k(self, store_env):
+        import numpy as np
+
+        store = _make_store(store_env)
+        store.build()
+
+        # Without the mask, top-1 would be the chunk (shorter document)
+        mask = np.array([d.startswith("insight:") for d in store.doc_ids])
+        assert store.search(["nginx"], top_k=1, mask=mask)[0][0] == "insight:abc12345"
+
+    def test_unknown_tokens_return_nothing(self, store_env):
+        store = _make_store(store_env)
+        store.build()
+
+        assert store.search(["zzzinconnu"], top_k=5) == []
+
+    def test_empty_corpus(self, temp_context_dir):
+        store = _make_store(temp_context_dir)
+        assert store.load() == 0
+        assert store.search(["nginx"]) == []
+
+    def test_search_batch_matches_single_queries(self, store_env):
+        store = _make_store(store_env)
+        store.build()
+        _write_chunk(store_env / "chunks", "2026-01-19_001", "Plan serveur nginx")
+        store.add_chunk("2026-01-19_001")  # Delta segment takes part too
+
+        queries = [["nginx"], ["business", "plan"], [], ["zzzinconnu"], ["serveur", "nginx"]]
+        batch = store.search_batch(queries, top_k=3)
+        assert batch == [store.search(q, top_k=3) for q in queries]
+
+    def test_rlmsearch_uses_persisted_index(self, store_env):
+        from mcp_server.tools.search import RLMSearch
+
+        builder = RLMSearch(chunks_dir=store_env / "chunks")
+        builder.store._memory_file = store_env / "session_memory.json"
+        builder.build_index()
+
+        searcher = RLMSearch(chunks_dir=store_env / "chunks")
+        searcher.store._memory_file = store_env / "session_memory.json"
+        with patch("mcp_server.tools.bm25store.tokenize_fr") as tokenize:
+            assert searcher.load_index() == 3
+            tokenize.assert_not_called()
+
+        results = searcher.search("business plan")
+        assert results[0]["chunk_id"] == "2026-01-18_001"
+        assert results[0]["summary"] == "BP 2026"
+
+
+class TestSegments:
+    def test_add_chunk_scores_like_full_build(self, store_env):
+        store = _make_store(store_env)
+        store.build()
+        _write_chunk(store_env / "chunks", "2026-01-19_001", "Serveur nginx et certificat nginx")
+        assert store.add_chunk("2026-01-19_001")
+
+        incremental = store.search(["nginx", "serveur"], top_k=5)
+        rebuilt = _make_store(store_env)
+        rebuilt.build()
+        expected = rebuilt.search(["nginx", "serveur"], top_k=5)
+
+        assert [d for d, _ in incremental] == [d for d, _ in expected]
+        # Delta docs use main + delta statistics, like a full rebuild
+        assert incremental[0][1] == pytest.approx(expected[0][1], rel=1e-5)
+
+    def test_remove_tombstones_main_doc(self, store_env):
+        store = _make_store(store_env)
+        store.build()
+        assert store.remove("2026-01-18_002")
+
+        assert store.manifest["tombstones"] == ["2026-01-18_002"]
+        assert [d for d, _ in store.search(["nginx"])] == ["insight:abc12345"]
+        assert "2026-01-18_002" not in store.live_ids
+
+    def test_hooks_are_noop_without_index(self, store_env):
+        from mcp_server.tools.bm25store import index_chunk
+
+        index_chunk(store_env / "chunks", "2026-01-18_001")
+        assert not (store_env / "bm25_index").exists()
+
+    def test_merge_folds_delta_and_drops_tombstones(self, store_env):
+        store = _make_store(store_env)
+        store.build()
+        old_segment = store.manifest["main"]
+        _write_chunk(store_env / "chunks", "2026-01-19_001", "Nouvelle strategie marketing")
+        store.add_chunk("2026-01-19_001")
+        store.remove("2026-01-18_001")
+
+        with patch("mcp_server.tools.bm25store.tokenize_fr") as tokenize:
+            assert store.merge()
+            tokenize.assert_not_called()
+
+        manifest = json.loads((store_env / "bm25_index" / "manifest.json").read_text())
+        assert manifest["main_docs"] == ["2026-01-18_002", "insight:abc12345", "2026-01-19_001"]
+        assert manifest["delta"] == [] and manifest["tombstones"] == []
+        assert not (store_env / "bm25_index" / old_segment).exists()
+        assert store.search(["marketing"])[0][0] == "2026-01-19_001"
+        assert store.search(["business"]) == []
+
+    def test_merge_policy_runs_in_background(self, store_env):
+        from mcp_server.tools import bm25store
+
+        store = _make_store(store_env)
+        store.build()
+        with patch.object(bm25store, "MERGE_MIN_DOCS", 1):
+            _write_chunk(store_env / "chunks", "2026-01-19_001", "Nouvelle strategie marketing")
+            store.add_chunk("2026-01-19_001")
+            store.wait_for_merge()
+
+        manifest = json.loads((store_env / "bm25_index" / "manifest.json").read_text())
+        assert manifest["delta"] == []
+        assert "2026-01-19_001" in manifest["main_docs"]
+
+    def test_remember_and_forget_update_index(self, store_env, monkeypatch):
+        from mcp_server.tools import memory
+
+        monkeypatch.setattr(memory, "MEMORY_FILE", store_env / "session_memory.json")
+        monkeypatch.setattr(memory, "CHUNKS_DIR", store_env / "chunks")
+        memory_file = store_env / "session_memory.json"
+        data = json.loads(memory_file.read_text())
+        data["metadata"] = {}
+        memory_file.write_text(json.dumps(data))
+        _make_store(store_env).build()
+
+        insight_id = memory.remember("Migration vers postgresql", tags=["db"])["id"]
+        manifest = json.loads((store_env / "bm25_index" / "manifest.json").read_text())
+        assert manifest["delta"][0]["id"] == f"insight:{insight_id}"
+
+        memory.forget(insight_id)
+        manifest = json.loads((store_env / "bm25_index" / "manifest.json").read_text())
+        assert manifest["delta"] == []
+        assert f"insight:{insight_id}" not in manifest["fingerprints"]
+
+
+class TestFilterPushdown:
+    @pytest.fixture
+    def filter_env(self, temp_context_dir, monkeypatch):
+        from mcp_server.tools import search as search_mod
+
+        chunks_dir = temp_context_dir / "chunks"
+        entries = []
+        # Many strong matches in project A, one weak match in project B
+        for i in range(12):
+            chunk_id = f"2026-01-18_A_{i:03d}"
+            _write_chunk(chunks_dir, chunk_id, "nginx nginx nginx serveur")
+            entries.append({"id": chunk_id, "project": "A", "created_at": "2026-01-18T10:00:00"})
+        for i in range(2):
+            chunk_id = f"2026-02-01_B_{i:03d}"
+            _write_chunk(chunks_dir, chunk_id, f"Long compte rendu {i} reunion budget nginx")
+            entries.append({"id": chunk_id, "project": "B", "created_at": "2026-02-01T10:00:00"})
+
+        index_file = temp_context_dir / "index.json"
+        index = json.loads(index_file.read_text())
+        index["chunks"] = entries
+        index_file.write_text(json.dumps(index))
+
+        monkeypatch.setattr(search_mod, "CONTEXT_DIR", temp_context_dir)
+        monkeypatch.setattr(search_mod, "CHUNKS_DIR", chunks_dir)
+        return search_mod
+
+    def test_selective_filter_is_exact(self, filter_env):
+        result = filter_env.search("nginx", limit=2, project="B")
+        assert [r["chunk_id"] for r in result["results"]] == [
+            "2026-02-01_B_000",
+            "2026-02-01_B_001",
+        ]
+
+    def test_date_filter_is_exact(self, filter_env):
+        result = filter_env.search("nginx", limit=5, date_from="2026-01-25")
+        assert result["result_count"] == 2
+
+    def test_filter_excludes_insights(self, filter_env):
+        memory_file = filter_env.CONTEXT_DIR / "session_memory.json"
+        memory = json.loads(memory_file.read_text())
+        memory["insights"] = [{"id": "abc12345", "content": "nginx", "tags": []}]
+        memory_file.write_text(json.dumps(memory))
+
+        unfiltered = filter_env.search("nginx", limit=20)
+        assert any(r["chunk_id"] == "insight:abc12345" for r in unfiltered["results"])
+        filtered = filter_env.search("nginx", limit=20, project="A")
+        assert all(r["chunk_id"].startswith("2026-01-18_A") for r in filtered["results"])
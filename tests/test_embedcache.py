@@ -0,0 +1,191 @@
+"""
+Tests for the persistent embedding cache (Phase 11).
+
+Tests cover:
+- Cached texts are not re-embedded, misses are embedded in one batch
+- Persistence across instances and processes (appends picked up)
+- One namespace per model
+- Keys with trailing NUL bytes, torn records
+- chunk() goes through the cache
+- Query embedding LRU: normalized keys, batch duplicates, stats
+"""
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+
+class FakeProvider:
+    MODEL_NAME = "test/fake-model"
+
+    def __init__(self, dim=4):
+        self.calls = []
+        self._dim = dim
+
+    def embed(self, texts):
+        self.calls.append(list(texts))
+        return np.array([[len(t), t.count("a"), 1.0, self._dim] for t in texts], dtype=np.float32)
+
+    def dim(self):
+        return self._dim
+
+
+@pytest.fixture
+def cache_dir(tmp_path, monkeypatch):
+    from mcp_server.tools import embedcache
+
+    monkeypatch.setattr(embedcache, "_caches", {})
+    return tmp_path / "embed_cache"
+
+
+class TestEmbeddingCache:
+    def test_cached_texts_are_not_reembedded(self, cache_dir):
+        from mcp_server.tools.embedcache import cached_embed
+
+        provider = FakeProvider()
+        first = cached_embed(provider, ["alpha", "beta"], cache_dir)
+        second = cached_embed(provider, ["beta", "gamma", "alpha"], cache_dir)
+
+        assert provider.calls == [["alpha", "beta"], ["gamma"]]
+        assert np.array_equal(second[0], first[1])
+        assert np.array_equal(second[2], first[0])
+        assert second.shape == (3, 4)
+
+    def test_persisted_across_instances(self, cache_dir):
+        from mcp_server.tools.embedcache import EmbeddingCache, cached_embed, text_digest
+
+        cached_embed(FakeProvider(), ["alpha"], cache_dir)
+
+        cache = EmbeddingCache(FakeProvider.MODEL_NAME, cache_dir)
+        (vec,) = cache.get_many([text_digest("alpha")])
+        assert vec.tolist() == [5.0, 2.0, 1.0, 4.0]
+        assert cache.stats()["hits"] == 1
+
+    def test_appends_from_other_instances_are_seen(self, cache_dir):
+        from mcp_server.tools.embedcache import EmbeddingCache, text_digest
+
+        reader = EmbeddingCache("m", cache_dir)
+        writer = EmbeddingCache("m", cache_dir)
+        assert reader.get_many([text_digest("x")]) == [None]
+
+        writer.put_many([text_digest("x")], np.ones((1, 3)))
+        assert reader.get_many([text_digest("x")])[0].tolist() == [1.0, 1.0, 1.0]
+
+    def test_models_are_separate(self, cache_dir):
+        from mcp_server.tools.embedcache import cached_embed
+
+        other = FakeProvider(dim=8)
+        other.MODEL_NAME = "test/other-model"
+        cached_embed(FakeProvider(), ["alpha"], cache_dir)
+        cached_embed(other, ["alpha"], cache_dir)
+
+        assert other.calls == [["alpha"]]
+        assert len(list(cache_dir.iterdir())) == 2
+
+    def test_trailing_nul_keys_and_duplicates(self, cache_dir):
+        from mcp_server.tools.embedcache import EmbeddingCache
+
+        cache = EmbeddingCache("m", cache_dir)
+        key = b"k" * 31 + b"\x00"
+        assert cache.put_many([key, key], np.ones((2, 2))) == 1
+        assert EmbeddingCache("m", cache_dir).get_many([key])[0] is not None
+
+    def test_torn_record_is_ignored(self, cache_dir):
+        from mcp_server.tools.embedcache import EmbeddingCache
+
+        cache = EmbeddingCache("m", cache_dir)
+        cache.put_many([b"a" * 32], np.ones((1, 2)))
+        with open(cache.file, "ab") as f:
+            f.write(b"b" * 10)  # Crash mid-append
+
+        cache = EmbeddingCache("m", cache_dir)
+        assert len(cache) == 1
+        cache.put_many([b"c" * 32], np.zeros((1, 2)))
+        assert EmbeddingCache("m", cache_dir).get_many([b"a" * 32, b"c" * 32])[1].tolist() == [
+            0.0,
+            0.0,
+        ]
+
+    def test_disabled(self, cache_dir, monkeypatch):
+        from mcp_server.tools.embedcache import cached_embed
+
+        monkeypatch.setenv("RLM_EMBED_CACHE", "0")
+        provider = FakeProvider()
+        cached_embed(provider, ["alpha"], cache_dir)
+        cached_embed(provider, ["alpha"], cache_dir)
+        assert len(provider.calls) == 2
+        assert not cache_dir.exists()
+
+    def test_chunk_uses_cache(self, temp_context_dir, monkeypatch):
+        pytest.importorskip("bm25s")
+        from mcp_server.tools import embedcache, embeddings, navigation, vecstore
+        from mcp_server.tools.embedqueue import get_embed_queue
+
+        monkeypatch.setattr(embedcache, "_caches", {})
+        monkeypatch.setattr(embedcache, "CONTEXT_DIR", temp_context_dir)
+        monkeypatch.setattr(navigation, "CONTEXT_DIR", temp_context_dir)
+        monkeypatch.setattr(navigation, "CHUNKS_DIR", temp_context_dir / "chunks")
+        monkeypatch.setattr(navigation, "INDEX_FILE", temp_context_dir / "index.json")
+        monkeypatch.setattr(
+            vecstore, "DEFAULT_EMBEDDINGS_PATH", temp_context_dir / "embeddings.npz"
+        )
+        provider = FakeProvider()
+        monkeypatch.setattr(embeddings, "_get_cached_provider", lambda: provider)
+
+        navigation.chunk("Same content about nginx", summary="Infra")
+        get_embed_queue(temp_context_dir).wait_for_worker()
+        embedcache.cached_embed(provider, ["Infra\nSame content about nginx"])
+        assert len(provider.calls) == 1
+
+
+class TestQueryCache:
+    @pytest.fixture
+    def query_cache(self, monkeypatch):
+        from mcp_server.tools import embedcache
+        from mcp_server.tools.cache import LRUCache
+
+        cache = LRUCache(maxsize=4)
+        monkeypatch.setattr(embedcache, "_query_cache", cache)
+        return cache
+
+    def test_rephrased_queries_hit(self, query_cache):
+        from mcp_server.tools.embedcache import embed_queries, query_cache_stats
+
+        provider = FakeProvider()
+        first = embed_queries(provider, ["Serveur  nginx"])
+        second = embed_queries(provider, ["serveur nginx ", "SERVEUR NGINX"])
+
+        assert provider.calls == [["Serveur  nginx"]]  # Embedded as typed
+        assert np.array_equal(second[0], first[0]) and np.array_equal(second[1], first[0])
+        assert query_cache_stats()["hits"] == 2
+
+    def test_batch_duplicates_embedded_once(self, query_cache):
+        from mcp_server.tools.embedcache import embed_queries
+
+        provider = FakeProvider()
+        vectors = embed_queries(provider, ["a", "b", "A"])
+        assert provider.calls == [["a", "b"]]
+        assert vectors.shape == (3, 4)
+        assert np.array_equal(vectors[0], vectors[2])
+
+        vectors[0] = 0.0  # Callers get a copy, the cached vector is untouched
+        assert embed_queries(provider, ["a"])[0].tolist() == [1.0, 1.0, 1.0, 4.0]
+
+    def test_keyed_by_model(self, query_cache):
+        from mcp_server.tools.embedcache import embed_queries
+
+        other = FakeProvider(dim=8)
+        other.MODEL_NAME = "test/other-model"
+        embed_queries(FakeProvider(), ["alpha"])
+        embed_queries(other, ["alpha"])
+        assert other.calls == [["alpha"]]
+
+    def test_disabled(self, monkeypatch):
+        from mcp_server.tools import embedcache
+        from mcp_server.tools.cache import LRUCache
+
+        monkeypatch.setattr(embedcache, "_query_cache", LRUCache(maxsize=0))
+        provider = FakeProvider()
+        embedcache.embed_queries(provider, ["alpha"])
+        embedcache.embed_queries(provider, ["alpha"])
+        assert len(provider.calls) == 2
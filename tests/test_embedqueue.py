@@ -0,0 +1,157 @@
+"""
+Tests for the write-behind embedding queue (Phase 11).
+
+Tests cover:
+- Queued chunks are embedded in micro-batches into the vector log
+- pending_ids() until the vectors land
+- Recovery of a worker's leftover .processing file
+- Deleted chunks, duplicate and torn entries
+- One worker per context directory
+- chunk() returns before the embedding is computed
+- Pending chunks are fused on BM25 alone
+"""
+
+import fcntl
+import threading
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+
+class FakeProvider:
+    MODEL_NAME = "test/queue-model"
+
+    def __init__(self, gate=None):
+        self.calls = []
+        self.gate = gate
+
+    def embed(self, texts):
+        if self.gate is not None:
+            self.gate.wait(5)
+        self.calls.append(list(texts))
+        return np.array([[1.0, len(t), t.count("e")] for t in texts], dtype=np.float32)
+
+    def dim(self):
+        return 3
+
+
+@pytest.fixture
+def queue_env(temp_context_dir, monkeypatch):
+    from mcp_server.tools import embedcache, embeddings
+    from mcp_server.tools.embedqueue import EmbedQueue
+
+    monkeypatch.setattr(embedcache, "_caches", {})
+    provider = FakeProvider()
+    monkeypatch.setattr(embeddings, "_get_cached_provider", lambda: provider)
+    return EmbedQueue(temp_context_dir), provider
+
+
+def _touch_chunk(context_dir, chunk_id):
+    (context_dir / "chunks" / f"{chunk_id}.md").write_text("---\n---\n\nbody\n")
+
+
+def _stored(context_dir):
+    from mcp_server.tools.vecstore import VectorStore
+
+    store = VectorStore(context_dir / "embeddings.npz")
+    store.load()
+    return store
+
+
+class TestEmbedQueue:
+    def test_drain_in_micro_batches(self, queue_env):
+        queue, provider = queue_env
+        for i in range(5):
+            _touch_chunk(queue.context_dir, f"c{i}")
+            queue.enqueue(f"c{i}", f"text {i}", background=False)
+
+        assert provider.calls and queue.pending_ids() == frozenset()
+        assert sorted(_stored(queue.context_dir).chunk_ids) == [f"c{i}" for i in range(5)]
+
+    def test_batch_size(self, queue_env):
+        queue, provider = queue_env
+        for i in range(5):
+            _touch_chunk(queue.context_dir, f"c{i}")
+        queue.queue_file.write_text(
+            "".join(f'{{"chunk_id": "c{i}", "text": "t{i}"}}\n' for i in range(5))
+        )
+
+        assert queue.pending_ids() == {f"c{i}" for i in range(5)}
+        assert queue.drain(batch_size=2) == 5
+        assert [len(call) for call in provider.calls] == [2, 2, 1]
+        assert not queue.processing_file.exists()
+
+    def test_leftover_processing_file_is_recovered(self, queue_env):
+        queue, _ = queue_env
+        _touch_chunk(queue.context_dir, "crashed")
+        queue.processing_file.write_text('{"chunk_id": "crashed", "text": "t"}\n')
+
+        assert queue.pending_ids() == {"crashed"}
+        assert queue.drain() == 1
+        assert _stored(queue.context_dir).chunk_ids == ["crashed"]
+
+    def test_deleted_duplicate_and_torn_entries(self, queue_env):
+        queue, provider = queue_env
+        _touch_chunk(queue.context_dir, "kept")
+        queue.queue_file.write_text(
+            '{"chunk_id": "kept", "text": "old"}\n'
+            '{"chunk_id": "gone", "text": "x"}\n'
+            '{"chunk_id": "kept", "text": "newer"}\n'
+            '{"chunk_id": "tor'
+        )
+
+        assert queue.drain() == 1
+        assert provider.calls == [["newer"]]
+
+    def test_one_worker_per_context(self, queue_env):
+        queue, provider = queue_env
+        _touch_chunk(queue.context_dir, "c1")
+        queue.queue_file.write_text('{"chunk_id": "c1", "text": "t"}\n')
+
+        with open(queue.lock_file, "a") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            assert queue.drain() == 0
+            fcntl.flock(lock, fcntl.LOCK_UN)
+        assert queue.pending_ids() == {"c1"}
+        assert queue.drain() == 1
+
+    def test_chunk_returns_before_embedding(self, temp_context_dir, monkeypatch):
+        pytest.importorskip("bm25s")
+        from mcp_server.tools import embedcache, embeddings, navigation
+        from mcp_server.tools.embedqueue import get_embed_queue
+
+        monkeypatch.setattr(embedcache, "_caches", {})
+        monkeypatch.setattr(navigation, "CONTEXT_DIR", temp_context_dir)
+        monkeypatch.setattr(navigation, "CHUNKS_DIR", temp_context_dir / "chunks")
+        monkeypatch.setattr(navigation, "INDEX_FILE", temp_context_dir / "index.json")
+        gate = threading.Event()
+        provider = FakeProvider(gate)
+        monkeypatch.setattr(embeddings, "_get_cached_provider", lambda: provider)
+
+        result = navigation.chunk("Contenu en attente", summary="Queue")
+        queue = get_embed_queue(temp_context_dir)
+        assert provider.calls == []
+        assert result["chunk_id"] in queue.pending_ids()
+
+        gate.set()
+        queue.wait_for_worker(5)
+        assert provider.calls == [["Queue\nContenu en attente"]]
+        assert _stored(temp_context_dir).chunk_ids == [result["chunk_id"]]
+        assert queue.pending_ids() == frozenset()
+
+
+class TestPendingFusion:
+    def test_pending_chunks_are_bm25_only(self):
+        from mcp_server.tools.search import HYBRID_ALPHA, _fuse
+
+        results = [
+            {"chunk_id": "embedded", "score": 10.0},
+            {"chunk_id": "pending", "score": 10.0},
+            {"chunk_id": "low", "score": 0.0},
+        ]
+        fused = _fuse(results, [("embedded", 0.5)], {}, frozenset({"pending"}))
+        scores = {r["chunk_id"]: r["score"] for r in fused}
+
+        assert scores["pending"] == pytest.approx(1.0)
+        assert scores["embedded"] == pytest.approx((1 - HYBRID_ALPHA) + HYBRID_ALPHA * 0.5)
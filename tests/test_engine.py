@@ -0,0 +1,281 @@
+"""
+Tests for the long-lived search engine and generation counters (Phase 11).
+
+Tests cover:
+- .generation header: bump/read, independent slots
+- Writers (_save_memory, VectorStore.save) bump their slot
+- Engine keeps parts loaded until a generation changes
+- Stat fallback when no header exists
+- LRU cache and the search result cache
+- search_batch matches search() and shares its cache
+- Background warm-up at startup and its timing breakdown
+"""
+
+import json
+from types import SimpleNamespace
+
+import pytest
+
+from mcp_server.tools.fileutil import GENERATION_FILE, bump_generation, read_generation
+
+
+def _write_chunk(chunks_dir, chunk_id, body, summary=""):
+    (chunks_dir / f"{chunk_id}.md").write_text(
+        f"---\nsummary: {summary}\n---\n\n{body}\n", encoding="utf-8"
+    )
+
+
+class TestGeneration:
+    def test_missing_header(self, tmp_path):
+        assert read_generation(tmp_path) is None
+
+    def test_bump_and_read(self, tmp_path):
+        assert bump_generation(tmp_path, "index") == 1
+        assert bump_generation(tmp_path, "index") == 2
+        assert bump_generation(tmp_path, "memory") == 1
+
+        generations = read_generation(tmp_path)
+        assert generations == {"index": 2, "memory": 1, "vectors": 0, "access": 0}
+
+    def test_corrupt_header_is_ignored(self, tmp_path):
+        (tmp_path / GENERATION_FILE).write_bytes(b"garbage")
+        assert read_generation(tmp_path) is None
+        assert bump_generation(tmp_path, "vectors") == 1
+
+    def test_unknown_slot(self, tmp_path):
+        with pytest.raises(ValueError):
+            bump_generation(tmp_path, "nope")
+
+    def test_save_memory_bumps(self, temp_context_dir, monkeypatch):
+        from mcp_server.tools import memory
+
+        monkeypatch.setattr(memory, "MEMORY_FILE", temp_context_dir / "session_memory.json")
+        memory._save_memory({"insights": [], "metadata": {}})
+        assert read_generation(temp_context_dir)["memory"] == 1
+
+    def test_vectorstore_save_bumps(self, tmp_path):
+        np = pytest.importorskip("numpy")
+        from mcp_server.tools.vecstore import VectorStore
+
+        store = VectorStore(tmp_path / "embeddings.npz")
+        store.add("c1", np.array([1.0, 0.0]))
+        store.save()
+        assert read_generation(tmp_path)["vectors"] == 1
+
+
+class TestSearchEngine:
+    @pytest.fixture
+    def engine_env(self, temp_context_dir):
+        pytest.importorskip("bm25s")
+        chunks_dir = temp_context_dir / "chunks"
+        _write_chunk(chunks_dir, "2026-01-18_001", "Configuration serveur nginx", "Infra")
+        index = json.loads((temp_context_dir / "index.json").read_text())
+        index["chunks"] = [{"id": "2026-01-18_001", "project": "RLM"}]
+        (temp_context_dir / "index.json").write_text(json.dumps(index))
+        return temp_context_dir
+
+    def test_parts_stay_loaded(self, engine_env):
+        from mcp_server.tools.engine import get_engine
+
+        engine = get_engine(engine_env)
+        assert engine.bm25().search("nginx")[0]["chunk_id"] == "2026-01-18_001"
+        meta = engine.metastore()
+        assert meta.chunks[meta.row_of["2026-01-18_001"]]["project"] == "RLM"
+
+        engine = get_engine(engine_env)
+        engine.bm25()
+        engine.metastore()
+        assert engine.reloads["bm25"] == 1
+        assert engine.reloads["metastore"] == 1
+
+    def test_generation_bump_reloads_only_affected_parts(self, engine_env):
+        from mcp_server.tools.engine import get_engine
+
+        engine = get_engine(engine_env)
+        engine.bm25()
+        engine.metastore()
+
+        _write_chunk(engine_env / "chunks", "2026-01-19_001", "Strategie marketing")
+        bump_generation(engine_env, "index")
+        bump_generation(engine_env, "vectors")
+
+        engine = get_engine(engine_env)
+        assert engine.bm25().search("marketing")[0]["chunk_id"] == "2026-01-19_001"
+        assert engine.reloads["bm25"] == 2
+        assert engine.reloads["metastore"] == 1  # Not used since the bump
+
+        bump_generation(engine_env, "memory")
+        assert engine.refresh() == {"bm25"}
+
+    def test_stat_fallback_without_header(self, engine_env):
+        from mcp_server.tools.engine import SearchEngine
+
+        engine = SearchEngine(engine_env)
+        engine.refresh()
+        engine.metastore()
+
+        index = json.loads((engine_env / "index.json").read_text())
+        index["chunks"][0]["project"] = "OTHER"
+        (engine_env / "index.json").write_text(json.dumps(index, indent=2))
+
+        assert engine.refresh() == {"metastore"}
+        assert engine.metastore().chunks[0]["project"] == "OTHER"
+
+
+class TestLRUCache:
+    def test_eviction_and_counters(self):
+        from mcp_server.tools.cache import LRUCache
+
+        cache = LRUCache(maxsize=2)
+        cache.put("a", 1)
+        cache.put("b", 2)
+        assert cache.get("a") == 1  # "b" is now least recently used
+        cache.put("c", 3)
+
+        assert cache.get("b") is None
+        assert cache.get("c") == 3
+        assert cache.stats() == {
+            "size": 2,
+            "maxsize": 2,
+            "hits": 2,
+            "misses": 1,
+            "hit_rate": pytest.approx(2 / 3),
+        }
+
+    def test_disabled(self):
+        from mcp_server.tools.cache import LRUCache
+
+        cache = LRUCache(maxsize=0)
+        cache.put("a", 1)
+        assert cache.get("a") is None
+
+    def test_env_size(self, monkeypatch):
+        from mcp_server.tools.cache import env_cache_size
+
+        monkeypatch.setenv("RLM_TEST_CACHE", "16")
+        assert env_cache_size("RLM_TEST_CACHE", 4) == 16
+        monkeypatch.setenv("RLM_TEST_CACHE", "lots")
+        assert env_cache_size("RLM_TEST_CACHE", 4) == 4
+
+
+class TestResultCache:
+    @pytest.fixture
+    def search_mod(self, temp_context_dir, monkeypatch):
+        pytest.importorskip("bm25s")
+        from mcp_server.tools import search as search_mod
+
+        chunks_dir = temp_context_dir / "chunks"
+        _write_chunk(chunks_dir, "2026-01-18_001", "Configuration serveur nginx", "Infra")
+        monkeypatch.setattr(search_mod, "CONTEXT_DIR", temp_context_dir)
+        monkeypatch.setattr(search_mod, "CHUNKS_DIR", chunks_dir)
+        return search_mod
+
+    def test_repeated_query_hits(self, search_mod):
+        first = search_mod.search("serveur nginx")
+        second = search_mod.search("  Serveur   NGINX ")
+
+        assert second["results"] == first["results"]
+        assert second["query"] == "  Serveur   NGINX "
+        assert search_mod.cache_stats()["hits"] == 1
+
+        # Same tokens, different text: embedded differently, not shared
+        search_mod.search("nginx, le serveur")
+        assert search_mod.cache_stats()["hits"] == 1
+
+    def test_queries_without_tokens_bypass(self, search_mod):
+        for _ in range(2):
+            assert search_mod.search("le la les")["status"] == "success"
+        stats = search_mod.cache_stats()
+        assert (stats["hits"], stats["misses"]) == (0, 0)
+
+    def test_cached_results_are_copies(self, search_mod):
+        search_mod.search("nginx")["results"].clear()
+        assert search_mod.search("nginx")["result_count"] == 1
+        assert search_mod.search("nginx")["results"]
+
+    def test_filters_and_limit_are_part_of_key(self, search_mod):
+        search_mod.search("nginx")
+        search_mod.search("nginx", limit=3)
+        search_mod.search("nginx", project="RLM")
+        assert search_mod.cache_stats()["hits"] == 0
+
+    def test_generation_change_invalidates(self, search_mod):
+        assert search_mod.search("marketing")["result_count"] == 0
+
+        context_dir = search_mod.CONTEXT_DIR
+        _write_chunk(context_dir / "chunks", "2026-01-19_001", "Strategie marketing")
+        bump_generation(context_dir, "index")
+
+        assert search_mod.search("marketing")["result_count"] == 1
+        assert search_mod.cache_stats()["hits"] == 0
+
+    def test_search_batch_matches_search(self, search_mod):
+        _write_chunk(search_mod.CHUNKS_DIR, "2026-01-19_001", "Strategie marketing")
+        queries = ["nginx", "marketing", "zzzinconnu"]
+
+        batch = search_mod.search_batch(queries)
+        assert batch["query_count"] == 3
+        assert [r["query"] for r in batch["results"]] == queries
+        assert batch["results"][2]["result_count"] == 0
+
+        assert [search_mod.search(q) for q in queries] == batch["results"]
+        assert search_mod.cache_stats()["hits"] == 3
+
+
+class TestWarmup:
+    @pytest.fixture
+    def warmup(self, temp_context_dir, monkeypatch):
+        pytest.importorskip("bm25s")
+        from mcp_server.tools import embeddings, warmup
+
+        monkeypatch.setattr(warmup, "_thread", None)
+        monkeypatch.setattr(warmup, "_status", "not started")
+        monkeypatch.setattr(warmup, "_timings", {})
+        monkeypatch.setattr(embeddings, "_get_cached_provider", lambda: None)
+        _write_chunk(temp_context_dir / "chunks", "2026-01-18_001", "Configuration nginx")
+        return warmup
+
+    def test_warmup_loads_engine_parts(self, warmup, temp_context_dir):
+        from mcp_server.tools.engine import get_engine
+
+        assert warmup.startup_report()["status"] == "not started"
+        assert warmup.start_warmup(temp_context_dir)
+        assert not warmup.start_warmup(temp_context_dir)  # Once per process
+        warmup.wait_for_warmup(10)
+
+        report = warmup.startup_report()
+        assert report["status"] == "done"
+        assert list(report["timings_ms"]) == ["model_load", "index_load", "vector_load"]
+
+        engine = get_engine(temp_context_dir)
+        engine.bm25()
+        engine.metastore()
+        assert engine.reloads["bm25"] == 1
+        assert engine.reloads["metastore"] == 1
+
+    def test_started_after_handshake(self, monkeypatch):
+        import asyncio
+
+        from mcp.types import InitializedNotification
+
+        from mcp_server import server
+
+        started = []
+        monkeypatch.setattr(server, "start_warmup", lambda context_dir: started.append("warmup"))
+        monkeypatch.setattr(
+            server,
+            "get_embed_queue",
+            lambda: SimpleNamespace(start_worker=lambda: started.append("worker")),
+        )
+
+        handler = server.mcp._mcp_server.notification_handlers[InitializedNotification]
+        asyncio.run(handler(InitializedNotification(method="notifications/initialized")))
+        assert started == ["warmup", "worker"]
+
+    def test_import_timing_comes_first(self, warmup):
+        warmup.record_timing("vector_load", 0.002)
+        warmup.record_timing("import", 0.5)
+        assert list(warmup.startup_report()["timings_ms"].items()) == [
+            ("import", 500.0),
+            ("vector_load", 2.0),
+        ]
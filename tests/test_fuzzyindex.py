@@ -0,0 +1,135 @@
+"""
+Tests for the fuzzy grep q-gram filter (Phase 11).
+
+Tests cover:
+- Same top-k as scoring every line (brute force), across thresholds,
+  pattern lengths, repeated q-grams and short lines
+- Count filter and threshold tightening actually skip lines
+- Every line scored without numpy
+- Merged index cached until a file changes, unchanged chunks reused
+"""
+
+import random
+
+import pytest
+
+fuzz = pytest.importorskip("thefuzz.fuzz")
+
+from mcp_server.tools import fuzzyindex  # noqa: E402
+from mcp_server.tools.fuzzyindex import ChunkLines, FuzzyMatcher, chunk_lines  # noqa: E402
+
+WORDS = [
+    "validation", "validaton", "deploy", "deploiement", "nginx", "engine", "aaaa",
+    "timeout", "config", "configuration", "café", "Straße", "x", "ab", "fix bug",
+]  # fmt: skip
+
+PATTERNS = ["validation", "validaton error", "nginx", "aaaaaa", "cfg", "x", "ab", "déploiement"]
+
+
+def _brute_force(pattern, chunks, threshold, limit):
+    """grep_fuzzy before the filter: score every line, stable sort, truncate."""
+    matches = []
+    for tag, lines in chunks:
+        for number, line in enumerate(lines, 1):
+            text = line.strip()
+            if not text:
+                continue
+            score = fuzz.partial_ratio(pattern.lower(), text.lower())
+            if score >= threshold:
+                matches.append((tag, number, score, text))
+    matches.sort(key=lambda m: m[2], reverse=True)
+    return matches[:limit]
+
+
+def _random_chunks(rng, n_chunks=30):
+    chunks = []
+    for c in range(n_chunks):
+        lines = [
+            " ".join(rng.choices(WORDS, k=rng.randint(0, 6))) + "\n"
+            for _ in range(rng.randint(1, 15))
+        ]
+        chunks.append((f"c{c}", lines))
+    return chunks
+
+
+def _search(pattern, chunks, threshold, limit):
+    matcher = FuzzyMatcher(pattern, threshold, limit, fuzz.partial_ratio)
+    results = matcher.search([(tag, ChunkLines(lines)) for tag, lines in chunks])
+    return results, matcher.scored
+
+
+class TestFilter:
+    @pytest.mark.parametrize("threshold", [0, 40, 60, 80, 90, 100])
+    def test_matches_brute_force(self, threshold):
+        rng = random.Random(threshold)
+        chunks = _random_chunks(rng)
+        for pattern in PATTERNS:
+            for limit in (1, 5, 1000):
+                results, _ = _search(pattern, chunks, threshold, limit)
+                expected = _brute_force(pattern, chunks, threshold, limit)
+                assert results == expected, (pattern, threshold, limit)
+
+    def test_filter_skips_lines(self):
+        rng = random.Random(1)
+        words = ["deploy", "nginx", "timeout", "redis", "cache", "server", "the", "fix"]
+        lines = [" ".join(rng.choices(words, k=8)) + "\n" for _ in range(500)]
+        lines.append("the validaton step failed\n")
+        results, scored = _search("validation", [("c", lines)], 80, 1000)
+
+        assert [number for _, number, _, _ in results] == [501]
+        assert scored < 50
+
+    def test_tightening_stops_at_full_heap(self):
+        lines = ["nginx reload failed\n"] * 3 + ["ngnix reloaded ok\n"] * 300
+        chunks = [("c", lines)]
+        results, scored = _search("nginx reload", chunks, 40, 3)
+
+        assert results == _brute_force("nginx reload", chunks, 40, 3)
+        assert [score for _, _, score, _ in results] == [100, 100, 100]
+        assert scored == 3
+
+    def test_without_numpy_scores_every_line(self, monkeypatch):
+        monkeypatch.setattr(fuzzyindex, "np", None)
+        chunks = _random_chunks(random.Random(7))
+        for limit in (1, 5, 1000):
+            results, scored = _search("validaton error", chunks, 60, limit)
+            assert results == _brute_force("validaton error", chunks, 60, limit)
+            assert scored == sum(1 for _, lines in chunks for line in lines if line.strip())
+
+
+class TestCorpusCache:
+    def test_chunk_lines(self, tmp_path):
+        path = tmp_path / "c.md"
+        path.write_text("---\nid: c\n---\n\nfirst\n")
+        first = chunk_lines(path)
+        assert first.texts == ["first"] and first.numbers == [2]
+        assert chunk_lines(tmp_path / "gone.md") is None
+
+    def test_cached_until_a_file_changes(self, tmp_path, monkeypatch):
+        from mcp_server.tools.cache import LRUCache
+
+        monkeypatch.setattr(fuzzyindex, "_corpus_cache", LRUCache(4))
+        monkeypatch.setattr(fuzzyindex, "_latest_chunks", {})
+        files = []
+        for name in ("a", "b"):
+            path = tmp_path / f"{name}.md"
+            path.write_text(f"---\nid: {name}\n---\n\n{name} body\n")
+            files.append((path, None))
+        files.append((tmp_path / "gone.md", None))
+
+        present, corpus = fuzzyindex.line_corpus(files)
+        assert present == [0, 1]
+        assert [lines.texts for lines in corpus.chunks] == [["a body"], ["b body"]]
+        built = []
+        real_init = ChunkLines.__init__
+        monkeypatch.setattr(
+            ChunkLines, "__init__", lambda self, *a: built.append(1) or real_init(self, *a)
+        )
+        assert fuzzyindex.line_corpus(files)[1] is corpus
+        assert built == []
+
+        files[1][0].write_text("---\nid: b\n---\n\nb rewritten\n")
+        _, rebuilt = fuzzyindex.line_corpus(files)
+        assert rebuilt.chunks[0] is corpus.chunks[0]  # Unchanged file reused
+        assert rebuilt.chunks[1].texts == ["b rewritten"]
+        assert built == [1]
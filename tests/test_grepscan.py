@@ -0,0 +1,149 @@
+"""
+Tests for the grep scanner (Phase 11).
+
+Tests cover:
+- Same matches, line numbers and context as the per-line scan
+  (ASCII and non-ASCII chunks, CRLF, no header, unsafe patterns)
+- Recorded body offsets (valid or stale)
+- Results in file order, truncated at limit
+- No file scheduled once limit matches are in
+"""
+
+import random
+import re
+
+import pytest
+
+from mcp_server.tools import grepscan
+from mcp_server.tools.grepscan import LineMatcher, body_offset, grep_files, scan_file
+
+WORDS = [
+    "nginx", "Redis", "timeout", "---", "café", "ſtate", "KELVIN", "straße",
+    "deploy", "error", "v2.3", "\x1c", "  ", "",
+]  # fmt: skip
+
+PATTERNS = [
+    "nginx",
+    "REDIS|timeout",
+    "^deploy",
+    "error$",
+    "caf.",
+    "state",
+    "kelvin",
+    "e\\s+r",
+    "\\bv2\\.3\\b",
+    "(?<=nginx )redis",
+    "x*",
+    "\\Btate",
+    "o\\n",
+    "[^a-z]+",
+    "\\u00e9",
+]
+
+
+def _reference(pattern, path, context_lines):
+    """The per-line scan grep() used to run (readlines, skip header)."""
+    regex = re.compile(pattern, re.IGNORECASE)
+    with open(path, encoding="utf-8") as f:
+        lines = f.readlines()
+    content_start = 0
+    in_header = False
+    for i, line in enumerate(lines):
+        if line.strip() == "---":
+            if not in_header:
+                in_header = True
+            else:
+                content_start = i + 1
+                break
+    content = lines[content_start:]
+    hits = []
+    for i, line in enumerate(content):
+        if regex.search(line):
+            ctx = "".join(content[max(0, i - context_lines) : i + context_lines + 1])
+            hits.append((i + 1, ctx))
+    return hits
+
+
+def _random_text(rng):
+    lines = [" ".join(rng.choices(WORDS, k=rng.randint(0, 5))) for _ in range(rng.randint(0, 12))]
+    header = "---\nid: x\nsummary: nginx\n---\n\n" if rng.random() < 0.8 else ""
+    newline = "\r\n" if rng.random() < 0.1 else "\n"
+    return header + newline.join(lines) + ("\n" if rng.random() < 0.7 else "")
+
+
+class TestScanFile:
+    def test_matches_per_line_scan(self, tmp_path):
+        rng = random.Random(3)
+        for n in range(80):
+            text = _random_text(rng)
+            path = tmp_path / f"c{n}.md"
+            path.write_bytes(text.encode("utf-8"))
+            for pattern in PATTERNS:
+                for context_lines in (0, 1, 2):
+                    expected = _reference(pattern, path, context_lines)
+                    got = scan_file(path, LineMatcher(pattern), 1000, context_lines)
+                    assert got == expected, (pattern, context_lines, text)
+
+    def test_limit_and_missing_file(self, tmp_path):
+        path = tmp_path / "c.md"
+        path.write_text("---\nid: c\n---\n\nnginx\nnginx\nnginx\n")
+        assert [n for n, _ in scan_file(path, LineMatcher("nginx"), 2, 0)] == [2, 3]
+        assert scan_file(tmp_path / "gone.md", LineMatcher("nginx"), 5, 1) == []
+        (tmp_path / "empty.md").write_text("")
+        assert scan_file(tmp_path / "empty.md", LineMatcher(""), 5, 1) == []
+
+    def test_body_offset(self):
+        assert body_offset("---\nid: x\n---\nbody\n") == len("---\nid: x\n---\n")
+        assert body_offset(b"no header\n") == 0
+
+    @pytest.mark.parametrize("body", ["nginx\nredis\n", "café nginx\nredis\n"])
+    def test_recorded_offset(self, tmp_path, body):
+        path = tmp_path / "c.md"
+        path.write_text(f"---\nid: c\nsummary: nginx\n---\n\n{body}", encoding="utf-8")
+        offset = body_offset(path.read_bytes())
+        expected = scan_file(path, LineMatcher("nginx"), 10, 1)
+        assert [n for n, _ in expected] == [2]
+        for recorded in (offset, offset + 3, None):  # Valid, stale, missing
+            assert scan_file(path, LineMatcher("nginx"), 10, 1, recorded) == expected
+
+
+class TestGrepFiles:
+    @pytest.fixture
+    def chunks(self, tmp_path):
+        entries = []
+        for n in range(40):
+            path = tmp_path / f"c{n:02d}.md"
+            body = "nginx here\n" if n % 3 == 0 else "nothing\n"
+            path.write_text(f"---\nid: c{n}\n---\n\n{body}")
+            entries.append({"id": f"c{n:02d}", "file": path.name})
+        return entries
+
+    @pytest.mark.parametrize("workers", [1, 4])
+    def test_file_order_and_limit(self, chunks, tmp_path, workers, monkeypatch):
+        monkeypatch.setattr(grepscan, "GREP_WORKERS", workers)
+        hits = grep_files(chunks, tmp_path, LineMatcher("nginx"), limit=5, context_lines=0)
+        assert [c["id"] for c, _, _ in hits] == ["c00", "c03", "c06", "c09", "c12"]
+        assert all(line == 2 and ctx == "nginx here\n" for _, line, ctx in hits)
+
+    @pytest.mark.parametrize("workers", [1, 2])
+    def test_stops_consuming_at_limit(self, chunks, tmp_path, workers, monkeypatch):
+        monkeypatch.setattr(grepscan, "GREP_WORKERS", workers)
+        monkeypatch.setattr(grepscan, "GREP_PREFETCH", 1)
+        scanned, consumed = [], []
+        real_scan = grepscan.scan_file
+
+        def counting_scan(path, *args):
+            scanned.append(path)
+            return real_scan(path, *args)
+
+        def lazy_chunks():
+            for chunk in chunks:
+                consumed.append(chunk["id"])
+                yield chunk
+
+        monkeypatch.setattr(grepscan, "scan_file", counting_scan)
+        hits = grep_files(lazy_chunks(), tmp_path, LineMatcher("nginx"), limit=1)
+
+        assert [c["id"] for c, _, _ in hits] == ["c00"]
+        assert len(scanned) <= 3
+        assert len(consumed) <= 3
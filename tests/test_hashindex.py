@@ -0,0 +1,144 @@
+"""
+Tests for the content hash index (Phase 11).
+
+Tests cover:
+- Log rebuilt from index.json and archive_index.json
+- Records appended by another process, compaction
+- Hits on deleted chunks ignored
+- chunk() duplicates (active and archived) without scanning the index,
+  purge forgets the hash
+"""
+
+import json
+
+import pytest
+
+from mcp_server.tools import hashindex
+from mcp_server.tools.hashindex import HASH_LOG_FILE, HashIndex
+
+
+def _touch_chunk(context_dir, chunk_id, archived=False):
+    if archived:
+        path = context_dir / "archive" / f"{chunk_id}.md.gz"
+    else:
+        path = context_dir / "chunks" / f"{chunk_id}.md"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(b"")
+
+
+class TestHashIndex:
+    def test_rebuilt_from_indexes(self, temp_context_dir):
+        (temp_context_dir / "index.json").write_text(
+            json.dumps({"chunks": [{"id": "a_001", "content_hash": "h1", "summary": "first"}]})
+        )
+        (temp_context_dir / "archive_index.json").write_text(
+            json.dumps({"archives": [{"id": "b_001", "content_hash": "h2", "summary": "old"}]})
+        )
+        _touch_chunk(temp_context_dir, "a_001")
+        _touch_chunk(temp_context_dir, "b_001", archived=True)
+
+        index = HashIndex(temp_context_dir)
+        assert index.lookup("h1") == {"id": "a_001", "summary": "first", "archived": False}
+        assert index.lookup("h2") == {"id": "b_001", "summary": "old", "archived": True}
+        assert index.lookup("h3") is None
+        assert (temp_context_dir / HASH_LOG_FILE).exists()
+
+    def test_deleted_chunk_ignored(self, temp_context_dir):
+        index = HashIndex(temp_context_dir)
+        index.add("h1", "a_001", "first")
+        assert index.lookup("h1") is None  # No chunk file anywhere
+        _touch_chunk(temp_context_dir, "a_001")
+        assert index.lookup("h1")["id"] == "a_001"
+
+    def test_appends_seen_by_other_instance(self, temp_context_dir):
+        writer, reader = HashIndex(temp_context_dir), HashIndex(temp_context_dir)
+        for n in range(3):
+            _touch_chunk(temp_context_dir, f"a_00{n}")
+        assert reader.lookup("h0") is None
+
+        writer.add("h0", "a_000")
+        writer.add("h1", "a_001")
+        assert reader.lookup("h0")["id"] == "a_000"
+
+        writer.remove("h1", "a_002")  # Maps to another chunk: kept
+        writer.remove("h0", "a_000")
+        assert reader.lookup("h0") is None
+        assert reader.lookup("h1")["id"] == "a_001"
+
+        with open(temp_context_dir / HASH_LOG_FILE, "ab") as log:
+            log.write(b'{"op": "add", "hash": "h2", "id": "a_0')  # Torn record
+        assert reader.lookup("h2") is None
+        with open(temp_context_dir / HASH_LOG_FILE, "ab") as log:
+            log.write(b'02"}\n')
+        assert reader.lookup("h2")["id"] == "a_002"
+
+    def test_compaction(self, temp_context_dir, monkeypatch):
+        monkeypatch.setattr(hashindex, "HASH_LOG_COMPACT_MIN", 10)
+        writer, reader = HashIndex(temp_context_dir), HashIndex(temp_context_dir)
+        _touch_chunk(temp_context_dir, "a_001")
+        reader.refresh()
+        for n in range(10):
+            writer.add(f"h{n}", "a_001")
+            writer.remove(f"h{n}", "a_001")
+        writer.add("h_live", "a_001")
+
+        lines = (temp_context_dir / HASH_LOG_FILE).read_text().splitlines()
+        assert len(lines) < 10  # Compacted at least once
+        assert reader.lookup("h_live")["id"] == "a_001"
+        assert reader.lookup("h3") is None
+        assert len(reader) == len(writer) == 1
+
+
+class TestChunkDuplicates:
+    @pytest.fixture
+    def nav(self, temp_context_dir, monkeypatch):
+        from mcp_server.tools import navigation, retention, sessions
+
+        monkeypatch.setattr(navigation, "CONTEXT_DIR", temp_context_dir)
+        monkeypatch.setattr(navigation, "CHUNKS_DIR", temp_context_dir / "chunks")
+        monkeypatch.setattr(navigation, "INDEX_FILE", temp_context_dir / "index.json")
+        monkeypatch.setattr(sessions, "CONTEXT_DIR", temp_context_dir)
+        monkeypatch.setattr(sessions, "SESSIONS_FILE", temp_context_dir / "sessions.json")
+        monkeypatch.setattr(retention, "CONTEXT_DIR", temp_context_dir)
+        monkeypatch.setattr(retention, "CHUNKS_DIR", temp_context_dir / "chunks")
+        monkeypatch.setattr(retention, "ARCHIVE_DIR", temp_context_dir / "archive")
+        monkeypatch.setattr(retention, "INDEX_FILE", temp_context_dir / "index.json")
+        monkeypatch.setattr(
+            retention, "ARCHIVE_INDEX_FILE", temp_context_dir / "archive_index.json"
+        )
+        monkeypatch.setattr(retention, "PURGE_LOG_FILE", temp_context_dir / "purge_log.json")
+        return navigation
+
+    def test_index_loaded_once(self, nav, monkeypatch):
+        first = nav.chunk("Deploy notes for nginx", summary="deploy")
+        loads = []
+        real_load = nav._load_index
+
+        def counting_load():
+            loads.append(1)
+            return real_load()
+
+        monkeypatch.setattr(nav, "_load_index", counting_load)
+        result = nav.chunk("  deploy NOTES for nginx ", summary="again")
+
+        assert result["status"] == "duplicate"
+        assert result["existing_chunk_id"] == first["chunk_id"]
+        assert result["existing_summary"] == "deploy"
+        assert loads == []
+
+        assert nav.chunk("Other content", summary="other")["status"] == "created"
+        assert len(loads) == 1
+
+    def test_archived_and_purged(self, nav):
+        from mcp_server.tools import retention
+
+        chunk_id = nav.chunk("Old decision log", summary="old")["chunk_id"]
+        assert retention.archive_chunk(chunk_id)["status"] == "archived"
+
+        result = nav.chunk("Old decision log")
+        assert result["status"] == "duplicate"
+        assert result["existing_chunk_id"] == chunk_id
+        assert result["archived"] is True
+
+        assert retention.purge_chunk(chunk_id)["status"] == "purged"
+        assert nav.chunk("Old decision log")["status"] == "created"
@@ -0,0 +1,115 @@
+"""
+Tests for body offsets and line-offset sidecars (Phase 11).
+
+Tests cover:
+- Ranged reads match slices of the full read (strides, negatives, bounds)
+- Stale or missing sidecars fall back to a full read
+- CRLF chunks (no sidecar, translated line ends)
+- chunk() records body_offset and writes the sidecar; peek reads a range
+"""
+
+import pytest
+
+from mcp_server.tools.lineindex import (
+    LINE_INDEX_STRIDE,
+    body_offset,
+    line_index_path,
+    read_body_lines,
+    read_line_range,
+    valid_body_offset,
+    write_line_index,
+)
+
+
+def _write_chunk(path, n_lines, trailing_newline=True):
+    body = "\n".join(f"line {i} é" for i in range(1, n_lines))
+    text = f"---\nid: x\nsummary: test\n---\n\n{body}" + ("\n" if trailing_newline else "")
+    path.write_bytes(text.encode("utf-8"))
+    return path
+
+
+class TestRanges:
+    @pytest.mark.parametrize("n_lines", [1, 2, LINE_INDEX_STRIDE, 3 * LINE_INDEX_STRIDE + 5])
+    @pytest.mark.parametrize("trailing_newline", [True, False])
+    def test_ranges_match_full_read(self, tmp_path, n_lines, trailing_newline):
+        path = _write_chunk(tmp_path / "c.md", n_lines, trailing_newline)
+        assert write_line_index(path)
+        full = read_body_lines(path)
+
+        bounds = [None, -3, 0, 1, 5, LINE_INDEX_STRIDE - 1, LINE_INDEX_STRIDE, n_lines, 1000]
+        for start in [b for b in bounds if b is not None]:
+            for end in bounds:
+                assert read_line_range(path, start, end) == (full[start:end], len(full)), (
+                    start,
+                    end,
+                )
+
+    def test_stale_or_missing_sidecar(self, tmp_path):
+        path = _write_chunk(tmp_path / "c.md", 50)
+        assert read_line_range(path, 0, 5) is None
+
+        write_line_index(path)
+        _write_chunk(path, 80)  # Rewritten: size differs
+        assert read_line_range(path, 0, 5) is None
+
+        line_index_path(path).write_bytes(b"garbage")
+        assert read_line_range(path, 0, 5) is None
+
+    def test_crlf_chunk_has_no_sidecar(self, tmp_path):
+        path = tmp_path / "c.md"
+        path.write_bytes(b"---\r\nid: x\r\n---\r\n\r\na\r\nb\rc\n")
+        assert not write_line_index(path)
+        assert read_body_lines(path) == ["\n", "a\n", "b\n", "c\n"]
+
+
+class TestBodyOffset:
+    def test_recorded_offset_checked(self):
+        data = b"---\nid: x\n---\n\nbody\n"
+        offset = body_offset(data)
+        assert data[offset:] == b"\nbody\n"
+        assert valid_body_offset(data, offset)
+        assert not valid_body_offset(data, offset + 1)
+        assert not valid_body_offset(data, None)
+
+    def test_stale_offset_ignored(self, tmp_path):
+        path = _write_chunk(tmp_path / "c.md", 5)
+        assert read_body_lines(path, offset=7) == read_body_lines(path)
+
+
+class TestChunkAndPeek:
+    @pytest.fixture
+    def nav(self, temp_context_dir, monkeypatch):
+        from mcp_server.tools import navigation, sessions
+
+        monkeypatch.setattr(navigation, "CONTEXT_DIR", temp_context_dir)
+        monkeypatch.setattr(navigation, "CHUNKS_DIR", temp_context_dir / "chunks")
+        monkeypatch.setattr(navigation, "INDEX_FILE", temp_context_dir / "index.json")
+        monkeypatch.setattr(sessions, "CONTEXT_DIR", temp_context_dir)
+        monkeypatch.setattr(sessions, "SESSIONS_FILE", temp_context_dir / "sessions.json")
+        return navigation
+
+    def test_chunk_records_offset_and_peek_is_ranged(self, nav, temp_context_dir, monkeypatch):
+        content = "\n".join(f"line {i}" for i in range(200))
+        chunk_id = nav.chunk(content, summary="numbered lines")["chunk_id"]
+        chunk_file = temp_context_dir / "chunks" / f"{chunk_id}.md"
+        entry = nav._load_index()["chunks"][-1]
+
+        assert chunk_file.read_bytes()[entry["body_offset"] :].startswith(b"\nline 0\n")
+        assert line_index_path(chunk_file).exists()
+
+        def no_full_read(*args, **kwargs):
+            raise AssertionError("full read")
+
+        monkeypatch.setattr(nav, "read_body_lines", no_full_read)
+        result = nav.peek(chunk_id, 101, 103)
+        assert result["content"] == "line 100\nline 101\n"
+        assert result["total_lines"] == 201
+        assert result["showing_lines"] == "101-103"
+
+    def test_peek_rebuilds_missing_sidecar(self, nav, temp_context_dir):
+        chunk_id = nav.chunk("alpha\nbeta\ngamma", summary="greek")["chunk_id"]
+        chunk_file = temp_context_dir / "chunks" / f"{chunk_id}.md"
+        line_index_path(chunk_file).unlink()
+
+        assert nav.peek(chunk_id, 1, 3)["content"] == "alpha\nbeta\n"
+        assert read_line_range(chunk_file, 1, 3) == (["alpha\n", "beta\n"], 4)
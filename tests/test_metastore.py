@@ -0,0 +1,122 @@
+"""
+Tests for the columnar metadata store (Phase 11).
+
+Tests cover:
+- Bitmap helpers
+- Filter bitmaps match the per-chunk filters they replace
+- Ordering and id lookups
+- list_chunks sees access count updates
+"""
+
+import json
+import random
+
+import pytest
+
+from mcp_server.tools.metastore import MetaStore, bitmap_rows, to_bitmap
+from mcp_server.tools.navigation import _chunk_in_date_range, _entity_matches
+
+
+def _random_index(n=200, seed=7):
+    rng = random.Random(seed)
+    chunks = []
+    for i in range(n):
+        day = rng.randint(1, 28)
+        chunk = {
+            "id": f"2026-01-{day:02d}_{i:03d}",
+            "project": rng.choice(["RLM", "WEB", None, ""]),
+            "domain": rng.choice(["bp", "infra", None]),
+            "chunk_type": rng.choice(["snapshot", "session", "debug"]),
+            "created_at": rng.choice([f"2026-01-{day:02d}T10:00:00", "", None]),
+            "access_count": rng.randint(0, 5),
+        }
+        if chunk["created_at"] is None:
+            del chunk["created_at"]
+        if rng.random() < 0.5:
+            chunk["entities"] = {
+                "files": rng.sample(["server.py", "search.py", "navigation.py"], 2),
+                "modules": rng.sample(["bm25s", "numpy", "thefuzz"], 1),
+            }
+        chunks.append(chunk)
+    return {"version": "2.1.0", "chunks": chunks}
+
+
+class TestBitmaps:
+    def test_roundtrip(self):
+        rows = [0, 3, 8, 63, 64, 199]
+        assert bitmap_rows(to_bitmap(rows, 200)) == rows
+
+    def test_empty(self):
+        assert bitmap_rows(0) == []
+        assert to_bitmap([], 0) == 0
+
+
+class TestFilters:
+    @pytest.mark.parametrize(
+        "filters",
+        [
+            {},
+            {"project": "RLM"},
+            {"project": "RLM", "domain": "infra"},
+            {"date_from": "2026-01-10"},
+            {"date_to": "2026-01-10"},
+            {"date_from": "2026-01-05", "date_to": "2026-01-20"},
+            {"entity": "SEARCH"},
+            {"entity": "py", "project": "WEB", "date_from": "2026-01-15"},
+            {"project": "missing"},
+        ],
+    )
+    def test_mask_matches_per_chunk_filters(self, filters):
+        index = _random_index()
+        meta = MetaStore(index)
+
+        expected = [
+            c["id"]
+            for c in index["chunks"]
+            if _chunk_in_date_range(c, filters.get("date_from"), filters.get("date_to"))
+            and (not filters.get("project") or c.get("project") == filters["project"])
+            and (not filters.get("domain") or c.get("domain") == filters["domain"])
+            and (not filters.get("entity") or _entity_matches(c, filters["entity"]))
+        ]
+        assert [c["id"] for c in meta.select(meta.mask(**filters))] == expected
+
+    def test_chunk_type(self):
+        index = _random_index()
+        meta = MetaStore(index)
+        selected = meta.select(meta.mask(chunk_type="debug"))
+        assert selected == [c for c in index["chunks"] if c["chunk_type"] == "debug"]
+
+
+class TestOrdering:
+    def test_newest_first_is_stable(self):
+        index = _random_index()
+        meta = MetaStore(index)
+        expected = sorted(index["chunks"], key=lambda x: x.get("created_at", ""), reverse=True)
+        assert meta.newest_first() == expected
+        assert meta.newest_first(5) == expected[:5]
+
+    def test_positions(self):
+        meta = MetaStore({"chunks": [{"id": "a"}, {"id": "b"}]})
+        doc_ids = ["b", "insight:x", "a"]
+        assert list(meta.positions(doc_ids)) == [1, -1, 0]
+        assert meta.positions(doc_ids) is meta.positions(doc_ids)
+
+    def test_v1_index_total_chunks(self):
+        meta = MetaStore({"chunks": [{"id": "a"}]})
+        assert meta.info["total_chunks"] == 1
+
+
+def test_list_chunks_sees_access_updates(temp_context_dir, monkeypatch):
+    from mcp_server.tools import navigation
+
+    monkeypatch.setattr(navigation, "CONTEXT_DIR", temp_context_dir)
+    monkeypatch.setattr(navigation, "CHUNKS_DIR", temp_context_dir / "chunks")
+    monkeypatch.setattr(navigation, "INDEX_FILE", temp_context_dir / "index.json")
+
+    index = json.loads((temp_context_dir / "index.json").read_text())
+    index["chunks"] = [{"id": "2026-01-18_001", "created_at": "2026-01-18T10:00:00"}]
+    (temp_context_dir / "index.json").write_text(json.dumps(index))
+
+    assert navigation.list_chunks()["chunks"][0]["access_count"] == 0
+    navigation._increment_access("2026-01-18_001")
+    assert navigation.list_chunks()["chunks"][0]["access_count"] == 1
@@ -0,0 +1,178 @@
+"""
+Tests for the passage index (Phase 11).
+
+Tests cover:
+- Line windows and passage ids
+- Line numbers match rlm_peek's
+- Best window per chunk for a query
+- Embed queue worker writes passages when enabled
+- Search results tagged with their best line range
+"""
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+
+class KeywordProvider:
+    """One dimension per keyword: a window mentioning nginx points at nginx."""
+
+    MODEL_NAME = "test/keyword-model"
+    KEYWORDS = ("nginx", "postgres", "redis")
+
+    def embed(self, texts):
+        return np.array(
+            [[t.lower().count(k) for k in self.KEYWORDS] + [0.01] for t in texts],
+            dtype=np.float32,
+        )
+
+    def dim(self):
+        return len(self.KEYWORDS) + 1
+
+
+def _write_chunk(context_dir, chunk_id, lines):
+    body = "".join(f"{line}\n" for line in lines)
+    (context_dir / "chunks" / f"{chunk_id}.md").write_text(
+        f"---\nid: {chunk_id}\nsummary: test\n---\n\n{body}", encoding="utf-8"
+    )
+
+
+def _body(topic_at: dict[int, str], n_lines: int = 100) -> list[str]:
+    """n_lines body lines as peek numbers them (line 0 is the blank after the header)."""
+    return [topic_at.get(i, f"filler line {i}") for i in range(1, n_lines)]
+
+
+@pytest.fixture
+def passage_env(temp_context_dir, monkeypatch):
+    from mcp_server.tools import embedcache, embeddings
+    from mcp_server.tools.cache import LRUCache
+
+    monkeypatch.setattr(embedcache, "_caches", {})
+    monkeypatch.setattr(embedcache, "_query_cache", LRUCache(maxsize=16))
+    provider = KeywordProvider()
+    monkeypatch.setattr(embeddings, "_get_cached_provider", lambda: provider)
+    return temp_context_dir, provider
+
+
+def _passage_index(context_dir):
+    from mcp_server.tools.passages import PASSAGES_FILE, PassageIndex
+    from mcp_server.tools.vecstore import VectorStore
+
+    store = VectorStore(context_dir / PASSAGES_FILE)
+    assert store.load()
+    return PassageIndex(store)
+
+
+class TestWindows:
+    def test_windows_overlap_and_cover(self):
+        from mcp_server.tools.passages import passage_windows
+
+        assert passage_windows(100, size=40, overlap=10) == [(0, 40), (30, 70), (60, 100)]
+        assert passage_windows(10, size=40, overlap=10) == [(0, 10)]
+        assert passage_windows(0) == []
+
+    def test_passage_id_roundtrip(self):
+        from mcp_server.tools.passages import parse_passage_id, passage_id
+
+        pid = passage_id("2026-01-18_RLM_001_r&d", 30, 70)
+        assert pid == "2026-01-18_RLM_001_r&d#30-70"
+        assert parse_passage_id(pid) == ("2026-01-18_RLM_001_r&d", 30, 70)
+
+    def test_line_numbers_match_peek(self, temp_context_dir, monkeypatch):
+        from mcp_server.tools import navigation
+        from mcp_server.tools.passages import chunk_passages, read_body_lines
+
+        monkeypatch.setattr(navigation, "CHUNKS_DIR", temp_context_dir / "chunks")
+        monkeypatch.setattr(navigation, "INDEX_FILE", temp_context_dir / "index.json")
+        _write_chunk(temp_context_dir, "2026-01-18_001", _body({50: "nginx config"}))
+
+        lines = read_body_lines(temp_context_dir / "chunks" / "2026-01-18_001.md")
+        pid, text = chunk_passages("2026-01-18_001", lines)[1]
+        assert pid == "2026-01-18_001#30-70"
+        assert navigation.peek("2026-01-18_001", 30, 70)["content"] == text
+
+
+class TestPassageIndex:
+    def test_best_window_per_chunk(self, passage_env):
+        from mcp_server.tools.passages import index_passages
+
+        context_dir, provider = passage_env
+        _write_chunk(context_dir, "c1", _body({5: "nginx reverse proxy", 85: "postgres tuning"}))
+        _write_chunk(context_dir, "c2", _body({45: "postgres vacuum"}))
+
+        assert index_passages(["c1", "c2", "missing"], provider, context_dir) == 6
+        index = _passage_index(context_dir)
+
+        postgres = provider.embed(["postgres"])[0]
+        best = index.best(postgres, ["c1", "c2"])
+        assert (best["c1"]["start"], best["c1"]["end"]) == (60, 100)
+        assert (best["c2"]["start"], best["c2"]["end"]) == (30, 70)
+        assert index.best(postgres, ["c2"]).keys() == {"c2"}
+        assert index.best(postgres, ["unknown"]) == {}
+
+    def test_worker_writes_passages_when_enabled(self, passage_env, monkeypatch):
+        from mcp_server.tools.embedqueue import EmbedQueue
+
+        context_dir, _ = passage_env
+        _write_chunk(context_dir, "c1", _body({}, n_lines=50))
+        queue = EmbedQueue(context_dir)
+
+        queue.enqueue("c1", "text", background=False)
+        assert not (context_dir / "passages.vlog").exists()
+
+        monkeypatch.setenv("RLM_PASSAGE_INDEX", "1")
+        queue.enqueue("c1", "text", background=False)
+        assert sorted(_passage_index(context_dir).store.chunk_ids) == ["c1#0-40", "c1#30-50"]
+
+    def test_stale_passages_removed(self, passage_env, monkeypatch):
+        from mcp_server.tools import retention
+        from mcp_server.tools.passages import index_passages
+
+        context_dir, provider = passage_env
+        monkeypatch.setattr(retention, "CHUNKS_DIR", context_dir / "chunks")
+        monkeypatch.setattr(retention, "ARCHIVE_DIR", context_dir / "archive")
+        monkeypatch.setattr(retention, "INDEX_FILE", context_dir / "index.json")
+        monkeypatch.setattr(retention, "ARCHIVE_INDEX_FILE", context_dir / "archive_index.json")
+        (context_dir / "index.json").write_text(
+            '{"chunks": [{"id": "c1", "file": "chunks/c1.md"}, {"id": "c2", "file": "chunks/c2.md"}]}'
+        )
+        _write_chunk(context_dir, "c1", _body({}))
+        _write_chunk(context_dir, "c2", _body({}, n_lines=50))
+        index_passages(["c1", "c2"], provider, context_dir)
+
+        _write_chunk(context_dir, "c1", _body({}, n_lines=50))  # Rewritten, shorter
+        index_passages(["c1"], provider, context_dir)
+        assert sorted(_passage_index(context_dir).store.chunk_ids) == [
+            "c1#0-40",
+            "c1#30-50",
+            "c2#0-40",
+            "c2#30-50",
+        ]
+
+        assert retention.archive_chunk("c2")["status"] == "archived"
+        assert sorted(_passage_index(context_dir).store.chunk_ids) == ["c1#0-40", "c1#30-50"]
+
+
+class TestSearchPassages:
+    def test_results_tagged_with_line_range(self, passage_env, monkeypatch):
+        pytest.importorskip("bm25s")
+        from mcp_server.tools import search
+        from mcp_server.tools.embedqueue import EmbedQueue
+
+        context_dir, _ = passage_env
+        monkeypatch.setattr(search, "CONTEXT_DIR", context_dir)
+        monkeypatch.setattr(search, "CHUNKS_DIR", context_dir / "chunks")
+        monkeypatch.setenv("RLM_PASSAGE_INDEX", "1")
+        _write_chunk(context_dir, "c1", _body({75: "redis eviction policy"}))
+        queue = EmbedQueue(context_dir)
+        queue.enqueue("c1", "redis cache", background=False)
+
+        result = search.search("redis eviction")
+        (hit,) = [r for r in result["results"] if r["chunk_id"] == "c1"]
+        assert (hit["passage"]["start"], hit["passage"]["end"]) == (60, 100)
+
+    def test_passage_hint(self):
+        from mcp_server.server import _passage_hint
+
+        assert _passage_hint({"chunk_id": "c1"}) == ""
+        assert "60-100" in _passage_hint({"passage": {"start": 60, "end": 100, "score": 0.9}})
@@ -508,3 +508,36 @@ def test_index_updated_after_restore(retention_context, old_chunks):
     archive_index = _load_archive_index()
     archive_ids = [a["id"] for a in archive_index["archives"]]
     assert "old_unused_001" not in archive_ids
+
+
+def test_archive_removes_vector_and_restore_requeues(retention_context, old_chunks, monkeypatch):
+    """Archived chunks leave the vector store; restore queues them for embedding."""
+    np = pytest.importorskip("numpy")
+    from mcp_server.tools.embedqueue import EmbedQueue
+    from mcp_server.tools.retention import archive_chunk, purge_chunk, restore_chunk
+    from mcp_server.tools.vecstore import VectorStore
+
+    monkeypatch.setattr(EmbedQueue, "start_worker", lambda self, background=True: False)
+    store = VectorStore(retention_context / "embeddings.npz")
+    store.append("old_unused_001", np.array([1.0, 0.0]))
+    store.append("old_accessed_002", np.array([0.0, 1.0]))
+
+    archive_chunk("old_unused_001")
+    reader = VectorStore(retention_context / "embeddings.npz")
+    reader.load()
+    assert reader.chunk_ids == ["old_accessed_002"]
+
+    restore_chunk("old_unused_001")
+    queue_file = retention_context / "embed_queue.jsonl"
+    queued = [json.loads(line) for line in queue_file.read_text().splitlines()]
+    assert [e["chunk_id"] for e in queued] == ["old_unused_001"]
+    assert (
+        queued[0]["text"]
+        == "test\nOld unused chunk\nOld unused chunk content for testing retention.\n"
+    )
+
+    archive_chunk("old_accessed_002")
+    purge_chunk("old_accessed_002")
+    reader = VectorStore(retention_context / "embeddings.npz")
+    reader.load()
+    assert "old_accessed_002" not in reader.chunk_ids
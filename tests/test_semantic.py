@@ -121,6 +121,422 @@ class TestVectorStore:
         results = store.search(np.array([0.0, 0.0]))
         assert results == []
 
+    def test_search_with_mask(self, tmp_path):
+        """Masked-out rows are never scored (Phase 11 filter pushdown)."""
+        store = self._make_store(tmp_path)
+        store.add("chunk_a", np.array([1.0, 0.0]))
+        store.add("chunk_b", np.array([0.9, 0.1]))
+        store.add("chunk_c", np.array([0.5, 0.5]))
+
+        results = store.search(np.array([1.0, 0.0]), top_k=2, mask=np.array([False, True, True]))
+        assert [cid for cid, _ in results] == ["chunk_b", "chunk_c"]
+
+        assert store.search(np.array([1.0, 0.0]), mask=np.zeros(3, dtype=bool)) == []
+
+
+    def test_search_batch_matches_search(self, tmp_path):
+        """One matmul for several queries gives the same hits as search()."""
+        store = self._make_store(tmp_path)
+        store.add("chunk_a", np.array([1.0, 0.0]))
+        store.add("chunk_b", np.array([0.9, 0.1]))
+        store.add("chunk_c", np.array([0.0, 1.0]))
+
+        queries = np.array([[1.0, 0.0], [0.0, 0.0], [0.2, 1.0]])
+        batch = store.search_batch(queries, top_k=2)
+        assert batch == [store.search(q, top_k=2) for q in queries]
+        assert batch[1] == []
+
+
+    def test_cached_norms_match_full_scoring(self, tmp_path):
+        """Cached row norms + argpartition give the same top-k as full scoring."""
+        rng = np.random.default_rng(0)
+        vectors = rng.standard_normal((200, 8)).astype(np.float32)
+        vectors[5] = 0  # Zero rows never match
+
+        store = self._make_store(tmp_path)
+        for i, vec in enumerate(vectors):
+            store.add(f"c{i}", vec)
+        store.add("c7", vectors[7] * 3)  # Replace updates the cached norm
+        store.remove("c9")
+        store.save()
+        store.load()
+
+        query = rng.standard_normal(8).astype(np.float32)
+        kept = [i for i in range(200) if i != 9]
+        v = vectors[kept]
+        full = (v @ query) / (np.maximum(np.linalg.norm(v, axis=1), 1e-10) * np.linalg.norm(query))
+        expected = [f"c{kept[i]}" for i in np.argsort(full)[::-1][:10] if full[i] > 0]
+
+        results = store.search(query, top_k=10)
+        assert [cid for cid, _ in results] == expected
+        assert results[0][1] == pytest.approx(float(np.sort(full)[-1]), abs=1e-5)
+
+
+    def test_load_is_memory_mapped(self, tmp_path):
+        """Load maps the .vec file without copying or decoding ids (Phase 11)."""
+        store = self._make_store(tmp_path)
+        store.add("chunk_a", np.array([1.0, 0.0]))
+        store.add("chunk_b", np.array([0.0, 1.0]))
+        store.save()
+        assert store.data_file == tmp_path / "test_embeddings.vec"
+        assert not store.path.exists()
+
+        store2 = self._make_store(tmp_path)
+        assert store2.load() is True
+        assert isinstance(store2.vectors, np.memmap)
+        assert store2.search(np.array([0.0, 1.0]), top_k=1)[0][0] == "chunk_b"
+        assert store2._ids is None  # Ids decoded lazily, per hit
+
+        store2.add("chunk_a", np.array([0.5, 0.5]))  # Base rows are never written
+        assert isinstance(store2._base, np.memmap)
+        assert store2.chunk_ids == ["chunk_b", "chunk_a"]
+        np.testing.assert_array_almost_equal(store2.vectors[1], [0.5, 0.5])
+
+    def test_legacy_npz_is_migrated(self, tmp_path):
+        """A pre-Phase 11 .npz is converted to .vec on first load."""
+        np.savez(
+            tmp_path / "test_embeddings.npz",
+            chunk_ids=np.array(["chunk_a", "chunk_b"], dtype=object),
+            vectors=np.array([[1.0, 0.0], [0.0, 1.0]]),
+        )
+        store = self._make_store(tmp_path)
+        assert store.load() is True
+        assert (tmp_path / "test_embeddings.vec").exists()
+
+        store2 = self._make_store(tmp_path)
+        assert store2.load() is True
+        assert isinstance(store2.vectors, np.memmap)
+        assert store2.chunk_ids == ["chunk_a", "chunk_b"]
+
+    def test_float16_storage(self, tmp_path, monkeypatch):
+        """RLM_VECTOR_DTYPE=float16 halves the matrix, search still works."""
+        monkeypatch.setenv("RLM_VECTOR_DTYPE", "float16")
+        store = self._make_store(tmp_path)
+        store.add("chunk_a", np.array([1.0, 0.0, 0.0]))
+        store.add("chunk_b", np.array([0.7, 0.7, 0.0]))
+        store.save()
+
+        store2 = self._make_store(tmp_path)
+        store2.load()
+        assert store2.vectors.dtype == np.float16
+        results = store2.search(np.array([1.0, 0.0, 0.0]), top_k=2)
+        assert [cid for cid, _ in results] == ["chunk_a", "chunk_b"]
+        assert results[0][1] == pytest.approx(1.0, abs=1e-3)
+
+    def test_corrupt_file(self, tmp_path):
+        """An unreadable .vec file loads as empty."""
+        (tmp_path / "test_embeddings.vec").write_bytes(b"garbage")
+        store = self._make_store(tmp_path)
+        assert store.load() is False
+        assert store.chunk_ids == []
+
+
+    def test_append_log_replayed_on_load(self, tmp_path):
+        """append()/append_remove() only touch the log; load() replays it."""
+        store = self._make_store(tmp_path)
+        store.add("chunk_a", np.array([1.0, 0.0]))
+        store.add("chunk_b", np.array([0.0, 1.0]))
+        store.save()
+        base = store.data_file.read_bytes()
+
+        writer = self._make_store(tmp_path)
+        writer.append("chunk_c", np.array([0.6, 0.8]))
+        writer.append("chunk_a", np.array([0.0, 2.0]))  # Replace
+        writer.append_remove("chunk_b")
+        assert store.data_file.read_bytes() == base
+
+        reader = self._make_store(tmp_path)
+        assert reader.load() is True
+        assert sorted(reader.chunk_ids) == ["chunk_a", "chunk_c"]
+        assert reader.search(np.array([0.0, 1.0]), top_k=1)[0][0] == "chunk_a"
+
+    def test_save_keeps_records_appended_since_load(self, tmp_path):
+        """save() merges log records other writers appended after load()."""
+        store = self._make_store(tmp_path)
+        store.add("chunk_a", np.array([1.0, 0.0]))
+        store.add("chunk_b", np.array([0.0, 1.0]))
+        store.save()
+
+        loaded = self._make_store(tmp_path)
+        loaded.load()
+        writer = self._make_store(tmp_path)
+        writer.append("chunk_c", np.array([0.6, 0.8]))  # e.g. the embed worker
+        writer.append("chunk_b", np.array([0.8, 0.6]))
+
+        loaded.add("chunk_d", np.array([0.5, 0.5]))
+        loaded.remove("chunk_a")
+        loaded.save()
+
+        assert loaded.log_file.stat().st_size == 0
+        reader = self._make_store(tmp_path)
+        reader.load()
+        assert sorted(reader.chunk_ids) == ["chunk_b", "chunk_c", "chunk_d"]
+        assert reader.search(np.array([1.0, 0.0]), top_k=1)[0][0] == "chunk_b"
+        assert loaded.chunk_ids == reader.chunk_ids
+
+    def test_append_without_base(self, tmp_path):
+        """A log alone is a valid store (first chunk after install)."""
+        self._make_store(tmp_path).append("chunk_a", np.array([1.0, 0.0]))
+        store = self._make_store(tmp_path)
+        assert store.load() is True
+        assert store.chunk_ids == ["chunk_a"]
+
+    def test_truncated_log_record_is_ignored(self, tmp_path):
+        """An interrupted append does not break the records before it."""
+        store = self._make_store(tmp_path)
+        store.append("chunk_a", np.array([1.0, 0.0]))
+        store.append("chunk_b", np.array([0.0, 1.0]))
+        store.log_file.write_bytes(store.log_file.read_bytes()[:-3])
+
+        reader = self._make_store(tmp_path)
+        reader.load()
+        assert reader.chunk_ids == ["chunk_a"]
+
+    def test_compaction(self, tmp_path, monkeypatch):
+        """Past the size threshold, the log is folded into the base file."""
+        from mcp_server.tools import vecstore
+
+        monkeypatch.setattr(vecstore, "VLOG_COMPACT_MIN_BYTES", 40)
+        store = self._make_store(tmp_path)
+        store.append("chunk_a", np.array([1.0, 0.0]))
+        assert not store.needs_compact()
+        store.append("chunk_b", np.array([0.0, 1.0]))  # 44 bytes of log
+        store.wait_for_compact()
+        assert store.log_file.stat().st_size == 0
+
+        reader = self._make_store(tmp_path)
+        assert reader.load() is True
+        assert isinstance(reader.vectors, np.memmap)
+        assert reader.chunk_ids == ["chunk_a", "chunk_b"]
+
+        store.append_remove("chunk_a")
+        reader = self._make_store(tmp_path)
+        reader.load()
+        assert reader.chunk_ids == ["chunk_b"]
+
+    def test_chunk_appends_to_log(self, temp_context_dir, monkeypatch):
+        """The embed worker appends chunk() embeddings instead of rewriting the store."""
+        from mcp_server.tools import navigation, vecstore
+        from mcp_server.tools.embedqueue import get_embed_queue
+
+        monkeypatch.setattr(navigation, "CONTEXT_DIR", temp_context_dir)
+        monkeypatch.setattr(navigation, "CHUNKS_DIR", temp_context_dir / "chunks")
+        monkeypatch.setattr(navigation, "INDEX_FILE", temp_context_dir / "index.json")
+        monkeypatch.setattr(
+            vecstore, "DEFAULT_EMBEDDINGS_PATH", temp_context_dir / "embeddings.npz"
+        )
+        provider = MagicMock()
+        provider.embed.return_value = np.array([[0.3, 0.4]])
+
+        with patch("mcp_server.tools.embeddings._get_cached_provider", return_value=provider):
+            result = navigation.chunk("Contenu de test", project="RLM")
+            get_embed_queue(temp_context_dir).wait_for_worker()
+
+        assert (temp_context_dir / "embeddings.vlog").exists()
+        assert not (temp_context_dir / "embeddings.vec").exists()
+        store = vecstore.VectorStore()
+        store.load()
+        assert store.chunk_ids == [result["chunk_id"]]
+
+
+    def test_rows_are_reused_and_masked(self, tmp_path):
+        """Removed rows are masked out of search; extra rows are reused (Phase 11)."""
+        store = self._make_store(tmp_path)
+        store.add("base_a", np.array([1.0, 0.0]))
+        store.add("base_b", np.array([0.9, 0.1]))
+        store.save()
+        store.load()
+
+        store.add("new_c", np.array([0.8, 0.2]))
+        store.remove("base_a")
+        store.remove("new_c")
+        store.add("new_d", np.array([0.7, 0.3]))
+
+        assert store.row_ids == [None, "base_b", "new_d"]  # new_d reused new_c's row
+        assert len(store) == 2
+        results = store.search(np.array([1.0, 0.0]), top_k=5)
+        assert [cid for cid, _ in results] == ["base_b", "new_d"]
+
+        mask = np.array([True, False, True])  # Aligned with row_ids
+        assert [cid for cid, _ in store.search(np.array([1.0, 0.0]), mask=mask)] == ["new_d"]
+
+        store.save()
+        reloaded = self._make_store(tmp_path)
+        reloaded.load()
+        assert reloaded.row_ids == ["base_b", "new_d"]
+
+    def test_many_adds_and_removes(self, tmp_path):
+        """Capacity growth and row reuse keep every live vector searchable."""
+        rng = np.random.default_rng(1)
+        store = self._make_store(tmp_path)
+        expected = {}
+        for i in range(300):
+            cid = f"c{i % 120}"
+            if rng.random() < 0.3 and cid in expected:
+                store.remove(cid)
+                del expected[cid]
+            else:
+                expected[cid] = rng.standard_normal(4).astype(np.float32)
+                store.add(cid, expected[cid])
+
+        assert sorted(store.chunk_ids) == sorted(expected)
+        for cid, vec in list(expected.items())[:10]:
+            assert store.search(vec, top_k=1)[0][0] == cid
+
+
+class TestANNIndex:
+    """Test the optional IVF index (RLM_VECTOR_INDEX=ivf)."""
+
+    @pytest.fixture
+    def ivf_store(self, tmp_path, monkeypatch):
+        from mcp_server.tools import vecstore
+
+        monkeypatch.setenv("RLM_VECTOR_INDEX", "ivf")
+        monkeypatch.setattr(vecstore, "ANN_MIN_ROWS", 100)
+
+        # Clustered vectors, like real embeddings (IVF relies on the structure)
+        rng = np.random.default_rng(0)
+        centers = rng.standard_normal((20, 16)).astype(np.float32)
+        store = vecstore.VectorStore(path=tmp_path / "embeddings.npz")
+        for i in range(1000):
+            store.add(f"c{i}", centers[i % 20] + 0.3 * rng.standard_normal(16))
+        store.save()
+        store.load()
+        return store
+
+    def _brute_force(self, store, query, top_k):
+        vectors = np.asarray(store.vectors, dtype=np.float32)
+        sims = vectors @ query / (np.linalg.norm(vectors, axis=1) * np.linalg.norm(query))
+        return [store.chunk_ids[i] for i in np.argsort(sims)[::-1][:top_k]]
+
+    def test_recall_against_brute_force(self, ivf_store, monkeypatch):
+        index = ivf_store.ann_index()
+        assert index is not None and ivf_store.ann_file.exists()
+
+        rng = np.random.default_rng(1)
+        queries = rng.standard_normal((20, 16)).astype(np.float32)
+        hits = 0
+        for query in queries:
+            got = [cid for cid, _ in ivf_store.search(query, top_k=10)]
+            hits += len(set(got) & set(self._brute_force(ivf_store, query, 10)))
+        assert hits / 200 >= 0.8
+
+        # Probing every list is exact
+        monkeypatch.setenv("RLM_IVF_NPROBE", str(index.n_lists))
+        for query in queries[:5]:
+            got = [cid for cid, _ in ivf_store.search(query, top_k=10)]
+            assert got == self._brute_force(ivf_store, query, 10)
+
+    def test_persisted_index_is_reused(self, ivf_store, monkeypatch):
+        from mcp_server.tools import vecstore
+
+        ivf_store.ann_index()
+        monkeypatch.setattr(vecstore.IVFIndex, "build", MagicMock(side_effect=AssertionError))
+
+        store = vecstore.VectorStore(path=ivf_store.path)
+        store.load()
+        assert store.ann_index() is not None
+
+    def test_rebuilt_when_base_changes(self, ivf_store):
+        old = ivf_store.ann_index()
+        ivf_store.add("new", np.ones(16))
+        ivf_store.save()  # Rebuilds the index for the new base file
+        ivf_store.load()
+
+        index = ivf_store.ann_index()
+        assert index.fingerprint != old.fingerprint
+        assert len(index.order) == 1001
+
+    def test_log_rows_and_removals(self, ivf_store):
+        query = np.zeros(16)
+        query[0] = 1.0
+        ivf_store.append("logged", query * 100)
+        ivf_store.load()
+        assert ivf_store.search(query, top_k=1)[0][0] == "logged"
+
+        best_base = ivf_store.search(-query, top_k=1)[0][0]
+        ivf_store.remove(best_base)
+        assert best_base not in [cid for cid, _ in ivf_store.search(-query, top_k=10)]
+
+    def test_flat_by_default(self, ivf_store, monkeypatch):
+        monkeypatch.delenv("RLM_VECTOR_INDEX")
+        assert ivf_store.ann_index() is None
+
+
+class TestQuantization:
+    """Test int8 / binary code shortlists with exact rescoring (RLM_VECTOR_QUANT)."""
+
+    @pytest.fixture(params=["int8", "binary"])
+    def quant_store(self, request, tmp_path, monkeypatch):
+        from mcp_server.tools import vecstore
+
+        monkeypatch.setenv("RLM_VECTOR_QUANT", request.param)
+        monkeypatch.setattr(vecstore, "ANN_MIN_ROWS", 100)
+
+        rng = np.random.default_rng(0)
+        centers = rng.standard_normal((20, 64)).astype(np.float32)
+        store = vecstore.VectorStore(path=tmp_path / "embeddings.npz")
+        for i in range(1000):
+            store.add(f"c{i}", centers[i % 20] + 0.5 * rng.standard_normal(64))
+        store.save()
+        store.load()
+        return store
+
+    def _exact(self, store, query, top_k):
+        from mcp_server.tools.vecstore import _inverse_norms
+
+        vectors = np.asarray(store.vectors, dtype=np.float32)
+        sims = (vectors @ query) * _inverse_norms(vectors) / np.linalg.norm(query)
+        return [(store.chunk_ids[i], float(sims[i])) for i in np.argsort(sims)[::-1][:top_k]]
+
+    def test_codes_are_smaller(self, quant_store):
+        codes = quant_store.quantized()
+        assert quant_store.quant_file.exists()
+        ratio = {"int8": 4, "binary": 32}[codes.kind]
+        assert codes.nbytes * ratio == 1000 * 64 * 4
+
+    def test_rescored_results_match_brute_force(self, quant_store):
+        # Queries near the stored data, like real embeddings
+        rng = np.random.default_rng(1)
+        queries = np.asarray(quant_store.vectors[:10]) + 0.5 * rng.standard_normal((10, 64))
+        hits = 0
+        for query in queries.astype(np.float32):
+            got = quant_store.search(query, top_k=5)
+            exact = dict(self._exact(quant_store, query, 1000))
+            hits += len({cid for cid, _ in got} & set(list(exact)[:5]))
+            # Scores come from the full-precision vectors, not the codes
+            for cid, score in got:
+                assert score == pytest.approx(exact[cid], abs=1e-5)
+        assert hits / 50 >= 0.9
+
+    def test_mask_and_log_rows(self, quant_store):
+        query = np.random.default_rng(2).standard_normal(64).astype(np.float32)
+        mask = np.zeros(len(quant_store.row_ids), dtype=bool)
+        mask[::3] = True
+        allowed = {cid for cid, keep in zip(quant_store.row_ids, mask, strict=True) if keep}
+        got = quant_store.search(query, top_k=5, mask=mask)
+        assert len(got) == 5 and {cid for cid, _ in got} <= allowed
+
+        quant_store.append("logged", query)
+        quant_store.load()
+        assert quant_store.search(query, top_k=1)[0][0] == "logged"
+
+    def test_persisted_codes_are_reused(self, quant_store, monkeypatch):
+        from mcp_server.tools import vecstore
+
+        kind = quant_store.quantized().kind
+        monkeypatch.setattr(vecstore.QuantizedCodes, "build", MagicMock(side_effect=AssertionError))
+        store = vecstore.VectorStore(path=quant_store.path)
+        store.load()
+        codes = store.quantized()
+        assert codes.kind == kind and isinstance(codes.codes, np.memmap)
+
+    def test_popcount_table(self):
+        from mcp_server.tools.quant import _POPCOUNT_TABLE
+
+        values = np.arange(256, dtype=np.uint8)
+        assert np.array_equal(_POPCOUNT_TABLE[values], np.unpackbits(values[:, None], axis=1).sum(1))
+
 
 # =============================================================================
 # BM25 Normalization Tests
@@ -287,6 +703,36 @@ class TestGracefulDegradation:
         emb_module._provider_loaded = False
         emb_module._cached_provider = None
 
+    def test_provider_loaded_once_across_threads(self, monkeypatch):
+        """A caller racing the warm-up thread waits for the model instead of getting None."""
+        import threading
+        import time
+
+        import mcp_server.tools.embeddings as emb_module
+
+        monkeypatch.setattr(emb_module, "_cached_provider", None)
+        monkeypatch.setattr(emb_module, "_provider_loaded", False)
+        loads = []
+
+        def slow_provider():
+            time.sleep(0.05)
+            loads.append(1)
+            return "provider"
+
+        monkeypatch.setattr(emb_module, "Model2VecProvider", slow_provider)
+        results = []
+        threads = [
+            threading.Thread(target=lambda: results.append(emb_module._get_cached_provider()))
+            for _ in range(4)
+        ]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        assert results == ["provider"] * 4
+        assert len(loads) == 1
+
 
 # =============================================================================
 # Phase 8.1: Metadata-Boosted Search Tests
@@ -0,0 +1,314 @@
+"""
+Tests for the trigram index (Phase 11).
+
+Tests cover:
+- Regex to trigram query: candidates are a superset of the real matches
+- Case-insensitive matching (including non-ASCII case folds)
+- grep() only opens candidate chunks, results unchanged
+- Changed and removed chunks, log replay and compaction
+- Archive / restore hooks
+"""
+
+import json
+import random
+import re
+
+import pytest
+
+from mcp_server.tools.trigram import (
+    TrigramIndex,
+    body_text,
+    get_trigram_index,
+    index_chunk_trigrams,
+    regex_query,
+    trigram_keys,
+    unindex_chunk_trigrams,
+)
+
+WORDS = [
+    "nginx", "postgres", "redis", "deploy", "Kubernetes", "timeout", "error",
+    "config", "v2.3.1", "café", "straße", "ſtate", "KELVIN", "İstanbul", "abc",
+]  # fmt: skip
+
+PATTERNS = [
+    "nginx",
+    "NGINX",
+    "post(gres|man)",
+    "redis|timeout",
+    "dep.oy",
+    "k[a-z]bernetes",
+    "err(or)?s?",
+    "(ab)+c",
+    "v2\\.3\\.\\d",
+    "^config",
+    "tim[e]+out",
+    "caf[éè]",
+    "STRASSE",
+    "straße",
+    "state",
+    "kelvin",
+    "istanbul",
+    "[^x]ginx",
+    "x*nginx",
+    "\\bredis\\b",
+    "(?:deploy|config) (?:error|timeout)",
+    "a{2,}",
+    "no-such-term",
+    "ab",
+]
+
+
+def _write_chunk(context_dir, chunk_id, body):
+    path = context_dir / "chunks" / f"{chunk_id}.md"
+    path.write_text(f"---\nid: {chunk_id}\nsummary: nginx redis\n---\n\n{body}", encoding="utf-8")
+    return path
+
+
+def _matches(pattern, path):
+    """Brute force: does any body line match, as grep() searches."""
+    regex = re.compile(pattern, re.IGNORECASE)
+    body = body_text(path.read_text(encoding="utf-8"))
+    return any(regex.search(line) for line in body.splitlines(keepends=True))
+
+
+@pytest.fixture
+def corpus(temp_context_dir):
+    rng = random.Random(7)
+    chunks = []
+    for i in range(60):
+        lines = [" ".join(rng.choices(WORDS, k=rng.randint(1, 6))) for _ in range(3)]
+        path = _write_chunk(temp_context_dir, f"c{i:02d}", "\n".join(lines) + "\n")
+        chunks.append((f"c{i:02d}", path))
+    return temp_context_dir, chunks
+
+
+class TestQuery:
+    def test_keys_fold_case(self):
+        assert trigram_keys("NGINX") == trigram_keys("nginx")
+        assert trigram_keys("Kelvin") == trigram_keys("kelvin")
+        assert trigram_keys("ab") == []
+
+    def test_unselective_patterns_scan_everything(self):
+        for pattern in (".*", "ab", "a|bcd", "[^a]+", "x?yz"):
+            assert regex_query(pattern) is None
+
+    def test_literal_query(self):
+        assert regex_query("nginx") is not None
+
+    def test_header_is_not_indexed(self):
+        assert body_text("---\nid: x\n---\n\nbody\n") == "\nbody\n"
+
+
+class TestCandidates:
+    def test_superset_of_matches(self, corpus):
+        context_dir, chunks = corpus
+        index = TrigramIndex(context_dir)
+        for pattern in PATTERNS:
+            expected = {cid for cid, path in chunks if _matches(pattern, path)}
+            candidates = index.candidates(pattern, chunks)
+            if candidates is not None:
+                assert expected <= candidates, pattern
+
+    def test_prunes_rare_terms(self, corpus):
+        context_dir, chunks = corpus
+        index = TrigramIndex(context_dir)
+        assert index.candidates("no-such-term", chunks) == set()
+        assert index.candidates("nginx", chunks) == {
+            cid for cid, path in chunks if _matches("nginx", path)
+        }
+
+    def test_changed_and_removed_chunks(self, corpus):
+        context_dir, chunks = corpus
+        index = TrigramIndex(context_dir)
+        assert index.candidates("zeppelin", chunks) == set()
+
+        # Rewritten behind the index's back: picked up by size/mtime
+        _write_chunk(context_dir, "c00", "a zeppelin story, much longer than before\n")
+        assert index.candidates("zeppelin", chunks) == {"c00"}
+
+        index.remove("c00")
+        other = TrigramIndex(context_dir)
+        other.refresh()
+        assert "c00" not in other._fps
+
+    def test_synced_once_per_generation(self, corpus, monkeypatch):
+        from mcp_server.tools import trigram
+
+        context_dir, chunks = corpus
+        index = TrigramIndex(context_dir)
+        assert index.candidates("zeppelin", chunks, ("gen", 1)) == set()
+
+        checked = []
+        real_fingerprint = trigram._fingerprint
+        monkeypatch.setattr(
+            trigram, "_fingerprint", lambda path: checked.append(path) or real_fingerprint(path)
+        )
+        _write_chunk(context_dir, "c00", "a zeppelin story, much longer than before\n")
+        assert index.candidates("zeppelin", chunks, ("gen", 1)) == set()
+        assert checked == []
+
+        assert index.candidates("zeppelin", chunks, ("gen", 2)) == {"c00"}
+        assert len(checked) == len(chunks) + 1  # Every file, then the one reindexed
+
+    def test_compaction_roundtrip(self, corpus):
+        context_dir, chunks = corpus
+        index = TrigramIndex(context_dir)
+        before = {p: index.candidates(p, chunks) for p in PATTERNS}
+        index.remove("c01")
+        before = {p: (c - {"c01"} if c is not None else None) for p, c in before.items()}
+
+        assert index.compact()
+        assert (context_dir / "trigrams.tlog").stat().st_size == 0
+
+        reloaded = TrigramIndex(context_dir)
+        reloaded.refresh()
+        assert len(reloaded) == len(chunks) - 1
+        remaining = [(cid, path) for cid, path in chunks if cid != "c01"]
+        for pattern in PATTERNS:
+            assert reloaded.candidates(pattern, remaining) == before[pattern], pattern
+        assert reloaded.sync(remaining) == 0  # Nothing reindexed
+
+        # The first index sees the new base on its next refresh
+        index.refresh()
+        assert len(index) == len(chunks) - 1
+
+    def test_refresh_consistent_with_concurrent_compaction(self, corpus, monkeypatch):
+        import threading
+
+        from mcp_server.tools import trigram
+
+        context_dir, chunks = corpus
+        writer, reader = TrigramIndex(context_dir), TrigramIndex(context_dir)
+        writer.add_files(chunks[:10])
+        reader.refresh()
+        writer.add_files(chunks[10:20])
+
+        def compact_and_append():
+            other = TrigramIndex(context_dir)
+            other.compact()  # Base replaced, log truncated...
+            other.add_files(chunks[20:])  # ...then grown past the reader's position
+
+        # Another writer runs right after the reader checked the base
+        threads = []
+        real_stat_key = trigram._stat_key
+
+        def racing_stat_key(path):
+            key = real_stat_key(path)
+            if path == reader.base_file and not threads:
+                threads.append(threading.Thread(target=compact_and_append))
+                threads[0].start()
+                threads[0].join(0.2)
+            return key
+
+        monkeypatch.setattr(trigram, "_stat_key", racing_stat_key)
+        reader.refresh()
+        assert sorted(reader._fps) == [cid for cid, _ in chunks[:20]]  # State before the writer
+        threads[0].join()
+        reader.refresh()
+
+        assert sorted(reader._fps) == sorted(cid for cid, _ in chunks)
+        assert reader.candidates("nginx", chunks) == {
+            cid for cid, path in chunks if _matches("nginx", path)
+        }
+
+
+class TestGrep:
+    @pytest.fixture
+    def nav(self, temp_context_dir, monkeypatch):
+        from mcp_server.tools import navigation
+
+        monkeypatch.setattr(navigation, "CONTEXT_DIR", temp_context_dir)
+        monkeypatch.setattr(navigation, "CHUNKS_DIR", temp_context_dir / "chunks")
+        monkeypatch.setattr(navigation, "INDEX_FILE", temp_context_dir / "index.json")
+        return navigation
+
+    def _index(self, context_dir, ids):
+        index_file = context_dir / "index.json"
+        index = json.loads(index_file.read_text())
+        index["chunks"] = [
+            {"id": cid, "file": f"chunks/{cid}.md", "summary": cid, "tags": []} for cid in ids
+        ]
+        index_file.write_text(json.dumps(index))
+
+    def test_only_candidates_are_opened(self, nav, temp_context_dir, monkeypatch):
+        _write_chunk(temp_context_dir, "hit", "the zeppelin landed\n")
+        _write_chunk(temp_context_dir, "miss", "nothing to see\n")
+        self._index(temp_context_dir, ["hit", "miss"])
+        nav.grep("warm up the index")
+
+        opened = []
+        real_open = open
+
+        def tracking_open(path, *args, **kwargs):
+            opened.append(str(path))
+            return real_open(path, *args, **kwargs)
+
+        monkeypatch.setattr("builtins.open", tracking_open)
+        result = nav.grep("Zeppelin")
+
+        assert [m["chunk_id"] for m in result["matches"]] == ["hit"]
+        assert not any(p.endswith("miss.md") for p in opened)
+
+    def test_chunk_files_checked_on_generation_change(self, nav, temp_context_dir, monkeypatch):
+        from mcp_server.tools import trigram
+        from mcp_server.tools.fileutil import bump_generation
+
+        _write_chunk(temp_context_dir, "hit", "the zeppelin landed\n")
+        self._index(temp_context_dir, ["hit"])
+        bump_generation(temp_context_dir, "index")
+        assert nav.grep("zeppelin")["match_count"] == 1
+
+        checked = []
+        real_fingerprint = trigram._fingerprint
+        monkeypatch.setattr(
+            trigram, "_fingerprint", lambda path: checked.append(path) or real_fingerprint(path)
+        )
+        assert nav.grep("zeppelin")["match_count"] == 1
+        assert nav.grep("zzqx")["match_count"] == 0
+        assert checked == []
+
+        _write_chunk(temp_context_dir, "new", "another zeppelin\n")
+        self._index(temp_context_dir, ["hit", "new"])
+        bump_generation(temp_context_dir, "index")
+        assert nav.grep("zeppelin")["match_count"] == 2
+        assert len(checked) == 3  # Both files, then the new one indexed
+
+    def test_invalid_regex_still_searched_literally(self, nav, temp_context_dir):
+        _write_chunk(temp_context_dir, "a", "call foo(bar now\n")
+        self._index(temp_context_dir, ["a"])
+        assert nav.grep("foo(bar")["match_count"] == 1
+
+
+class TestHooks:
+    def test_archive_and_restore(self, temp_context_dir, monkeypatch):
+        from mcp_server.tools import retention
+
+        monkeypatch.setattr(retention, "CONTEXT_DIR", temp_context_dir)
+        monkeypatch.setattr(retention, "CHUNKS_DIR", temp_context_dir / "chunks")
+        monkeypatch.setattr(retention, "ARCHIVE_DIR", temp_context_dir / "archive")
+        monkeypatch.setattr(retention, "INDEX_FILE", temp_context_dir / "index.json")
+        monkeypatch.setattr(
+            retention, "ARCHIVE_INDEX_FILE", temp_context_dir / "archive_index.json"
+        )
+        path = _write_chunk(temp_context_dir, "old", "the zeppelin landed\n")
+        index_file = temp_context_dir / "index.json"
+        index = json.loads(index_file.read_text())
+        index["chunks"] = [{"id": "old", "file": "chunks/old.md", "summary": "old"}]
+        index_file.write_text(json.dumps(index))
+
+        index_chunk_trigrams(temp_context_dir, "old", path)
+        trigrams = get_trigram_index(temp_context_dir)
+        trigrams.refresh()
+        assert "old" in trigrams._fps
+
+        assert retention.archive_chunk("old")["status"] == "archived"
+        trigrams.refresh()
+        assert "old" not in trigrams._fps
+
+        assert retention.restore_chunk("old")["status"] == "restored"
+        trigrams.refresh()
+        assert "old" in trigrams._fps
+
+    def test_hooks_never_raise(self, tmp_path):
+        unindex_chunk_trigrams(tmp_path / "missing" / "file", "x")
+        index_chunk_trigrams(tmp_path, "x", tmp_path / "nope.md")